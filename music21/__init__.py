@@ -85,7 +85,7 @@ __all__ = ['base',
            'key', 
            'layout',
            'medren', 'metadata', 'meter', 
-           'note', 
+           'note', 'noteArray',
            'pitch', 
            'ratios', 'repeat', 'roman',
            'scale', 'search', 'serial', 'sieve', 'spanner', 'stream', 
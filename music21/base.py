@@ -48,6 +48,7 @@ import copy
 import inspect
 import math
 import json
+import os
 import sys
 import types
 import unittest, doctest
@@ -126,6 +127,9 @@ class JSONSerializer(object):
     # this class need to give object last
     # e.g. class Text(music21.JSONSerializer, object):
 
+    # subclasses that define slots do not need instance dictionaries
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -655,6 +659,62 @@ class Groups(list):
 
 
 #-------------------------------------------------------------------------------
+# a DefinedContexts of this size or larger is searched for dead references 
+# before storing a new reference
+_DEFINED_CONTEXTS_PURGE_SIZE = 8
+
+class SiteRef(object):
+    '''
+    A single reference stored in a 
+    :class:`~music21.base.DefinedContexts` object: the (weak) 
+    reference to the object, the offset if it is a location, the time 
+    added, the name of the object's class, and whether the referenced 
+    object no longer exists.
+
+    >>> from music21 import *
+    >>> s = stream.Stream()
+    >>> n = note.Note()
+    >>> s.insert(4, n)
+    >>> siteRef = n._definedContexts._definedContexts[id(s)]
+    >>> siteRef.offset, siteRef.classString, siteRef.isDead
+    (4.0, 'Stream', False)
+    >>> siteRef.obj() is s
+    True
+    '''
+    # slots avoid storing a dictionary for every reference; jsonpickle 
+    # requires that slots are in sorted order
+    __slots__ = ('classString', 'isDead', 'obj', 'offset', 'time')
+
+    def __init__(self, obj=None, offset=None, time=0, classString=None, 
+        isDead=False):
+        self.obj = obj
+        self.offset = offset
+        self.time = time
+        self.classString = classString
+        self.isDead = isDead
+
+    def __getstate__(self):
+        return self.toDict()
+
+    def __setstate__(self, state):
+        self.obj = state['obj']
+        self.offset = state['offset']
+        self.time = state['time']
+        self.classString = state['class']
+        self.isDead = state['isDead']
+
+    def toDict(self):
+        '''
+        Return the stored values as a dictionary, as used for JSON.
+
+        >>> from music21 import *
+        >>> sorted(base.SiteRef(offset=2.0, time=3).toDict().items())
+        [('class', None), ('isDead', False), ('obj', None), ('offset', 2.0), ('time', 3)]
+        '''
+        return {'obj': self.obj, 'offset': self.offset, 'time': self.time, 
+                'class': self.classString, 'isDead': self.isDead}
+
+
 class DefinedContexts(JSONSerializer):
     '''
     An object, stored within a Music21Object, that 
@@ -666,11 +726,17 @@ class DefinedContexts(JSONSerializer):
     object stores an offset value, used for determining position 
     within a Stream. 
 
-    All defined contexts are stored as dictionaries in a 
-    dictionary. The outermost dictionary stores objects.
+    All defined contexts are stored as :class:`~music21.base.SiteRef` 
+    objects in a dictionary keyed by object id. References to objects 
+    that no longer exist are removed when new references are added.
     '''
+    # there is one DefinedContexts for every Music21Object; jsonpickle 
+    # requires that slots are in sorted order
+    __slots__ = ('_definedContexts', '_lastID', '_lastOffset', 
+                 '_locationKeys', '_purgeSize', '_timeIndex', 'containedById')
+
     def __init__(self, containedById=None):
-        # a dictionary of dictionaries
+        # a dictionary of SiteRef objects
         self._definedContexts = {} 
         # store idKeys in lists for easy access
         # the same key may be both in locationKeys and contextKeys
@@ -683,6 +749,44 @@ class DefinedContexts(JSONSerializer):
         # cache for performance
         self._lastID = -1 # cannot be None
         self._lastOffset = None
+        # size at which to next look for dead references
+        self._purgeSize = _DEFINED_CONTEXTS_PURGE_SIZE
+
+    def __getstate__(self):
+        return dict([(name, getattr(self, name)) for name in self.__slots__])
+
+    def __setstate__(self, state):
+        for name in self.__slots__:
+            if name in state:
+                setattr(self, name, state[name])
+        if '_purgeSize' not in state:
+            self._purgeSize = _DEFINED_CONTEXTS_PURGE_SIZE
+
+    def jsonAttributes(self):
+        '''
+        Return the names of the attributes stored in JSON.
+        '''
+        return ['_definedContexts', '_lastID', '_lastOffset', 
+                '_locationKeys', '_timeIndex']
+
+    def _getJSONDict(self, includeVersion=False):
+        src = JSONSerializer._getJSONDict(self, includeVersion=includeVersion)
+        # SiteRef objects are stored as dictionaries
+        siteRefs = src['__attr__']['_definedContexts']
+        for idKey in siteRefs.keys():
+            siteRefs[idKey] = siteRefs[idKey].toDict()
+        return src
+
+    def _setJSON(self, jsonStr):
+        JSONSerializer._setJSON(self, jsonStr)
+        for idKey in self._definedContexts.keys():
+            siteRef = self._definedContexts[idKey]
+            if isinstance(siteRef, dict):
+                self._definedContexts[idKey] = SiteRef(siteRef['obj'], 
+                    siteRef['offset'], siteRef['time'], siteRef['class'], 
+                    siteRef['isDead'])
+
+    json = property(JSONSerializer._getJSON, _setJSON)
 
     def __len__(self):
         '''Return the total number of references.
@@ -731,24 +835,19 @@ class DefinedContexts(JSONSerializer):
         locations = [] #self._locationKeys[:]
         #environLocal.printDebug(['DefinedContexts.__deepcopy__', 'self._definedContexts.keys()', self._definedContexts.keys()])
         for idKey in self._definedContexts.keys():
-            dict = self._definedContexts[idKey]
-            if dict['isDead']:
+            siteRef = self._definedContexts[idKey]
+            if siteRef.isDead:
                 continue # do not copy dead references
-            post = {}
-            post['obj'] = dict['obj'] # already a weak ref
-
             # not copying the offset in deepcopying means that 
             # the old site becomes a context, not a site
             # this is still experimental
-            # post['offset'] = None
+            # post.offset = None
 
-            post['offset'] = dict['offset']
-            if post['offset'] is not None:
+            # the weak ref is already wrapped; time is assumed still valid
+            post = SiteRef(siteRef.obj, siteRef.offset, siteRef.time, 
+                           siteRef.classString)
+            if post.offset is not None:
                 locations.append(idKey) # if offset not None, a location
-
-            post['time'] = dict['time'] # assume still valid
-            post['class'] = dict['class']
-            post['isDead'] = False
             new._definedContexts[idKey] = post
 
         new._locationKeys = locations
@@ -771,12 +870,12 @@ class DefinedContexts(JSONSerializer):
         >>> aContexts.add(bObj)
         >>> common.isWeakref(aContexts.get()[0]) # unwrapping happens 
         False
-        >>> common.isWeakref(aContexts._definedContexts[id(aObj)]['obj'])
+        >>> common.isWeakref(aContexts._definedContexts[id(aObj)].obj)
         True
         >>> aContexts.unwrapWeakref()
-        >>> common.isWeakref(aContexts._definedContexts[id(aObj)]['obj'])
+        >>> common.isWeakref(aContexts._definedContexts[id(aObj)].obj)
         False
-        >>> common.isWeakref(aContexts._definedContexts[id(bObj)]['obj'])
+        >>> common.isWeakref(aContexts._definedContexts[id(bObj)].obj)
         False
         '''
         self.purgeLocations(rescanIsDead=True)
@@ -784,18 +883,18 @@ class DefinedContexts(JSONSerializer):
         #environLocal.printDebug(['self', self, 'self._definedContexts.keys()', self._definedContexts.keys()])
         for idKey in self._definedContexts.keys():
             if WEAKREF_ACTIVE:
-            #if common.isWeakref(self._definedContexts[idKey]['obj']):
-                target = self._definedContexts[idKey]['obj']
+            #if common.isWeakref(self._definedContexts[idKey].obj):
+                target = self._definedContexts[idKey].obj
                 if target is None:
                     continue
                 if common.isWeakref(target):
-                    #environLocal.printDebug(['unwrapping:', self._definedContexts[idKey]['obj']])
+                    #environLocal.printDebug(['unwrapping:', self._definedContexts[idKey].obj])
                     target = common.unwrapWeakref(target)
-                    self._definedContexts[idKey]['obj'] = target
+                    self._definedContexts[idKey].obj = target
                     # we may need to unwrap the weakrefs in this Stream
                     # if it is not stored elsewhere
 #                     if target is not None:
-#                         self._definedContexts[idKey]['obj'].unwrapWeakref()
+#                         self._definedContexts[idKey].obj.unwrapWeakref()
 
     def wrapWeakref(self):
         '''
@@ -810,18 +909,18 @@ class DefinedContexts(JSONSerializer):
         >>> aContexts.add(bObj)
         >>> aContexts.unwrapWeakref()
         >>> aContexts.wrapWeakref()
-        >>> common.isWeakref(aContexts._definedContexts[id(aObj)]['obj'])
+        >>> common.isWeakref(aContexts._definedContexts[id(aObj)].obj)
         True
-        >>> common.isWeakref(aContexts._definedContexts[id(bObj)]['obj'])
+        >>> common.isWeakref(aContexts._definedContexts[id(bObj)].obj)
         True
         '''
         for idKey in self._definedContexts.keys():
-            if self._definedContexts[idKey]['obj'] is None:
+            if self._definedContexts[idKey].obj is None:
                 continue # always skip None
-            if not common.isWeakref(self._definedContexts[idKey]['obj']):
-                #environLocal.printDebug(['wrapping:', self._definedContexts[idKey]['obj']])
-                post = common.wrapWeakref(self._definedContexts[idKey]['obj'])
-                self._definedContexts[idKey]['obj'] = post
+            if not common.isWeakref(self._definedContexts[idKey].obj):
+                #environLocal.printDebug(['wrapping:', self._definedContexts[idKey].obj])
+                post = common.wrapWeakref(self._definedContexts[idKey].obj)
+                self._definedContexts[idKey].obj = post
 
     def freezeIds(self):
         '''
@@ -847,10 +946,10 @@ class DefinedContexts(JSONSerializer):
         counter = common.SingletonCounter()
 
         for idKey in self._definedContexts.keys():
-            if idKey is not None:
-                newKey = counter() # uuid.uuid4()
-            else:
-                newKey = idKey # keep None
+            # zero-padded strings sort the same before and after json
+            # encoding, so that serializers that track references by
+            # traversal order find site records in the same order
+            newKey = '%012d' % counter()
             # might want to store old id?
             #environLocal.printDebug(['freezing key:', idKey, newKey])
             if idKey in self._locationKeys:
@@ -903,7 +1002,7 @@ class DefinedContexts(JSONSerializer):
         postLocationKeys = []
         for idKey in self._definedContexts.keys():
             # check if unwrapped, unwrap
-            obj = common.unwrapWeakref(self._definedContexts[idKey]['obj'])
+            obj = common.unwrapWeakref(self._definedContexts[idKey].obj)
             if obj is not None:
                 newKey = id(obj)
             else:
@@ -961,8 +1060,14 @@ class DefinedContexts(JSONSerializer):
             idKey = id(obj)
 
         updateNotAdd = False
-        if idKey in self._definedContexts.keys():
+        if idKey in self._definedContexts:
             updateNotAdd = True 
+        elif len(self._definedContexts) >= self._purgeSize:
+            # remove dead references before storing more; as the next 
+            # purge is only done after the size doubles, this is cheap
+            self._purgeDead()
+            self._purgeSize = max(_DEFINED_CONTEXTS_PURGE_SIZE, 
+                                  2 * len(self._definedContexts))
 
         if offset is not None: # a location, not a context
             if idKey not in self._locationKeys:                 
@@ -977,23 +1082,24 @@ class DefinedContexts(JSONSerializer):
             classString = obj.classes[0] # get last class
             objRef = self._prepareObject(obj)
 
-        if updateNotAdd:
-            dict = self._definedContexts[idKey]
-        else:
-            dict = {}
-
-        dict['obj'] = objRef # a weak ref
-        dict['offset'] = offset # offset can be None for contexts
-        dict['class'] = classString 
-        dict['isDead'] = False # store to access w/o unwrapping
         # time is a numeric count, not a real time measure
         if timeValue is None:
-            dict['time'] = self._timeIndex
+            timeValue = self._timeIndex
             self._timeIndex += 1 # increment for next usage
-        else:
-            dict['time'] = timeValue
-        if not updateNotAdd: # add new/missing information to dictionary
-            self._definedContexts[idKey] = dict
+
+        if updateNotAdd:
+            siteRef = self._definedContexts[idKey]
+            siteRef.obj = objRef # a weak ref
+            siteRef.offset = offset # offset can be None for contexts
+            siteRef.classString = classString 
+            siteRef.isDead = False # store to access w/o unwrapping
+            siteRef.time = timeValue
+            if idKey == self._lastID: # cached offset may have changed
+                self._lastID = -1
+                self._lastOffset = None
+        else: # add new/missing information to dictionary
+            self._definedContexts[idKey] = SiteRef(objRef, offset, 
+                                                   timeValue, classString)
 
 
     def remove(self, site):
@@ -1067,13 +1173,13 @@ class DefinedContexts(JSONSerializer):
         Return the object specified by an id.
         Used for testing and debugging. 
         '''
-        dict = self._definedContexts[id]
+        siteRef = self._definedContexts[id]
         # need to check if these is weakref
-        #if common.isWeakref(dict['obj']):
+        #if common.isWeakref(siteRef.obj):
         if WEAKREF_ACTIVE:
-            return common.unwrapWeakref(dict['obj'])
+            return common.unwrapWeakref(siteRef.obj)
         else:
-            return dict['obj']
+            return siteRef.obj
 
 
     def _keysByTime(self, newFirst=True):
@@ -1092,12 +1198,12 @@ class DefinedContexts(JSONSerializer):
         >>> aContexts.add(aObj)
         >>> aContexts.add(bObj)
         >>> k = aContexts._keysByTime()
-        >>> aContexts._definedContexts[k[0]]['time'] > aContexts._definedContexts[k[1]]['time'] > aContexts._definedContexts[k[2]]['time']
+        >>> aContexts._definedContexts[k[0]].time > aContexts._definedContexts[k[1]].time > aContexts._definedContexts[k[2]].time
         True
         '''
         post = []
         for key in self._definedContexts.keys():
-            post.append((self._definedContexts[key]['time'], key))
+            post.append((self._definedContexts[key].time, key))
         post.sort()
         if newFirst:
             post.reverse()
@@ -1161,19 +1267,19 @@ class DefinedContexts(JSONSerializer):
             
         # get each dict from all defined contexts
         for key in keys:
-            dict = self._definedContexts[key]
+            siteRef = self._definedContexts[key]
             # check for None object; default location, not a weakref, keep
-            if dict['obj'] is None:
+            if siteRef.obj is None:
                 if not excludeNone:
-                    post.append(dict['obj'])
+                    post.append(siteRef.obj)
             elif WEAKREF_ACTIVE:
-                obj = common.unwrapWeakref(dict['obj'])
+                obj = common.unwrapWeakref(siteRef.obj)
                 if obj is None: # dead ref
-                    dict['isDead'] = True
+                    siteRef.isDead = True
                 else:
                     post.append(obj)
             else:
-                post.append(dict['obj'])
+                post.append(siteRef.obj)
 
         # remove dead references
 #         if autoPurge:
@@ -1216,11 +1322,11 @@ class DefinedContexts(JSONSerializer):
                 if idKey in idExclude:
                     continue
             try:
-                objRef = self._definedContexts[idKey]['obj']
+                objRef = self._definedContexts[idKey].obj
             except KeyError:
                 raise DefinedContextsException('no such site: %s' % idKey)
             # skip dead references
-            if self._definedContexts[idKey]['isDead']:
+            if self._definedContexts[idKey].isDead:
                 continue
             if idKey is None:
                 if not excludeNone: 
@@ -1230,7 +1336,7 @@ class DefinedContexts(JSONSerializer):
             else:
                 obj = common.unwrapWeakref(objRef)
                 if obj is None:
-                    self._definedContexts[idKey]['isDead'] = True
+                    self._definedContexts[idKey].isDead = True
                     continue
                 post.append(obj)
         return post
@@ -1263,11 +1369,11 @@ class DefinedContexts(JSONSerializer):
             className = common.classToClassStr(className)
 
         for idKey in self._locationKeys:
-            if self._definedContexts[idKey]['isDead']:
+            if self._definedContexts[idKey].isDead:
                 continue 
-            classStr = self._definedContexts[idKey]['class']
+            classStr = self._definedContexts[idKey].classString
             if classStr == className:
-                objRef = self._definedContexts[idKey]['obj']
+                objRef = self._definedContexts[idKey].obj
                 if not WEAKREF_ACTIVE: # leave None alone
                     obj = objRef
                 else:
@@ -1277,7 +1383,7 @@ class DefinedContexts(JSONSerializer):
 #             
 #        found = []
 #        for idKey in self._locationKeys:
-#            objRef = self._definedContexts[idKey]['obj']
+#            objRef = self._definedContexts[idKey].obj
 #            if objRef is None:
 #                continue
 #            if not WEAKREF_ACTIVE: # leave None alone
@@ -1305,9 +1411,9 @@ class DefinedContexts(JSONSerializer):
         a SpannerStorage Stream class as a Site.
         '''
         for idKey in self._locationKeys:
-            if self._definedContexts[idKey]['isDead']:
+            if self._definedContexts[idKey].isDead:
                 continue 
-            if self._definedContexts[idKey]['class'] == 'SpannerStorage':
+            if self._definedContexts[idKey].classString == 'SpannerStorage':
                 return True
         return False
 
@@ -1318,9 +1424,9 @@ class DefinedContexts(JSONSerializer):
         a VariantStorage Stream class as a Site.
         '''
         for idKey in self._locationKeys:
-            if self._definedContexts[idKey]['isDead']:
+            if self._definedContexts[idKey].isDead:
                 continue 
-            if self._definedContexts[idKey]['class'] == 'VariantStorage':
+            if self._definedContexts[idKey].classString == 'VariantStorage':
                 return True
         return False
 
@@ -1331,7 +1437,7 @@ class DefinedContexts(JSONSerializer):
         '''
         count = 0
         for idKey in self._locationKeys:
-            if self._definedContexts[idKey]['isDead']:
+            if self._definedContexts[idKey].isDead:
                 continue 
             count += 1
         return count
@@ -1432,28 +1538,60 @@ class DefinedContexts(JSONSerializer):
             for idKey in self._locationKeys:
                 if idKey is None: 
                     continue
-                if self._definedContexts[idKey]['isDead']:
+                if self._definedContexts[idKey].isDead:
                     continue # already marked
                 if WEAKREF_ACTIVE:
                     obj = common.unwrapWeakref(
-                        self._definedContexts[idKey]['obj'])
+                        self._definedContexts[idKey].obj)
                 else:
-                    obj = self._definedContexts[idKey]['obj']
+                    obj = self._definedContexts[idKey].obj
                 if obj is None: # if None, it no longer exists
-                    self._definedContexts[idKey]['isDead'] = True
+                    self._definedContexts[idKey].isDead = True
         # use previously set isDead entry, so as not to
         # unwrap all references
         remove = []
         for idKey in self._locationKeys:
             if idKey is None: 
                 continue
-            if self._definedContexts[idKey]['isDead']:
+            if self._definedContexts[idKey].isDead:
                 remove.append(idKey)
         for idKey in remove:
-            # this call changes the ._locationKeys list, and thus must be 
+            # this call changes the ._locationKeys list, and thus must be
             # out side _locationKeys loop
             self.removeById(idKey)
-        
+
+    def _purgeDead(self):
+        '''
+        Remove all references, both locations and contexts, to objects
+        that no longer exist. This is called automatically by
+        :meth:`~music21.base.DefinedContexts.add`.
+
+        >>> import music21
+        >>> class Mock(music21.Music21Object):
+        ...     pass
+        >>> sites = [Mock() for i in range(4)]
+        >>> dc = music21.DefinedContexts()
+        >>> for i in range(4):
+        ...     dc.add(sites[i], i)
+        >>> dc.add(Mock()) # a context, immediately dead
+        >>> del sites[1:]
+        >>> len(dc)
+        5
+        >>> dc._purgeDead()
+        >>> len(dc), len(dc._locationKeys)
+        (1, 1)
+        '''
+        if not WEAKREF_ACTIVE:
+            return
+        remove = []
+        for idKey, siteRef in self._definedContexts.items():
+            if siteRef.obj is None: # the None site, or a cleared reference
+                continue
+            if siteRef.isDead or common.unwrapWeakref(siteRef.obj) is None:
+                remove.append(idKey)
+        for idKey in remove:
+            self.removeById(idKey)
+
 
     def _getOffsetBySiteId(self, idKey):
         '''
@@ -1479,7 +1617,7 @@ class DefinedContexts(JSONSerializer):
         if idKey == self._lastID:
             return self._lastOffset
         try:
-            value = self._definedContexts[idKey]['offset']
+            value = self._definedContexts[idKey].offset
         except KeyError:
             raise DefinedContextsException("Could not find the object with id %s in the Site marked with idKey %s" % (id(self), idKey))
         # stored string are assummed to be attributes of the stored object
@@ -1487,9 +1625,9 @@ class DefinedContexts(JSONSerializer):
             if value not in ['highestTime', 'lowestOffset', 'highestOffset']:
                 raise DefinedContextsException('attempted to set a bound offset with a string attribute that is not supported: %s' % value)
             if WEAKREF_ACTIVE:
-                obj = common.unwrapWeakref(self._definedContexts[idKey]['obj'])
+                obj = common.unwrapWeakref(self._definedContexts[idKey].obj)
             else:
-                obj = self._definedContexts[idKey]['obj']
+                obj = self._definedContexts[idKey].obj
             # offset value is an attribute string
             # canot cache these values as may change outside of definedcontexts
             return getattr(obj, value)
@@ -1545,21 +1683,21 @@ class DefinedContexts(JSONSerializer):
         121.5
         '''
         for idKey in self._definedContexts.keys():
-            dict = self._definedContexts[idKey]
-            if dict['isDead']: # cal alway skip
+            siteRef = self._definedContexts[idKey]
+            if siteRef.isDead: # cal alway skip
                 continue
             # must unwrap references before comparison
-            #if common.isWeakref(dict['obj']):
+            #if common.isWeakref(siteRef.obj):
             if WEAKREF_ACTIVE:
-                compareObj = common.unwrapWeakref(dict['obj'])
+                compareObj = common.unwrapWeakref(siteRef.obj)
             else:
-                compareObj = dict['obj']
+                compareObj = siteRef.obj
             if compareObj is None: # mark isDead for later removal
-                dict['isDead'] = True
+                siteRef.isDead = True
                 continue
             if id(compareObj) == id(obj):
                 #environLocal.printDebug(['found object as site', obj, id(obj), 'idKey', idKey])
-                return self._getOffsetBySiteId(idKey) #dict['offset']
+                return self._getOffsetBySiteId(idKey) #siteRef.offset
         raise DefinedContextsException('an entry for this object (%s) is not stored in DefinedContexts' % obj)
 
     def getOffsetBySite(self, site):
@@ -1589,7 +1727,7 @@ class DefinedContexts(JSONSerializer):
         try:
             # will raise a key error if not found
             return self._getOffsetBySiteId(siteId) 
-            #post = self._definedContexts[siteId]['offset']
+            #post = self._definedContexts[siteId].offset
         except DefinedContextsException: # the site id is not valid
             #environLocal.printDebug(['getOffsetBySite: trying to get an offset by a site failed; self:', self, 'site:', site, 'defined contexts:', self._definedContexts])
             raise # re-raise Exception
@@ -1644,7 +1782,7 @@ class DefinedContexts(JSONSerializer):
             siteId = id(site)
         # will raise an index error if the siteId does not exist
         try:
-            self._definedContexts[siteId]['offset'] = value
+            self._definedContexts[siteId].offset = value
             self._lastID = siteId
             self._lastOffset = value
         except KeyError:
@@ -1659,7 +1797,7 @@ class DefinedContexts(JSONSerializer):
         The `siteId` parameter can be None.
         '''
         try:
-            self._definedContexts[siteId]['offset'] = value
+            self._definedContexts[siteId].offset = value
             self._lastID = siteId
             self._lastOffset = value
         except KeyError:
@@ -1690,10 +1828,10 @@ class DefinedContexts(JSONSerializer):
         match = None
         for siteId in self._definedContexts.keys():
             # might need to use almost equals here
-            if self._definedContexts[siteId]['offset'] == offset:
-                if self._definedContexts[siteId]['isDead']:
+            if self._definedContexts[siteId].offset == offset:
+                if self._definedContexts[siteId].isDead:
                     return None
-                match = self._definedContexts[siteId]['obj']
+                match = self._definedContexts[siteId].obj
                 break
         if WEAKREF_ACTIVE:
             if match is None: # this is a dead erfs
@@ -2339,7 +2477,10 @@ class Music21Object(JSONSerializer):
         >>> a.getOffsetBySite(aSite)
         30
         '''
-        return self._definedContexts.setOffsetBySite(site, value)
+        self._definedContexts.setOffsetBySite(site, value)
+        if getattr(site, 'isStream', False):
+            # offsets cached by the site are no longer valid
+            site._clearOffsetIndex()
 
 
     def getContextAttr(self, attr):
@@ -3374,6 +3515,10 @@ class Music21Object(JSONSerializer):
         # do not have to unwrap a weakref of self.activeSite to get the id()
         # of activeSite
         self._definedContexts.setOffsetBySiteId(self._activeSiteId, offset) 
+        if self._activeSiteId is not None:
+            site = self.activeSite
+            if site is not None and site.isStream:
+                site._clearOffsetIndex()
 
     
     offset = property(_getOffset, _setOffset, 
@@ -3683,14 +3828,29 @@ class Music21Object(JSONSerializer):
         if fp is None:
             fp = environLocal.getTempFile(ext)
 
-        if format in ['text', 'textline', 'musicxml', 'vexflow', 'vexflow.html']:        
+        if format == 'musicxml':
+            from music21.musicxml import translate as musicxmlTranslate
+            # write to a temporary file, so that a translation error does 
+            # not leave a partial file
+            fpTemp = fp + '.tmp'
+            f = open(fpTemp, 'w')
+            try:
+                musicxmlTranslate.music21ObjectToMusicXMLFile(self, f)
+            except:
+                f.close()
+                os.remove(fpTemp)
+                raise
+            f.close()
+            if os.path.exists(fp):
+                os.remove(fp)
+            os.rename(fpTemp, fp)
+            return fp
+
+        if format in ['text', 'textline', 'vexflow', 'vexflow.html']:        
             if format == 'text':
                 dataStr = self._reprText()
             elif format == 'textline':
                 dataStr = self._reprTextLine()
-            elif format == 'musicxml':
-                from music21.musicxml import translate as musicxmlTranslate
-                dataStr = musicxmlTranslate.music21ObjectToMusicXML(self)
             elif format.startswith('vexflow'):
                 import music21.vexflow
                 dataStr = music21.vexflow.fromObject(self, mode='html')
@@ -5966,7 +6126,67 @@ class Test(unittest.TestCase):
 
         n2 = copy.deepcopy(n1)
         #self.assertEqual(n2._activeSite, s1)
-        
+
+    def testDefinedContextsPurgeA(self):
+        from music21 import note, stream
+        import pickle
+
+        n = note.Note()
+        # derived Streams that are discarded leave dead references
+        for i in range(100):
+            s = stream.Stream()
+            s.insert(i, n)
+        del s
+        self.assertEqual(len(n._definedContexts) < 20, True)
+        # a new site is always stored
+        s = stream.Stream()
+        s.insert(3, n)
+        self.assertEqual(n.getOffsetBySite(s), 3.0)
+        self.assertEqual(n.hasSite(s), True)
+
+        # adding a site again replaces a cached offset
+        dc = n._definedContexts
+        dc.add(s, 5.0)
+        self.assertEqual(n.getOffsetBySite(s), 5.0)
+
+        self.assertEqual(hasattr(dc, '__dict__'), False)
+
+        # slotted objects can be pickled with all protocols
+        sites = [TestMock(), TestMock()]
+        dc = DefinedContexts()
+        dc.add(sites[0], 2.0)
+        dc.add(sites[1])
+        dc.unwrapWeakref()
+        for protocol in (0, -1):
+            post = pickle.loads(pickle.dumps(dc, protocol))
+            self.assertEqual(len(post), 2)
+            self.assertEqual(len(post._locationKeys), 1)
+            self.assertEqual(post.getOffsets(), [2.0])
+
+    def testWriteMusicXMLA(self):
+        import tempfile
+        from music21 import note, stream
+        from music21.musicxml import translate as musicxmlTranslate
+
+        fd, fp = tempfile.mkstemp(suffix='.xml')
+        os.close(fd)
+        try:
+            s = stream.Stream()
+            s.repeatAppend(note.Note('g4'), 4)
+            self.assertEqual(s.write('musicxml', fp), fp)
+            f = open(fp)
+            self.assertEqual(f.read().count('<note'), 4)
+            f.close()
+            # a translation error leaves the existing file unchanged
+            self.assertRaises(musicxmlTranslate.TranslateException, 
+                Music21Object().write, 'musicxml', fp)
+            f = open(fp)
+            self.assertEqual(f.read().count('<note'), 4)
+            f.close()
+            self.assertEqual(os.path.exists(fp + '.tmp'), False)
+        finally:
+            os.remove(fp)
+
 
 #-------------------------------------------------------------------------------
 # define presented order in documentation
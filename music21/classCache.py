@@ -10,6 +10,7 @@
 #-------------------------------------------------------------------------------
 
 import unittest
+import bisect
 import collections
 
 from music21 import exceptions21
@@ -23,21 +24,69 @@ class ClassCacheException(exceptions21.Music21Exception):
     pass
 
 
+# a list of (name, class) pairs for each class, in method resolution order
+_classPairsCache = {}
+
+def _getClassPairs(classObj):
+    '''
+    Return a list of (name, class) pairs for the method resolution order of 
+    `classObj`; this matches the names in `classes`.
+
+    >>> from music21 import *
+    >>> [pair[0] for pair in classCache._getClassPairs(note.Rest)][:3]
+    ['Rest', 'GeneralNote', 'Music21Object']
+    '''
+    try:
+        return _classPairsCache[classObj]
+    except KeyError:
+        post = [(x.__name__, x) for x in classObj.mro()]
+        _classPairsCache[classObj] = post
+        return post
+
+
+def _addToRepository(r, className, e, position, isEndElement=False):
+    '''
+    Add `e` to the Repository `r` if `className` is one of its classes.
+    '''
+    for name, classObj in _getClassPairs(e.__class__):
+        if name == className:
+            if isEndElement:
+                r.addEndElement(e, position)
+            else:
+                r.addElement(e, position)
+            r.classObjs.add(classObj)
+            return
+
+
 class Repository(object):
-    # perhaps use 
-    # from collections import deque
-    # for elements
+    '''
+    Storage for all elements of a single class (or of all subclasses of 
+    a class) found in a Stream, retaining Stream order. 
+    '''
     def __init__(self):
         self.classObj = None
         self.classes = []
-        self._elements = collections.deque()
-        self._endElements = collections.deque()
+        # all distinct classes, of the stored name, that have been added
+        self.classObjs = set()
+        self._elements = []
+        self._endElements = []
+        # the increasing positions of the elements in the source Stream, 
+        # used to find elements for removal
+        self._positions = []
+        self._endPositions = []
 
     def __len__(self):
         return len(self._elements) + len(self._endElements)
 
-    def addElement(self, e):
-        '''Add an element to the repository
+    def _getNextPosition(self, positions):
+        if len(positions) == 0:
+            return 0
+        return positions[-1] + 1
+
+    def addElement(self, e, position=None):
+        '''Add an element to the repository. `position`, if given, is the 
+        position of the element in the source Stream, greater than that 
+        of any element already added.
 
         >>> from music21 import *
         >>> n = note.Note()
@@ -51,10 +100,13 @@ class Repository(object):
             # set class name and key
             self.classObj = e.__class__
             self.classes = e.classes
+        if position is None:
+            position = self._getNextPosition(self._positions)
         self._elements.append(e)
+        self._positions.append(position)
             
-    def addEndElement(self, e):
-        '''Add an element to the repository
+    def addEndElement(self, e, position=None):
+        '''Add an end element to the repository
 
         >>> from music21 import *
         >>> n = note.Note()
@@ -69,8 +121,46 @@ class Repository(object):
             # set class name and key
             self.classObj = e.__class__
             self.classes = e.classes
+        if position is None:
+            position = self._getNextPosition(self._endPositions)
         self._endElements.append(e)
-            
+        self._endPositions.append(position)
+
+    def removeElement(self, e, position=None):
+        '''Remove an element from the repository. Elements are matched by 
+        id(), not by equality. If `position` is given, the element is 
+        found by its position, as given when it was added.
+
+        >>> from music21 import *
+        >>> n1 = note.Note()
+        >>> n2 = note.Note()
+        >>> n3 = note.Note()
+        >>> r = classCache.Repository()
+        >>> r.addElement(n1, 0)
+        >>> r.addElement(n2, 4)
+        >>> r.addElement(n3, 5)
+        >>> r.removeElement(n2, 4)
+        >>> len(r), r._elements[1] is n3
+        (2, True)
+        >>> r.removeElement(n1)
+        >>> len(r), r._elements[0] is n3
+        (1, True)
+        '''
+        idElement = id(e)
+        for storage, positions in ((self._elements, self._positions), 
+            (self._endElements, self._endPositions)):
+            if position is not None:
+                i = bisect.bisect_left(positions, position)
+                if i < len(storage) and storage[i] is e:
+                    del storage[i]
+                    del positions[i]
+                    return
+                continue
+            for i in range(len(storage)):
+                if id(storage[i]) == idElement:
+                    del storage[i]
+                    del positions[i]
+                    return
 
     def insertIntoStream(self, targetStream, offsetSite):
         '''
@@ -103,14 +193,57 @@ class Repository(object):
 
 #-------------------------------------------------------------------------------
 class ClassCache(object):
-
+    '''
+    An index of the elements of a Stream by class. For each class name 
+    requested (thus including names of superclasses, as found in the 
+    `classes` of the elements), a :class:`~music21.classCache.Repository` 
+    stores the matching elements in Stream order. Only requested class 
+    names are indexed, so that elements are not also stored under 
+    names, such as 'Music21Object' or 'object', that are never searched.
+
+    A ClassCache is stored in a Stream's `_cache`; it can be updated as 
+    elements are appended or removed (see 
+    :meth:`~music21.classCache.ClassCache.addElement` and 
+    :meth:`~music21.classCache.ClassCache.removeElement`) rather than being 
+    rebuilt.
+    '''
     def __init__(self, srcStream=None):
         self.repositories = {}
         self.parent = None
+        # the element lists of the source Stream, and the count of its 
+        # changes that this ClassCache has seen; used to detect changes
+        # not made through this ClassCache
+        self._srcElements = None
+        self._srcEndElements = None
+        self._srcMutations = None
+        # a position for each element id, used to merge repositories and 
+        # to find elements for removal
+        self._positions = {}
+        self._nextPosition = 0
 
         if srcStream is not None:
             self.load(srcStream)
 
+    def _getRepository(self, className):
+        '''
+        Return the Repository for `className`, finding the matching 
+        elements of the source Stream if this name has not yet been 
+        requested.
+        '''
+        try:
+            return self.repositories[className]
+        except KeyError:
+            # store a repository for each name requested
+            r = Repository()
+            positions = self._positions
+            for e in self._srcElements:
+                _addToRepository(r, className, e, positions[id(e)])
+            for e in self._srcEndElements:
+                _addToRepository(r, className, e, positions[id(e)], 
+                                 isEndElement=True)
+            self.repositories[className] = r
+            return r
+
     def load(self, srcStream):
         '''
         >>> from music21 import *
@@ -119,52 +252,195 @@ class ClassCache(object):
         >>> s1.repeatAppend(note.Rest(), 4)
         >>> cc = classCache.ClassCache()
         >>> cc.load(s1)
-        >>> cc.repositories.keys()
-        ['Note', 'Rest', 'NotRest', 'GeneralNote']
+        >>> len(cc.repositories)
+        0
+        >>> len(cc.getElementListsByClass(['GeneralNote'])[0])
+        8
+        >>> sorted(cc.repositories.keys())
+        ['GeneralNote']
         '''
         self.parent = srcStream # store this to get offsets later
         #environLocal.printDebug(['loading parent:', srcStream])
+        self.repositories = {}
+        self._positions = {}
+        self._nextPosition = 0
+        self._srcElements = srcStream._elements
+        self._srcEndElements = srcStream._endElements
+        self._srcMutations = srcStream._mutations
 
         # elements must already be sorted
         for e in srcStream._elements:
-            #environLocal.printDebug(['loading', e, e.classes])
-            for className in e.classes:
-                if className == 'Music21Object': 
-                    break
-                try:
-                    dst = self.repositories[className]
-                except KeyError:
-                    # store a repository for each entry
-                    self.repositories[className] = Repository()
-                    dst = self.repositories[className]
-                dst.addElement(e)                
-
+            self._addElement(e)
         for e in srcStream._endElements:
-            for className in e.classes:
-                if className == 'Music21Object':
-                    break
-                try:
-                    dst = self.repositories[className]
-                except KeyError:
-                    # store a repository for each entry
-                    self.repositories[className] = Repository()
-                    dst = self.repositories[className]
-                dst.addEndElement(e)                
+            self._addEndElement(e)
 
 #         environLocal.printDebug(['loaded parent:', srcStream, 'got repository keys', self.repositories.keys()])
 #         for r in self.repositories.keys():
 #             environLocal.printDebug([r, len(self.repositories[r])])
 
+    def _addElement(self, e):
+        position = self._nextPosition
+        self._positions[id(e)] = position
+        self._nextPosition += 1
+        for className, classObj in _getClassPairs(e.__class__):
+            if className in self.repositories:
+                r = self.repositories[className]
+                r.addElement(e, position)
+                r.classObjs.add(classObj)
+
+    def _addEndElement(self, e):
+        # end elements are always stored in their own lists; positions 
+        # only need to order them relative to each other 
+        position = self._nextPosition
+        self._positions[id(e)] = position
+        self._nextPosition += 1
+        for className, classObj in _getClassPairs(e.__class__):
+            if className in self.repositories:
+                r = self.repositories[className]
+                r.addEndElement(e, position)
+                r.classObjs.add(classObj)
+
+    def isCurrent(self, srcStream):
+        '''
+        Return True if this ClassCache was loaded from the element lists of 
+        `srcStream` and has seen all changes to them, as counted by the 
+        Stream when its elements change.
+
+        >>> from music21 import *
+        >>> s1 = stream.Stream()
+        >>> s1.repeatAppend(note.Note(), 4)
+        >>> cc = classCache.ClassCache(s1)
+        >>> cc.isCurrent(s1)
+        True
+        >>> s1._elements[0] = note.Rest()
+        >>> s1._elementsChanged()
+        >>> cc.isCurrent(s1)
+        False
+        >>> cc.isCurrent(stream.Stream())
+        False
+        '''
+        return (self._srcElements is srcStream._elements and 
+                self._srcEndElements is srcStream._endElements and 
+                self._srcMutations == srcStream._mutations)
+
+    def addElement(self, e):
+        '''
+        Add an element that has been appended to the end of the 
+        `_elements` of the source Stream.
+
+        >>> from music21 import *
+        >>> s1 = stream.Stream()
+        >>> s1.repeatAppend(note.Note(), 2)
+        >>> cc = classCache.ClassCache(s1)
+        >>> len(cc.getElementListsByClass(['GeneralNote'])[0])
+        2
+        >>> r = note.Rest()
+        >>> s1._elements.append(r)
+        >>> s1._elementsChanged()
+        >>> cc.isCurrent(s1)
+        False
+        >>> cc.addElement(r)
+        >>> cc.isCurrent(s1)
+        True
+        >>> len(cc.repositories['GeneralNote'])
+        3
+        '''
+        self._addElement(e)
+        self._srcMutations = self.parent._mutations
+
+    def addEndElement(self, e):
+        '''
+        Add an element that has been appended to the end of the 
+        `_endElements` of the source Stream.
+        '''
+        self._addEndElement(e)
+        self._srcMutations = self.parent._mutations
+
+    def removeElement(self, e):
+        '''
+        Remove an element that has been removed from the source Stream.
+
+        >>> from music21 import *
+        >>> s1 = stream.Stream()
+        >>> s1.repeatAppend(note.Note(), 2)
+        >>> cc = classCache.ClassCache(s1)
+        >>> len(cc.getElementListsByClass(['Note'])[0])
+        2
+        >>> n = s1._elements.pop()
+        >>> s1._elementsChanged()
+        >>> cc.removeElement(n)
+        >>> cc.isCurrent(s1)
+        True
+        >>> len(cc.repositories['Note'])
+        1
+        '''
+        idElement = id(e)
+        position = self._positions.pop(idElement, None)
+        for className in e.classes:
+            if className in self.repositories:
+                # an empty repository is kept, as this name is indexed
+                self.repositories[className].removeElement(e, position)
+        self._srcMutations = self.parent._mutations
 
     def hasElementOfClass(self, className):
         '''Return True/False if this class is found. 
         '''
-        try: # for performance, try a direct match first
-            r = self.repositories[className]
-            return True
-        except KeyError: # string match not possible
-            return False
+        return len(self._getRepository(className)) > 0
 
+    def getElementListsByClass(self, classFilterList):
+        '''
+        Return a pair of lists, the matching elements and end elements, in 
+        Stream order. `classFilterList` must be a list or tuple of class 
+        names or classes; as with 
+        :meth:`~music21.base.Music21Object.isClassOrSubclass`, an element 
+        matches if it is an instance of any of them.
+
+        >>> from music21 import *
+        >>> s1 = stream.Stream()
+        >>> s1.insert(0, clef.BassClef())
+        >>> s1.repeatAppend(note.Note(), 2)
+        >>> s1.repeatAppend(note.Rest(), 2)
+        >>> cc = classCache.ClassCache(s1)
+        >>> cc.getElementListsByClass(['Clef', note.Rest])
+        ([<music21.clef.BassClef>, <music21.note.Rest rest>, <music21.note.Rest rest>], [])
+        >>> cc.getElementListsByClass(['Measure'])
+        ([], [])
+        '''
+        matches = []
+        for classNameOrObj in classFilterList:
+            if isinstance(classNameOrObj, basestring):
+                className = classNameOrObj
+                classObj = None
+            else:
+                # an instance of a class always has the name of the class
+                # in .classes; but a name may be shared by distinct classes
+                className = classNameOrObj.__name__
+                classObj = classNameOrObj
+            r = self._getRepository(className)
+            if len(r) == 0:
+                continue
+            if classObj is not None and (len(r.classObjs) != 1 or 
+                classObj not in r.classObjs):
+                matches.append((
+                    [e for e in r._elements if isinstance(e, classObj)],
+                    [e for e in r._endElements if isinstance(e, classObj)]))
+            else:
+                matches.append((r._elements, r._endElements))
+
+        if len(matches) == 0:
+            return [], []
+        elif len(matches) == 1:
+            return list(matches[0][0]), list(matches[0][1])
+        # merge multiple repositories, removing duplicates
+        post = []
+        for i in range(2):
+            found = {}
+            for m in matches:
+                for e in m[i]:
+                    found[id(e)] = e
+            post.append(sorted(found.values(), 
+                        key=lambda e: self._positions[id(e)]))
+        return post[0], post[1]
 
     def getElementsByClass(self, targetStream, classFilterList):
         '''
@@ -192,59 +468,20 @@ class ClassCache(object):
         {6.0} <music21.note.Rest rest>
         {7.0} <music21.note.Rest rest>
 
-        >>> # cannot match more than one class
         >>> s4 = stream.Stream()
         >>> len(cc.getElementsByClass(s4, [note.Note, note.Rest]))
-        Traceback (most recent call last):
-        ClassCacheException: can only process single class names given as a string
+        8
         '''
-        matchKeys = []
-        #environLocal.printDebug(['getElementsByClass', 'classFilterList', classFilterList])
-
-        # for now, can only match a single class, as this will be in the 
-        # correct order
-        if len(classFilterList) == 1:
-            classNameOrStr = classFilterList[0]
-            r = None
-            try: # for performance, try a direct match first
-                r = self.repositories[classNameOrStr]
-            except KeyError: # string match not possible
-                pass
-            if r is not None:
-                r.insertIntoStream(targetStream=targetStream, 
-                        offsetSite=self.parent)
-        else:
-            raise ClassCacheException('can only process single class names given as a string')
-
+        elements, endElements = self.getElementListsByClass(classFilterList)
+        for e in elements:
+            targetStream._insertCore(e.getOffsetBySite(self.parent), e, 
+                                    ignoreSort=True)
+        for e in endElements:
+            targetStream._storeAtEndCore(e)
+        targetStream._elementsChanged()
         # found may be unaltered; check length
         return targetStream 
 
-#         if matchKeys == []:
-#             for classNameOrStr in classFilterList:
-#                 #environLocal.printDebug(['classNameOrStr', classNameOrStr])
-#                 if isinstance(classNameOrStr, str):
-#                     for r in self.repositories.values(): 
-#                         if classNameOrStr in r.classes:
-#                             # they key is always the first class
-#                             matchKeys.append(r.classes[0])
-#                 else:
-#                     for r in self.repositories.values():
-#                         # see if the requested class is or is subclass      
-#                         # of the stored class
-#                         if issubclass(classNameOrStr, r.classObj):
-#                             # they key is always the first class
-#                             matchKeys.append(r.classes[0])
-        #environLocal.printDebug(['matchKeys', matchKeys, 'self.repositories.keys()', self.repositories.keys()])
-
-#         for key in matchKeys:
-#             # rather than directly assign, can build list of offset/value?
-#             self.repositories[key].insertIntoStream(targetStream=targetStream, 
-#                                     offsetSite=self.parent)
-#         # must sort, as ordering is sequential
-#         # if sort, remove all performance boost
-#         #targetStream.sort()
-#         return targetStream
-
 
 class Test(unittest.TestCase):
     
@@ -359,6 +596,34 @@ class Test(unittest.TestCase):
         
 
 
+    def testStaleA(self):
+        from music21 import stream, note
+
+        s = stream.Stream()
+        s.repeatAppend(note.Note(), 4)
+        self.assertEqual(len(s.getElementsByClass('Rest')), 0)
+        cc = s._getClassCache()
+        # only requested names are indexed
+        self.assertEqual(sorted(cc.repositories.keys()), ['Rest'])
+        # an element replaced directly in the element list is found
+        r = note.Rest()
+        r.addLocation(s, s._elements[1].getOffsetBySite(s))
+        s._elements[1] = r
+        s._elementsChanged()
+        self.assertEqual(len(s.getElementsByClass('Rest')), 1)
+        self.assertEqual(len(s.getElementsByClass('Note')), 3)
+        # an element added with _insertCore, before _elementsChanged is 
+        # called, is found
+        s._insertCore(4.0, note.Rest())
+        self.assertEqual(len(s.getElementsByClass('Rest')), 2)
+        # appending and removing keeps the ClassCache
+        cc = s._getClassCache()
+        s.append(note.Rest())
+        s.remove(r)
+        self.assertEqual(s._getClassCache() is cc, True)
+        self.assertEqual(len(s.getElementsByClass('Rest')), 2)
+        self.assertEqual(len(s.getElementsByClass('Note')), 3)
+
     def testBasicB(self):
         from music21.musicxml import testPrimitive
         from music21 import converter, clef
@@ -82,6 +82,10 @@ VALID_SHOW_FORMATS = ['musicxml', 'lilypond', 'text', 'textline', 'midi', 'png',
 VALID_WRITE_FORMATS = ['musicxml', 'lilypond', 'text', 'textline', 'midi', 'png', 'pdf', 'svg', 'lily.pdf', 'lily.png', 'lily.svg', 'braille', 'vexflow', 'vexflow.html', 'vexflow.js']
 VALID_AUTO_DOWNLOAD = ['ask', 'deny', 'allow']
 
+# offsets compared with offsetSpanMatches() are cleaned up first, so sorted 
+# offsets are searched this far below the requested start
+OFFSET_SEARCH_MARGIN = 0.001
+
 
 #-------------------------------------------------------------------------------
 # provide warning strings to users for use in conditional imports
@@ -346,6 +350,68 @@ def cleanupFloat(floatNum, maxDenominator=1000):
     return float(f)
 
 
+def offsetSpanMatches(offset, quarterLength, offsetStart, offsetEnd, 
+    includeEndBoundary=True, mustFinishInSpan=False, mustBeginInSpan=True):
+    '''
+    Return True if an element at `offset` with duration `quarterLength` 
+    is found in the span from `offsetStart` to `offsetEnd`, as defined by 
+    :meth:`~music21.stream.Stream.getElementsByOffset`. Offsets are 
+    compared after :func:`~music21.common.cleanupFloat`, so a binary 
+    search of sorted offsets should start OFFSET_SEARCH_MARGIN below 
+    `offsetStart`.
+
+    >>> from music21 import *
+    >>> common.offsetSpanMatches(2.0, 2.0, 1.5, 2.5)
+    True
+    >>> common.offsetSpanMatches(2.0, 2.0, 1.5, 2.5, mustFinishInSpan=True)
+    False
+    >>> common.offsetSpanMatches(2.0, 2.0, 3.0, 3.5, mustBeginInSpan=False)
+    True
+    '''
+    if not mustFinishInSpan:
+        eEnd = offset
+    else:
+        eEnd = offset + quarterLength
+    eEnd = cleanupFloat(eEnd)
+
+    if not mustBeginInSpan:
+        eStart = offset + quarterLength
+    else:
+        eStart = offset
+    eStart = cleanupFloat(eStart)
+
+    # alternate version that uses common based comparison
+    # not yet seen as necessary (but incurring a performance hit so
+    # not yet used
+
+#     if (includeEndBoundary is True and mustBeginInSpan is True and 
+#         greaterThanOrEqual(eStart, offsetStart) and lessThanOrEqual(eEnd, offsetEnd)):
+#             match = True
+#     elif (includeEndBoundary is True and mustBeginInSpan is False and
+#         eStart > offsetStart and lessThanOrEqual(eEnd, offsetEnd)):
+#             match = True
+#     elif (includeEndBoundary is False and mustBeginInSpan is True and 
+#         greaterThanOrEqual(eStart, offsetStart) and eEnd < offsetEnd):
+#             match = True
+#     elif (includeEndBoundary is False and mustBeginInSpan is False and
+#         eStart > offsetStart and eEnd < offsetEnd):
+#             match = True
+
+    if includeEndBoundary is True and mustBeginInSpan is True and \
+        eStart >= offsetStart and eEnd <= offsetEnd:
+            return True
+    elif includeEndBoundary is True and mustBeginInSpan is False and \
+        eStart > offsetStart and eEnd <= offsetEnd:
+            return True
+    elif includeEndBoundary is False and mustBeginInSpan is True and \
+        eStart >= offsetStart and eEnd < offsetEnd:
+            return True
+    elif includeEndBoundary is False and mustBeginInSpan is False and \
+        eStart > offsetStart and eEnd < offsetEnd:
+            return True
+    return False
+
+
 def roundToHalfInteger(num):
     '''Given a floating-point number, round to the nearest half-integer.  
 
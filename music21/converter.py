@@ -43,19 +43,22 @@ the temp folder on the disk.
 import doctest
 import unittest
 
+import atexit
 import copy
+import errno
+import json
 import os
 import re
+import tempfile
 import time
 import urllib
 import zipfile
 
-# try:
-#     import cPickle as pickleMod
-# except ImportError:
-#     import pickle as pickleMod
+try:
+    import cPickle as pickleMod
+except ImportError:
+    import pickle as pickleMod
 
-import pickle as pickleMod
 import StringIO # this module is not supported in python3
 # use io.StringIO  in python 3, avail in 2.6, not 2.5
 
@@ -71,6 +74,7 @@ from music21 import tinyNotation
 from music21.abc import base as abcModule
 from music21.abc import translate as abcTranslate
 from music21.musedata import base as musedataModule
+from music21.musicxml import translate as musicxmlTranslate
 from music21.musedata import translate as musedataTranslate
 
 from music21.romanText import base as romanTextModule
@@ -197,6 +201,293 @@ class ArchiveManager(object):
         return post
 
 
+#-------------------------------------------------------------------------------
+# the default maximum size, in bytes, of all files managed by a ScratchCache
+SCRATCH_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# the number of hits after which access times are written to the index
+SCRATCH_CACHE_FLUSH_HITS = 50
+# the time, in seconds, after which an index lock is taken as abandoned
+SCRATCH_CACHE_LOCK_TIMEOUT = 10
+
+class ScratchCache(object):
+    '''Manages the pickled files that music21 writes into a scratch
+    directory, such as those written by the 
+    :class:`~music21.converter.PickleFilter`, the 
+    :class:`~music21.converter.ParseCache`, and the 
+    :class:`~music21.converter.StreamFreezer`.
+
+    The total size of managed files is kept under `maxBytes`; when a new
+    file exceeds this budget, the least recently used files are removed.
+    An index file in the directory records the size and last access time 
+    of each file, so that this order persists across sessions. Files are
+    written to a temporary file and then renamed, so that an incomplete
+    file is never found.
+
+    Access times are kept in memory and written to the index in batches, 
+    on writes, and by :meth:`flush`. The index is updated under a lock 
+    file, merging the entries written by other sessions.
+
+    Numbers of hits, misses, writes, and evictions are counted in `stats`.
+
+    >>> from music21 import *
+    >>> import tempfile, shutil
+    >>> dir = tempfile.mkdtemp()
+    >>> sc = converter.ScratchCache(dir, maxBytes=10)
+    >>> sc.get('m21-a.p') is None
+    True
+    >>> def writer(fp):
+    ...     f = open(fp, 'w')
+    ...     f.write('123456')
+    ...     f.close()
+    >>> fp = sc.write('m21-a.p', writer)
+    >>> os.path.basename(sc.get('m21-a.p'))
+    'm21-a.p'
+    >>> fp = sc.write('m21-b.p', writer) # exceeds the budget
+    >>> sc.get('m21-a.p') is None
+    True
+    >>> sc.totalBytes
+    6
+    >>> sorted(sc.stats.items())
+    [('evictions', 1), ('hits', 1), ('misses', 2), ('writes', 2)]
+    >>> shutil.rmtree(dir)
+    '''
+    indexFileName = 'm21-cache-index.json'
+
+    def __init__(self, dir=None, maxBytes=None):
+        if dir is None:
+            dir = environLocal.getRootTempDir()
+        self.dir = dir
+        if maxBytes is None:
+            maxBytes = SCRATCH_CACHE_MAX_BYTES
+        self.maxBytes = maxBytes
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        # file name : [size in bytes, last access time]
+        self._entries = {}
+        # number of hits not yet written to the index
+        self._pendingHits = 0
+        self._readIndex()
+
+    def __repr__(self):
+        return '<music21.converter.ScratchCache %s: %s files, %s bytes>' % (
+            self.dir, len(self._entries), self.totalBytes)
+
+    def _getIndexFp(self):
+        return os.path.join(self.dir, self.indexFileName)
+
+    def _getLockFp(self):
+        return os.path.join(self.dir, '.' + self.indexFileName + '.lock')
+
+    def _lockIndex(self):
+        '''Create the lock file, waiting while another session holds it.
+        Return True if the lock was acquired. A lock older than 
+        SCRATCH_CACHE_LOCK_TIMEOUT is taken as abandoned and removed; 
+        if the lock cannot be acquired, the index is updated without it, 
+        as it only orders evictions.
+        '''
+        fpLock = self._getLockFp()
+        timeStart = time.time()
+        while time.time() - timeStart < SCRATCH_CACHE_LOCK_TIMEOUT:
+            try:
+                fd = os.open(fpLock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return True
+            except OSError, e:
+                if e.errno != errno.EEXIST:
+                    return False
+            try:
+                if time.time() - os.path.getmtime(fpLock) > SCRATCH_CACHE_LOCK_TIMEOUT:
+                    os.remove(fpLock)
+                    continue
+            except OSError: # released by another session
+                continue
+            time.sleep(.01)
+        return False
+
+    def _unlockIndex(self):
+        try:
+            os.remove(self._getLockFp())
+        except OSError:
+            pass
+
+    def _updateIndex(self, keep=None):
+        '''Merge the index written by other sessions, evict if necessary,
+        and write the index, all while holding the lock.
+        '''
+        locked = self._lockIndex()
+        try:
+            self._readIndex()
+            self.evict(keep=keep)
+            self._writeIndex()
+            self._pendingHits = 0
+        finally:
+            if locked:
+                self._unlockIndex()
+
+    def flush(self):
+        '''Write access times kept in memory to the index.
+        '''
+        if self._pendingHits > 0:
+            self._updateIndex()
+
+    def _isManaged(self, fn):
+        # only scratch pickles are managed; downloads are left alone
+        return (fn.startswith('m21-') and fn != self.indexFileName and 
+            (fn.endswith('.p') or fn.endswith('.json')))
+
+    def _readIndex(self):
+        '''Load the index file, merging entries written by other sessions.
+        Managed files found in the directory but not in the index, 
+        such as those written by older versions, are added with their
+        modification time.
+        '''
+        entries = {}
+        try:
+            f = open(self._getIndexFp())
+            entries = json.load(f)
+            f.close()
+        except (IOError, ValueError): # missing or damaged
+            pass
+        for fn in entries:
+            if fn not in self._entries or self._entries[fn][1] < entries[fn][1]:
+                self._entries[fn] = entries[fn]
+
+        found = set()
+        for fn in os.listdir(self.dir):
+            if not self._isManaged(fn):
+                continue
+            found.add(fn)
+            if fn not in self._entries:
+                fp = os.path.join(self.dir, fn)
+                try:
+                    self._entries[fn] = [os.path.getsize(fp), 
+                                         os.path.getmtime(fp)]
+                except OSError: # removed by another session
+                    found.discard(fn)
+        for fn in self._entries.keys():
+            if fn not in found:
+                del self._entries[fn]
+
+    def _writeIndex(self):
+        fd, fpTemp = tempfile.mkstemp(dir=self.dir, prefix='.m21-index-')
+        f = os.fdopen(fd, 'w')
+        json.dump(self._entries, f)
+        f.close()
+        self._replace(fpTemp, self._getIndexFp())
+
+    def _replace(self, fpSrc, fpDst):
+        try:
+            os.rename(fpSrc, fpDst)
+        except OSError: # on Windows, an existing file cannot be replaced
+            os.remove(fpDst)
+            os.rename(fpSrc, fpDst)
+
+    def _getTotalBytes(self):
+        return sum([x[0] for x in self._entries.values()])
+
+    totalBytes = property(_getTotalBytes, doc='''
+        The total size, in bytes, of all managed files.
+        ''')
+
+    def getFp(self, name):
+        '''Return the file path for the file `name` in this directory, 
+        whether or not it exists.
+        '''
+        return os.path.join(self.dir, name)
+
+    def get(self, name):
+        '''Return the file path for the file `name` if it exists, 
+        marking it as recently used, or None.
+        '''
+        fp = self.getFp(name)
+        if not os.path.exists(fp):
+            self.stats['misses'] += 1
+            if name in self._entries:
+                del self._entries[name]
+            return None
+        self.stats['hits'] += 1
+        self._entries[name] = [os.path.getsize(fp), time.time()]
+        self._pendingHits += 1
+        if self._pendingHits >= SCRATCH_CACHE_FLUSH_HITS:
+            self._updateIndex()
+        return fp
+
+    def write(self, name, writer):
+        '''Write the file `name` by calling `writer` with a temporary 
+        file path, then move the complete file into place, remove least 
+        recently used files if necessary, and return its file path. 
+        If `writer` raises an exception, nothing is stored.
+        '''
+        fd, fpTemp = tempfile.mkstemp(dir=self.dir, prefix='.' + name + '-')
+        os.close(fd)
+        try:
+            writer(fpTemp)
+        except:
+            os.remove(fpTemp)
+            raise
+        fp = self.getFp(name)
+        self._replace(fpTemp, fp)
+        self.stats['writes'] += 1
+
+        self._entries[name] = [os.path.getsize(fp), time.time()]
+        self._updateIndex(keep=name)
+        return fp
+
+    def remove(self, name):
+        '''Remove the file `name`, if it exists.
+        '''
+        fp = self.getFp(name)
+        if os.path.exists(fp):
+            os.remove(fp)
+        if name in self._entries:
+            del self._entries[name]
+            self._updateIndex()
+
+    def evict(self, keep=None):
+        '''Remove least recently used files until the total size is within 
+        `maxBytes`. The file named `keep` is never removed.
+        '''
+        total = self.totalBytes
+        if total <= self.maxBytes:
+            return
+        candidates = sorted(self._entries.items(), key=lambda x: x[1][1])
+        for fn, (size, unused) in candidates:
+            if total <= self.maxBytes:
+                break
+            if fn == keep:
+                continue
+            try:
+                os.remove(self.getFp(fn))
+            except OSError: # already removed by another session
+                pass
+            del self._entries[fn]
+            total -= size
+            self.stats['evictions'] += 1
+
+
+# one ScratchCache is shared for each scratch directory
+_scratchCaches = {}
+
+def getScratchCache():
+    '''Return the shared :class:`~music21.converter.ScratchCache` for the
+    current scratch directory, or None if there is no scratch directory.
+    '''
+    dir = environLocal.getRootTempDir()
+    if dir is None:
+        return None
+    if dir not in _scratchCaches:
+        _scratchCaches[dir] = ScratchCache(dir)
+    return _scratchCaches[dir]
+
+def _flushScratchCaches():
+    for sc in _scratchCaches.values():
+        try:
+            sc.flush()
+        except (IOError, OSError): # scratch directory removed
+            pass
+
+atexit.register(_flushScratchCaches)
+
+
 #-------------------------------------------------------------------------------
 class PickleFilter(object):
     '''Before opening a file path, this class can check if there is an up 
@@ -240,7 +531,7 @@ class PickleFilter(object):
             fpPickle = None
         else: # see which is more up to doate
             fpPickle = self._getPickleFp(fpScratch)
-            if not os.path.exists(fpPickle):
+            if getScratchCache().get(os.path.basename(fpPickle)) is None:
                 writePickle = True # if pickled file does not exist
                 fpLoad = self.fp
             else:
@@ -255,6 +546,203 @@ class PickleFilter(object):
 
 
 
+# the ParseCache is only used when enabled
+_parseCacheEnabled = False
+
+def enableParseCache():
+    '''Turn on the :class:`~music21.converter.ParseCache`, so that Streams 
+    parsed from files are stored in the scratch directory and not parsed 
+    again.
+    '''
+    global _parseCacheEnabled
+    _parseCacheEnabled = True
+
+def disableParseCache():
+    '''Turn off the :class:`~music21.converter.ParseCache`. Stored Streams 
+    are kept on disk, and are used again if the cache is enabled.
+    '''
+    global _parseCacheEnabled
+    _parseCacheEnabled = False
+
+
+class ParseCache(object):
+    '''Before parsing a file, this class can check if a frozen version of
+    the resulting Stream, written by the
+    :class:`~music21.converter.StreamFreezer`, is stored in the scratch
+    directory. This is done for all formats, when enabled with 
+    :func:`~music21.converter.enableParseCache`.
+
+    Cached Streams are found with a key made from the contents of the
+    file, the music21 version, the format, and the parse options, so that
+    a changed file, a new music21 version, or different options never
+    return an out of date Stream.
+
+    >>> from music21 import *
+    >>> fp = corpus.getWork('bach/bwv66.6')
+    >>> pc = converter.ParseCache(fp, 'musicxml')
+    >>> len(pc.getKey())
+    32
+    >>> pc.getKey() == converter.ParseCache(fp, 'musicxml', number=2).getKey()
+    False
+    >>> pc.getKey() == converter.ParseCache(fp, 'musicxml', parts=[0]).getKey()
+    False
+    '''
+    def __init__(self, fp, format, number=None, forceSource=False, 
+        parts=None, measureRange=None):
+        self.fp = fp
+        self.format = format
+        self.number = number
+        self.forceSource = forceSource
+        self.parts = parts
+        self.measureRange = measureRange
+
+    def _getContents(self):
+        # a directory (such as a collection of MuseData parts) is
+        # represented by the names and contents of all files it contains
+        if os.path.isdir(self.fp):
+            post = []
+            for fn in sorted(os.listdir(self.fp)):
+                fpSub = os.path.join(self.fp, fn)
+                if os.path.isfile(fpSub):
+                    f = open(fpSub, 'rb')
+                    post.append(fn + f.read())
+                    f.close()
+            return ''.join(post)
+        f = open(self.fp, 'rb')
+        post = f.read()
+        f.close()
+        return post
+
+    def getKey(self):
+        '''Return a string key for the file contents, the music21 version,
+        the format, and the parse options.
+        '''
+        options = repr((base.VERSION, self.format, self.number, 
+                        self.parts, self.measureRange))
+        return common.getMd5(common.getMd5(self._getContents()) + options)
+
+    def _getCacheName(self):
+        return 'm21-stream-' + self.getKey() + '.p'
+
+    def _isActive(self):
+        # do not cache pickles, or when the source must be read
+        return (_parseCacheEnabled and not self.forceSource and 
+                self.format != 'pickle')
+
+    def get(self):
+        '''Return the cached Stream, or None if no cached Stream is available.
+        '''
+        if not self._isActive() or getScratchCache() is None:
+            return None
+        fpCache = getScratchCache().get(self._getCacheName())
+        if fpCache is None:
+            return None
+        sf = StreamFreezer()
+        try:
+            sf.open(fpCache)
+        except Exception: # a damaged file will be replaced
+            environLocal.printDebug(['cannot open cached stream', fpCache])
+            return None
+        environLocal.printDebug(['opened cached stream', fpCache])
+        return sf.stream
+
+    def set(self, streamObj):
+        '''Freeze and store the Stream parsed from the file path. The Stream
+        is frozen in place, rather than copied, and its sites are restored 
+        afterward, so that the Stream is not changed. If the Stream cannot 
+        be frozen, nothing is stored.
+
+        >>> from music21 import *
+        >>> s = corpus.parse('bwv66.6', forceSource=True)
+        >>> sFlat = s.flat
+        >>> n = sFlat.notes[0]
+        >>> sorted([x.classes[0] for x in n.getSites() if x is not None])
+        ['Measure', 'Score', 'Stream']
+        >>> converter.enableParseCache()
+        >>> converter.ParseCache(corpus.getWork('bwv66.6'), 'musicxml').set(s)
+        >>> converter.disableParseCache()
+        >>> sorted([x.classes[0] for x in n.getSites() if x is not None])
+        ['Measure', 'Score', 'Stream']
+        '''
+        if not self._isActive() or getScratchCache() is None:
+            return
+        def writer(fp):
+            # freezing in place is faster than copying; copying also 
+            # changes the activeSites of Spanner components
+            StreamFreezer(streamObj, fastButUnsafe=True).write(fmt='pickle', 
+                fp=fp)
+        siteState = _getSiteState(streamObj)
+        try:
+            getScratchCache().write(self._getCacheName(), writer)
+        except Exception:
+            environLocal.printDebug(['cannot write cached stream', 
+                self._getCacheName()])
+        _restoreSiteState(siteState)
+
+
+def _getSiteState(streamObj):
+    '''Return the sites and activeSites of all objects in a Stream, its 
+    contained Streams, and its Spanners, as well as the components of its 
+    Spanners and the caches of its Streams, so that they can be restored 
+    with _restoreSiteState() after the Stream is frozen in place.
+    '''
+    objs = []
+    streamStates = []
+    spanners = []
+    found = set()
+    streams = [streamObj]
+    while len(streams) > 0:
+        sub = streams.pop()
+        # cached Streams, such as flat forms, may be the activeSites of 
+        # elements; they are kept, as the elements do not change, but 
+        # forms cached while freezing are not
+        streamStates.append((sub, dict(sub._cache), sub.isSorted, 
+            sub.isFlat))
+        for e in [sub] + sub._elements + sub._endElements:
+            if id(e) in found:
+                continue
+            found.add(id(e))
+            objs.append(e)
+            if e.isStream and e is not sub:
+                streams.append(e)
+            elif 'Spanner' in e.classes:
+                # components may be outside of this hierarchy
+                components = e._components
+                spanners.append((e, components._elements[:], dict(e._cache)))
+                streams.append(components)
+    post = []
+    for e in objs:
+        dc = e._definedContexts
+        post.append((e, e._activeSite, e._activeSiteId, e._idLastDeepCopyOf,
+            dc, dict(dc._definedContexts), dc._locationKeys[:], 
+            dc.containedById))
+    return post, streamStates, spanners
+
+def _restoreSiteState(siteState):
+    '''Restore the state returned by _getSiteState().
+    '''
+    post, streamStates, spanners = siteState
+    for sp, components, cache in spanners:
+        # compare by identity, as equal Notes may be different objects
+        if [id(c) for c in sp._components._elements] != [id(c) for c in 
+            components]:
+            sp._components._elements = components
+        sp._cache = cache
+    for sub, cache, isSorted, isFlat in streamStates:
+        sub._cache = cache
+        sub.isSorted = isSorted
+        sub.isFlat = isFlat
+    for (e, activeSite, activeSiteId, idLastDeepCopyOf, dc, 
+        definedContexts, locationKeys, containedById) in post:
+        e._activeSite = activeSite
+        e._activeSiteId = activeSiteId
+        e._idLastDeepCopyOf = idLastDeepCopyOf
+        e._definedContexts = dc
+        dc._definedContexts = definedContexts
+        dc._locationKeys = locationKeys
+        dc.containedById = containedById
+        dc._lastID = -1 # clear cached lookup
+        dc.wrapWeakref()
 
 
 
@@ -285,11 +773,16 @@ class StreamFreezer(object):
     {6.0} <music21.note.Note G->
     {7.0} <music21.note.Note G>
 
+    If `fastButUnsafe` is True, the Stream is not copied before 
+    writing; it is changed while writing and restored afterward, and 
+    locations in Streams outside of its hierarchy are removed. 
     '''
-    def __init__(self, streamObj=None):
+    def __init__(self, streamObj=None, fastButUnsafe=False):
         # must make a deepcopy, as we will be altering DefinedContexts
         self.stream = None
-        if streamObj is not None:
+        if streamObj is not None and fastButUnsafe:
+            self.stream = streamObj
+        elif streamObj is not None:
             # deepcopy necessary because we mangle sites in the objects
             # before serialization
             self.stream = copy.deepcopy(streamObj)
@@ -365,40 +858,41 @@ class StreamFreezer(object):
         '''
         fmt = self._parseWriteFmt(fmt)
 
-        if fp is None:
+        if fp is None or os.sep not in fp:
             dir = environLocal.getRootTempDir()
-            if fmt.startswith('json'):
+            if fp is not None:
+                fp = os.path.join(dir, fp)
+            elif fmt.startswith('json'):
                 fp = self._getJsonFp(dir)
             else:
                 fp = self._getPickleFp(dir)
-        elif os.sep in fp: # assume its a complete path
-            fp = fp
-        else:
-            dir = environLocal.getRootTempDir()
-            fp = os.path.join(dir, fp)
+            # files in the scratch directory are managed by the ScratchCache
+            def writer(fpTemp):
+                self.write(fmt=fmt, fp=fpTemp)
+            return getScratchCache().write(os.path.basename(fp), writer)
     
         storage = self._packStream(self.stream)
 
         environLocal.printDebug(['writing fp', fp])
 
-        if fmt == 'pickle':
-            f = open(fp, 'wb') # binary
-            # a negative protocal value will get the highest protocal; 
-            # this is generally desirable 
-            # packStream() returns a storage dictionary
-            pickleMod.dump(storage, f, protocol=-1)
-            f.close()
-        elif fmt == 'jsonpickle':
-            data = jsonpickle.encode(storage)
-            f = open(fp, 'w') 
-            f.write(data)
-            f.close()
-        else:
-            raise ConverterException('bad StreamFreezer format: %s' % fmt)
-
-
-        # must restore the passed-in Stream
-        self._teardownStream(self.stream)
+        try:
+            if fmt == 'pickle':
+                f = open(fp, 'wb') # binary
+                # a negative protocal value will get the highest protocal; 
+                # this is generally desirable 
+                # packStream() returns a storage dictionary
+                pickleMod.dump(storage, f, protocol=-1)
+                f.close()
+            elif fmt == 'jsonpickle':
+                data = jsonpickle.encode(storage)
+                f = open(fp, 'w') 
+                f.write(data)
+                f.close()
+            else:
+                raise ConverterException('bad StreamFreezer format: %s' % fmt)
+        finally:
+            # must restore the passed-in Stream, even if writing fails
+            self._teardownStream(self.stream)
         return fp
 
     def writeStr(self, fmt=None):
@@ -407,15 +901,16 @@ class StreamFreezer(object):
         fmt = self._parseWriteFmt(fmt)
         storage = self._packStream(self.stream)
 
-        if fmt == 'pickle':
-            out = pickleMod.dumps(storage, protocol=-1)
-        elif fmt == 'jsonpickle':
-            out = jsonpickle.encode(storage)
-        else:
-            raise ConverterException('bad StreamFreezer format: %s' % fmt)
-
-        # must restore the passed-in Stream
-        self._teardownStream(self.stream)
+        try:
+            if fmt == 'pickle':
+                out = pickleMod.dumps(storage, protocol=-1)
+            elif fmt == 'jsonpickle':
+                out = jsonpickle.encode(storage)
+            else:
+                raise ConverterException('bad StreamFreezer format: %s' % fmt)
+        finally:
+            # must restore the passed-in Stream, even if writing fails
+            self._teardownStream(self.stream)
         return out
 
 
@@ -486,22 +981,26 @@ class ConverterHumdrum(object):
         self.stream = None
 
     #---------------------------------------------------------------------------
-    def parseData(self, humdrumString, number=None):
+    def parseData(self, humdrumString, number=None, parts=None, 
+        measureRange=None):
         '''Open Humdrum data from a string
 
         >>> humdata = '**kern\\n*M2/4\\n=1\\n24r\\n24g#\\n24f#\\n24e\\n24c#\\n24f\\n24r\\n24dn\\n24e-\\n24gn\\n24e-\\n24dn\\n*-'
         >>> c = ConverterHumdrum()
         >>> s = c.parseData(humdata)
         '''
-        self.data = humdrum.parseData(humdrumString)
+        self.data = humdrum.parseData(humdrumString, parts=parts, 
+                                      measureRange=measureRange)
         #self.data.stream.makeNotation()
         
         self.stream = self.data.stream
         return self.data
 
-    def parseFile(self, filepath, number=None):
+    def parseFile(self, filepath, number=None, parts=None, 
+        measureRange=None):
         '''Open Humdram data from a file path.'''
-        self.data = humdrum.parseFile(filepath)
+        self.data = humdrum.parseFile(filepath, parts=parts, 
+                                      measureRange=measureRange)
         #self.data.stream.makeNotation()
 
         self.stream = self.data.stream
@@ -634,9 +1133,19 @@ class ConverterMusicXML(object):
 
 
     #---------------------------------------------------------------------------
-    def parseData(self, xmlString, number=None):
+    def parseData(self, xmlString, number=None, parts=None, 
+        measureRange=None):
         '''Open MusicXML data from a string.'''
         c = musicxml.Document()
+        if parts is not None or measureRange is not None:
+            # only the selection is translated, measure by measure
+            musicxmlTranslate.musicXMLToScore(xmlString, isFile=False, 
+                inputM21=self._stream, mxDocument=c, parts=parts, 
+                measureRange=measureRange)
+            self._mxScore = c.score
+            if len(self._mxScore) == 0:
+                raise ConverterException('score from xmlString (%s...) either has no parts defined or was incompletely parsed' % xmlString[:30])
+            return
         c.read(xmlString)
         self._mxScore = c.score #  the mxScore object from the musicxml Document
         if len(self._mxScore) == 0:
@@ -644,19 +1153,28 @@ class ConverterMusicXML(object):
             raise ConverterException('score from xmlString (%s...) either has no parts defined or was incompletely parsed' % xmlString[:30])
         self.load()
 
-    def parseFile(self, fp, number=None):
+    def parseFile(self, fp, number=None, parts=None, measureRange=None):
         '''Open from a file path; check to see if there is a pickled
         version available and up to date; if so, open that, otherwise
-        open source.
+        open source. Pickles are no longer written for musicxml sources;
+        repeated parses can instead be served by the :class:`ParseCache`,
+        if enabled.
+
+        If `parts` or `measureRange` is given, only the selected parts and
+        measures are translated from the source; see 
+        :func:`~music21.musicxml.translate.musicXMLToScore`.
         '''
-        # return fp to load, if pickle needs to be written, fp pickle
         # this should be able to work on a .mxl file, as all we are doing
         # here is seeing which is more recent
 
-        pfObj = PickleFilter(fp, self.forceSource)
-        # fpDst here is the file path to load, which may or may not be
-        # a pickled file 
-        fpDst, writePickle, fpPickle = pfObj.status() # get status
+        if parts is not None or measureRange is not None:
+            # pickles store complete scores; always read the source
+            fpDst = fp
+        else:
+            pfObj = PickleFilter(fp, self.forceSource)
+            # fpDst here is the file path to load, which may or may not be
+            # a pickled file 
+            fpDst, junk, junk = pfObj.status() # get status
 
         formatSrc = common.findFormatFile(fp)
         # here we determine if we have pickled file or a musicxml file
@@ -669,9 +1187,8 @@ class ConverterMusicXML(object):
             try:
                 c.openPickle(fpDst)
             except (ImportError, EOFError):
-                msg = 'pickled file (%s) is damaged; a new file will be created.' % fpDst
+                msg = 'pickled file (%s) is damaged.' % fpDst
                 pickleError = True
-                writePickle = True
                 if formatSrc == 'musicxml':
                     #environLocal.printDebug([msg], environLocal)
                     fpDst = fp # set to orignal file path
@@ -689,18 +1206,29 @@ class ConverterMusicXML(object):
                     # some old pickles have no versions
                     pass
                 pickleError = True
-                writePickle = True
                 fpDst = fp # set to orignal file path
 
         if format == 'musicxml' or (formatSrc == 'musicxml' and pickleError):
             environLocal.printDebug(['opening musicxml file:', fpDst])
-
+            # translate measure by measure, without building a complete 
+            # mxScore; as there is then no mxScore to pickle, repeated 
+            # parses can instead be served by the ParseCache
+            junk, fn = os.path.split(fp)
             # here, we can see if this is a mxl or similar archive
             arch = ArchiveManager(fpDst)
             if arch.isArchive():
-                c.read(arch.getData())
+                musicxmlTranslate.musicXMLToScore(arch.getData(), 
+                    isFile=False, inputM21=self._stream, 
+                    defaultMovementTitle=fn, mxDocument=c, parts=parts, 
+                    measureRange=measureRange)
             else: # its a file path or a raw musicxml string
-                c.open(fpDst)
+                musicxmlTranslate.musicXMLToScore(fpDst, isFile=True, 
+                    inputM21=self._stream, defaultMovementTitle=fn, 
+                    mxDocument=c, parts=parts, measureRange=measureRange)
+            self._mxScore = c.score
+            if len(self._mxScore) == 0:
+                raise ConverterException('score from file path (%s) no parts defined' % fp)
+            return
 
         # get mxScore object from .score attribute
         self._mxScore = c.score
@@ -718,13 +1246,6 @@ class ConverterMusicXML(object):
                 # set as movement title
                 self._mxScore.set('movementTitle', fn)
 
-        # only write pickle if we have parts defined
-        if writePickle:
-            if fpPickle == None: # if original file cannot be found
-                raise ConverterException('attempting to write pickle but no file path is given')
-            environLocal.printDebug(['writing pickled file', fpPickle])
-            c.writePickle(fpPickle)
-
         self.load()
 
 
@@ -868,7 +1389,7 @@ class ConverterMuseData(object):
         # always create a score instance
         self._stream = stream.Score()
 
-    def parseData(self, strData, number=None):
+    def parseData(self, strData, number=None, parts=None, measureRange=None):
         '''Get musedata from a string representation. 
 
         '''
@@ -882,10 +1403,11 @@ class ConverterMuseData(object):
         for strData in strDataList:
             mdw.addString(strData)
 
-        musedataTranslate.museDataWorkToStreamScore(mdw, self._stream)
+        musedataTranslate.museDataWorkToStreamScore(mdw, self._stream, 
+            parts=parts, measureRange=measureRange)
 
 
-    def parseFile(self, fp, number=None):
+    def parseFile(self, fp, number=None, parts=None, measureRange=None):
         '''
         '''
         mdw = musedataModule.MuseDataWork()
@@ -914,7 +1436,8 @@ class ConverterMuseData(object):
 
         #environLocal.printDebug(['ConverterMuseData: mdw file count', len(mdw.files)])
 
-        musedataTranslate.museDataWorkToStreamScore(mdw, self._stream)
+        musedataTranslate.museDataWorkToStreamScore(mdw, self._stream, 
+            parts=parts, measureRange=measureRange)
 
 
 
@@ -940,6 +1463,8 @@ class Converter(object):
 
     def __init__(self):
         self._converter = None
+        # a Stream found in the parse cache, if any
+        self._cachedStream = None
 
     def _setConverter(self, format, forceSource=False):
         # assume for now tt pickled files are alwasy musicxml
@@ -971,18 +1496,50 @@ class Converter(object):
         else:
             raise ConverterException('no such format: %s' % format)
 
+    # formats that can translate only selected parts and measures
+    selectionFormats = ['musicxml', 'musedata', 'humdrum']
+
+    def _getSelectionKeywords(self, format, parts, measureRange):
+        '''Return the keywords that give the selection of `parts` and
+        `measureRange` to the converter for the format.
+
+        >>> from music21 import *
+        >>> c = converter.Converter()
+        >>> c._getSelectionKeywords('abc', None, None)
+        {}
+        >>> c._getSelectionKeywords('humdrum', None, (1, 4)) == {
+        ...     'parts': None, 'measureRange': (1, 4)}
+        True
+        >>> c._getSelectionKeywords('abc', [0], None)
+        Traceback (most recent call last):
+        ConverterException: cannot select parts or measures when parsing format: abc
+        '''
+        if parts is None and measureRange is None:
+            return {}
+        if format not in self.selectionFormats:
+            raise ConverterException(
+                'cannot select parts or measures when parsing format: %s' % 
+                format)
+        return {'parts': parts, 'measureRange': measureRange}
+
     def _getDownloadFp(self, dir, ext, url):
         if dir == None:
             raise ValueError
         return os.path.join(dir, 'm21-' + common.getMd5(url) + ext)
 
-    def parseFile(self, fp, number=None, format=None, forceSource=False):
+    def parseFile(self, fp, number=None, format=None, forceSource=False, 
+        parts=None, measureRange=None):
         '''
         Given a file path, parse and store a music21 Stream.
         
         
         If format is None then look up the format from the file 
         extension using `common.findFormatFile`.
+
+
+        For MusicXML, MuseData, and Humdrum, `parts` (a list of part 
+        indices or names) and `measureRange` (a pair of measure numbers)
+        select what is translated; other parts and measures are skipped.
         
         '''
         #environLocal.printDebug(['attempting to parseFile', fp])
@@ -998,11 +1555,28 @@ class Converter(object):
                 format = common.findFormatFile(fp)
                 if format is None:
                      raise ConverterFileException('cannot find a format extensions for: %s' % fp)
-        self._setConverter(format, forceSource=forceSource)
-        self._converter.parseFile(fp, number=number)
-
+        self._parseFileCached(fp, number, format, forceSource, 
+                              parts=parts, measureRange=measureRange)
 
-    def parseData(self, dataStr, number=None, format=None, forceSource=False):
+    def _parseFileCached(self, fp, number, format, forceSource, parts=None, 
+        measureRange=None):
+        '''Parse a file with the converter for the format, first looking
+        for the resulting Stream in the :class:`~music21.converter.ParseCache`.
+        '''
+        keywords = self._getSelectionKeywords(format, parts, measureRange)
+        self._setConverter(format, forceSource=forceSource)
+        self._cachedStream = None
+        pc = ParseCache(fp, format, number=number, forceSource=forceSource, 
+                        parts=parts, measureRange=measureRange)
+        self._cachedStream = pc.get()
+        if self._cachedStream is not None:
+            return
+        self._converter.parseFile(fp, number=number, **keywords)
+        pc.set(self._converter.stream)
+
+
+    def parseData(self, dataStr, number=None, format=None, forceSource=False,
+        parts=None, measureRange=None):
         '''Given raw data, determine format and parse into a music21 Stream.
         '''
         if common.isListLike(dataStr):
@@ -1037,14 +1611,18 @@ class Converter(object):
             else:
                 raise ConverterException('File not found or no such format found for: %s' % dataStr)
 
+        keywords = self._getSelectionKeywords(format, parts, measureRange)
         self._setConverter(format)
-        self._converter.parseData(dataStr, number=number)
+        self._cachedStream = None
+        self._converter.parseData(dataStr, number=number, **keywords)
 
 
-    def parseURL(self, url, format=None, number=None):
+    def parseURL(self, url, format=None, number=None, parts=None, 
+        measureRange=None):
         '''Given a url, download and parse the file 
         into a music21 Stream stored in the `stream`
-        property of the converter object.
+        property of the converter object. `parts` and `measureRange` 
+        are used as by :meth:`~music21.converter.Converter.parseFile`.
 
         Note that this checks the user Environment 
         `autoDownlaad` setting before downloading. 
@@ -1105,8 +1683,8 @@ class Converter(object):
         # update format based on downloaded fp
         if format is None: # if not provided as an argument
             format = common.findFormatFile(fp) 
-        self._setConverter(format, forceSource=False)
-        self._converter.parseFile(fp, number=number)
+        self._parseFileCached(fp, number, format, False, parts=parts, 
+                              measureRange=measureRange)
 
 
     validHeaderFormats = ['musicxml', 'midi', 'humdrum', 'tinyNotation', 'musedata', 'abc', 'romanText']
@@ -1148,6 +1726,8 @@ class Converter(object):
     def _getStream(self):
         '''All converters have to have a stream property or attribute.
         '''
+        if self._cachedStream is not None:
+            return self._cachedStream
         return self._converter.stream 
         # not _stream: please don't look in other objects' private variables; 
         #              humdrum worked differently.
@@ -1161,25 +1741,30 @@ class Converter(object):
 # module level convenience methods
 
 
-def parseFile(fp, number=None, format=None, forceSource=False):
+def parseFile(fp, number=None, format=None, forceSource=False, parts=None, 
+    measureRange=None):
     '''Given a file path, attempt to parse the file into a Stream.
     '''
     v = Converter()
-    v.parseFile(fp, number=number, format=format, forceSource=forceSource)
+    v.parseFile(fp, number=number, format=format, forceSource=forceSource, 
+                parts=parts, measureRange=measureRange)
     return v.stream
 
-def parseData(dataStr, number=None, format=None):
+def parseData(dataStr, number=None, format=None, parts=None, 
+    measureRange=None):
     '''Given musical data represented within a Python string, attempt to parse the data into a Stream.
     '''
     v = Converter()
-    v.parseData(dataStr, number=number, format=format)
+    v.parseData(dataStr, number=number, format=format, parts=parts, 
+                measureRange=measureRange)
     return v.stream
 
-def parseURL(url, number=None, format=None, forceSource=False):
+def parseURL(url, number=None, format=None, forceSource=False, parts=None,
+    measureRange=None):
     '''Given a URL, attempt to download and parse the file into a Stream. Note: URL downloading will not happen automatically unless the user has set their Environment "autoDownload" preference to "allow". 
     '''
     v = Converter()
-    v.parseURL(url, format=format)
+    v.parseURL(url, format=format, parts=parts, measureRange=measureRange)
     return v.stream
 
 def parse(value, *args, **keywords):
@@ -1196,6 +1781,11 @@ def parse(value, *args, **keywords):
     
     
     `format` specifies the format to parse the line of text or the file as.    
+
+
+    `parts` and `measureRange` select the parts (by index or name) and
+    the range of measure numbers (inclusive) to translate from MusicXML,
+    MuseData, or Humdrum; nothing else is translated.
     
     A string of text is first checked to see if it is a 
     filename that exists on disk.  If not it is searched
@@ -1228,6 +1818,12 @@ def parse(value, *args, **keywords):
     {2.5} <music21.note.Note G#>
     {3.0} <music21.note.Note G>
     {3.5} <music21.note.Note G#>
+
+    Selecting parts or measures from other formats raises an exception:
+
+    >>> converter.parse('c4 d e f', '4/4', parts=[3], measureRange=(5, 9))
+    Traceback (most recent call last):
+    ConverterException: cannot select parts or measures when parsing format: tinyNotation
     
     '''
 
@@ -1248,28 +1844,39 @@ def parse(value, *args, **keywords):
     else:   
         format = None
 
+    # selections of parts and measures to translate
+    parts = keywords.get('parts', None)
+    measureRange = keywords.get('measureRange', None)
+
     if (common.isListLike(value) and len(value) == 2 and 
         value[1] == None and os.path.exists(value[0])):
         # comes from corpus.search
-        return parseFile(value[0], format=format)
+        return parseFile(value[0], format=format, parts=parts, 
+                         measureRange=measureRange)
     elif (common.isListLike(value) and len(value) == 2 and 
         isinstance(value[1], int) and os.path.exists(value[0])):
         # corpus or other file with movement number
-        return parseFile(value[0], format=format).getScoreByNumber(value[1])
+        return parseFile(value[0], format=format, parts=parts, 
+            measureRange=measureRange).getScoreByNumber(value[1])
     elif common.isListLike(value) or len(args) > 0: # tiny notation list
         if len(args) > 0: # add additional args to a list
             value = [value] + list(args)
-        return parseData(value, number=number)
+        return parseData(value, number=number, parts=parts, 
+                         measureRange=measureRange)
      # a midi string, must come before os.path.exists test
     elif value.startswith('MThd'):
-        return parseData(value, number=number, format=format)
+        return parseData(value, number=number, format=format, parts=parts, 
+                         measureRange=measureRange)
     elif os.path.exists(value):
-        return parseFile(value, number=number, format=format, forceSource=forceSource)
+        return parseFile(value, number=number, format=format, 
+            forceSource=forceSource, parts=parts, measureRange=measureRange)
     elif (value.startswith('http://') or value.startswith('https://')): 
         # its a url; may need to broaden these criteria
-        return parseURL(value, number=number, format=format, forceSource=forceSource)
+        return parseURL(value, number=number, format=format, 
+            forceSource=forceSource, parts=parts, measureRange=measureRange)
     else:
-        return parseData(value, number=number, format=format)
+        return parseData(value, number=number, format=format, parts=parts, 
+                         measureRange=measureRange)
 
 
 
@@ -1995,9 +2602,170 @@ class Test(unittest.TestCase):
         #s.show()
 
 
+    def testParseCacheA(self):
+        from music21 import corpus
+
+        fp = corpus.getWork('essenFolksong/altdeu10.abc')
+        pc = ParseCache(fp, 'abc', number=3)
+        fpCache = getScratchCache().getFp(pc._getCacheName())
+        if os.path.exists(fpCache):
+            os.remove(fpCache)
+
+        # the cache is only used when enabled
+        s1 = parseFile(fp, number=3)
+        self.assertEqual(os.path.exists(fpCache), False)
+        enableParseCache()
+        try:
+            self._testParseCacheEnabled(fp, fpCache)
+        finally:
+            disableParseCache()
+
+    def testParseCacheSiteStateA(self):
+        import gc
+        from music21 import corpus
+        from music21.musicxml import testPrimitive
+
+        def getSignature(s):
+            # found without creating Streams, which would add sites
+            post = []
+            streams = [s]
+            while len(streams) > 0:
+                sub = streams.pop(0)
+                post.append((id(sub), sub.isSorted, sub.isFlat, 
+                             sorted(sub._cache.keys())))
+                for e in sub._elements + sub._endElements:
+                    sites = [x for x in e.getSites() if x is not None]
+                    post.append((id(e), id(e.activeSite), sorted([(id(x), 
+                        e.getOffsetBySite(x)) for x in sites])))
+                    if e.isStream:
+                        streams.append(e)
+                    elif 'Spanner' in e.classes:
+                        post.append([id(c) for c in e._components._elements])
+                        post.append(sorted(e._cache.keys()))
+            return post
+
+        # spanners and voices are restored after freezing in place
+        enableParseCache()
+        try:
+            for s in [parseData(testPrimitive.spanners33a), 
+                parseData(testPrimitive.voiceDouble), 
+                corpus.parse('beethoven/opus18no1/movement1.xml')]:
+                # end element offsets cache highest times; get them first, 
+                # after removing unreachable sites
+                gc.collect()
+                getSignature(s)
+                before = getSignature(s)
+                pc = ParseCache(corpus.getWork('bwv66.6'), 'test-site-state')
+                pc.set(s)
+                fpCache = getScratchCache().getFp(pc._getCacheName())
+                self.assertEqual(os.path.exists(fpCache), True)
+                getScratchCache().remove(pc._getCacheName())
+                self.assertEqual(getSignature(s), before)
+        finally:
+            disableParseCache()
+
+    def _testParseCacheEnabled(self, fp, fpCache):
+        s1 = parseFile(fp, number=3)
+        self.assertEqual(os.path.exists(fpCache), True)
+        # a second parse is read from the cache
+        c = Converter()
+        c.parseFile(fp, number=3)
+        self.assertEqual(c._cachedStream is not None, True)
+        s2 = c.stream
+        self.assertEqual(s2.metadata.title, s1.metadata.title)
+        self.assertEqual([str(p) for p in s2.flat.pitches],
+                         [str(p) for p in s1.flat.pitches])
+        self.assertEqual(s2.highestTime, s1.highestTime)
+
+        # forcing the source does not use the cache
+        c = Converter()
+        c.parseFile(fp, number=3, forceSource=True)
+        self.assertEqual(c._cachedStream, None)
+
+        # a damaged cache file is ignored
+        f = open(fpCache, 'wb')
+        f.write('not a pickle')
+        f.close()
+        s3 = parseFile(fp, number=3)
+        self.assertEqual(len(s3.flat.notes), len(s1.flat.notes))
+        os.remove(fpCache)
+
+    def testScratchCacheA(self):
+        import shutil
+
+        def writer(fp):
+            f = open(fp, 'w')
+            f.write('x' * 10)
+            f.close()
+
+        dir = tempfile.mkdtemp()
+        try:
+            sc = ScratchCache(dir, maxBytes=30)
+            for name in ['m21-a.p', 'm21-b.p', 'm21-c.p']:
+                sc.write(name, writer)
+                time.sleep(.01)
+            self.assertEqual(sc.totalBytes, 30)
+            # using a makes b the least recently used
+            self.assertEqual(sc.get('m21-a.p') is not None, True)
+            time.sleep(.01)
+            sc.write('m21-d.p', writer)
+            self.assertEqual(sorted(os.listdir(dir)), ['m21-a.p', 
+                'm21-c.p', 'm21-cache-index.json', 'm21-d.p'])
+            self.assertEqual(sc.stats['evictions'], 1)
+
+            # files not written by a ScratchCache are adopted; other 
+            # files are not managed
+            writer(os.path.join(dir, 'm21-e.p'))
+            writer(os.path.join(dir, 'download.xml'))
+            # the order is read from the index by a new instance
+            sc = ScratchCache(dir, maxBytes=40)
+            self.assertEqual(sc.totalBytes, 40)
+            time.sleep(.01)
+            sc.write('m21-f.p', writer)
+            self.assertEqual(sc.get('m21-c.p'), None)
+            self.assertEqual(sc.get('m21-a.p') is not None, True)
+            self.assertEqual(os.path.exists(os.path.join(dir, 
+                'download.xml')), True)
+            self.assertEqual(sc.stats, {'hits': 1, 'misses': 1, 
+                'writes': 1, 'evictions': 1})
+
+            # a failed write stores nothing
+            def badWriter(fp):
+                raise ValueError
+            self.assertRaises(ValueError, sc.write, 'm21-g.p', badWriter)
+            self.assertEqual(sorted(os.listdir(dir)), ['download.xml', 
+                'm21-a.p', 'm21-cache-index.json', 'm21-d.p', 'm21-e.p',
+                'm21-f.p'])
+
+            # hits are kept in memory until flushed; other sessions' 
+            # access times are merged when the index is written
+            fpIndex = os.path.join(dir, 'm21-cache-index.json')
+            sc2 = ScratchCache(dir, maxBytes=40)
+            time.sleep(.01)
+            sc2.get('m21-d.p')
+            f = open(fpIndex)
+            entries = json.load(f)
+            f.close()
+            self.assertEqual(entries['m21-d.p'][1] < 
+                sc2._entries['m21-d.p'][1], True)
+            sc2.flush()
+            time.sleep(.01)
+            sc.get('m21-e.p')
+            sc.flush()
+            f = open(fpIndex)
+            entries = json.load(f)
+            f.close()
+            self.assertEqual(entries['m21-d.p'], sc2._entries['m21-d.p'])
+            self.assertEqual(entries['m21-e.p'], sc._entries['m21-e.p'])
+            # the lock file is removed
+            self.assertEqual(os.path.exists(sc._getLockFp()), False)
+        finally:
+            shutil.rmtree(dir)
+
+
 #-------------------------------------------------------------------------------
 # define presented order in documentation
-_DOC_ORDER = [parse, parseFile, parseData, parseURL, freeze, unfreeze, freezeStr, unfreezeStr, Converter, ConverterMusicXML, ConverterHumdrum]
+_DOC_ORDER = [parse, parseFile, parseData, parseURL, freeze, unfreeze, freezeStr, unfreezeStr, Converter, ConverterMusicXML, ConverterHumdrum, ParseCache, ScratchCache]
 
 
 if __name__ == "__main__":
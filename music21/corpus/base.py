@@ -25,6 +25,9 @@ from __future__ import unicode_literals
 
 import re
 import os
+import collections
+import hashlib
+import json
 import doctest, unittest
 import zipfile
 
@@ -88,6 +91,235 @@ class CorpusException(exceptions21.Music21Exception):
 
 
 #-------------------------------------------------------------------------------
+class ParseMemo(object):
+    '''An in-memory, size-bounded store of Streams returned by 
+    :func:`~music21.corpus.parse`, keyed by the arguments given.
+
+    Each Stream is stored in pickled form, and a new Stream is unpickled
+    for each request, so that changes made to a returned Stream are never 
+    seen by later callers. (This is considerably faster than 
+    `copy.deepcopy()`, and faster than reading the pickle from disk.)
+    The modification time and size of the source file are stored with 
+    each Stream; if either has changed, the Stream is discarded and the 
+    file is parsed again. When more than `maxSize` Streams are stored, 
+    the least recently used is removed. 
+
+    The memo is disabled by default; see 
+    :func:`~music21.corpus.enableParseMemo`.
+
+    >>> from music21 import *
+    >>> pm = corpus.ParseMemo(maxSize=2)
+    >>> pm.get(('bach/bwv66.6', None, None, (None,))) is None
+    True
+    >>> pm.stats['misses']
+    1
+    '''
+    def __init__(self, maxSize=16):
+        self.maxSize = maxSize
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 
+                      'evictions': 0}
+        # key : [file path, file signature, pickled Stream]; most recent last
+        self._entries = collections.OrderedDict()
+
+    def __repr__(self):
+        return '<music21.corpus.base.ParseMemo %s/%s Streams>' % (
+            len(self._entries), self.maxSize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _getSignature(self, fp):
+        try:
+            st = os.stat(fp)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def get(self, key):
+        '''Return a tuple of the file path and a new copy of the Stream 
+        stored for `key`, or None if there is no current Stream.
+        '''
+        if key not in self._entries:
+            self.stats['misses'] += 1
+            return None
+        fp, signature, data = self._entries.pop(key)
+        if self._getSignature(fp) != signature:
+            self.stats['invalidations'] += 1
+            self.stats['misses'] += 1
+            return None
+        self._entries[key] = [fp, signature, data]
+        self.stats['hits'] += 1
+        sf = converter.StreamFreezer()
+        sf.openStr(data)
+        return fp, sf.stream
+
+    def set(self, key, fp, streamObj):
+        '''Store a copy of `streamObj` parsed from the file `fp`. 
+        Streams not read from a local file, or that cannot be pickled, 
+        are not stored.
+        '''
+        signature = self._getSignature(fp)
+        if signature is None or self.maxSize <= 0:
+            return
+        if key in self._entries:
+            del self._entries[key]
+        try:
+            # the Stream is restored after pickling, so need not be copied
+            data = converter.StreamFreezer(streamObj, 
+                fastButUnsafe=True).writeStr(fmt='pickle')
+        except Exception:
+            environLocal.printDebug(['cannot store parsed stream', fp])
+            return
+        self._entries[key] = [fp, signature, data]
+        while len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        '''Remove all stored Streams.
+        '''
+        self._entries.clear()
+
+
+# the ParseMemo used by parse(), or None if disabled
+_parseMemo = None
+
+def enableParseMemo(maxSize=16):
+    '''Keep up to `maxSize` Streams returned by 
+    :func:`~music21.corpus.parse` in memory, so that parsing the same 
+    work again returns a copy without reading the file. 
+
+    >>> from music21 import *
+    >>> pm = corpus.enableParseMemo(maxSize=4)
+    >>> s1 = corpus.parse('bach/bwv66.6')
+    >>> s2 = corpus.parse('bach/bwv66.6')
+    >>> s1 is s2
+    False
+    >>> len(s2.flat.notes) == len(s1.flat.notes)
+    True
+    >>> pm.stats['hits'], pm.stats['misses']
+    (1, 1)
+    >>> corpus.getParseMemo() is pm
+    True
+    >>> corpus.disableParseMemo()
+    >>> corpus.getParseMemo() is None
+    True
+    '''
+    global _parseMemo
+    if _parseMemo is None:
+        _parseMemo = ParseMemo(maxSize)
+    else:
+        _parseMemo.maxSize = maxSize
+    return _parseMemo
+
+def disableParseMemo():
+    '''Stop keeping parsed Streams in memory and remove those stored.
+    '''
+    global _parseMemo
+    if _parseMemo is not None:
+        _parseMemo.clear()
+    _parseMemo = None
+
+def getParseMemo():
+    '''Return the :class:`~music21.corpus.ParseMemo` used by 
+    :func:`~music21.corpus.parse`, or None if it is not enabled.
+    '''
+    return _parseMemo
+
+
+#-------------------------------------------------------------------------------
+# pairs of directory modification times and file path lists for each 
+# directory searched with _findPaths(); see _getPathManifest()
+_pathManifests = {}
+
+def _dirsAreCurrent(fpRoot, dirs):
+    '''Return True if all directories in `dirs`, a dictionary of paths 
+    relative to fpRoot and modification times, exist and have the stored 
+    modification times.
+    '''
+    try:
+        for dirpath, mtime in dirs.items():
+            if os.path.getmtime(os.path.join(fpRoot, dirpath)) != mtime:
+                return False
+    except (OSError, AttributeError, TypeError):
+        return False
+    return True
+
+def _getPathManifest(fpRoot):
+    '''Return a list of all file paths in fpRoot and its subdirectories, 
+    excluding hidden files and .svn directories, in the order found by 
+    os.walk().
+
+    The list is stored with the modification time of each directory 
+    in a manifest file in the scratch directory. When all directories 
+    have the same modification time, no file or directory has been added 
+    or removed, and the stored list is used without walking the 
+    directories. The list is also kept in memory for this session, and 
+    is used while the directories have the same modification times. 
+
+    >>> from music21 import *
+    >>> paths = corpus.base._getPathManifest(common.getCorpusFilePath())
+    >>> len(paths) > 2000
+    True
+    '''
+    # force fpRoot to be unicode so that dir names are properly resolved...
+    fpRoot = unicode(fpRoot) 
+    if fpRoot in _pathManifests:
+        dirs, paths = _pathManifests[fpRoot]
+        if _dirsAreCurrent(fpRoot, dirs):
+            return paths
+        del _pathManifests[fpRoot]
+
+    cache = converter.getScratchCache()
+    name = 'm21-paths-%s.json' % hashlib.md5(fpRoot.encode('utf-8')).hexdigest()
+    manifest = None
+    fpManifest = None
+    if cache is not None:
+        fpManifest = cache.get(name)
+    if fpManifest is not None:
+        try:
+            f = open(fpManifest)
+            manifest = json.load(f)
+            f.close()
+            if not _dirsAreCurrent(fpRoot, manifest['dirs']):
+                manifest = None
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            manifest = None
+
+    if manifest is None:
+        dirs = {}
+        files = []
+        for dirpath, dirnames, filenames in os.walk(fpRoot):
+            if '.svn' in dirnames:
+                # removing in place will stop recursion into these dirs
+                dirnames.remove('.svn')
+            dirRelative = os.path.relpath(dirpath, fpRoot)
+            dirs[dirRelative] = os.path.getmtime(dirpath)
+            for fn in filenames:
+                try:
+                    if fn.startswith('.'): 
+                        continue
+                except UnicodeDecodeError as ude:
+                    raise CorpusException("Incorrect filename in corpus path: %s: %s" % (fn, ude))
+                if dirRelative == os.curdir:
+                    files.append(fn)
+                else:
+                    files.append(os.path.join(dirRelative, fn))
+        manifest = {'dirs': dirs, 'files': files}
+        if cache is not None:
+            def writer(fp):
+                f = open(fp, 'w')
+                json.dump(manifest, f)
+                f.close()
+            try:
+                cache.write(name, writer)
+            except (IOError, OSError):
+                environLocal.printDebug(['cannot write path manifest', name])
+
+    paths = [os.path.join(fpRoot, fp) for fp in manifest['files']]
+    _pathManifests[fpRoot] = (manifest['dirs'], paths)
+    return paths
+
 def _findPaths(fpRoot, extList):
     '''Given a root fp file path, recursively search all contained paths for files
     in fpRoot matching any of the extensions in extList
@@ -95,29 +327,14 @@ def _findPaths(fpRoot, extList):
     The `extList` is a list of file extensions. 
     
     NB: we've tried optimizing with fnmatch but it does not save any time.
+    Files are found with :func:`~music21.corpus.base._getPathManifest`, 
+    which only walks the directories when they have changed.
     '''
-    # can replace extension matching with a regex    
-    #escape extension dots (if there) for regex
-    #extList = ["\\%s" % ex for ex in extList if ex.startswith('.')]
-    #extRe = re.compile('.*(%s)' % '|'.join(extList))
-
     matched = []
-    # walk each top-level dir
-    fpRoot = unicode(fpRoot) # force fpRoot to be unicode so that dir names are properly resolved...
-    for dirpath, dirnames, filenames in os.walk(fpRoot):
-        if '.svn' in dirnames:
-            # removing in place will stop recursion into these dirs
-            dirnames.remove('.svn')
-        for fn in filenames:
-            try:
-                if fn.startswith('.'): 
-                    continue
-            except UnicodeDecodeError as ude:
-                raise CorpusException("Incorrect filename in corpus path: %s: %s" % (fn, ude))
-            for ext in extList:
-                if fn.endswith(ext):
-                    matched.append(os.path.join(dirpath, fn))
-                    break # just break out of outer loop
+    extTuple = tuple(extList)
+    for fp in _getPathManifest(fpRoot):
+        if fp.endswith(extTuple):
+            matched.append(fp)
     return matched
 
 
@@ -194,7 +411,7 @@ def getCorePaths(extList=None, expandExtensions=True):
                 expandExtensions=expandExtensions)
     cacheKey = ('core', tuple(extList))
     # not cached, fetch and reset 
-    if cacheKey not in _pathsCache.keys():
+    if cacheKey not in _pathsCache:
         _pathsCache[cacheKey] = _findPaths(common.getCorpusFilePath(), extList)
     return _pathsCache[cacheKey]
 
@@ -228,7 +445,7 @@ def getLocalPaths(extList=None, expandExtensions=True):
                 expandExtensions=expandExtensions)
     cacheKey = ('local', tuple(extList))
     # not cached, fetch and reset 
-    if cacheKey not in _pathsCache.keys():
+    if cacheKey not in _pathsCache:
         # check paths before trying to search
         candidatePaths = environLocal['localCorpusSettings']
         validPaths = []
@@ -286,10 +503,14 @@ def addPath(fp):
         raise CorpusException("the provided path is already incldued in the Environment localCorpusSettings: %s" % fp)
 
     _pathsLocalTemp.append(fp)
-    # delete all local keys in the cache
+    # delete all local keys, and the work lists found in them, in the cache
     for key in _pathsCache.keys():
-        if key[0] == 'local':
+        if key[0] in ['local', 'workList']:
             del _pathsCache[key]
+    # the directory may have been searched before being added
+    for fpRoot in [unicode(fp), unicode(os.path.abspath(fp))]:
+        if fpRoot in _pathManifests:
+            del _pathManifests[fpRoot]
 
 
 def getPaths(extList=None, expandExtensions=True, 
@@ -508,6 +729,15 @@ def getWorkList(workName, movementNumber=None, extList=None):
     if not common.isListLike(extList):
         extList = [extList]
 
+    # results are cached with the paths they are found in
+    cacheKey = ['workList', workName, movementNumber, extList]
+    for i in range(1, len(cacheKey)):
+        if common.isListLike(cacheKey[i]):
+            cacheKey[i] = tuple(cacheKey[i])
+    cacheKey = tuple(cacheKey)
+    if cacheKey in _pathsCache:
+        return list(_pathsCache[cacheKey])
+
     paths = getPaths(extList)
     post = []
 
@@ -585,10 +815,8 @@ def getWorkList(workName, movementNumber=None, extList=None):
     #environLocal.printDebug(['postMvt', postMvt])
 
     postMvt.sort() # sort here, a shorter list
-    if len(postMvt) == 0:
-        return []
-    else:
-        return postMvt
+    _pathsCache[cacheKey] = postMvt
+    return list(postMvt)
 
 def getVirtualWorkList(workName, movementNumber=None, extList=None):
     '''Given a work name, search all virtual works and return a list of URLs for any matches.
@@ -811,6 +1039,18 @@ def parse(workName, movementNumber=None, number=None,
     if not common.isListLike(extList):
         extList = [extList]
 
+    memoKey = None
+    if _parseMemo is not None and not forceSource:
+        if common.isListLike(workName):
+            memoKey = (tuple(workName), movementNumber, number, tuple(extList))
+        else:
+            memoKey = (workName, movementNumber, number, tuple(extList))
+        post = _parseMemo.get(memoKey)
+        if post is not None:
+            fp, streamObj = post
+            _addCorpusFilepath(streamObj, fp)
+            return streamObj
+
     post = getWorkList(workName, movementNumber, extList)
     #environLocal.printDebug(['result of getWorkList()', post])
     if len(post) == 0:
@@ -833,6 +1073,8 @@ def parse(workName, movementNumber=None, number=None,
 
     streamObj = converter.parse(fp, forceSource=forceSource, number=number)
     _addCorpusFilepath(streamObj, fp)
+    if memoKey is not None:
+        _parseMemo.set(memoKey, fp, streamObj)
     return streamObj
 
 def _addCorpusFilepath(streamObj, filepath):   
@@ -1286,6 +1528,115 @@ class Test(unittest.TestCase):
         #s.show()
 
 
+    def testPathManifestA(self):
+        import tempfile, shutil
+
+        dir = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(dir, 'a'))
+            os.mkdir(os.path.join(dir, '.svn'))
+            for fn in ['x.xml', '.hidden.xml', 'y.krn', 
+                       os.path.join('a', 'z.xml'), 
+                       os.path.join('.svn', 'w.xml')]:
+                open(os.path.join(dir, fn), 'w').close()
+            # times that can be restored exactly
+            mtime = 1000000000
+            os.utime(os.path.join(dir, 'a'), (mtime, mtime))
+
+            post = _findPaths(dir, ['.xml'])
+            self.assertEqual(sorted(post), [os.path.join(dir, 'a', 'z.xml'),
+                                            os.path.join(dir, 'x.xml')])
+            self.assertEqual(_findPaths(dir, ['.krn', '.abc']), 
+                             [os.path.join(dir, 'y.krn')])
+
+            # a new session reads the stored manifest; as directory times 
+            # are unchanged, a removed file is not noticed
+            del _pathManifests[unicode(dir)]
+            os.remove(os.path.join(dir, 'a', 'z.xml'))
+            os.utime(os.path.join(dir, 'a'), (mtime, mtime))
+            self.assertEqual(len(_findPaths(dir, ['.xml'])), 2)
+
+            # changing a directory's time finds changes, also in this session
+            open(os.path.join(dir, 'a', 'v.xml'), 'w').close()
+            os.utime(os.path.join(dir, 'a'), (mtime + 10, mtime + 10))
+            post = _findPaths(dir, ['.xml'])
+            self.assertEqual(sorted(post), [os.path.join(dir, 'a', 'v.xml'),
+                                            os.path.join(dir, 'x.xml')])
+        finally:
+            if unicode(dir) in _pathManifests:
+                del _pathManifests[unicode(dir)]
+            shutil.rmtree(dir)
+
+    def testWorkListCacheA(self):
+        post = getWorkList('beethoven/opus18no1', 1)
+        post.append('junk')
+        self.assertEqual(len(getWorkList('beethoven/opus18no1', 1)), 2)
+        self.assertEqual(getWorkList(['beethoven', 'opus18no1'], 1), 
+                         getWorkList('beethoven/opus18no1', 1))
+
+    def testParseMemoA(self):
+        import tempfile, time
+        from music21 import stream, note
+
+        pm = ParseMemo(maxSize=2)
+        fd, fp = tempfile.mkstemp()
+        os.write(fd, 'a')
+        os.close(fd)
+        try:
+            s = stream.Stream()
+            s.append(note.Note('g4'))
+            pm.set('a', fp, s)
+            # changes to the original are not stored 
+            s.append(note.Note('a4'))
+            fpPost, s1 = pm.get('a')
+            self.assertEqual(fpPost, fp)
+            self.assertEqual(len(s1), 1)
+            # nor are changes to a returned Stream
+            s1.append(note.Note('b4'))
+            fpPost, s2 = pm.get('a')
+            self.assertEqual(len(s2), 1)
+            self.assertEqual(s2 is s1, False)
+
+            # least recently used are removed
+            pm.set('b', fp, s)
+            pm.get('a')
+            pm.set('c', fp, s)
+            self.assertEqual(sorted(pm._entries.keys()), ['a', 'c'])
+            self.assertEqual(pm.stats['evictions'], 1)
+
+            # a changed file invalidates the Stream
+            f = open(fp, 'w')
+            f.write('abc')
+            f.close()
+            self.assertEqual(pm.get('a'), None)
+            self.assertEqual(pm.stats['invalidations'], 1)
+            self.assertEqual(len(pm), 1)
+            # Streams that do not come from a file are not stored
+            pm.set('d', 'http://www.music21.org/x.xml', s)
+            self.assertEqual(len(pm), 1)
+        finally:
+            os.remove(fp)
+            
+    def testParseMemoB(self):
+        pm = enableParseMemo()
+        try:
+            pm.clear()
+            s1 = parse('bach/bwv66.6')
+            s2 = parse('bach/bwv66.6')
+            self.assertEqual(pm.stats['hits'], 1)
+            self.assertEqual(s2.corpusFilepath, s1.corpusFilepath)
+            # spanners refer to the copied parts
+            sg = s2.parts[0].getSpannerSites()[0]
+            self.assertEqual(sg.getComponents()[0] is s2.parts[0], True)
+            self.assertEqual([str(p) for p in s2.flat.pitches], 
+                             [str(p) for p in s1.flat.pitches])
+            # forceSource does not use the memo
+            parse('bach/bwv66.6', forceSource=True)
+            self.assertEqual(pm.stats['hits'], 1)
+        finally:
+            disableParseMemo()
+
+
 #     def testWorkReferences(self):
 #         from music21 import corpus
 #         s = corpus.getWorkReferences()
@@ -1297,7 +1648,7 @@ class Test(unittest.TestCase):
 
 #-------------------------------------------------------------------------------
 # define presented order in documentation
-_DOC_ORDER = [parse, getWork]
+_DOC_ORDER = [parse, getWork, enableParseMemo, ParseMemo]
 
 
 if __name__ == "__main__":
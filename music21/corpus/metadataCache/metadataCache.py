@@ -31,9 +31,19 @@ class MetadataCacheException(exceptions21.Music21Exception):
 
 
 
-def cacheMetadata(domainList=['local','core', 'virtual']): 
+def cacheMetadata(domainList=['local','core', 'virtual'], processes=None,
+    timeout=None, incremental=True): 
     '''The core cache is all locally-stored corpus files. 
+
+    Files are parsed by a pool of `processes` processes; if None, one
+    process is used for each CPU. Files that take more than `timeout` 
+    seconds to parse are skipped. 
+
+    If `incremental` is True, an existing cache is updated: only files 
+    added or changed since it was written are parsed, and files that no 
+    longer exist are removed. Otherwise the cache is built from scratch.
     '''
+    import os
     from music21 import corpus, metadata
 
     if not common.isListLike(domainList):
@@ -68,7 +78,13 @@ def cacheMetadata(domainList=['local','core', 'virtual']):
     
         #mdb.addFromPaths(paths[-3:])
         # returns any paths that failed to load
-        fpError += mdb.addFromPaths(paths, printDebugAfter = 50) 
+        if incremental and os.path.exists(mdb._getFilePath()):
+            mdb.read()
+            fpError += mdb.updateFromPaths(paths, printDebugAfter = 50, 
+                processes=processes, timeout=timeout)
+        else:
+            fpError += mdb.addFromPaths(paths, printDebugAfter = 50, 
+                processes=processes, timeout=timeout)
         #print mdb.storage
         mdb.write() # will use a default file path based on domain
 
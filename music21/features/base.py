@@ -12,6 +12,22 @@
 import unittest
 import os
 
+try:
+    import cPickle as pickleMod
+except ImportError:
+    import pickle as pickleMod
+
+try:
+    import sqlite3
+except ImportError: # not included in all Python builds
+    sqlite3 = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None # only needed for array output
+
+from music21 import base as baseModule
 from music21 import common
 from music21 import converter
 from music21 import corpus
@@ -188,17 +204,110 @@ class FeatureExtractor(object):
 
     def extract(self, source=None):
         '''Extract the feature and return the result. 
+
+        If the data was given as a path to a file or corpus work, and 
+        the :class:`~music21.features.base.FeatureCache` is enabled, the 
+        cache is consulted first, and newly extracted features are 
+        stored in it.
         '''
         if source is not None:
             self.stream = source
+        feature = self.getCachedFeature()
+        if feature is not None:
+            self._feature = feature
+            return self._feature
+        return self._extract()
+
+    def _extract(self):
+        '''Extract the feature without consulting the FeatureCache, 
+        storing the result in the cache if it is enabled.
+        '''
         # preparing the feature always sets self._feature to a new instance
         self._prepareFeature()
         self._process() # will set Feature object to _feature
         # assume we always want to normalize?
         if self.normalize:
             self._feature.normalize()
+        cacheKey = self.getCacheKey()
+        if cacheKey is not None:
+            getFeatureCache().set(cacheKey, self._feature.vector)
         return self._feature    
 
+    def _getConfiguration(self):
+        '''Return a sorted list of (name, value) pairs of the attributes 
+        of this FeatureExtractor that configure it, such as `normalize`; 
+        only attributes whose values are numbers, strings, or lists, 
+        tuples, or dictionaries of these are included. 
+
+        >>> from music21 import *
+        >>> fe = features.jSymbolic.PitchClassDistributionFeature()
+        >>> ('normalize', True) in fe._getConfiguration()
+        True
+        >>> fe.normalize = False
+        >>> ('normalize', False) in fe._getConfiguration()
+        True
+        >>> 'data' in [name for name, value in fe._getConfiguration()]
+        False
+        '''
+        post = []
+        for name, value in sorted(self.__dict__.items()):
+            # the data and the results are not configuration
+            if name in ['stream', 'data', '_feature']:
+                continue
+            if _isPlainData(value):
+                post.append((name, value))
+        return post
+
+    def getCacheKey(self):
+        '''Return the key of the feature of the present data in the 
+        :class:`~music21.features.base.FeatureCache`, made from the 
+        contents of the source file, this FeatureExtractor's class and 
+        configuration, and the music21 version; return None if the 
+        cache is not enabled, or if the data was not given as a path.
+
+        >>> from music21 import *
+        >>> fc = features.enableFeatureCache()
+        >>> fe = features.jSymbolic.PitchClassDistributionFeature()
+        >>> fe.getCacheKey() is None
+        True
+        >>> fe.setData(features.DataInstance('bwv66.6'))
+        >>> key = fe.getCacheKey()
+        >>> len(key)
+        32
+        >>> fe.data.isParsed()
+        False
+        >>> fe.normalize = False
+        >>> fe.getCacheKey() == key
+        False
+        >>> features.disableFeatureCache()
+        >>> fe.getCacheKey() is None
+        True
+        '''
+        if self.data is None or getFeatureCache() is None:
+            return None
+        sourceKey = self.data.getSourceKey()
+        if sourceKey is None:
+            return None
+        extractorId = '%s.%s' % (self.__class__.__module__, 
+                                 self.__class__.__name__)
+        return common.getMd5(repr((sourceKey, extractorId, 
+                    self._getConfiguration(), baseModule.VERSION)))
+
+    def getCachedFeature(self):
+        '''Return the Feature of the present data stored in the 
+        :class:`~music21.features.base.FeatureCache`, or None if 
+        it is not stored.
+        '''
+        cacheKey = self.getCacheKey()
+        if cacheKey is None:
+            return None
+        vector = getFeatureCache().get(cacheKey)
+        if vector is None:
+            return None
+        feature = self.getBlankFeature()
+        feature.vector = vector
+        return feature
+
     def getBlankFeature(self):
         '''Return a properly configured plain feature as a place holder
 
@@ -214,6 +323,37 @@ class FeatureExtractor(object):
 
 
 #-------------------------------------------------------------------------------
+def _getElementPitches(e):
+    '''Return the pitches of an element of a flat Stream, found as 
+    Stream.pitches does.
+    '''
+    if hasattr(e, 'pitch'):
+        return [e.pitch]
+    elif hasattr(e, 'pitches'):
+        return e.pitches
+    elif 'Pitch' in e.classes:
+        return [e]
+    return []
+
+
+class _NoteTable(dict):
+    '''A dictionary of the columns of a note table, made by 
+    :class:`~music21.features.base.StreamForms`. Columns are only made 
+    when first requested, by calling the function given for the column 
+    in `columnMakers` with the table; each function returns a dictionary 
+    of one or more columns.
+    '''
+    def __init__(self, columnMakers):
+        dict.__init__(self)
+        self._columnMakers = columnMakers
+
+    def __missing__(self, key):
+        if key not in self._columnMakers:
+            raise KeyError(key)
+        self.update(self._columnMakers[key](self))
+        return self[key]
+
+
 class StreamForms(object):
     '''A dictionary-like wrapper of a Stream, providing 
     numerous representations, generated on-demand, and cached.
@@ -223,16 +363,32 @@ class StreamForms(object):
 
     A DataSet object manages one or more StreamForms 
     objects, and exposes them to FeatureExtractors for usage.
+
+    Most forms are made from a prepared copy of the Stream, with tied 
+    notes merged. As this copy is expensive, it is only made when 
+    first needed; forms that do not depend on ties, such as 
+    TimeSignatures and KeySignatures, are taken from the Stream itself.
+
+    >>> from music21 import *
+    >>> s = corpus.parse('bwv66.6')
+    >>> sf = features.StreamForms(s)
+    >>> len(sf['flat.getElementsByClass.TimeSignature'])
+    4
+    >>> sf.isPrepared()
+    False
+    >>> len(sf['flat.notes'])
+    163
+    >>> sf.isPrepared()
+    True
     '''
     def __init__(self, streamObj, prepareStream=True):   
         self.stream = streamObj
-        if self.stream is not None:
-            if prepareStream:
-                self._base = self._prepareStream(self.stream)
-            else: # possibly make a copy?
-                self._base = self.stream
-        else:       
-            self._base = None
+        self.prepareStream = prepareStream
+        # the prepared Stream is created when first needed
+        self._preparedStream = None
+        # if set, a pair of the StreamForms of a Score and the index of 
+        # the Part of its prepared Stream to use as the prepared Stream
+        self._sourceForms = None
 
         # basic data storage is a dictionary
         self._forms = {}    
@@ -245,10 +401,240 @@ class StreamForms(object):
         '''Common routines done on Streams prior to processing. Return a new Stream
         '''   
         # this causes lots of deepcopys, but an inPlace operation loses 
-        #accuracy on feature extractors         
+        # accuracy on feature extractors; this is only called once, 
+        # when a form first needs the prepared Stream
         streamObj = streamObj.stripTies(retainContainers=True)
         return streamObj
 
+    def _getBase(self):
+        if self._preparedStream is None and self.stream is not None:
+            if not self.prepareStream: # possibly make a copy?
+                self._preparedStream = self.stream
+            elif self._sourceForms is not None:
+                # a Part of a Score prepared as a whole
+                sourceForms, i = self._sourceForms
+                self._preparedStream = sourceForms._base.parts[i]
+            else:
+                self._preparedStream = self._prepareStream(self.stream)
+        return self._preparedStream
+
+    _base = property(_getBase, doc='''
+        The prepared Stream, with tied notes merged, from which most 
+        forms are made; this is created when first needed.
+        ''')
+
+    def isPrepared(self):
+        '''
+        Return True if the prepared Stream of this StreamForms is 
+        available without preparing it.
+        '''
+        if self._sourceForms is not None:
+            return self._sourceForms[0].isPrepared()
+        return self._preparedStream is not None or self.stream is None
+
+    def getPartForms(self):
+        '''
+        Return a list of StreamForms, one for each Part of this Stream. 
+        The Parts share the prepared Stream of this StreamForms, so 
+        preparing the Score and its Parts only copies the Score once.
+
+        >>> from music21 import *
+        >>> s = corpus.parse('bwv66.6')
+        >>> sf = features.StreamForms(s)
+        >>> partForms = sf.getPartForms()
+        >>> len(partForms)
+        4
+        >>> partForms[0].isPrepared()
+        False
+        >>> len(partForms[0]['flat.notes'])
+        36
+        >>> sf.isPrepared()
+        True
+        '''
+        post = []
+        for i, p in enumerate(self.stream.parts):
+            partForms = StreamForms(p, prepareStream=self.prepareStream)
+            # a Score only strips ties part by part
+            if self.prepareStream and self.stream.hasPartLikeStreams():
+                partForms._sourceForms = (self, i)
+            post.append(partForms)
+        return post
+
+    def _getConsecutiveNotesByPart(self):
+        '''For each part, or for the Stream if there are no parts, return 
+        a pair of a flat Stream of its notes and rests, and a list of 
+        consecutive Notes, skipping rests, chords, and gaps.
+        '''
+        # note that this does not optimize and cache part presentations            
+        # if we have parts, must add one at a time
+        if self._base.hasPartLikeStreams():
+            parts = self._base.parts
+        else:
+            parts = [self._base] # emulate a list
+        postByPart = []
+        for p in parts:
+            # will be flat
+            
+            # edit June 2012:
+            # was causing millions of deepcopy calls
+            # so I made it inPlace, but for some reason
+            # code errored with 'p =' not present
+            # also, this part has measures...so should retainContains be True?
+            p = p.stripTies(retainContainers=False, inPlace=True)
+            # noNone means that we will see all connections, even w/ a gap
+            postByPart.append((p, p.findConsecutiveNotes(skipRests=True, 
+                skipChords=True, skipGaps=True, noNone=True)))
+        return postByPart
+
+    def _getNoteTable(self):
+        '''Return a columnar table of the pitches of this Stream, as a 
+        dictionary of NumPy arrays, with a row for each pitch, in the 
+        order of the 'flat.pitches' form. Columns are made in groups, 
+        each when one of its columns is first requested, so that forms 
+        that only need pitches do not pay for offsets or intervals. 
+        The columns are:
+        
+        'ps', 'midi' and 'pitchClass': the pitch space value, MIDI 
+        number, and pitch class, made from the 'flat.pitches' form;
+
+        'onset' and 'duration': the offset and quarter length of the note
+        or chord of the pitch;
+        'velocity': the velocity of the note or chord, or NaN if not set;
+        'note': the index of the note or chord in the 'flat.notes' 
+        form, or -1; these are made in one pass over the 'flat' form;
+
+        'part': the index of the part, or -1 if in no part (0 if 
+        the Stream has no parts);
+        'interval': for a Note, the melodic interval in half steps from 
+        the preceding Note in its part (skipping rests, chords, and gaps), 
+        or NaN; these are made from the notes of each part.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> s.append(note.Note('C4'))
+        >>> s.append(chord.Chord(['E4', 'G4'], quarterLength=2))
+        >>> n = note.Note('D4')
+        >>> n.volume.velocity = 64
+        >>> s.append(n)
+        >>> sf = features.StreamForms(s)
+        >>> table = sf['noteTable']
+        >>> table['midi']
+        array([60, 64, 67, 62])
+        >>> sorted(table.keys())
+        ['midi', 'pitchClass', 'ps']
+        >>> table['onset']
+        array([0., 1., 1., 3.])
+        >>> table['note']
+        array([0, 1, 1, 2])
+        >>> table['velocity']
+        array([nan, nan, nan, 64.])
+        >>> table['interval']
+        array([nan, nan, nan,  2.])
+        >>> table['part']
+        array([0, 0, 0, 0])
+        '''
+        return _NoteTable({
+            'ps': self._getNoteTablePitchColumns, 
+            'midi': self._getNoteTablePitchColumns, 
+            'pitchClass': self._getNoteTablePitchColumns, 
+            'onset': self._getNoteTableNoteColumns, 
+            'duration': self._getNoteTableNoteColumns, 
+            'velocity': self._getNoteTableNoteColumns, 
+            'note': self._getNoteTableNoteColumns, 
+            'part': self._getNoteTablePartColumns, 
+            'interval': self._getNoteTablePartColumns})
+
+    def _getNoteTablePitchColumns(self, table):
+        '''Return the 'ps', 'midi' and 'pitchClass' columns of the note 
+        table `table`, as a dictionary; see _getNoteTable(). Only pitch 
+        space values are read from the Pitch objects; MIDI numbers and 
+        pitch classes are derived from them as Pitch does, rounding 
+        halves away from zero.
+        '''
+        pitches = self.__getitem__('flat.pitches')
+        ps = numpy.array([p.ps for p in pitches], dtype=float)
+        rounded = numpy.where(ps < 0, -numpy.floor(.5 - ps), 
+                              numpy.floor(ps + .5)).astype(int)
+        midi = rounded.copy()
+        # as Pitch.midi, move values out of range by octaves
+        high = rounded > 127
+        midi[high] = 108 + rounded[high] % 12
+        midi[high & (midi < 115)] += 12
+        low = rounded < 0
+        midi[low] = rounded[low] % 12
+        pitchClass = numpy.floor(numpy.mod(ps, 12) + .5).astype(int)
+        return {'ps': ps, 'midi': midi, 'pitchClass': pitchClass}
+
+    def _getNoteTableNoteColumns(self, table):
+        '''Return the 'onset', 'duration', 'velocity', and 'note' columns 
+        of the note table `table`, as a dictionary; see _getNoteTable().
+        '''
+        flat = self.__getitem__('flat')
+        notes = self.__getitem__('flat.notes')
+        noteIndices = dict((id(n), i) for i, n in enumerate(notes))
+
+        nan = float('nan')
+        columns = dict((name, []) for name in ['onset', 'duration', 
+            'velocity', 'note'])
+        for e in flat.elements:
+            count = len(_getElementPitches(e))
+            if count == 0:
+                continue
+            onset = e.getOffsetBySite(flat)
+            duration = getattr(e, 'quarterLength', 0.0)
+            # do not create Volume objects if not yet defined
+            velocity = nan
+            v = getattr(e, '_volume', None)
+            if v is not None and v.velocity is not None:
+                velocity = v.velocity
+            columns['onset'] += [onset] * count
+            columns['duration'] += [duration] * count
+            columns['velocity'] += [velocity] * count
+            columns['note'] += [noteIndices.get(id(e), -1)] * count
+
+        post = {}
+        for name in ['onset', 'duration', 'velocity']:
+            post[name] = numpy.array(columns[name], dtype=float)
+        post['note'] = numpy.array(columns['note'], dtype=int)
+        return post
+
+    def _getNoteTablePartColumns(self, table):
+        '''Return the 'part' and 'interval' columns of the note table 
+        `table`, as a dictionary; see _getNoteTable().
+        '''
+        notesByPart = self._getConsecutiveNotesByPart()
+        noPart = 0
+        partIndices = {}
+        if self._base.hasPartLikeStreams():
+            noPart = -1
+            for i, (partNotes, post) in enumerate(notesByPart):
+                for e in partNotes:
+                    partIndices[id(e)] = i
+
+        # rows are in the order of the pitches of the flat elements
+        part = []
+        rowsByNote = {} # the row of each Note, for intervals
+        for e in self.__getitem__('flat').elements:
+            count = len(_getElementPitches(e))
+            if count > 0:
+                if hasattr(e, 'pitch'):
+                    rowsByNote[id(e)] = len(part)
+                part += [partIndices.get(id(e), noPart)] * count
+
+        midi = table['midi']
+        interval = numpy.empty(len(midi), dtype=float)
+        interval.fill(numpy.nan)
+        for partNotes, post in notesByPart:
+            rows = numpy.array([rowsByNote.get(id(n), -1) for n in post], 
+                               dtype=int)
+            if len(rows) < 2:
+                continue
+            # only between consecutive Notes that are both in the table
+            valid = (rows[1:] >= 0) & (rows[:-1] >= 0)
+            rowsTo = rows[1:][valid]
+            interval[rowsTo] = midi[rowsTo] - midi[rows[:-1][valid]]
+        return {'part': numpy.array(part, dtype=int), 'interval': interval}
+
     def __getitem__(self, key):
         '''Get a form of this Stream, using a cached version if available.
         '''
@@ -284,12 +670,14 @@ class StreamForms(object):
             self._forms['getElementsByClass.Measure'] = post
             return self._forms['getElementsByClass.Measure']
 
+        # these forms do not depend on ties, and do not need the 
+        # prepared Stream
         elif key in ['flat.getElementsByClass.TimeSignature']:
-            self._forms['flat.getElementsByClass.TimeSignature'] = self._base.flat.getElementsByClass('TimeSignature')
+            self._forms['flat.getElementsByClass.TimeSignature'] = self.stream.flat.getElementsByClass('TimeSignature')
             return self._forms['flat.getElementsByClass.TimeSignature']
 
         elif key in ['flat.getElementsByClass.KeySignature']:
-            self._forms['flat.getElementsByClass.KeySignature'] = self._base.flat.getElementsByClass('KeySignature')
+            self._forms['flat.getElementsByClass.KeySignature'] = self.stream.flat.getElementsByClass('KeySignature')
             return self._forms['flat.getElementsByClass.KeySignature']
 
         elif key in ['flat.getElementsByClass.Harmony']:
@@ -298,7 +686,7 @@ class StreamForms(object):
 
 
         elif key in ['metronomeMarkBoundaries']: # already flat
-            self._forms['metronomeMarkBoundaries'] = self._base.metronomeMarkBoundaries()
+            self._forms['metronomeMarkBoundaries'] = self.stream.metronomeMarkBoundaries()
             return self._forms['metronomeMarkBoundaries']
 
         # some methods that return new streams
@@ -368,6 +756,11 @@ class StreamForms(object):
         # a dictionary of intervals
         #self.flat.melodicIntervals(skipRests=True, skipChords=False, skipGaps=True)
 
+        # a table of NumPy arrays, with a row for each pitch
+        elif key in ['noteTable']:
+            self._forms['noteTable'] = self._getNoteTable()
+            return self._forms['noteTable']
+
         # a dictionary of quarter length values
         elif key in ['noteQuarterLengthHistogram']:  
             histo = {}
@@ -381,48 +774,44 @@ class StreamForms(object):
 
         # data lists / histograms
         elif key in ['pitchClassHistogram']:
-            histo = [0] * 12
-            for p in self.__getitem__('flat.pitches'): # recursive call
-                histo[p.pitchClass] += 1
+            if numpy is not None:
+                table = self.__getitem__('noteTable')
+                histo = numpy.bincount(table['pitchClass'], 
+                                       minlength=12).tolist()
+                if len(histo) > 12: # as when indexing a list
+                    raise IndexError('pitch class out of range')
+            else:
+                histo = [0] * 12
+                for p in self.__getitem__('flat.pitches'): # recursive call
+                    histo[p.pitchClass] += 1
             self._forms['pitchClassHistogram'] = histo
             return self._forms['pitchClassHistogram']
 
         elif key in ['midiPitchHistogram']:
-            histo = [0] * 128
-            for p in self.__getitem__('flat.pitches'): # recursive call
-                histo[p.midi] += 1
+            if numpy is not None:
+                table = self.__getitem__('noteTable')
+                # midi values are always between 0 and 127
+                histo = numpy.bincount(table['midi'], minlength=128).tolist()
+            else:
+                histo = [0] * 128
+                for p in self.__getitem__('flat.pitches'): # recursive call
+                    histo[p.midi] += 1
             self._forms['midiPitchHistogram'] = histo
             return self._forms['midiPitchHistogram']
 
         # bins for all abs spans between adjacent melodic notes
         elif key in ['midiIntervalHistogram']:
-            # note that this does not optimize and cache part presentations            
-            histo = [0] * 128
-            # if we have parts, must add one at a time
-            if self._base.hasPartLikeStreams():
-                parts = self._base.parts
+            if numpy is not None:
+                interval = self.__getitem__('noteTable')['interval']
+                # midi values are always between 0 and 127
+                interval = numpy.abs(interval[~numpy.isnan(interval)])
+                histo = numpy.bincount(interval.astype(int), 
+                                       minlength=128).tolist()
             else:
-                parts = [self._base] # emulate a list
-            for p in parts:
-                # will be flat
-                
-                # edit June 2012:
-                # was causing millions of deepcopy calls
-                # so I made it inPlace, but for some reason
-                # code errored with 'p =' not present
-                # also, this part has measures...so should retainContains be True?
-                p = p.stripTies(retainContainers=False, inPlace=True)
-                # noNone means that we will see all connections, even w/ a gap
-                post = p.findConsecutiveNotes(skipRests=True, 
-                    skipChords=True, skipGaps=True, noNone=True)
-                for i, n in enumerate(post):
-                    if i < len(post) - 1: # if not last
-                        iNext = i + 1
-                        nNext = post[iNext]
-                        try:
-                            histo[abs(n.midi - nNext.midi)] += 1
-                        except:
-                            pass # problem with not having midi
+                histo = [0] * 128
+                for partNotes, post in self._getConsecutiveNotesByPart():
+                    for i in range(1, len(post)):
+                        histo[abs(post[i].midi - post[i-1].midi)] += 1
             self._forms['midiIntervalHistogram'] = histo
             return self._forms['midiIntervalHistogram']
 
@@ -479,7 +868,7 @@ class StreamForms(object):
             return self._forms['flat.tonalCertainty']
         
         elif key in ['metadata']:
-            self._forms['metadata'] = self._base.metadata
+            self._forms['metadata'] = self.stream.metadata
             return self._forms['metadata']
 
         elif key in ['secondsMap']:
@@ -504,50 +893,325 @@ class StreamForms(object):
 
 
 #-------------------------------------------------------------------------------
+class FeatureCache(object):
+    '''
+    An on-disk store of feature vectors, kept in an sqlite database in 
+    the scratch directory, so that features extracted from a work are 
+    not extracted again, even in a later session. Keys are given by 
+    :meth:`~music21.features.base.FeatureExtractor.getCacheKey`; 
+    adding a FeatureExtractor or a work to a DataSet thus only requires 
+    the new features to be extracted. The shared FeatureCache is only 
+    used after calling :func:`~music21.features.base.enableFeatureCache`.
+
+    Numbers of hits, misses, and writes are counted in `stats`. Errors 
+    in reading or writing the database (e.g., when it is locked by 
+    another process for too long) are treated as misses.
+
+    >>> from music21 import *
+    >>> import tempfile, shutil
+    >>> dir = tempfile.mkdtemp()
+    >>> fc = features.FeatureCache(dir)
+    >>> fc.get('a') is None
+    True
+    >>> fc.set('a', [0, 0.5, 1])
+    >>> fc.get('a')
+    [0, 0.5, 1]
+    >>> sorted(fc.stats.items())
+    [('hits', 1), ('misses', 1), ('writes', 1)]
+    >>> fc.close()
+    >>> shutil.rmtree(dir)
+    '''
+    fileName = 'm21-features.db'
+
+    def __init__(self, dir=None):
+        if dir is None:
+            dir = environLocal.getRootTempDir()
+        self.fp = os.path.join(dir, self.fileName)
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0}
+        self._conn = None
+
+    def _getConnection(self):
+        if self._conn is None:
+            # wait for other processes writing to the database
+            self._conn = sqlite3.connect(self.fp, timeout=30)
+            self._conn.execute('CREATE TABLE IF NOT EXISTS features ' + 
+                               '(key TEXT PRIMARY KEY, vector BLOB)')
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key):
+        '''Return the feature vector stored for `key`, or None.
+        '''
+        try:
+            row = self._getConnection().execute(
+                'SELECT vector FROM features WHERE key = ?', 
+                (key,)).fetchone()
+        except sqlite3.Error:
+            environLocal.printDebug(['cannot read feature cache', self.fp])
+            row = None
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return pickleMod.loads(str(row[0]))
+
+    def set(self, key, vector):
+        '''Store the feature vector `vector` for `key`.
+        '''
+        data = pickleMod.dumps(vector, pickleMod.HIGHEST_PROTOCOL)
+        try:
+            conn = self._getConnection()
+            conn.execute('INSERT OR REPLACE INTO features VALUES (?, ?)', 
+                         (key, sqlite3.Binary(data)))
+            conn.commit()
+        except sqlite3.Error:
+            environLocal.printDebug(['cannot write feature cache', self.fp])
+            return
+        self.stats['writes'] += 1
+
+    def clear(self):
+        '''Remove all stored feature vectors.
+        '''
+        conn = self._getConnection()
+        conn.execute('DELETE FROM features')
+        conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# one FeatureCache for each scratch directory and process
+_featureCaches = {}
+# the FeatureCache is only used when enabled
+_featureCacheEnabled = False
+
+def enableFeatureCache():
+    '''Turn on the :class:`~music21.features.base.FeatureCache`, so that 
+    features extracted from data given as paths are stored in the 
+    scratch directory and not extracted again. Return the FeatureCache, 
+    or None if there is no scratch directory or the sqlite3 module is 
+    not available.
+    '''
+    global _featureCacheEnabled
+    _featureCacheEnabled = True
+    return getFeatureCache()
+
+def disableFeatureCache():
+    '''Turn off the :class:`~music21.features.base.FeatureCache`. Stored 
+    features are kept on disk, and are used again if the cache is 
+    enabled.
+    '''
+    global _featureCacheEnabled
+    _featureCacheEnabled = False
+    for fc in _featureCaches.values():
+        fc.close()
+    _featureCaches.clear()
+
+def getFeatureCache():
+    '''Return the shared :class:`~music21.features.base.FeatureCache` for 
+    the current scratch directory, or None if the cache is not enabled, 
+    there is no scratch directory, or the sqlite3 module is not 
+    available.
+    '''
+    if not _featureCacheEnabled or sqlite3 is None:
+        return None
+    dir = environLocal.getRootTempDir()
+    if dir is None:
+        return None
+    # sqlite connections cannot be shared by forked processes
+    key = (dir, os.getpid())
+    if key not in _featureCaches:
+        _featureCaches[key] = FeatureCache(dir)
+    return _featureCaches[key]
+
+
+def _isPlainData(value):
+    '''Return True if `value` is None, a number, a string, or a list, 
+    tuple, or dictionary of these.
+
+    >>> from music21 import *
+    >>> features.base._isPlainData([1, 'a', (2.5, None)])
+    True
+    >>> features.base._isPlainData({'a': [stream.Stream()]})
+    False
+    '''
+    if value is None or isinstance(value, (bool, int, long, float, 
+                                           basestring)):
+        return True
+    if isinstance(value, (list, tuple)):
+        for v in value:
+            if not _isPlainData(v):
+                return False
+        return True
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if not _isPlainData(k) or not _isPlainData(v):
+                return False
+        return True
+    return False
+
+
+def _getSourceHash(fp):
+    '''Return the md5 hash of the contents of the file or directory `fp`.
+    '''
+    if os.path.isdir(fp):
+        post = []
+        for fn in sorted(os.listdir(fp)):
+            fpSub = os.path.join(fp, fn)
+            if os.path.isfile(fpSub):
+                post.append(fn + _getSourceHash(fpSub))
+        return common.getMd5(''.join(post))
+    f = open(fp, 'rb')
+    data = f.read()
+    f.close()
+    return common.getMd5(data)
+
+
+def _parseDataPath(path):
+    '''
+    Parse a path to a local file or URL, or a corpus path, as given to 
+    :meth:`~music21.features.base.DataSet.addData`.
+    '''
+    # could be corpus or file path
+    if os.path.exists(path) or path.startswith('http'):
+        return converter.parse(path)
+    else: # assume corpus
+        return corpus.parse(path)
+
+
 class DataInstance(object):
     '''
     A data instance for analysis. This object prepares a Stream 
     (by stripping ties, etc.) and stores 
     multiple commonly-used stream representations once, providing rapid processing. 
+
+    In place of a Stream, a path to a local file or URL, or a corpus 
+    path, can be given; it is only parsed when the Stream is first needed, 
+    and is used as the id if none is given.
+
+    >>> from music21 import *
+    >>> di = features.DataInstance('bwv66.6')
+    >>> di.getId()
+    'bwv66.6'
+    >>> di.isParsed()
+    False
+    >>> di.partsCount
+    4
+    >>> di.isParsed()
+    True
     '''
     def __init__(self, streamObj=None, id=None):
-        self.stream = streamObj
+        # a path to be parsed when the stream is needed
+        self.sourcePath = None
+        if common.isStr(streamObj):
+            self.sourcePath = streamObj
+            streamObj = None
+            if id is None:
+                id = self.sourcePath
+        self._stream = streamObj
+        self._sourceKey = None
 
         # perform basic operations that are performed on all
         # streams
 
         # store an id for the source stream: file path url, corpus url
         # or metadata title
+        self._id = None
         if id is not None:
             self._id = id
         else:
-            if hasattr(self.stream, 'metadata'): 
-                self._id = self.stream.metadata # may be None
+            if hasattr(self._stream, 'metadata'): 
+                self._id = self._stream.metadata # may be None
 
         # the attribute name in the data set for this label
         self._classLabel = None
         # store the class value for this data instance
         self._classValue = None
 
+        # StreamForms are created when first needed
+        self._forms = None
+        self._formsByPart = []
+        self._formsByVoice = []
+        self._partsCount = 0
+
+    def _getStream(self):
+        if self._stream is None and self.sourcePath is not None:
+            self._stream = _parseDataPath(self.sourcePath)
+        return self._stream
+
+    stream = property(_getStream, doc='''
+        The Stream of this DataInstance, parsing the source path if necessary.
+        ''')
+
+    def getSourceKey(self):
+        '''
+        Return a string identifying the contents of the file given as 
+        the source path (found in the corpus if necessary), or None if 
+        this DataInstance was not given a path to a local file or 
+        corpus work.
+
+        >>> from music21 import *
+        >>> len(features.DataInstance('bwv66.6').getSourceKey())
+        32
+        >>> features.DataInstance(stream.Stream()).getSourceKey() is None
+        True
+        '''
+        if self._sourceKey is None and self.sourcePath is not None:
+            fp = self.sourcePath
+            if not os.path.exists(fp):
+                if fp.startswith('http'):
+                    return None
+                # as corpus.parse(), use the first matching work
+                post = corpus.getWorkList(fp)
+                if len(post) == 0:
+                    return None
+                fp = post[0]
+            self._sourceKey = _getSourceHash(fp)
+        return self._sourceKey
+
+    def isParsed(self):
+        '''
+        Return True if the Stream of this DataInstance is available 
+        without parsing.
+        '''
+        return self._stream is not None or self.sourcePath is None
+
+    def _prepareForms(self):
+        '''
+        Create the StreamForms of the Stream and its parts, if not 
+        yet created.
+        '''
+        if self._forms is not None:
+            return
+        streamObj = self.stream
         # store a dictionary of StreamForms
-        self._forms = StreamForms(self.stream)
+        self._forms = StreamForms(streamObj)
         
         # if parts exist, store a forms for each
         self._formsByPart = []
-        if hasattr(self.stream, 'parts'):
-            self.partsCount = len(self.stream.parts)
-            for p in self.stream.parts:
-                # note that this will join ties and expand rests again
-                self._formsByPart.append(StreamForms(p))
+        if hasattr(streamObj, 'parts'):
+            # the parts share the prepared stream of the score
+            self._formsByPart = self._forms.getPartForms()
+            self._partsCount = len(self._formsByPart)
         else:
-            self.partsCount = 0
+            self._partsCount = 0
 
         # TODO: store a list of voices, extracted from each part, 
         # presently this will only work on a measure stream
         self._formsByVoice = []
-        if hasattr(self.stream, 'voices'):
-            for v in self.stream.voices:
+        if hasattr(streamObj, 'voices'):
+            for v in streamObj.voices:
                 self._formsByPart.append(StreamForms(v))
+
+    def _getPartsCount(self):
+        self._prepareForms()
+        return self._partsCount
+
+    partsCount = property(_getPartsCount, doc='''
+        The number of parts in the Stream of this DataInstance.
+        ''')
   
     def setClassLabel(self, classLabel, classValue=None):
         '''Set the class label, as well as the class value if known. The class label is the attribute name used to define the class of this data instance.
@@ -593,6 +1257,7 @@ class DataInstance(object):
         >>> len(di['flat.getElementsByClass.TimeSignature'])
         4
         '''
+        self._prepareForms()
         if key in ['parts']:
             # return a list of Forms for each part
             return self._formsByPart
@@ -837,10 +1502,85 @@ class OutputARFF(OutputFormat):
 
 
 
+class OutputNPZ(OutputFormat):
+    '''A NumPy .npz file, a binary format that can be loaded quickly 
+    with numpy.load(). The file contains a floating-point array of 
+    features ('features'), and arrays of class values ('classValues'), 
+    attribute labels ('attributes'), and, if `includeId` is True, 
+    identifiers ('ids'), as returned by 
+    :meth:`~music21.features.base.DataSet.getFeaturesAsArray`.
+
+    >>> from music21 import *
+    >>> import StringIO
+    >>> ds = features.DataSet(classLabel='Composer')
+    >>> ds.addFeatureExtractors(features.jSymbolic.InitialTimeSignatureFeature)
+    >>> s = stream.Stream()
+    >>> s.append(meter.TimeSignature('3/4'))
+    >>> ds.addData(s, classValue='Bach', id='test')
+    >>> ds.process()
+    >>> of = features.OutputNPZ(ds)
+    >>> of._ext
+    '.npz'
+    >>> npz = numpy.load(StringIO.StringIO(of.getString()))
+    >>> npz['features']
+    array([[3., 4.]])
+    >>> list(npz['classValues']), list(npz['attributes']), list(npz['ids'])
+    (['Bach'], ['Initial_Time_Signature_0', 'Initial_Time_Signature_1'], ['test'])
+    '''
+    def __init__(self, dataSet=None):
+        OutputFormat.__init__(self, dataSet=dataSet)
+        self._ext = '.npz'
+
+    def getHeaderLines(self, includeClassLabel=True, includeId=True):
+        '''Get the attribute labels as the only line.
+        '''
+        return [self._dataSet.getAttributeLabels(includeClassLabel=False, 
+                includeId=False)]
+
+    def _writeArrays(self, f, includeClassLabel=True, includeId=True):
+        array, classValues, attributes = self._dataSet.getFeaturesAsArray()
+        arrays = {'features': array, 'attributes': numpy.array(attributes)}
+        if includeClassLabel:
+            arrays['classValues'] = classValues
+        if includeId:
+            arrays['ids'] = numpy.array(
+                [di.getId() for di in self._dataSet.dataInstances])
+        numpy.savez(f, **arrays)
+
+    def getString(self, includeClassLabel=True, includeId=True, lineBreak=None):
+        '''Get the contents of the .npz file as a (binary) string.
+        '''
+        import StringIO
+        f = StringIO.StringIO()
+        self._writeArrays(f, includeClassLabel=includeClassLabel, 
+                          includeId=includeId)
+        return f.getvalue()
+
+    def write(self, fp=None, includeClassLabel=True, includeId=True):
+        '''Write the file. If not file path is given, a temporary file will be written.
+        '''
+        if fp is None:
+            fp = environLocal.getTempFile(suffix=self._ext)
+        if not fp.endswith(self._ext):
+            raise OutputFormatException('file path must end with %s' % self._ext)
+        f = open(fp, 'wb')
+        try:
+            self._writeArrays(f, includeClassLabel=includeClassLabel, 
+                              includeId=includeId)
+        finally:
+            f.close()
+        return fp
+
+
+
 #-------------------------------------------------------------------------------
 class DataSetException(exceptions21.Music21Exception):
     pass
 
+# seconds to wait for the features of each DataInstance processed in another 
+# process; see DataSet.process()
+_PROCESS_DATA_TIMEOUT = 600
+
 class DataSet(object):
     '''
     A set of features, as well as a collection of data to operate on
@@ -864,16 +1604,24 @@ class DataSet(object):
     def __init__(self, classLabel=None, featureExtractors=[]):
         # assume a two dimensional array
         self.dataInstances = []
-        self.streams = []
         # order of feature extractors is the order used in the presentations
         self._featureExtractors = []
         # the label of the class
         self._classLabel = classLabel
         # store a multidimensional storage of all features
         self._features = [] 
+        # store (id, feature extractor name, error message) for failures
+        self.failures = []
         # set extractors
         self.addFeatureExtractors(featureExtractors)
         
+    def _getStreams(self):
+        return [di.stream for di in self.dataInstances]
+
+    streams = property(_getStreams, doc='''
+        A list of the Streams of all DataInstances, parsing them if necessary.
+        ''')
+
 
     def getClassLabel(self):
         return self._classLabel
@@ -954,51 +1702,115 @@ class DataSet(object):
         '''Add a Stream, DataInstance, or path to a corpus or local file to this data set.
 
         The class value passed here is assumed to be the same as the classLable assigned at startup. 
+
+        Paths are not parsed until the data is processed.
         '''
         if self._classLabel is None:
             raise DataSetException('cannot add data unless a class label for this DataSet has been set.')
 
-        s = None
         if isinstance(dataOrStreamOrPath, DataInstance):
             di = dataOrStreamOrPath
-            s = di.stream
         elif common.isStr(dataOrStreamOrPath):
-            # could be corpus or file path
-            if os.path.exists(dataOrStreamOrPath) or dataOrStreamOrPath.startswith('http'):
-                s = converter.parse(dataOrStreamOrPath)
-            else: # assume corpus
-                s = corpus.parse(dataOrStreamOrPath)
             # assume we can use this string as an id
-            di = DataInstance(s, id=dataOrStreamOrPath)
+            di = DataInstance(dataOrStreamOrPath, id=dataOrStreamOrPath)
         else:        
             # for now, assume all else are streams
-            s = dataOrStreamOrPath
             di = DataInstance(dataOrStreamOrPath, id=id)
 
         di.setClassLabel(self._classLabel, classValue)
         self.dataInstances.append(di)
-        self.streams.append(s)
 
-    def process(self):
+    def process(self, workers=None):
         '''Process all Data with all FeatureExtractors. Processed data is stored internally as numerous Feature objects. 
+
+        If `workers` is greater than 1, data added as paths and not yet 
+        parsed is processed by a pool of that many processes. Each process 
+        parses the path itself and returns only the feature vectors, so 
+        no Streams are passed between processes; Streams added directly 
+        are processed in this process. Results are stored in the order 
+        in which data was added, however many workers are used.
+
+        Data that cannot be parsed, and feature extractors that fail, 
+        produce blank features; each failure is stored in `failures` as 
+        a tuple of the data id, the feature extractor name (or None 
+        if the data could not be parsed), and the error message.
+
+        >>> from music21 import *
+        >>> ds = features.DataSet(classLabel='Composer')
+        >>> ds.addFeatureExtractors(features.extractorsById(['ql1', 'ql2'], 'native'))
+        >>> ds.addData('bwv66.6', classValue='Bach')
+        >>> ds.addData('hwv56/movement3-05.md', classValue='Handel')
+        >>> ds.process(workers=2)
+        >>> ds.getFeaturesAsList()
+        [['bwv66.6', 3, 1.0, 'Bach'], ['hwv56/movement3-05.md', 7, 0.5, 'Handel']]
+        >>> ds.failures
+        []
         '''
         # clear features
-        self._features = []
-        for data in self.dataInstances:
-            row = []
-            for fe in self._featureExtractors:
-                fe.setData(data)
-                # in some cases there might be problem; to not fail 
-                try:
-                    fReturned = fe.extract()
-                except: # for now take any error
-                    environLocal.printDebug(['failed feature extactor:', fe])
-                    # provide a blank feature extactor
-                    fReturned = fe.getBlankFeature()
+        self._features = [None] * len(self.dataInstances)
+        self.failures = []
+
+        parallelIndices = []
+        if workers is not None and workers > 1:
+            parallelIndices = [i for i, di in enumerate(self.dataInstances)
+                               if not di.isParsed()]
+        if len(parallelIndices) > 1:
+            self._processParallel(parallelIndices, workers)
+        else:
+            parallelIndices = []
 
-                row.append(fReturned) # get feature and store
+        parallelIndexSet = set(parallelIndices)
+        for i, data in enumerate(self.dataInstances):
+            if i in parallelIndexSet:
+                continue
+            row, errors = _extractFeatures(data, self._featureExtractors)
             # rows will align with data the order of DataInstances
-            self._features.append(row)
+            self._features[i] = row
+            for feName, msg in errors:
+                self.failures.append((data.getId(), feName, msg))
+
+        if len(self.failures) > 0:
+            environLocal.warn('%s feature extraction(s) failed; see DataSet.failures' % len(self.failures))
+
+    def _processParallel(self, indices, workers):
+        '''
+        Process the DataInstances at `indices` with a pool of `workers` 
+        processes, each of which parses the source path of a DataInstance.
+        A DataInstance whose results do not arrive within 
+        _PROCESS_DATA_TIMEOUT seconds of being started (e.g., because its 
+        process has died) gets blank features and a failure.
+        '''
+        import multiprocessing
+
+        # settings such as normalize are sent with each class
+        extractorSpecs = [(fe.__class__, fe._getConfiguration()) for fe in 
+                          self._featureExtractors]
+        pool = multiprocessing.Pool(processes=workers)
+        try:
+            asyncResults = [pool.apply_async(_extractFeatureVectors, 
+                ((self.dataInstances[i].sourcePath, extractorSpecs),)) 
+                for i in indices]
+            pool.close()
+            for i, asyncResult in zip(indices, asyncResults):
+                # tasks are started in order; always wait for a limited 
+                # time, as the results of a process that dies never arrive
+                try:
+                    vectors, errors = asyncResult.get(_PROCESS_DATA_TIMEOUT)
+                except multiprocessing.TimeoutError:
+                    vectors, errors = None, [(None, 'timed out')]
+                row = []
+                for j, fe in enumerate(self._featureExtractors):
+                    f = fe.getBlankFeature()
+                    if vectors is not None and vectors[j] is not None:
+                        f.vector = vectors[j]
+                    row.append(f)
+                self._features[i] = row
+                for feName, msg in errors:
+                    self.failures.append((self.dataInstances[i].getId(), 
+                                          feName, msg))
+        finally:
+            # do not join(), which waits for tasks lost with a process
+            pool.terminate()
 
     def getFeaturesAsList(self, includeClassLabel=True, includeId=True, concatenateLists=True):
         '''Get processed data as a list of lists, merging any sub-lists in multi-dimensional features. 
@@ -1023,6 +1835,47 @@ class DataSet(object):
         else:
             return post
 
+    def getFeaturesAsArray(self):
+        '''Get processed data as a tuple of a two-dimensional NumPy array 
+        of floating-point feature values, with a row for each data 
+        instance and a column for each feature dimension; a NumPy array 
+        of class values, one for each row; and a list of attribute labels, 
+        one for each column. Requires NumPy.
+
+        >>> from music21 import *
+        >>> ds = features.DataSet(classLabel='Composer')
+        >>> ds.addFeatureExtractors(features.extractorsById(['ql1', 'ql2', 'ql4'], 'native'))
+        >>> ds.addData('bwv66.6', classValue='Bach')
+        >>> ds.addData('hwv56/movement3-05.md', classValue='Handel')
+        >>> ds.process()
+        >>> array, classValues, attributes = ds.getFeaturesAsArray()
+        >>> array
+        array([[3.  , 1.  , 1.5 ],
+               [7.  , 0.5 , 3.75]])
+        >>> list(classValues)
+        ['Bach', 'Handel']
+        >>> attributes
+        ['Unique_Note_Quarter_Lengths', 'Most_Common_Note_Quarter_Length', 'Range_of_Note_Quarter_Lengths']
+        '''
+        if numpy is None:
+            raise DataSetException('NumPy is required to get features as an array')
+        attributes = self.getAttributeLabels(includeClassLabel=False, 
+                     includeId=False)
+        # allocate once, then fill a slice for each feature
+        array = numpy.zeros((len(self._features), len(attributes)), 
+                            dtype=float)
+        for i, row in enumerate(self._features):
+            j = 0
+            for f in row:
+                try:
+                    array[i, j:j + len(f.vector)] = f.vector
+                except (ValueError, TypeError):
+                    raise DataSetException('feature %s of %s cannot be stored as numbers: %r' % (f.name, self.dataInstances[i].getId(), f.vector))
+                j += len(f.vector)
+        classValues = numpy.array(
+            [di.getClassValue() for di in self.dataInstances[:len(self._features)]])
+        return array, classValues, attributes
+
     def getUniqueClassValues(self):
         '''Return a list of unique class values.
         '''
@@ -1040,6 +1893,8 @@ class DataSet(object):
             outputFormat = OutputCSV(dataSet=self)
         elif format.lower() in ['arff', 'attribute']:
             outputFormat = OutputARFF(dataSet=self)
+        elif format.lower() in ['npz', 'numpy']:
+            outputFormat = OutputNPZ(dataSet=self)
         else:
             return None
         return outputFormat
@@ -1053,6 +1908,8 @@ class DataSet(object):
         <music21.features.base.OutputTabOrange object at ...>
         >>> ds._getOutputFormatFromFilePath('test.csv')
         <music21.features.base.OutputCSV object at ...>
+        >>> ds._getOutputFormatFromFilePath('test.npz')
+        <music21.features.base.OutputNPZ object at ...>
         >>> ds._getOutputFormatFromFilePath('junk') is None
         True
 
@@ -1074,7 +1931,7 @@ class DataSet(object):
 
 
     def write(self, fp=None, format=None, includeClassLabel=True):
-        '''Set the output format object. 
+        '''Set the output format object, write the file, and return its file path. 
         '''
         if format is None and fp is not None:
             outputFormat = self._getOutputFormatFromFilePath(fp)
@@ -1083,8 +1940,70 @@ class DataSet(object):
         if OutputFormat is None:
             raise DataSetException('no output format could be defined from file path %s or format %s' % (fp, format))
 
-        outputFormat.write(fp=fp, includeClassLabel=includeClassLabel)
+        return outputFormat.write(fp=fp, includeClassLabel=includeClassLabel)
         
+
+def _extractFeatures(dataInstance, featureExtractors):
+    '''
+    Extract a Feature from `dataInstance` with each of `featureExtractors`; 
+    return a list of Features and a list of (feature extractor name, 
+    error message) pairs for failures. A blank Feature is used for any 
+    failure, and for all feature extractors if the data cannot be parsed.
+    '''
+    row = []
+    errors = []
+    for fe in featureExtractors:
+        fe.setData(dataInstance)
+        feature = fe.getCachedFeature()
+        if feature is not None:
+            row.append(feature)
+            continue
+        # only parse when a feature must be extracted
+        try:
+            dataInstance.stream
+        except Exception as excp:
+            environLocal.printDebug(['failed to parse data:', dataInstance.getId()])
+            return ([fe.getBlankFeature() for fe in featureExtractors], 
+                    [(None, _getErrorMessage(excp))])
+        # in some cases there might be problem; to not fail 
+        try:
+            # the cache has already been consulted
+            fReturned = fe._extract()
+        except Exception as excp: # for now take any error
+            environLocal.printDebug(['failed feature extactor:', fe])
+            errors.append((fe.name, _getErrorMessage(excp)))
+            # provide a blank feature extactor
+            fReturned = fe.getBlankFeature()
+        row.append(fReturned) # get feature and store
+    return row, errors
+
+def _extractFeatureVectors(args):
+    '''
+    Parse a path and extract the feature vectors with new instances of 
+    the given FeatureExtractor classes, each given as a pair of the class 
+    and a list of (name, value) pairs of its configuration, as returned 
+    by FeatureExtractor._getConfiguration(). This is run in the processes 
+    of :meth:`~music21.features.base.DataSet.process`. Return a list of 
+    vectors (or None if the path cannot be parsed) and a list of 
+    failures.
+    '''
+    path, extractorSpecs = args
+    featureExtractors = []
+    for fec, configuration in extractorSpecs:
+        fe = fec()
+        for name, value in configuration:
+            setattr(fe, name, value)
+        featureExtractors.append(fe)
+    di = DataInstance(path)
+    row, errors = _extractFeatures(di, featureExtractors)
+    if len(errors) == 1 and errors[0][0] is None: # could not parse
+        return None, errors
+    return [f.vector for f in row], errors
+
+def _getErrorMessage(excp):
+    return '%s: %s' % (excp.__class__.__name__, excp)
+
+
 def allFeaturesAsList(streamInput):
     '''
     returns a tuple containing ALL currentingly implemented feature extractors. The first
@@ -1334,6 +2253,65 @@ class Test(unittest.TestCase):
         self.assertEqual(str(di['secondsMap']), """[{'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note C>, 'offsetSeconds': 0.0, 'endTimeSeconds': 0.5}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note C>, 'offsetSeconds': 0.5, 'endTimeSeconds': 1.0}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note D->, 'offsetSeconds': 1.0, 'endTimeSeconds': 1.5}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note D#>, 'offsetSeconds': 1.5, 'endTimeSeconds': 2.0}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note F#>, 'offsetSeconds': 2.0, 'endTimeSeconds': 2.5}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note A#>, 'offsetSeconds': 2.5, 'endTimeSeconds': 3.0}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note D#>, 'offsetSeconds': 3.0, 'endTimeSeconds': 3.5}, {'durationSeconds': 0.5, 'voiceIndex': None, 'element': <music21.note.Note A>, 'offsetSeconds': 3.5, 'endTimeSeconds': 4.0}]""")
 
 
+    def testStreamFormsPreparation(self):
+        from music21 import corpus, features
+
+        s = corpus.parse('hwv56/movement3-05.md')
+        di = features.DataInstance(s)
+        fe = features.jSymbolic.InitialTimeSignatureFeature(di)
+        self.assertEqual(fe.extract().vector, [4, 4])
+        self.assertEqual(di.partsCount, 2)
+        # neither the score nor the parts have been prepared
+        self.assertEqual(di._forms.isPrepared(), False)
+        self.assertEqual([pf.isPrepared() for pf in di['parts']], 
+                         [False, False])
+        # parts prepared with the score match parts prepared alone
+        for p, pf in zip(s.parts, di['parts']):
+            alone = features.StreamForms(p)
+            self.assertEqual(pf['midiIntervalHistogram'], 
+                             alone['midiIntervalHistogram'])
+            self.assertEqual(pf['noteQuarterLengthHistogram'], 
+                             alone['noteQuarterLengthHistogram'])
+        self.assertEqual(di._forms.isPrepared(), True)
+        self.assertEqual(len(di['flat.notes']), 30)
+
+
+    def testNoteTable(self):
+        from music21 import corpus
+
+        s = corpus.parse('bwv66.6')
+        di = DataInstance(s)
+        table = di['noteTable']
+        pitches = di['flat.pitches']
+        self.assertEqual(len(table['midi']), len(pitches))
+        self.assertEqual(table['midi'].tolist(), [p.midi for p in pitches])
+        # each part's rows match the table of the part
+        for i, partForms in enumerate(di['parts']):
+            partTable = partForms['noteTable']
+            self.assertEqual(sorted(table['midi'][table['part'] == i].tolist()),
+                             sorted(partTable['midi'].tolist()))
+        self.assertEqual(set(table['part'].tolist()), set([0, 1, 2, 3]))
+        # intervals are only found within parts, not from the first notes
+        self.assertEqual(int((~numpy.isnan(table['interval'])).sum()), 
+                         sum(di['midiIntervalHistogram']))
+        self.assertEqual(sum(di['midiIntervalHistogram']), 
+                         len(pitches) - 4)
+
+        # MIDI numbers and pitch classes are derived as Pitch does, 
+        # including for quarter tones and pitches out of MIDI range
+        from music21 import note
+        s = stream.Stream()
+        for ps in [-13.5, -0.5, 0, 59.5, 60.5, 61.25, 70.75, 127.5, 
+                   130, 140.5, 200]:
+            n = note.Note()
+            n.pitch.ps = ps
+            s.append(n)
+        table = StreamForms(s)['noteTable']
+        self.assertEqual(table['midi'].tolist(), 
+                         [p.midi for p in s.pitches])
+        self.assertEqual(table['pitchClass'].tolist(), 
+                         [p.pitchClass for p in s.pitches])
+
     def testDataSetOutput(self):
         from music21 import features
         # test just a few features
@@ -1362,8 +2340,171 @@ class Test(unittest.TestCase):
         ds.write(format='csv')
         ds.write(format='arff')
 
+        # binary output is read back with numpy
+        import numpy
+        fp = ds.write(format='npz')
+        npz = numpy.load(fp)
+        self.assertEqual(npz['features'].tolist(), 
+                         [[3.0, 1.0, 1.5], [7.0, 0.5, 3.75]])
+        self.assertEqual(list(npz['classValues']), ['Bach', 'Handel'])
+        self.assertEqual(list(npz['ids']), 
+                         ['bwv66.6', 'hwv56/movement3-05.md'])
+        self.assertEqual(list(npz['attributes']), 
+                         ds.getAttributeLabels(includeClassLabel=False, 
+                         includeId=False))
+        npz.close()
+        os.remove(fp)
 
 
+
+    def testDataSetProcessWorkers(self):
+        from music21 import features
+
+        featureExtractors = features.extractorsById(['ql1', 'ql2', 'ql4'], 
+                            'native')
+        results = []
+        for workers in [None, 2]:
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(featureExtractors)
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.addData('hwv56/movement3-05.md', classValue='Handel')
+            ds.addData('notAWork/notAMovement.xml', classValue='Nobody')
+            ds.addData('bach/bwv324.xml', classValue='Bach')
+            ds.process(workers=workers)
+            # paths are only parsed in the worker processes
+            if workers is not None:
+                self.assertEqual(ds.dataInstances[0].isParsed(), False)
+            results.append(ds.getFeaturesAsList())
+            # failures are reported for the instance that cannot be parsed
+            self.assertEqual(len(ds.failures), 1)
+            self.assertEqual(ds.failures[0][:2], 
+                             ('notAWork/notAMovement.xml', None))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1][0], ['bwv66.6', 3, 1.0, 1.5, 'Bach'])
+        self.assertEqual(results[1][2], 
+                         ['notAWork/notAMovement.xml', 0, 0, 0, 'Nobody'])
+        self.assertEqual(results[1][3][0], 'bach/bwv324.xml')
+
+    def testDataSetProcessWorkersSettings(self):
+        from music21 import features
+        # DataSet uses the functions of the imported module
+        from music21.features import base as featuresBase
+
+        # settings of the extractors are used in the worker processes
+        results = []
+        for workers in [None, 2]:
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(
+                [features.jSymbolic.PitchClassDistributionFeature])
+            ds._featureExtractors[0].normalize = False
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.addData('hwv56/movement3-05.md', classValue='Handel')
+            ds.process(workers=workers)
+            results.append(ds.getFeaturesAsList())
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(max(results[1][0][1:-1]) > 1, True)
+
+        # a process that dies produces a failure, not a wait forever
+        extractFeatures = featuresBase._extractFeatures
+        timeout = featuresBase._PROCESS_DATA_TIMEOUT
+        def exitOrExtract(di, featureExtractors):
+            if di.sourcePath == 'exit':
+                os._exit(1)
+            return extractFeatures(di, featureExtractors)
+        featuresBase._extractFeatures = exitOrExtract
+        featuresBase._PROCESS_DATA_TIMEOUT = 10
+        try:
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(features.extractorsById(['ql1'], 
+                                    'native'))
+            ds.addData('exit', classValue='Nobody')
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.process(workers=2)
+        finally:
+            featuresBase._extractFeatures = extractFeatures
+            featuresBase._PROCESS_DATA_TIMEOUT = timeout
+        self.assertEqual(ds.failures, [('exit', None, 'timed out')])
+        self.assertEqual(ds.getFeaturesAsList(), 
+                         [['exit', 0, 'Nobody'], ['bwv66.6', 3, 'Bach']])
+
+    def testFeatureCache(self):
+        import tempfile, shutil
+        from music21 import features
+        # extractors use the cache of the imported module
+        from music21.features import base as featuresBase
+
+        dir = tempfile.mkdtemp()
+        fc = featuresBase.FeatureCache(dir)
+        key = (environLocal.getRootTempDir(), os.getpid())
+        wasEnabled = featuresBase._featureCacheEnabled
+        featuresBase.enableFeatureCache()
+        previous = featuresBase._featureCaches.get(key)
+        featuresBase._featureCaches[key] = fc
+        try:
+            featureExtractors = features.extractorsById(['ql1', 'ql2'], 
+                                'native')
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(featureExtractors)
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.addData('hwv56/movement3-05.md', classValue='Handel')
+            ds.process()
+            post = ds.getFeaturesAsList()
+            self.assertEqual(fc.stats['writes'], 4)
+            # each miss is looked up once
+            self.assertEqual(fc.stats['misses'], 4)
+
+            # adding one extractor only extracts that feature
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(featureExtractors)
+            ds.addFeatureExtractors(features.extractorsById(['ql4'], 
+                                    'native'))
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.addData('hwv56/movement3-05.md', classValue='Handel')
+            ds.process()
+            self.assertEqual(fc.stats['writes'], 6)
+            self.assertEqual(fc.stats['hits'], 4)
+            self.assertEqual([row[:3] for row in ds.getFeaturesAsList()],
+                             [row[:3] for row in post])
+            self.assertEqual(ds.getFeaturesAsList()[0][3], 1.5)
+
+            # if all features are stored, the work is not parsed
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(featureExtractors)
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.process()
+            self.assertEqual(ds.dataInstances[0].isParsed(), False)
+            self.assertEqual(ds.getFeaturesAsList(), post[:1])
+
+            # a differently configured extractor does not use the 
+            # stored feature
+            fe = features.jSymbolic.PitchClassDistributionFeature()
+            fe.setData(DataInstance('bwv66.6'))
+            normalized = fe.extract().vector
+            fe = features.jSymbolic.PitchClassDistributionFeature()
+            fe.normalize = False
+            fe.setData(DataInstance('bwv66.6'))
+            self.assertEqual(fe.getCachedFeature(), None)
+            self.assertNotEqual(fe.extract().vector, normalized)
+
+            # when disabled, the cache is not used
+            featuresBase.disableFeatureCache()
+            writes = fc.stats['writes']
+            ds = features.DataSet(classLabel='Composer')
+            ds.addFeatureExtractors(featureExtractors)
+            ds.addData('bwv66.6', classValue='Bach')
+            ds.process()
+            self.assertEqual(ds.dataInstances[0].isParsed(), True)
+            self.assertEqual(ds.getFeaturesAsList(), post[:1])
+            self.assertEqual(fc.stats['writes'], writes)
+        finally:
+            featuresBase.disableFeatureCache()
+            if wasEnabled:
+                featuresBase.enableFeatureCache()
+                if previous is not None:
+                    featuresBase._featureCaches[key] = previous
+            fc.close()
+            shutil.rmtree(dir)
+
     def testFeatureFail(self):
         import music21
         from music21 import stream, features
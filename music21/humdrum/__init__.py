@@ -157,17 +157,19 @@ import spineParser
 import testFiles
 #import questions
 
-def parseFile(filename):
+def parseFile(filename, parts=None, measureRange=None):
     '''
     shortcut to :class:`~music21.humdrum.spineParser.HumdrumFile`.  Most users will call `converter.parse()` instead.
     '''
-    return spineParser.HumdrumFile(filename)
+    return spineParser.HumdrumFile(filename, parts=parts, 
+                                   measureRange=measureRange)
 
-def parseData(data):
+def parseData(data, parts=None, measureRange=None):
     '''
     shortcut to :class:`~music21.humdrum.spineParser.HumdrumDataCollection`. Most users will call `converter.parse()` instead.
     '''
-    return spineParser.HumdrumDataCollection(data)
+    return spineParser.HumdrumDataCollection(data, parts=parts, 
+                                             measureRange=measureRange)
 
 
 #------------------------------------------------------------------------------
@@ -112,10 +112,19 @@ class HumdrumDataCollection(object):
     (2) Split spines are assumed to be voices in a single spine staff.
     
     
+    If `parts` is given, only the selected \*\*kern spines are translated;
+    each selection is an index into the Parts of the resulting Score 
+    (counting from zero) or a Part id such as "spine_3". If `measureRange` is
+    given as a pair of measure numbers (start, end), only those measures are 
+    translated.
     '''
     parsedLines = False
+    parts = None
+    measureRange = None
     
-    def __init__(self, dataStream = [] ):
+    def __init__(self, dataStream = [], parts = None, measureRange = None):
+        self.parts = parts
+        self.measureRange = measureRange
         if dataStream is []:
             raise HumdrumException("dataStream is not optional, specify some lines")
         elif isinstance(dataStream, basestring):
@@ -153,6 +162,10 @@ class HumdrumDataCollection(object):
             raise HumdrumException('getEventListFromDataStream failed: did not parse entire file')
         self.parseProtoSpinesAndEventCollections()
         self.spineCollection = self.createHumdrumSpines()
+        self.spineCollection.parts = self.parts
+        if self.measureRange is not None:
+            self.spineCollection.measureRange = self.measureRange
+            self.spineCollection.measureNumbers = self.getMeasureNumbers()
         self.spineCollection.createMusic21Streams()
         self.parsedLines = True
 
@@ -227,6 +240,38 @@ class HumdrumDataCollection(object):
         self.fileLength = self.parsePositionInStream 
         return self.eventList
 
+    def getMeasureNumbers(self):
+        r'''
+        Returns a list giving for each line in self.eventList the number
+        of the measure that the line is in.  Lines before the first barline 
+        are in measure 0; a barline without a number begins the measure
+        after the last one.
+
+        >>> from music21 import *
+        >>> eventString = "**kern\n" + \
+        ...               "C4\n" + \
+        ...               "=1\n" + \
+        ...               "D4\n" + \
+        ...               "=\n" + \
+        ...               "E4\n" + \
+        ...               "*-\n"
+        >>> hdc = humdrum.spineParser.HumdrumDataCollection(eventString)
+        >>> hdc.getMeasureNumbers()
+        [0, 0, 1, 1, 2, 2, 2]
+        '''
+        post = []
+        measureNumber = 0
+        for thisLine in self.eventList:
+            if (thisLine.isSpineLine and len(thisLine.spineData) > 0 and 
+                thisLine.spineData[0].startswith('=')):
+                rematchMN = re.search("(\d+)", thisLine.spineData[0])
+                if rematchMN:
+                    measureNumber = int(rematchMN.group(1))
+                else:
+                    measureNumber += 1
+            post.append(measureNumber)
+        return post
+
     def parseProtoSpinesAndEventCollections(self):
         r'''
         Run after :meth:`~music21.humdrum.spineParser.HumdrumDataCollection.parseEventListFromDataStream()`
@@ -515,9 +560,8 @@ class HumdrumDataCollection(object):
             masterStream = stream.Score()
             for thisSpine in self.spineCollection:
                 thisSpine.stream.id = "spine_" + str(thisSpine.id)
-            for thisSpine in self.spineCollection:
-                if thisSpine.parentSpine is None and thisSpine.spineType == 'kern':
-                    masterStream.insert(thisSpine.stream)
+            for thisSpine in self.spineCollection.getSelectedKernSpines():
+                masterStream.insert(thisSpine.stream)
             return masterStream
 
     stream = property(_getStream)
@@ -529,7 +573,9 @@ class HumdrumFile(HumdrumDataCollection):
     '''
     
     
-    def __init__(self, filename = None):
+    def __init__(self, filename = None, parts = None, measureRange = None):
+        self.parts = parts
+        self.measureRange = measureRange
         if (filename is not None):
             try:
                 humFH = open(filename)
@@ -940,6 +986,10 @@ class HumdrumSpine(object):
         {2.0} <music21.stream.Measure 2 offset=2.0>
             {0.0} <music21.note.Note D>        
         '''
+        measureRange = None
+        if self.spineCollection is not None:
+            # a selection of measures may not include measure 1
+            measureRange = self.spineCollection.measureRange
         streamOut = streamIn.__class__()
         currentMeasure = stream.Measure()
         currentMeasure.number = 0
@@ -972,7 +1022,7 @@ class HumdrumSpine(object):
         measureElements = streamOut.getElementsByClass('Measure')
         if len(measureElements) > 0:
             m1 = measureElements[0]
-            if hasMeasureOne == False: # pickup measure is not measure1
+            if hasMeasureOne == False and measureRange is None: # pickup measure is not measure1
                 m1.number = 1
             beginningStuff = streamOut.getElementsByOffset(0)
             for el in beginningStuff:
@@ -1025,11 +1075,58 @@ class KernSpine(HumdrumSpine):
         inTuplet = False
         lastNote = None
         currentBeamNumbers = 0
+
+        measureRange = None
+        if self.spineCollection is not None:
+            measureRange = self.spineCollection.measureRange
+            measureNumbers = self.spineCollection.measureNumbers
+        inRange = True
+        # tandem interpretations of skipped measures, to be added
+        # before the first event in range
+        pendingKeys = []
+        pendingObjects = {}
         
         for event in self.eventList:
             eventC = event.contents
             thisObject = None            
-            if eventC == ".":
+            if measureRange is not None:
+                measureNumber = measureNumbers[event.position]
+                wasInRange = inRange
+                inRange = measureRange[0] <= measureNumber <= measureRange[1]
+                if inRange and not wasInRange:
+                    for pendingKey in pendingKeys:
+                        self.stream._appendCore(pendingObjects[pendingKey])
+                    pendingKeys = []
+                if not inRange and eventC.startswith('='):
+                    # still needed to set the barline of the last measure
+                    lastContainer  = hdStringToMeasure(eventC, lastContainer)
+                    continue
+            if not inRange:
+                # notes are not translated; only the last tandem 
+                # interpretation of each kind is kept
+                inTuplet = False
+                lastNote = None
+                currentBeamNumbers = 0
+                if not eventC.startswith('*'):
+                    continue
+                tempObject = kernTandemToObject(eventC)
+                if tempObject is None:
+                    continue
+                pendingKey = eventC
+                for className in ['Clef', 'KeySignature', 'TimeSignature', 
+                                  'MetronomeMark']:
+                    if className in tempObject.classes:
+                        pendingKey = className
+                        break
+                if pendingKey in pendingKeys:
+                    pendingKeys.remove(pendingKey)
+                pendingKeys.append(pendingKey)
+                tempObject.humdrumPosition = event.position
+                tempObject.humdrumSpineId  = event.spineId                
+                tempObject.priority = event.position
+                pendingObjects[pendingKey] = tempObject
+                continue
+            elif eventC == ".":
                 pass
             elif eventC.startswith('*'):
                 ## control processing
@@ -1239,6 +1336,11 @@ class SpineCollection(object):
         self.spines = []
         self.nextFreeId  = 0
         self.spineReclassDone = False
+        # selections of parts and measures to translate
+        self.parts = None
+        self.measureRange = None
+        # the measure number of each line, when measureRange is set
+        self.measureNumbers = None
         
     def __iter__(self):
         '''Resets the counter to len(self.spines) so that iteration is correct'''
@@ -1337,6 +1439,58 @@ class SpineCollection(object):
 
 
 
+    def getSelectedKernSpines(self):
+        '''
+        returns a list of the \*\*kern spines that are not subspines 
+        and that are selected by the `parts` attribute, in the order that 
+        they appear as Parts in a Score.
+
+        >>> from music21 import *
+        >>> hsc = humdrum.spineParser.SpineCollection()
+        >>> for i in range(3):
+        ...     newSpine = hsc.addSpine()
+        ...     newSpine.spineType = 'kern'
+        >>> hsc.getSelectedKernSpines()
+        [Spine: 2, Spine: 1, Spine: 0]
+        >>> hsc.parts = [0, 'spine_0']
+        >>> hsc.getSelectedKernSpines()
+        [Spine: 2, Spine: 0]
+        >>> hsc.parts = ['spine_5']
+        >>> hsc.getSelectedKernSpines()
+        Traceback (most recent call last):
+        HumdrumException: cannot find a part for selection: spine_5
+        '''
+        kernSpines = []
+        for thisSpine in self:
+            if thisSpine.parentSpine is None and thisSpine.spineType == 'kern':
+                kernSpines.append(thisSpine)
+        if self.parts is None:
+            return kernSpines
+        spineNames = ['spine_' + str(thisSpine.id) for thisSpine in kernSpines]
+        for selection in self.parts:
+            if selection not in spineNames and not (common.isNum(selection)
+                and 0 <= selection < len(kernSpines)):
+                raise HumdrumException(
+                    'cannot find a part for selection: %s' % selection)
+        post = []
+        for i, thisSpine in enumerate(kernSpines):
+            if i in self.parts or spineNames[i] in self.parts:
+                post.append(thisSpine)
+        return post
+
+    def isSpineSelected(self, spine):
+        '''
+        returns False if the spine is, or is a subspine of, a \*\*kern 
+        spine that is not selected by the `parts` attribute.
+        '''
+        if self.parts is None:
+            return True
+        while spine.parentSpine is not None:
+            spine = spine.parentSpine
+        if spine.spineType != 'kern':
+            return True
+        return spine in self.getSelectedKernSpines()
+
     def createMusic21Streams(self):
         self.reclassSpines()
         self.parseMusic21()
@@ -1459,6 +1613,8 @@ class SpineCollection(object):
                             if 'Dynamic' in dynamic.classes:
                                 prioritiesToSearch[dynamic.humdrumPosition] = dynamic
                         for applyStaff in stavesAppliedTo:
+                            if applyStaff not in kernStreams: # not selected
+                                continue
                             applyStream = kernStreams[applyStaff]
                             for el in applyStream.recurse():
                                 if el.priority in prioritiesToSearch:
@@ -1472,6 +1628,8 @@ class SpineCollection(object):
                             if 'ElementWrapper' in text.classes:
                                 prioritiesToSearch[text.humdrumPosition] = text.obj
                         for applyStaff in stavesAppliedTo:
+                            if applyStaff not in kernStreams: # not selected
+                                continue
                             applyStream = kernStreams[applyStaff]
                             for el in applyStream.recurse():
                                 if el.priority in prioritiesToSearch:
@@ -1532,7 +1690,8 @@ class SpineCollection(object):
         thus populating the spine.stream for each Spine
         '''
         for thisSpine in self.spines:
-            thisSpine.parse()
+            if self.isSpineSelected(thisSpine):
+                thisSpine.parse()
 
      
     # TODO: append global comments and have a way of recalling them
@@ -2163,6 +2322,29 @@ class Test(unittest.TestCase):
         #hf1.spineCollection.moveDynamicsAndLyricsToStreams()        
         s = hf1.stream #.show()
 
+    def testSelectPartsAndMeasures(self):
+        def getNotes(s):
+            return [(round(n.offset, 6), n.quarterLength, n.fullName) 
+                    for n in s.flat.notesAndRests]
+
+        full = HumdrumDataCollection(testFiles.mazurka6).stream
+        hdc = HumdrumDataCollection(testFiles.mazurka6, parts=[1], 
+                                    measureRange=(5, 8))
+        s = hdc.stream
+        self.assertEqual(len(s.parts), 1)
+        self.assertEqual(s.parts[0].id, full.parts[1].id)
+        measures = s.parts[0].getElementsByClass('Measure')
+        self.assertEqual([m.number for m in measures], [5, 6, 7, 8])
+        self.assertEqual(measures[0].offset, 0)
+        # clef, key, and meter of the skipped measures are carried over
+        fullMeasures = full.parts[1].measures(5, 8)
+        self.assertEqual(getNotes(measures[0]), 
+            getNotes(fullMeasures.getElementsByClass('Measure')[0]))
+        self.assertEqual(len(measures[0].getElementsByClass('Clef')), 1)
+        self.assertEqual(len(measures[0].getElementsByClass('TimeSignature')), 1)
+        self.assertEqual(len(s.parts[0].flat.notesAndRests), 
+                         len(fullMeasures.flat.notesAndRests))
+
 class TestExternal(unittest.TestCase):
 
     def runTest(self):
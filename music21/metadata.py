@@ -30,11 +30,18 @@ The following example creates a :class:`~music21.stream.Stream` object, adds a :
 
 
 import unittest, doctest
+import bisect
 import datetime
 import json
 import os
 import inspect
 import re
+import time
+
+try:
+    import sqlite3
+except ImportError: # not included in all Python builds
+    sqlite3 = None
 
 from music21 import base
 from music21 import common
@@ -54,6 +61,43 @@ class MetadataException(exceptions21.Music21Exception):
     pass
 
 
+#-------------------------------------------------------------------------------
+# utility functions for searching
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def _isRegexQuery(query):
+    '''Return True if `query` is a compiled regular expression or a string 
+    that contains regular expression characters. 
+
+    >>> from music21 import *
+    >>> metadata._isRegexQuery('bach')
+    False
+    >>> metadata._isRegexQuery('bach|handel')
+    True
+    '''
+    if hasattr(query, 'search'):
+        return True
+    elif common.isStr(query):
+        for char in '*.|+?{}':
+            if char in query:
+                return True
+    return False
+
+def _getSearchTokens(value):
+    '''Return a list of the lower-case words in `value`.
+
+    >>> from music21 import *
+    >>> metadata._getSearchTokens('Beethoven, Ludwig van')
+    [u'beethoven', u'ludwig', u'van']
+    '''
+    if not common.isStr(value):
+        value = str(value)
+    if not isinstance(value, unicode):
+        value = value.decode('utf-8', 'replace')
+    return _WORD_RE.findall(value.lower())
+
+
 #-------------------------------------------------------------------------------
 # utility dictionaries and conversion functions; used by objects defined in this
 # module
@@ -1576,13 +1620,10 @@ class Metadata(base.Music21Object):
         # for now, make all queries strings
         # ultimately, can look for regular expressions by checking for
         # .search
-        useRegex = False
+        useRegex = _isRegexQuery(query)
         if hasattr(query, 'search'):
-            useRegex = True
             reQuery = query # already compiled
-        # look for regex characters
-        elif common.isStr(query) and ('*' in query or '.' in query or '|' in query or '+' in query or '?' in query or '{' in query or '}' in query):
-            useRegex = True
+        elif useRegex:
             reQuery = re.compile(query, flags=re.I) 
 
         if useRegex:
@@ -1869,6 +1910,168 @@ class RichMetadata(Metadata):
 
 
 
+#-------------------------------------------------------------------------------
+class _MetadataStorage(dict):
+    '''A dictionary of Metadata objects that counts changes to its 
+    entries, so that MetadataBundle can tell if its search index is 
+    current. Used for the `storage` of a MetadataBundle.
+
+    >>> from music21 import *
+    >>> storage = metadata._MetadataStorage()
+    >>> storage.changes
+    0
+    >>> storage['a'] = metadata.Metadata(title='A')
+    >>> storage.update({'b': metadata.Metadata(title='B')})
+    >>> del storage['a']
+    >>> storage.changes
+    3
+    '''
+    def __init__(self, *args, **keywords):
+        dict.__init__(self, *args, **keywords)
+        self.changes = 0
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self.items()),))
+
+    def __setitem__(self, key, value):
+        self.changes += 1
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self.changes += 1
+        dict.__delitem__(self, key)
+
+    def clear(self):
+        self.changes += 1
+        dict.clear(self)
+
+    def update(self, *args, **keywords):
+        self.changes += 1
+        dict.update(self, *args, **keywords)
+
+    def pop(self, key, *args):
+        self.changes += 1
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        self.changes += 1
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.changes += 1
+        return dict.setdefault(self, key, default)
+
+
+class _LazyMetadataStorage(_MetadataStorage):
+    '''A dictionary of Metadata objects, some of which are stored as JSON 
+    strings until accessed. Used by MetadataBundle, so that reading a 
+    bundle does not need to create an object for every work.
+
+    >>> from music21 import *
+    >>> mb = metadata.MetadataBundle()
+    >>> md = metadata.Metadata(title='Lazy')
+    >>> storage = metadata._LazyMetadataStorage(mb.jsonComponentFactory)
+    >>> storage.setJSON('a', md.json)
+    >>> 'a' in storage, storage.isLoaded('a')
+    (True, False)
+    >>> storage['a'].title
+    'Lazy'
+    >>> storage.isLoaded('a')
+    True
+    '''
+    def __init__(self, factory, *args, **keywords):
+        _MetadataStorage.__init__(self, *args, **keywords)
+        self._factory = factory
+
+    def __reduce__(self):
+        return (_MetadataStorage, (dict(self.items()),))
+
+    def setJSON(self, key, data):
+        '''Store a JSON string to be turned into a Metadata object when 
+        `key` is first accessed.
+        '''
+        dict.__setitem__(self, key, data)
+
+    def isLoaded(self, key):
+        return not common.isStr(dict.__getitem__(self, key))
+
+    def getJSON(self, key):
+        '''Return the JSON string for `key` without creating an object.
+        '''
+        value = dict.__getitem__(self, key)
+        if common.isStr(value):
+            return value
+        return value.json
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if common.isStr(value):
+            data = json.loads(value)
+            value = self._factory(data['__class__'])
+            value.json = data
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *args):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        key, value = _MetadataStorage.popitem(self)
+        if common.isStr(value):
+            dict.__setitem__(self, key, value)
+            value = self[key]
+            dict.__delitem__(self, key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def copy(self):
+        '''Return a new _LazyMetadataStorage with the same entries; 
+        entries not yet accessed are still created when first accessed.
+
+        >>> from music21 import *
+        >>> mb = metadata.MetadataBundle()
+        >>> storage = metadata._LazyMetadataStorage(mb.jsonComponentFactory)
+        >>> storage.setJSON('a', metadata.Metadata(title='Lazy').json)
+        >>> storageCopy = storage.copy()
+        >>> storageCopy['a'].title
+        'Lazy'
+        >>> storage.isLoaded('a')
+        False
+        '''
+        post = self.__class__(self._factory)
+        dict.update(post, self)
+        return post
+
+    def itervalues(self):
+        for key in self:
+            yield self[key]
+
+    def iteritems(self):
+        for key in self:
+            yield key, self[key]
+
+    def values(self):
+        return list(self.itervalues())
+
+    def items(self):
+        return list(self.iteritems())
+
+
 #-------------------------------------------------------------------------------
 class MetadataBundle(base.JSONSerializer):
     '''
@@ -1889,7 +2092,7 @@ class MetadataBundle(base.JSONSerializer):
 
         # all keys are strings, all value are Metadata
         # there is apparently a performance boost for using all-string keys
-        self.storage = {}
+        self.storage = _MetadataStorage()
         
         # name is used to write storage file and access this bundle from multiple # bundles
         self.name = name
@@ -1899,13 +2102,57 @@ class MetadataBundle(base.JSONSerializer):
         # keys are the same for self.storage
         self._accessPaths = {}
 
+        # for each source file, keyed as with corpusPathToKey() without a 
+        # number, a list of modification time, size, md5 hash, and the 
+        # keys in self.storage that were read from that file
+        self._fingerprints = {}
+
+        # an inverted index of search fields, each a dictionary of 
+        # lower-case words and the keys of self.storage that contain them;
+        # see _updateSearchIndex()
+        self._searchIndex = {}
+        # a sorted list of pairs of all suffixes of all indexed words 
+        # and the words; derived from self._searchIndex when needed
+        self._searchSuffixes = None
+        # a JSON string of the search index, as read from a database file, 
+        # not yet loaded into self._searchIndex
+        self._searchIndexData = None
+        # the changes of self.storage when the search index was made or 
+        # read, or None if the index is not current
+        self._searchIndexChanges = None
+
+    def _getStorage(self):
+        return self._storage
+
+    def _setStorage(self, value):
+        if not isinstance(value, _MetadataStorage):
+            value = _MetadataStorage(value)
+        self._storage = value
+
+    storage = property(_getStorage, _setStorage, doc='''
+        A dictionary of Metadata objects, keyed by corpus path. A 
+        dictionary assigned to `storage` is copied into a dictionary that 
+        counts changes, so that the search index is rebuilt when needed.
+
+        >>> from music21 import *
+        >>> mb = metadata.MetadataBundle()
+        >>> mb.storage = {'a': metadata.Metadata(title='Lacrimosa')}
+        >>> mb._getSearchCandidates('lacrimosa')
+        ['a']
+        >>> mb.storage['a'] = metadata.Metadata(title='Dies irae')
+        >>> mb._getSearchCandidates('lacrimosa')
+        []
+        >>> mb._getSearchCandidates('irae')
+        ['a']
+        ''')
+
     #---------------------------------------------------------------------------
     # overridden methods for json processing 
 
     def jsonAttributes(self):
         '''Define all attributes of this object that should be JSON serialized for storage and re-instantiation. Attributes that name basic Python objects or :class:`~music21.base.JSONSerializer` subclasses, or dictionaries or lists that contain Python objects or :class:`~music21.base.JSONSerializer` subclasses, can be provided.
         '''
-        return ['storage', 'name']
+        return ['storage', 'name', '_fingerprints', '_searchIndex']
 
     def jsonComponentFactory(self, idStr):
         if '.Metadata' in idStr:
@@ -1947,7 +2194,8 @@ class MetadataBundle(base.JSONSerializer):
     
     
 
-    def addFromPaths(self, pathList, printDebugAfter = 0):
+    def addFromPaths(self, pathList, printDebugAfter = 0, processes=1,
+        chunkSize=4, timeout=None):
         '''Parse and store metadata from numerous files.
 
         If any files cannot be loaded, their file paths 
@@ -1960,6 +2208,14 @@ class MetadataBundle(base.JSONSerializer):
         after every 100 files are parsed a message will be
         printed to stderr giving an update on progress.
 
+        If `processes` is greater than 1, files are parsed by a pool of 
+        that many processes (if None, one for each CPU), `chunkSize` 
+        files at a time. Results are always stored in the order of 
+        `pathList`, so the same paths produce the same bundle however 
+        many processes are used. 
+
+        If `timeout` is given, a file that takes longer than 
+        `timeout` seconds to parse is abandoned and returned as an error.
 
         >>> from music21 import *
         >>> mb = metadata.MetadataBundle()
@@ -1970,56 +2226,140 @@ class MetadataBundle(base.JSONSerializer):
         '''
         import gc # get a garbage collector
         fpError = [] # store errors
+        # the search index must be rebuilt
+        self._clearSearchIndex()
+
+        if processes is None:
+            import multiprocessing
+            processes = multiprocessing.cpu_count()
+        if processes > 1 and len(pathList) > 1:
+            results = _getMetadataEntriesParallel(pathList, processes, 
+                chunkSize, timeout)
+        else:
+            results = (_getMetadataEntries(fp, timeout) for fp in pathList)
 
-        # converter imports modules that import metadata
-        from music21 import converter
         numberConverted = 0
-        for fp in pathList:
-            environLocal.printDebug(['updateMetadataCache: examining:', fp])
+        for fp, entries, error in results:
             if printDebugAfter > 0 and numberConverted % printDebugAfter == 0 and numberConverted > 0:
                 environLocal.warn("updated %d files, %d to go; total errors: %d" %
                                   (numberConverted, len(pathList) - numberConverted, len(fpError)))
             numberConverted += 1
-            cp = self.corpusPathToKey(fp)
-            try:
-                post = converter.parse(fp, forceSource=True)
-            except:
-                environLocal.warn('parse failed: %s' % fp)
+            if error is not None:
+                environLocal.warn('parse failed: %s (%s)' % (fp, error))
                 fpError.append(fp)
                 continue
-
-            if 'Opus' in post.classes:
-                # need to get scores from each opus?
-                # problem here is that each sub-work has metadata, but there
-                # is only a single source file
-                for s in post.scores:
-                    md = s.metadata
-                    # updgrade md to rmd
-                    rmd = RichMetadata()
-                    rmd.merge(md)
-                    rmd.update(s) # update based on Stream
-                    if md.number == None:
-                        environLocal.printDebug(['addFromPaths: got Opus that contains Streams that do not have work numbers:', fp])
-                    else:
-                        # update path to include work number
-                        cp = self.corpusPathToKey(fp, number=md.number)
-                        environLocal.printDebug(['addFromPaths: storing:', cp])
-                        self.storage[cp] = rmd
-                    del s # for memory conservation
-            else:
-                md = post.metadata
-                if md is None:
-                    continue    
-                rmd = RichMetadata()
-                rmd.merge(md)
-                rmd.update(post) # update based on Stream
+            self._removeEntriesForPath(fp)
+            for cp, rmd in entries:
                 environLocal.printDebug(['updateMetadataCache: storing:', cp])
                 self.storage[cp] = rmd
-    
+            fingerprint = self._getFingerprint(fp)
+            if fingerprint is not None:
+                fingerprint.append(_getFileHash(fp))
+            else: # not a local file; always parsed by updateFromPaths()
+                fingerprint = [None, None, None]
+            fingerprint.append([cp for cp, rmd in entries])
+            self._fingerprints[self.corpusPathToKey(fp)] = fingerprint
             # explicitly delete the imported object for memory conservation
-            del post
-            gc.collect()
+            del entries
+            if processes <= 1:
+                gc.collect()
+
+        return fpError
+
+    def _getFingerprint(self, fp):
+        '''Return a list of the modification time and size of the file 
+        `fp`, or None if it is not a local file.
+        '''
+        try:
+            st = os.stat(fp)
+        except (OSError, TypeError, ValueError):
+            return None
+        return [st.st_mtime, st.st_size]
+
+    def _removeEntriesForPath(self, fp):
+        '''Remove the stored metadata read from the file `fp`, if any.
+        '''
+        key = self.corpusPathToKey(fp)
+        if key not in self._fingerprints:
+            return
+        for cp in self._fingerprints[key][3]:
+            if cp in self.storage:
+                del self.storage[cp]
+        del self._fingerprints[key]
+
+    def _isChanged(self, fp):
+        '''Return True if the file `fp` has been added or changed since 
+        its metadata was stored. A file with a new modification time but 
+        the same contents is not changed.
+        '''
+        key = self.corpusPathToKey(fp)
+        stored = self._fingerprints.get(key)
+        fingerprint = self._getFingerprint(fp)
+        if stored is None or fingerprint is None or stored[0] is None:
+            return True
+        if fingerprint[1] != stored[1]:
+            return True
+        if fingerprint[0] != stored[0]:
+            if _getFileHash(fp) != stored[2]:
+                return True
+            stored[0] = fingerprint[0]
+        return False
+
+    def updateFromPaths(self, pathList, printDebugAfter=0, processes=1,
+        chunkSize=4, timeout=None):
+        '''Update stored metadata to reflect the files in `pathList`, 
+        parsing only files that have been added or changed since they 
+        were last parsed, and removing metadata for files no longer in 
+        `pathList`. The modification time, size, and a hash of each 
+        parsed file are stored with this bundle for comparison. 
+        
+        Metadata that was not read from a file in `pathList` (such as 
+        from older caches without this information) is removed.
 
+        Arguments are as for 
+        :meth:`~music21.metadata.MetadataBundle.addFromPaths`; returns a
+        list of paths that could not be parsed.
+
+        >>> from music21 import *
+        >>> mb = metadata.MetadataBundle()
+        >>> mb.updateFromPaths(corpus.getWorkList('bwv66.6'))
+        []
+        >>> rmd = mb.storage.values()[0]
+        >>> mb.updateFromPaths(corpus.getWorkList('bwv66.6')) # not parsed
+        []
+        >>> mb.storage.values()[0] is rmd
+        True
+        >>> mb.updateFromPaths([])
+        []
+        >>> len(mb.storage)
+        0
+        '''
+        self._clearSearchIndex()
+        current = set([self.corpusPathToKey(fp) for fp in pathList])
+        for key in self._fingerprints.keys():
+            if key not in current:
+                for cp in self._fingerprints[key][3]:
+                    if cp in self.storage:
+                        del self.storage[cp]
+                del self._fingerprints[key]
+
+        changed = []
+        for fp in pathList:
+            if self._isChanged(fp):
+                # remove now, in case it can no longer be parsed
+                self._removeEntriesForPath(fp)
+                changed.append(fp)
+        environLocal.printDebug(['updateFromPaths: changed paths:', 
+            len(changed)])
+        fpError = self.addFromPaths(changed, printDebugAfter=printDebugAfter,
+            processes=processes, chunkSize=chunkSize, timeout=timeout)
+
+        known = set()
+        for fingerprint in self._fingerprints.values():
+            known.update(fingerprint[3])
+        for cp in self.storage.keys():
+            if cp not in known:
+                del self.storage[cp]
         return fpError
 
     def _getFilePath(self):
@@ -2035,29 +2375,175 @@ class MetadataBundle(base.JSONSerializer):
                 self.name)
         return fp
 
+    def _getDatabaseFilePath(self, fp=None):
+        if fp is None:
+            fp = self._getFilePath()
+        return os.path.splitext(fp)[0] + '.db'
+
+    def _getDatabaseFilePaths(self, fp):
+        '''Return a list of the database files that may be read in place 
+        of the JSON file `fp`: the file written beside it by write() and, 
+        as the corpus directory may not be writable, a file in the 
+        temporary directory for the metadata of the corpus, named for the
+        path of the JSON file. The last file is the one written by read()
+        when `cacheDatabase` is True.
+        '''
+        post = [self._getDatabaseFilePath(fp)]
+        if self.name in ['virtual', 'core']:
+            post.append(os.path.join(environLocal.getRootTempDir(), 
+                'm21-metadata-%s-%s.db' % (self.name, 
+                common.getMd5(os.path.abspath(fp))[:12])))
+        return post
+
 
     def write(self):
         '''Write the JSON storage of all Metadata or RichMetadata contained in this object. 
+
+        If the sqlite3 module is available, a database file, which can be 
+        read much more quickly, is also written; see 
+        :meth:`~music21.metadata.MetadataBundle.writeDatabase`.
         '''
         fp = self._getFilePath()
         environLocal.printDebug(['MetadataBundle: writing:', fp])
+        # the search index is stored with the metadata
+        self._updateSearchIndex()
         self.jsonWrite(fp)
+        if sqlite3 is not None:
+            self.writeDatabase(self._getDatabaseFilePath(fp))
 
 
-    def read(self, fp=None):
+    def read(self, fp=None, cacheDatabase=False):
         '''Load self from the file path suggested by the name of this MetadataBundle
+
+        If a database file written by 
+        :meth:`~music21.metadata.MetadataBundle.writeDatabase` with this 
+        version of music21 is at least as new as the JSON file, it is read 
+        instead. Otherwise the JSON file is read; if `cacheDatabase` is 
+        True, a database file is then written, if possible, to be read 
+        next time. Nothing is written otherwise.
         '''
         t = common.Timer()
         t.start()
+        fpDatabases = []
         if fp is None:
             fp = self._getFilePath()
+            if sqlite3 is not None:
+                fpDatabases = self._getDatabaseFilePaths(fp)
+        for fpDatabase in fpDatabases:
+            if (os.path.exists(fpDatabase) and (not os.path.exists(fp) or 
+                os.path.getmtime(fpDatabase) >= os.path.getmtime(fp))):
+                try:
+                    self.readDatabase(fpDatabase)
+                except (MetadataException, sqlite3.Error) as excp:
+                    environLocal.printDebug(['MetadataBundle: cannot read:',
+                        fpDatabase, excp])
+                    continue
+                environLocal.printDebug(['MetadataBundle: loading time:', self.name, t, 'md items:', len(self.storage)])
+                return
         if not os.path.exists(fp):
             environLocal.warn('no metadata found for: %s; try building cache with corpus.cacheMetadata("%s")' % (self.name, self.name))
             return
-        self.jsonRead(fp)
+        if fp.endswith('.db'):
+            self.readDatabase(fp)
+        else:
+            self.jsonRead(fp)
+            self._searchSuffixes = None
+            # the search index is read with the metadata
+            self._searchIndexChanges = None
+            if self._searchIndex.get('count') == len(self.storage):
+                self._searchIndexChanges = self.storage.changes
+            if cacheDatabase and len(fpDatabases) > 0:
+                try:
+                    self.writeDatabase(fpDatabases[-1])
+                except (IOError, OSError, sqlite3.Error) as excp:
+                    environLocal.printDebug(['MetadataBundle: cannot write:',
+                        fpDatabases[-1], excp])
         environLocal.printDebug(['MetadataBundle: loading time:', self.name, t, 'md items:', len(self.storage)])
 
 
+    def writeDatabase(self, fp):
+        '''Write all stored metadata to an sqlite database file at `fp`. 
+        
+        Each Metadata object is stored as a separate JSON string, so that 
+        :meth:`~music21.metadata.MetadataBundle.readDatabase` only needs 
+        to create objects when they are accessed.
+        '''
+        if sqlite3 is None:
+            raise MetadataException('the sqlite3 module is not available')
+        self._updateSearchIndex()
+        if isinstance(self.storage, _LazyMetadataStorage):
+            getJSON = self.storage.getJSON
+        else:
+            getJSON = lambda key: self.storage[key].json
+        
+        # write to a temporary file, so that a partial file is never read
+        fpTemp = fp + '.tmp'
+        if os.path.exists(fpTemp):
+            os.remove(fpTemp)
+        conn = sqlite3.connect(fpTemp)
+        try:
+            conn.execute('CREATE TABLE metadata (key TEXT PRIMARY KEY, data TEXT)')
+            conn.execute('CREATE TABLE info (name TEXT PRIMARY KEY, data TEXT)')
+            conn.executemany('INSERT INTO metadata VALUES (?, ?)', 
+                ((key, getJSON(key)) for key in self.storage))
+            info = [('version', json.dumps(base.VERSION)), 
+                    ('name', json.dumps(self.name)),
+                    ('fingerprints', json.dumps(self._fingerprints)),
+                    ('searchIndex', json.dumps(self._searchIndex))]
+            conn.executemany('INSERT INTO info VALUES (?, ?)', info)
+            conn.commit()
+        finally:
+            conn.close()
+        if os.path.exists(fp):
+            os.remove(fp)
+        os.rename(fpTemp, fp)
+
+    def readDatabase(self, fp):
+        '''Read metadata from an sqlite database file written by
+        :meth:`~music21.metadata.MetadataBundle.writeDatabase`, replacing 
+        all stored metadata. Metadata objects are created only when 
+        accessed in `storage`. A MetadataException is raised if the file 
+        was written by another version of music21.
+
+        >>> from music21 import *
+        >>> import os, tempfile
+        >>> mb = metadata.MetadataBundle()
+        >>> mb.addFromPaths(corpus.getWorkList('bwv66.6'))
+        []
+        >>> fp = os.path.join(tempfile.gettempdir(), 'm21-test-metadata.db')
+        >>> mb.writeDatabase(fp)
+        >>> mbNew = metadata.MetadataBundle()
+        >>> mbNew.readDatabase(fp)
+        >>> mbNew.storage.keys() == mb.storage.keys()
+        True
+        >>> mbNew.storage.values()[0].noteCount
+        165
+        >>> os.remove(fp)
+        '''
+        if sqlite3 is None:
+            raise MetadataException('the sqlite3 module is not available')
+        conn = sqlite3.connect(fp)
+        try:
+            rows = conn.execute('SELECT key, data FROM metadata').fetchall()
+            info = dict(conn.execute('SELECT name, data FROM info').fetchall())
+        finally:
+            conn.close()
+        version = json.loads(info.get('version', 'null'))
+        if version != list(base.VERSION):
+            raise MetadataException('metadata database %s was written by music21 version %s' % (fp, version))
+
+        storage = _LazyMetadataStorage(self.jsonComponentFactory)
+        for key, data in rows:
+            storage.setJSON(key, data)
+        self.storage = storage
+        self.name = json.loads(info['name'])
+        self._fingerprints = json.loads(info['fingerprints'])
+        self._clearSearchIndex()
+        # the index is only loaded when searching
+        self._searchIndexData = info['searchIndex']
+        self._searchIndexChanges = self.storage.changes
+
+
     def updateAccessPaths(self, pathList):
         '''For each stored Metatadata object, create an entry for a complete, local file path that returns this.
 
@@ -2104,11 +2590,115 @@ class MetadataBundle(base.JSONSerializer):
         #environLocal.printDebug(['metadata grouping time:', t, 'md bundles found:', len(post)])
         #return post
 
+    def _clearSearchIndex(self):
+        self._searchIndex = {}
+        self._searchIndexData = None
+        self._searchSuffixes = None
+        self._searchIndexChanges = None
+
+    def _updateSearchIndex(self):
+        '''Build the inverted index used by 
+        :meth:`~music21.metadata.MetadataBundle.search`, if the stored 
+        index does not match the stored metadata. Any change to `storage` 
+        since the index was made or read makes the index out of date.
+        '''
+        if self._searchIndexData is not None:
+            self._searchIndex = json.loads(self._searchIndexData)
+            self._searchIndexData = None
+        if (self._searchIndexChanges == self.storage.changes and 
+            'fields' in self._searchIndex):
+            return
+        fields = {}
+        for key, md in self.storage.items():
+            for f in md._searchAttributes:
+                value = getattr(md, f)
+                if value is None:
+                    continue
+                words = fields.setdefault(f, {})
+                for token in _getSearchTokens(value):
+                    keys = words.setdefault(token, [])
+                    if not keys or keys[-1] != key:
+                        keys.append(key)
+        self._searchIndex = {'count': len(self.storage), 'fields': fields}
+        self._searchSuffixes = None
+        self._searchIndexChanges = self.storage.changes
+
+    def _getSearchFields(self, field):
+        '''Return a list of the indexed fields that Metadata.search() 
+        would search for `field`, or None if `field` is not indexed.
+        '''
+        sample = self.storage.itervalues().next()
+        indexed = self._searchIndex['fields']
+        if field is None:
+            return indexed.keys()
+        elif field in sample._searchAttributes:
+            return [field]
+        try:
+            getattr(sample, field)
+            return None # an attribute that is not indexed
+        except AttributeError:
+            pass
+        for f in sample._searchAttributes:
+            if field.lower() in f.lower():
+                return [f]
+        return None
+
+    def _getSearchCandidates(self, query, field=None):
+        '''Return a sorted list of keys of stored metadata that might 
+        match the query, or None if the query cannot use the search index.
+
+        Every key that `Metadata.search()` matches is returned: each word 
+        of a matching query must be found within a word of a field value,
+        so words are found by looking up all suffixes of indexed words.
+        '''
+        if _isRegexQuery(query) or len(self.storage) == 0:
+            return None
+        tokens = _getSearchTokens(query)
+        if not tokens:
+            return None
+        self._updateSearchIndex()
+        fields = self._getSearchFields(field)
+        if fields is None:
+            return None
+
+        if self._searchSuffixes is None:
+            suffixes = set()
+            for words in self._searchIndex['fields'].values():
+                for word in words:
+                    for i in range(len(word)):
+                        suffixes.add((word[i:], word))
+            self._searchSuffixes = sorted(suffixes)
+
+        indexed = self._searchIndex['fields']
+        candidates = None
+        for token in set(tokens):
+            keys = set()
+            i = bisect.bisect_left(self._searchSuffixes, (token,))
+            while i < len(self._searchSuffixes):
+                suffix, word = self._searchSuffixes[i]
+                if not suffix.startswith(token):
+                    break
+                for f in fields:
+                    keys.update(indexed.get(f, {}).get(word, ()))
+                i += 1
+            if candidates is None:
+                candidates = keys
+            else:
+                candidates &= keys
+            if not candidates:
+                break
+        return sorted(candidates)
+
     def search(self, query, field=None, extList=None):
         '''Perform search, on all stored metadata, permit regular expression matching. 
 
         Return pairs of file paths and work numbers, or None
 
+        Queries that are not regular expressions only search metadata that
+        contains each word of the query, found with an index that is 
+        built on first use and stored with the bundle; regular expressions
+        search all metadata.
+
         >>> from music21 import *
         >>> mb = metadata.MetadataBundle()
         >>> mb.addFromPaths(corpus.getWorkList('ciconia'))
@@ -2125,7 +2715,10 @@ class MetadataBundle(base.JSONSerializer):
         11
         '''
         post = []
-        for key in self.storage.keys():
+        keys = self._getSearchCandidates(query, field)
+        if keys is None:
+            keys = self.storage.keys()
+        for key in keys:
             md = self.storage[key]
             match, fieldPost = md.search(query, field)
             if match:
@@ -2153,6 +2746,144 @@ class MetadataBundle(base.JSONSerializer):
 
 
 
+#-------------------------------------------------------------------------------
+# functions for MetadataBundle.addFromPaths(); these are module-level 
+# functions so that they can be called in other processes
+
+class _MetadataTimeout(BaseException):
+    pass
+
+def _raiseMetadataTimeout(signum, frame):
+    raise _MetadataTimeout()
+
+def _getMetadataEntries(fp, timeout=None):
+    '''Parse the file `fp` and return a tuple of the file path, a list of 
+    pairs of MetadataBundle keys and RichMetadata objects, and an error 
+    message, or None.
+    
+    If `timeout` is given, parsing is abandoned after `timeout` seconds.
+    This is only possible where signal.alarm() is available (i.e., not 
+    on Windows).
+    '''
+    # converter imports modules that import metadata
+    from music21 import converter
+    import signal
+
+    environLocal.printDebug(['updateMetadataCache: examining:', fp])
+    useAlarm = timeout is not None and hasattr(signal, 'SIGALRM')
+    if useAlarm:
+        previousHandler = signal.signal(signal.SIGALRM, _raiseMetadataTimeout)
+        signal.alarm(max(1, int(round(timeout))))
+    timeStart = time.time()
+    try:
+        try:
+            post = converter.parse(fp, forceSource=True)
+        except (_MetadataTimeout, Exception) as excp:
+            # parsers may catch the timeout and raise something else
+            if useAlarm and time.time() - timeStart >= timeout:
+                return (fp, None, 'timed out after %s seconds' % timeout)
+            return (fp, None, str(excp) or excp.__class__.__name__)
+    finally:
+        if useAlarm:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, previousHandler)
+
+    mb = MetadataBundle()
+    entries = []
+    if 'Opus' in post.classes:
+        # need to get scores from each opus?
+        # problem here is that each sub-work has metadata, but there
+        # is only a single source file
+        for s in post.scores:
+            md = s.metadata
+            # updgrade md to rmd
+            rmd = RichMetadata()
+            rmd.merge(md)
+            rmd.update(s) # update based on Stream
+            if md.number == None:
+                environLocal.printDebug(['addFromPaths: got Opus that contains Streams that do not have work numbers:', fp])
+            else:
+                # update path to include work number
+                cp = mb.corpusPathToKey(fp, number=md.number)
+                entries.append((cp, rmd))
+            del s # for memory conservation
+    else:
+        md = post.metadata
+        if md is not None:
+            rmd = RichMetadata()
+            rmd.merge(md)
+            rmd.update(post) # update based on Stream
+            entries.append((mb.corpusPathToKey(fp), rmd))
+    return (fp, entries, None)
+
+def _getFileHash(fp):
+    '''Return the md5 hash of the contents of the file `fp`.
+    '''
+    import hashlib
+    md5 = hashlib.md5()
+    f = open(fp, 'rb')
+    try:
+        while True:
+            data = f.read(1024 * 64)
+            if not data:
+                break
+            md5.update(data)
+    finally:
+        f.close()
+    return md5.hexdigest()
+
+# seconds allowed for each file of a chunk parsed in another process when 
+# no timeout is given; a chunk lost with a process that has died is only 
+# noticed after this time
+_METADATA_FILE_TIMEOUT = 600
+
+def _getMetadataEntriesChunk(args):
+    pathList, timeout = args
+    return [_getMetadataEntries(fp, timeout) for fp in pathList]
+
+def _getMetadataEntriesParallel(pathList, processes, chunkSize=4, 
+    timeout=None):
+    '''Call _getMetadataEntries() for each path in `pathList` with a pool 
+    of `processes` processes, yielding results in the order of `pathList`.
+
+    A chunk that does not return in time (e.g., because its process has 
+    died) yields an error for each of its paths. If `timeout` is None, 
+    files are not abandoned, but a chunk is only waited for 
+    _METADATA_FILE_TIMEOUT seconds for each of its files, and one more.
+    '''
+    import multiprocessing
+
+    chunkSize = max(1, chunkSize)
+    chunks = [pathList[i:i + chunkSize] for i in 
+              range(0, len(pathList), chunkSize)]
+    pool = multiprocessing.Pool(processes=processes)
+    try:
+        asyncResults = [pool.apply_async(_getMetadataEntriesChunk, 
+                        ((chunk, timeout),)) for chunk in chunks]
+        pool.close()
+        for chunk, asyncResult in zip(chunks, asyncResults):
+            # chunks are started in order, so once earlier chunks have 
+            # returned, this chunk has started; always wait for a limited 
+            # time, as get() without a timeout cannot be interrupted, and 
+            # the results of a process that dies never arrive
+            fileTimeout = timeout
+            if fileTimeout is None:
+                fileTimeout = _METADATA_FILE_TIMEOUT
+            # allow one more file for starting the chunk
+            chunkTimeout = fileTimeout * (len(chunk) + 1)
+            try:
+                results = asyncResult.get(chunkTimeout)
+            except multiprocessing.TimeoutError:
+                results = [(fp, None, 'timed out') for fp in chunk]
+            except Exception as excp:
+                results = [(fp, None, str(excp)) for fp in chunk]
+            for result in results:
+                yield result
+    finally:
+        # do not join(), which waits for chunks lost with a process
+        pool.terminate()
+
+
 #-------------------------------------------------------------------------------
 
 class Test(unittest.TestCase):
@@ -2420,6 +3151,245 @@ class Test(unittest.TestCase):
         self.assertEqual(s.metadata.search(re.compile('(.*)canon(.*)')), (True, 'title'))
 
 
+    def testAddFromPathsParallel(self):
+        from music21 import corpus
+
+        paths = corpus.getWorkList('ciconia') + corpus.getWorkList('bwv66.6')
+        paths.append(os.path.join(os.sep, 'not', 'a', 'file.xml'))
+        mb1 = MetadataBundle()
+        errors1 = mb1.addFromPaths(paths)
+        mb2 = MetadataBundle()
+        errors2 = mb2.addFromPaths(paths, processes=2, chunkSize=2, 
+            timeout=120)
+        self.assertEqual(errors2, errors1)
+        self.assertEqual(errors2, paths[-1:])
+        self.assertEqual(sorted(mb2.storage.keys()), 
+                         sorted(mb1.storage.keys()))
+        for key in mb1.storage:
+            self.assertEqual(mb2.storage[key].json, mb1.storage[key].json)
+
+    def testAddFromPathsParallelDeadProcess(self):
+        import sys
+        from music21 import corpus
+        # patch the module that defines this test, also when run as a script
+        module = sys.modules[self.__class__.__module__]
+        paths = corpus.getWorkList('bwv66.6') + ['exit']
+        getMetadataEntries = module._getMetadataEntries
+        fileTimeout = module._METADATA_FILE_TIMEOUT
+        def exitOrGet(fp, timeout=None):
+            if fp == 'exit':
+                os._exit(1)
+            return getMetadataEntries(fp, timeout)
+        module._getMetadataEntries = exitOrGet
+        module._METADATA_FILE_TIMEOUT = 1
+        try:
+            mb = MetadataBundle()
+            # without a timeout, the lost chunk is still only waited for 
+            # a limited time
+            errors = mb.addFromPaths(paths, processes=2, chunkSize=1)
+        finally:
+            module._getMetadataEntries = getMetadataEntries
+            module._METADATA_FILE_TIMEOUT = fileTimeout
+        self.assertEqual(errors, ['exit'])
+        self.assertEqual(len(mb.storage), 1)
+
+    def testUpdateFromPaths(self):
+        import tempfile, shutil
+        from music21 import corpus
+
+        dir = tempfile.mkdtemp()
+        try:
+            paths = []
+            for work in ['bwv66.6', 'ciconia']:
+                fpSrc = corpus.getWorkList(work)[0]
+                paths.append(os.path.join(dir, os.path.basename(fpSrc)))
+                shutil.copy(fpSrc, paths[-1])
+            mb = MetadataBundle('local')
+            self.assertEqual(mb.updateFromPaths(paths), [])
+            self.assertEqual(len(mb.storage), 2)
+            rmdBach = mb.storage[mb.corpusPathToKey(paths[0])]
+            rmdCiconia = mb.storage[mb.corpusPathToKey(paths[1])]
+
+            # fingerprints are stored
+            fp = os.path.join(dir, 'local.json')
+            mb.jsonWrite(fp)
+            mb = MetadataBundle('local')
+            mb.read(fp)
+            rmdBach = mb.storage[mb.corpusPathToKey(paths[0])]
+            rmdCiconia = mb.storage[mb.corpusPathToKey(paths[1])]
+
+            # a new modification time without changes does not parse
+            os.utime(paths[0], (0, 0))
+            # changing a file parses only that file
+            shutil.copy(corpus.getWorkList('ciconia')[1], paths[1])
+            self.assertEqual(mb.updateFromPaths(paths), [])
+            self.assertEqual(mb.storage[mb.corpusPathToKey(paths[0])] is 
+                rmdBach, True)
+            self.assertEqual(mb.storage[mb.corpusPathToKey(paths[1])] is 
+                rmdCiconia, False)
+            self.assertNotEqual(mb.storage[mb.corpusPathToKey(paths[1])].title,
+                rmdCiconia.title)
+
+            # removed files are dropped
+            self.assertEqual(mb.updateFromPaths(paths[:1]), [])
+            self.assertEqual(mb.storage.keys(), 
+                [mb.corpusPathToKey(paths[0])])
+            self.assertEqual(mb._fingerprints.keys(), 
+                [mb.corpusPathToKey(paths[0])])
+        finally:
+            shutil.rmtree(dir)
+
+    def testSearchIndex(self):
+        import tempfile
+        from music21 import corpus
+
+        paths = (corpus.getWorkList('essenFolksong/teste') + 
+                 corpus.getWorkList('ciconia') + 
+                 corpus.getWorkList('bwv66.6'))
+        mb = MetadataBundle('local')
+        mb.addFromPaths(paths)
+        mb.updateAccessPaths(paths)
+
+        def fullScan(query, field=None):
+            post = []
+            for key in mb.storage:
+                if mb.storage[key].search(query, field)[0]:
+                    post.append(key)
+            return sorted(post)
+
+        for query, field in [('china', 'locale'), ('bach', None), 
+            ('cicon', 'composer'), ('chuan', None), ('3/8', 'timeSignature'),
+            ('sichuan', 'title'), ('66', None), ('zzz', None)]:
+            keys = mb._getSearchCandidates(query, field)
+            post = [k for k in keys if mb.storage[k].search(query, field)[0]]
+            self.assertEqual(post, fullScan(query, field))
+            self.assertEqual(len(mb.search(query, field)), len(post))
+        self.assertEqual(len(mb.search('china', 'locale')) > 0, True)
+
+        # regular expressions, and fields that are not indexed, are scanned
+        self.assertEqual(mb._getSearchCandidates('sichuan|taiwan'), None)
+        self.assertEqual(mb._getSearchCandidates('e', 'ambitus'), None)
+
+        # the index is stored and read with the bundle
+        fd, fp = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            mb._updateSearchIndex()
+            mb.jsonWrite(fp)
+            mbNew = MetadataBundle('local')
+            mbNew.read(fp)
+            self.assertEqual(mbNew._searchIndex['count'], len(mb.storage))
+            # the index read is current, and is not rebuilt
+            self.assertEqual(mbNew._searchIndexChanges, 
+                             mbNew.storage.changes)
+            self.assertEqual(mbNew._getSearchCandidates('china', 'locale'),
+                             mb._getSearchCandidates('china', 'locale'))
+        finally:
+            os.remove(fp)
+
+    def testDatabaseA(self):
+        import tempfile, shutil
+        from music21 import corpus
+
+        paths = corpus.getWorkList('essenFolksong/teste') 
+        mb = MetadataBundle('local')
+        mb.addFromPaths(paths)
+        mb.updateAccessPaths(paths)
+        dir = tempfile.mkdtemp()
+        try:
+            fp = os.path.join(dir, 'local.db')
+            mb.writeDatabase(fp)
+            mbNew = MetadataBundle()
+            mbNew.read(fp)
+            self.assertEqual(mbNew.name, 'local')
+            self.assertEqual(sorted(mbNew.storage.keys()), 
+                             sorted(mb.storage.keys()))
+            self.assertEqual(mbNew._fingerprints, mb._fingerprints)
+            # no objects are created until needed
+            for key in mbNew.storage:
+                self.assertEqual(mbNew.storage.isLoaded(key), False)
+
+            mbNew.updateAccessPaths(paths)
+            post = mbNew.search('sichuan', 'locale')
+            self.assertEqual(post, mb.search('sichuan', 'locale'))
+            self.assertEqual(len(post), 1)
+            loaded = [k for k in mbNew.storage if mbNew.storage.isLoaded(k)]
+            self.assertEqual(len(loaded) < len(mbNew.storage), True)
+
+            for key in mb.storage:
+                self.assertEqual(mbNew.storage[key].title, mb.storage[key].title)
+                self.assertEqual(mbNew.storage[key].noteCount, 
+                                 mb.storage[key].noteCount)
+            # an existing file is replaced
+            mbNew.writeDatabase(fp)
+            self.assertEqual(os.listdir(dir), ['local.db'])
+
+            # reading replaces what is stored
+            mbOther = MetadataBundle('local')
+            mbOther.addFromPaths(corpus.getWorkList('bwv66.6'))
+            mbOther.readDatabase(fp)
+            self.assertEqual(sorted(mbOther.storage.keys()), 
+                             sorted(mb.storage.keys()))
+            self.assertEqual(mbOther._fingerprints, mb._fingerprints)
+
+            # methods of the storage create objects
+            storage = mbOther.storage
+            key = sorted(storage.keys())[0]
+            self.assertEqual(storage.copy()[key].title, mb.storage[key].title)
+            self.assertEqual(storage.setdefault(key).title, 
+                             mb.storage[key].title)
+            count = len(storage)
+            popped = storage.popitem()
+            self.assertEqual(popped[1].title, mb.storage[popped[0]].title)
+            self.assertEqual(len(storage), count - 1)
+
+            # files from other versions are not read
+            conn = sqlite3.connect(fp)
+            conn.execute("UPDATE info SET data = '[0, 1, 0]' WHERE name = 'version'")
+            conn.commit()
+            conn.close()
+            self.assertRaises(MetadataException, mbOther.readDatabase, fp)
+            self.assertEqual(len(mbOther.storage), count - 1)
+        finally:
+            shutil.rmtree(dir)
+
+    def testDatabaseB(self):
+        mb = MetadataBundle('virtual')
+        fpJSON = mb._getFilePath()
+        fp = mb._getDatabaseFilePaths(fpJSON)[-1]
+        if os.path.exists(fp):
+            os.remove(fp)
+        # reading the JSON file writes nothing by default
+        mb.read()
+        self.assertEqual(os.path.exists(fp), False)
+        # if requested, a database is written, which is read next time
+        mb = MetadataBundle('virtual')
+        mb.read(cacheDatabase=True)
+        self.assertEqual(os.path.exists(fp), True)
+        mbNew = MetadataBundle('virtual')
+        mbNew.read()
+        self.assertEqual(isinstance(mbNew.storage, _LazyMetadataStorage), 
+                         True)
+        self.assertEqual(sorted(mbNew.storage.keys()), 
+                         sorted(mb.storage.keys()))
+
+        # a database from another version is replaced
+        conn = sqlite3.connect(fp)
+        conn.execute("UPDATE info SET data = '[0, 1, 0]' WHERE name = 'version'")
+        conn.commit()
+        conn.close()
+        mbNew = MetadataBundle('virtual')
+        mbNew.read(cacheDatabase=True)
+        self.assertEqual(isinstance(mbNew.storage, _LazyMetadataStorage), 
+                         False)
+        self.assertEqual(sorted(mbNew.storage.keys()), 
+                         sorted(mb.storage.keys()))
+        mbNew = MetadataBundle('virtual')
+        mbNew.read()
+        self.assertEqual(isinstance(mbNew.storage, _LazyMetadataStorage), 
+                         True)
+        os.remove(fp)
+
     def testRichMetadataA(self):
         from music21 import base, corpus, metadata
 
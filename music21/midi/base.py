@@ -22,6 +22,7 @@ import unittest, doctest
 import unicodedata
 import sys, os, string, types
 import struct
+import mmap
 
 try:
     import StringIO # python 2 
@@ -100,6 +101,61 @@ def intsToHexString(intList):
     return post
     
 
+# struct formats for reading big-endian numbers of common lengths
+_numberFormats = {1: '>B', 2: '>H', 4: '>I'}
+
+def readNumber(data, offset, length):
+    '''Return the value of the `length` bytes of `data` (a string or any 
+    object with the buffer interface, such as an mmap) starting at 
+    `offset`, and the offset after them. 
+
+    Unlike :func:`~music21.midi.base.getNumber`, no remaining string is 
+    created; reading proceeds by moving the offset.
+
+    >>> from music21 import *
+    >>> midi.readNumber('test', 0, 2)
+    (29797, 2)
+    >>> midi.readNumber('test', 1, 3)
+    (6648692, 4)
+    >>> midi.readNumber('test', 4, 0)
+    (0, 4)
+    '''
+    if length in _numberFormats:
+        return (struct.unpack_from(_numberFormats[length], data, offset)[0],
+                offset + length)
+    sum = 0 
+    for i in range(offset, offset + length): 
+        sum = (sum << 8) + ord(data[i]) 
+    return sum, offset + length
+
+def readVariableLengthNumber(data, offset, end=None):
+    '''Return the value of the variable length number in `data` starting 
+    at `offset`, and the offset after it. A MidiException is raised if 
+    the number does not end before `end`, or before the end of `data` if 
+    `end` is None.
+
+    >>> from music21 import *
+    >>> midi.readVariableLengthNumber('A-u', 0)
+    (65, 1)
+    >>> midi.readVariableLengthNumber('A\\xff\\x7fu', 1)
+    (16383, 3)
+    >>> midi.readVariableLengthNumber('A\\xff\\x7fu', 1, 2)
+    Traceback (most recent call last):
+    MidiException: variable length number extends past the end of the data
+    '''
+    if end is None:
+        end = len(data)
+    sum = 0 
+    while True: 
+        if offset >= end:
+            raise MidiException(
+                'variable length number extends past the end of the data')
+        x = ord(data[offset]) 
+        sum = (sum << 7) + (x & 0x7F) 
+        offset += 1 
+        if not (x & 0x80): 
+            return sum, offset
+
 def getNumber(str, length): 
     '''Return the value of a string byte from an 8-bit string. Then, return the remaining string.
 
@@ -118,10 +174,8 @@ def getNumber(str, length):
     >>> midi.getNumber('test', 4)
     (1952805748, '')
     '''
-    sum = 0 
-    for i in range(length): 
-        sum = (sum << 8) + ord(str[i]) 
-    return sum, str[length:] 
+    sum, offset = readNumber(str, 0, length)
+    return sum, str[offset:] 
 
 def getVariableLengthNumber(str): 
     '''
@@ -158,16 +212,8 @@ def getVariableLengthNumber(str):
     # This allows the number to be read one byte at a time, and when you see a msb of 0, you know that it was the last (least significant) byte of the number.
     # additional reference here:
     # http://253.ccarh.org/handout/vlv/
-    sum = 0 
-    i = 0 
-    while True: 
-        x = ord(str[i]) 
-        #environLocal.printDebug(['getVariableLengthNumber: examined char:', charToBinary(str[i])])
-        sum = (sum << 7) + (x & 0x7F) 
-        i += 1 
-        if not (x & 0x80): 
-            #environLocal.printDebug(['getVariableLengthNumber: depth read into string: %s' % i])
-            return sum, str[i:] 
+    sum, offset = readVariableLengthNumber(str, 0)
+    return sum, str[offset:] 
 
 def getNumbersAsList(str):
     '''
@@ -548,15 +594,21 @@ class MidiEvent(object):
         self._parameter1 = d2
         self._parameter2 = d1 # d1 is msb here
         
-    def _parseChannelVoiceMessage(self, str):
+    def _parseChannelVoiceMessage(self, x, data, offset):
         '''
+        Given the status byte value `x`, parse the data bytes of a channel 
+        voice message found in `data` at `offset`; return the offset after 
+        the message.
+
         >>> from music21 import *
         >>> mt = midi.MidiTrack(1)
         >>> me1 = midi.MidiEvent(mt)
-        >>> remainder = me1._parseChannelVoiceMessage(midi.intsToHexString([144, 60, 120]))
+        >>> me1._parseChannelVoiceMessage(144, midi.intsToHexString([60, 120]), 0)
+        2
         >>> me1.channel
         1
-        >>> remainder = me1._parseChannelVoiceMessage(midi.intsToHexString([145, 60, 120]))
+        >>> me1._parseChannelVoiceMessage(145, midi.intsToHexString([145, 60, 120]), 1)
+        3
         >>> me1.channel
         2
         >>> me1.type
@@ -566,12 +618,9 @@ class MidiEvent(object):
         >>> me1.velocity
         120
         '''
-        # x, y, and z define characteristics of the first two chars
         # for x: The left nybble (4 bits) contains the actual command, and the right nibble contains the midi channel number on which the command will be executed.
-        x = ord(str[0]) # return the char number
         y = x & 0xF0  # bitwise and to derive channel number
-        z = ord(str[1])
-        thirdByte = str[2] 
+        z = ord(data[offset])
 
         self.channel = (x & 0x0F) + 1  # this is same as y + 1
         self.type = channelVoiceMessages.whatis(y) 
@@ -579,21 +628,21 @@ class MidiEvent(object):
         if (self.type == "PROGRAM_CHANGE" or 
             self.type == "CHANNEL_KEY_PRESSURE"): 
             self.data = z 
-            return str[2:] 
+            return offset + 1
         elif (self.type == "CONTROLLER_CHANGE"):
             # for now, do nothing with this data
-            # for a note, str[2] is velocity; here, it is the control value
+            # for a note, the third byte is velocity; here, it is the control value
             self.pitch = z # this is the controller id
-            self.velocity = ord(thirdByte) # this is the controller value
-            return str[3:] 
+            self.velocity = ord(data[offset + 1]) # this is the controller value
+            return offset + 2
         else: 
             self.pitch = z # the second byte
             # read the third chart toi get velocity 
-            self.velocity = ord(thirdByte) 
+            self.velocity = ord(data[offset + 1]) 
             # each MidiChannel object is accessed here
             # using that channel, data for each event is added or 
             # removed 
-            return str[3:] 
+            return offset + 2
 
     def read(self, time, str): 
         '''
@@ -618,16 +667,66 @@ class MidiEvent(object):
         1
         >>> (159 & 0x0F) + 1 # getting the channel
         16
+
+        >>> from music21 import *
+        >>> mt = midi.MidiTrack(1)
+        >>> me1 = midi.MidiEvent(mt)
+        >>> me1.read(0, midi.intsToHexString([144, 60, 120, 0]))
+        '\\x00'
+        >>> me1
+        <MidiEvent NOTE_ON, t=None, track=1, channel=1, pitch=60, velocity=120>
+        '''
+        offset = self.readAt(time, str, 0)
+        return str[offset:]
+
+    def readAt(self, time, data, offset, end=None): 
+        '''
+        Parse this event from `data` (a string or any object with the 
+        buffer interface, such as an mmap) starting at `offset`, and 
+        return the offset after the event. The event must end before 
+        `end`, or before the end of `data` if `end` is None; otherwise a 
+        MidiException is raised. 
+
+        No remaining string is created, and data is only copied 
+        for the `data` attribute of the event.
+
+        >>> from music21 import *
+        >>> mt = midi.MidiTrack(1)
+        >>> me1 = midi.MidiEvent(mt)
+        >>> data = midi.intsToHexString([0, 145, 60, 120, 61, 0])
+        >>> me1.readAt(0, data, 1)
+        4
+        >>> me1.pitch
+        60
+
+        A following event may use running status, taking its status byte 
+        from the event before:
+
+        >>> me2 = midi.MidiEvent(mt)
+        >>> me2.lastStatusByte = me1.lastStatusByte
+        >>> me2.readAt(0, data, 4)
+        6
+        >>> me2
+        <MidiEvent NOTE_ON, t=None, track=1, channel=2, pitch=61, velocity=0>
+
+        An event that does not fit before `end` is not read:
+
+        >>> me3 = midi.MidiEvent(mt)
+        >>> me3.readAt(0, data, 1, 3)
+        Traceback (most recent call last):
+        MidiException: midi event extends past the end of the track: NOTE_ON
         '''
-        if len(str) < 2:
+        if end is None:
+            end = len(data)
+        if end - offset < 2:
             # often what we have here are null events:
             # the string is simply: 0x00
-            environLocal.printDebug(['MidiEvent.read(): got bad data string', 'time', time, 'str', repr(str)])
-            return ''
+            environLocal.printDebug(['MidiEvent.read(): got bad data string', 'time', time, 'str', repr(data[offset:end])])
+            return end
 
         # x, y, and z define characteristics of the first two chars
         # for x: The left nybble (4 bits) contains the actual command, and the right nibble contains the midi channel number on which the command will be executed.
-        x = ord(str[0]) # given a string representation, get decimal number
+        x = ord(data[offset]) # given a string representation, get decimal number
 
         # detect running status: if the status byte is less than 128, its 
         # not a status byte, but a data byte
@@ -638,41 +737,49 @@ class MidiEvent(object):
                 rsb = self.lastStatusByte
             else: # provide a default
                 rsb = chr(0x90)
-            #post = self._parseChannelVoiceMessage(str, runningStatusByte=rsb)
-            #return post
-            # add the running status byte to the front of the string 
-            # and process as before
-            str = rsb + str
-            x = ord(str[0]) # given a string representation, get decimal number
+            # use the running status byte as the status of data bytes 
+            # starting at the present offset, and process as before
+            x = ord(rsb) # given a string representation, get decimal number
+            # the offset of the first data byte
+            dataOffset = offset
         else:
             # store last status byte
-            self.lastStatusByte = str[0]
+            self.lastStatusByte = data[offset]
+            dataOffset = offset + 1
 
         y = x & 0xF0  # bitwise and to derive message type
-        z = ord(str[1]) 
-
-        #environLocal.printDebug(['MidiEvent.read(): trying to parse a MIDI event, looking at first two chars:', 'repr(x)', repr(x), 'charToBinary(str[0])', charToBinary(str[0]), 'charToBinary(str[1])', charToBinary(str[1])])
+        z = ord(data[dataOffset]) 
 
         if channelVoiceMessages.hasValue(y): 
-            return self._parseChannelVoiceMessage(str)
+            if y == 0xC0 or y == 0xD0: # program change, channel pressure
+                dataLength = 1
+            else:
+                dataLength = 2
+            self._checkEventEnd(channelVoiceMessages.whatis(y), 
+                                dataOffset + dataLength, end)
+            return self._parseChannelVoiceMessage(x, data, dataOffset)
 
         elif y == 0xB0 and channelModeMessages.hasValue(z): 
+            self._checkEventEnd(channelModeMessages.whatis(z), 
+                                dataOffset + 2, end)
             self.channel = (x & 0x0F) + 1 
             self.type = channelModeMessages.whatis(z) 
             if self.type == "LOCAL_CONTROL": 
-                self.data = (ord(str[2]) == 0x7F) 
+                self.data = (ord(data[dataOffset + 1]) == 0x7F) 
             elif self.type == "MONO_MODE_ON": 
-                self.data = ord(str[2]) 
+                self.data = ord(data[dataOffset + 1]) 
             else:
-                environLocal.printDebug(['unhandled message:', str[2]])
-            return str[3:]
+                environLocal.printDebug(['unhandled message:', data[dataOffset + 1]])
+            return dataOffset + 2
 
         elif x == 0xF0 or x == 0xF7: 
             self.type = {0xF0: "F0_SYSEX_EVENT", 
                          0xF7: "F7_SYSEX_EVENT"}[x] 
-            length, str = getVariableLengthNumber(str[1:]) 
-            self.data = str[:length] 
-            return str[length:]
+            length, dataOffset = readVariableLengthNumber(data, 
+                                                          dataOffset, end) 
+            self._checkEventEnd(self.type, dataOffset + length, end)
+            self.data = data[dataOffset:dataOffset + length] 
+            return dataOffset + length
 
         # SEQUENCE_TRACK_NAME and other MetaEvents are here
         elif x == 0xFF: 
@@ -682,19 +789,36 @@ class MidiEvent(object):
                 sys.stdout.flush() 
                 raise MidiException("Unknown midi event type: %r, %r" % (x, z))
             self.type = metaEvents.whatis(z) 
-            length, str = getVariableLengthNumber(str[2:]) 
-            self.data = str[:length] 
-            # return remainder
-            return str[length:] 
+            length, dataOffset = readVariableLengthNumber(data, 
+                                                          dataOffset + 1, end) 
+            self._checkEventEnd(self.type, dataOffset + length, end)
+            self.data = data[dataOffset:dataOffset + length] 
+            # return offset of remainder
+            return dataOffset + length
         else:
             # an uncaught message
-            environLocal.printDebug(['got unknown midi event type', repr(x), 'charToBinary(str[0])', charToBinary(str[0]), 'charToBinary(str[1])', charToBinary(str[1])])
+            environLocal.printDebug(['got unknown midi event type', repr(x), 'charToBinary(str[0])', charToBinary(chr(x)), 'charToBinary(str[1])', charToBinary(chr(z))])
 
             raise MidiException("Unknown midi event type")
-            #return everything but the first character
-            return str[1:] # 
 
 
+    def _checkEventEnd(self, eventType, eventEnd, end):
+        '''
+        Raise a MidiException if an event of type `eventType` ending at 
+        `eventEnd` extends past `end`.
+
+        >>> from music21 import *
+        >>> mt = midi.MidiTrack(1)
+        >>> me1 = midi.MidiEvent(mt)
+        >>> me1._checkEventEnd('NOTE_ON', 4, 4)
+        >>> me1._checkEventEnd('NOTE_ON', 5, 4)
+        Traceback (most recent call last):
+        MidiException: midi event extends past the end of the track: NOTE_ON
+        '''
+        if eventEnd > end:
+            raise MidiException(
+                'midi event extends past the end of the track: %s' % eventType)
+
     def write(self): 
         '''
         Write out a midi track.
@@ -885,6 +1009,14 @@ class DeltaTime(MidiEvent):
         self.time, newstr = getVariableLengthNumber(oldstr) 
         return self.time, newstr 
 
+    def readAt(self, data, offset): 
+        '''
+        Read the time from `data` at `offset`; return the time and the 
+        offset after it.
+        '''
+        self.time, offset = readVariableLengthNumber(data, offset) 
+        return self.time, offset
+
     def write(self): 
         str = putVariableLengthNumber(self.time) 
         return str 
@@ -930,25 +1062,49 @@ class MidiTrack(object):
         Creates and stores :class:`~music21.midi.base.DeltaTime` 
         and :class:`~music21.midi.base.MidiEvent` objects. 
         '''
+        offset = self.readAt(str, 0)
+        return str[offset:] # remainder string after extracting track data
+
+    def readAt(self, data, offset): 
+        '''
+        Read the track found in `data` (a string or any object with the 
+        buffer interface, such as an mmap) at `offset`; return the offset 
+        after the track. 
+
+        Creates and stores :class:`~music21.midi.base.DeltaTime` 
+        and :class:`~music21.midi.base.MidiEvent` objects. 
+
+        >>> from music21 import *
+        >>> data = 'MTrk' + midi.putNumber(8, 4) + midi.intsToHexString(
+        ...     [0, 144, 60, 100, 96, 60, 0, 0])
+        >>> mt = midi.MidiTrack(1)
+        >>> mt.readAt(data, 0)
+        16
+        >>> mt.events[1]
+        <MidiEvent NOTE_ON, t=None, track=1, channel=1, pitch=60, velocity=100>
+        >>> mt.events[2]
+        <MidiEvent DeltaTime, t=96, track=1, channel=None>
+        >>> mt.events[3]
+        <MidiEvent NOTE_ON, t=None, track=1, channel=1, pitch=60, velocity=0>
+        '''
         time = 0 # a running counter of ticks
 
-        if not str[:4] == "MTrk":
+        if not data[offset:offset + 4] == "MTrk":
             raise MidiException('badly formed midi string: missing leading MTrk')
         # get the 4 chars after the MTrk encoding
-        length, str = getNumber(str[4:], 4)      
+        length, offset = readNumber(data, offset + 4, 4)      
         #environLocal.printDebug(['MidiTrack.read(): got chunk size', length])   
         self.length = length 
 
-        # all event data is in the track str
-        trackStr = str[:length] 
-        remainder = str[length:] 
+        # all event data is in the track
+        end = offset + length 
 
         ePrevious = None
-        while trackStr: 
+        while offset < end: 
             # shave off the time stamp from the event
             delta_t = DeltaTime(self) 
-            # return extracted time, as well as remaining string
-            dt, trackStrCandidate = delta_t.read(trackStr) 
+            # return extracted time, as well as the offset of the event
+            dt, offsetCandidate = delta_t.readAt(data, offset) 
             # this is the offset that this event happens at, in ticks
             timeCandidate = time + dt 
     
@@ -958,40 +1114,61 @@ class MidiTrack(object):
                 e.lastStatusByte = ePrevious.lastStatusByte
             # some midi events may raise errors; simply skip for now
             try:
-                trackStrCandidate = e.read(timeCandidate, trackStrCandidate) 
+                offsetCandidate = e.readAt(timeCandidate, data, 
+                                           offsetCandidate, end) 
             except MidiException:
-                # assume that trackStr, after delta extraction, is still correct
+                # assume that the offset, after delta extraction, is still correct
                 #environLocal.printDebug(['forced to skip event; delta_t:', delta_t])
                 # set to result after taking delta time
-                trackStr = trackStrCandidate
+                offset = offsetCandidate
                 continue
             # only set after trying to read, which may raise exception
             time = timeCandidate
-            trackStr = trackStrCandidate # remainder string
+            offset = offsetCandidate
             # only append if we get this far
             self.events.append(delta_t) 
             self.events.append(e) 
             ePrevious = e
 
-        return remainder # remainder string after extracting track data
+        return end # offset after the track data
     
     def write(self): 
         '''
         returns a string of midi-data from the `.events` in the object.
         '''
-        
+        buffer = bytearray()
+        self.writeInto(buffer)
+        return str(buffer)
+
+    def writeInto(self, buffer):
+        '''
+        Append the midi-data of the `.events` to a bytearray `buffer`, such 
+        that many tracks can be written without concatenating strings.
+
+        >>> from music21 import *
+        >>> mt = midi.MidiTrack(1)
+        >>> dt = midi.DeltaTime(mt)
+        >>> dt.time = 0
+        >>> me = midi.MidiEvent(mt, type='END_OF_TRACK')
+        >>> me.data = ''
+        >>> mt.events = [dt, me]
+        >>> buffer = bytearray('MThd')
+        >>> mt.writeInto(buffer)
+        >>> str(buffer)
+        'MThdMTrk\\x00\\x00\\x00\\x04\\x00\\xff/\\x00'
+        '''
         # set time to the first event
         time = self.events[0].time 
-        # build str using MidiEvents 
-        str = ""
+        start = len(buffer)
+        # the length is set after all events are written
+        buffer.extend("MTrk" + putNumber(0, 4))
         for e in self.events: 
             # this writes both delta time and message events
             try:
-                ew = e.write()
-                str = str + ew
+                buffer.extend(e.write())
             except MidiException as me:
                 environLocal.warn("Conversion error for %s: %s; ignored." % (e, me))
-        return "MTrk" + putNumber(len(str), 4) + str 
+        struct.pack_into('>I', buffer, start + 4, len(buffer) - start - 8)
     
     def __repr__(self): 
         r = "<MidiTrack %d -- %d events\n" % (self.index, len(self.events)) 
@@ -1097,29 +1274,40 @@ class MidiFile(object):
     def read(self): 
         '''
         Read and parse MIDI data stored in a file.
+
+        Files on disk are memory-mapped rather than read into a string.
         '''
-        self.readstr(self.file.read()) 
+        try:
+            data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, ValueError, EnvironmentError):
+            # file-like objects and empty files cannot be mapped
+            self.readstr(self.file.read()) 
+            return
+        try:
+            self.readstr(data)
+        finally:
+            data.close()
     
     def readstr(self, str): 
         '''
-        Read and parse MIDI data as a string.
+        Read and parse MIDI data as a string, or as any object with 
+        the buffer interface, such as an mmap.
         '''
         if not str[:4] == "MThd":
             raise MidiException('badly formated midi string, got: %s' % str[:20])
 
-        # we step through the str src, chopping off characters as we go
-        # and reassigning to str
-        length, str = getNumber(str[4:], 4) 
+        # we step through the str src, moving an offset as we go
+        length, offset = readNumber(str, 4, 4) 
         if not length == 6:
             raise MidiException('badly formated midi string')
 
-        format, str = getNumber(str, 2) 
+        format, offset = readNumber(str, offset, 2) 
         self.format = format 
         if not format in [0, 1]:
             raise MidiException('cannot handle midi file format: %s' % format)
 
-        numTracks, str = getNumber(str, 2) 
-        division, str = getNumber(str, 2) 
+        numTracks, offset = readNumber(str, offset, 2) 
+        division, offset = readNumber(str, offset, 2) 
 
         # very few midi files seem to define ticksPerSecond
         if division & 0x8000: 
@@ -1137,7 +1325,7 @@ class MidiFile(object):
 
         for i in range(numTracks): 
             trk = MidiTrack(i) # sets the MidiTrack index parameters
-            str = trk.read(str) # pass all the remaining string, reassing
+            offset = trk.readAt(str, offset) # get the offset of the next track
             self.tracks.append(trk) 
     
     def write(self): 
@@ -1155,12 +1343,14 @@ class MidiFile(object):
         # Don't handle ticksPerSecond yet, too confusing 
         if (division & 0x8000) != 0:
             raise MidiException('cannot write midi string')
-        str = "MThd" + putNumber(6, 4) + putNumber(self.format, 2) 
-        str = str + putNumber(len(self.tracks), 2) 
-        str = str + putNumber(division, 2) 
+        # all tracks are written into a single buffer
+        buffer = bytearray("MThd" + putNumber(6, 4) + 
+                           putNumber(self.format, 2)) 
+        buffer.extend(putNumber(len(self.tracks), 2))
+        buffer.extend(putNumber(division, 2))
         for trk in self.tracks: 
-            str = str + trk.write() 
-        return str 
+            trk.writeInto(buffer)
+        return str(buffer)
 
 
 
@@ -1480,6 +1670,61 @@ class Test(unittest.TestCase):
         #    print n, n.quarterLength
         #s.show()
 
+    def testMappedReadAndWrite(self):
+        from music21 import common
+
+        dir = common.getPackageDir(relative=False, remapSep=os.sep)
+        for fp in dir:
+            if fp.endswith('midi'):
+                break
+        dirLib = os.path.join(fp, 'testPrimitive')
+        # a file that uses running status
+        fp = os.path.join(dirLib, 'test09.mid')
+
+        # reading from disk memory-maps the file
+        mfMapped = MidiFile()
+        mfMapped.open(fp)
+        mfMapped.read()
+        mfMapped.close()
+
+        f = open(fp, 'rb')
+        data = f.read()
+        f.close()
+        mfString = MidiFile()
+        mfString.readstr(data)
+
+        self.assertEqual(len(mfMapped.tracks), len(mfString.tracks))
+        self.assertEqual(repr(mfMapped), repr(mfString))
+        # writing and reading again results in the same events
+        dataOut = mfMapped.writestr()
+        self.assertEqual(dataOut, mfString.writestr())
+        mfOut = MidiFile()
+        mfOut.readstr(dataOut)
+        self.assertEqual(repr(mfOut), repr(mfString))
+        for i in range(len(mfOut.tracks)):
+            self.assertEqual(mfOut.tracks[i].write(), 
+                             mfString.tracks[i].write())
+
+    def testReadEventPastTrackEnd(self):
+        # a text event claiming five bytes at the end of the first track
+        # must not read the second track
+        trackData = intsToHexString([0, 144, 60, 100, 0, 255, 1, 5])
+        data = 'MTrk' + putNumber(len(trackData), 4) + trackData
+        trackData = intsToHexString([0, 144, 62, 100, 96, 62, 0])
+        data += 'MTrk' + putNumber(len(trackData), 4) + trackData
+
+        mt1 = MidiTrack(1)
+        offset = mt1.readAt(data, 0)
+        self.assertEqual(offset, 16)
+        self.assertEqual([e.type for e in mt1.events 
+                          if e.type == 'TEXT_EVENT'], [])
+        self.assertEqual(mt1.events[1].pitch, 60)
+
+        mt2 = MidiTrack(2)
+        self.assertEqual(mt2.readAt(data, offset), len(data))
+        self.assertEqual([e.pitch for e in mt2.events 
+                          if e.type == 'NOTE_ON'], [62, 62])
+
 #-------------------------------------------------------------------------------
 # define presented order in documentation
 _DOC_ORDER = []
@@ -1312,41 +1312,24 @@ def packetsToMidiTrack(packets, trackId=1, channels=None):
 
 
 
-def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
-    inputM21=None):
+def _getTimedEventsAndNotes(mt):
     '''
-    Note that quantization takes place in stream.py since it's useful not just for MIDI.
+    Given a :class:`~music21.midi.base.MidiTrack`, return a list of 
+    [absolute time, event] pairs for all events (discarding delta times), 
+    and a list of [[time, note on event], [time, note off event]] 
+    pairs for all matched notes. Times are in ticks.
 
     >>> from music21 import *
-    >>> import os
-    >>> fp = os.path.join(common.getSourceFilePath(), 'midi', 'testPrimitive',  'test05.mid')
-    >>> mf = midi.MidiFile()
-    >>> mf.open(fp)
-    >>> mf.read()
-    >>> mf.close()
-    >>> len(mf.tracks)
-    1
-    >>> mt = mf.tracks[0] 
-    >>> s = midi.translate.midiTrackToStream(mt)
-    >>> s
-    <music21.stream.Stream ...>
-    >>> len(s.notesAndRests)
-    11
+    >>> mt = midi.MidiTrack(1)
+    >>> mt.read('MTrk' + midi.putNumber(13, 4) + midi.intsToHexString(
+    ...     [0, 144, 60, 100, 0, 64, 100, 96, 60, 0, 32, 64, 0]))
+    ''
+    >>> events, notes = midi.translate._getTimedEventsAndNotes(mt)
+    >>> len(events)
+    4
+    >>> [(on[0], off[0], on[1].pitch) for on, off in notes]
+    [(0, 96, 60), (0, 128, 64)]
     '''
-    #environLocal.printDebug(['midiTrackToStream(): got midi track: events', len(mt.events), 'ticksPerQuarter', ticksPerQuarter])
-
-    if inputM21 == None:
-        from music21 import stream
-        s = stream.Stream()
-    else:
-        s = inputM21
-    if ticksPerQuarter == None:
-        ticksPerQuarter = defaults.ticksPerQuarter
-
-    # need to build chords and notes
-    from music21 import chord
-    from music21 import note
-
     # get an abs start time for each event, discard deltas
     events = []
     t = 0
@@ -1359,8 +1342,8 @@ def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
     i = 0
     while i < len(mt.events):
         # in pairs, first should be delta time, second should be event
-        #environLocal.printDebug(['midiTrackToStream(): index', 'i', i, mt.events[i]])
-        #environLocal.printDebug(['midiTrackToStream(): index', 'i+1', i+1, mt.events[i+1]])
+        #environLocal.printDebug(['_getTimedEventsAndNotes(): index', 'i', i, mt.events[i]])
+        #environLocal.printDebug(['_getTimedEventsAndNotes(): index', 'i+1', i+1, mt.events[i+1]])
 
         # need to find pairs of delta time and events
         # in some cases, there are delta times that are out of order, or
@@ -1374,11 +1357,11 @@ def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
             continue
         elif (not mt.events[i].isDeltaTime() and not 
             mt.events[i+1].isDeltaTime()):
-            #environLocal.printDebug(['midiTrackToStream(): got two non delta times in a row'])
+            #environLocal.printDebug(['_getTimedEventsAndNotes(): got two non delta times in a row'])
             i += 1
             continue
         elif mt.events[i].isDeltaTime() and mt.events[i+1].isDeltaTime():
-            #environLocal.printDebug(['midiTrackToStream(): got two delta times in a row'])
+            #environLocal.printDebug(['_getTimedEventsAndNotes(): got two delta times in a row'])
             i += 1
             continue
         else:
@@ -1389,10 +1372,9 @@ def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
     #environLocal.printDebug(['raw event pairs', events])
     # need to pair note-on with note-off
     notes = [] # store pairs of pairs
-    metaEvents = [] # store pairs of abs time, m21 object
-    memo = [] # store already matched note off
+    memo = {} # store already matched note off
     for i in range(len(events)):
-        #environLocal.printDebug(['midiTrackToStream(): paired events', events[i][0], events[i][1]])
+        #environLocal.printDebug(['_getTimedEventsAndNotes(): paired events', events[i][0], events[i][1]])
         if i in memo:
             continue
         t, e = events[i]
@@ -1400,13 +1382,13 @@ def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
         # events
         if e.isNoteOn():
             match = None
-            #environLocal.printDebug(['midiTrackToStream(): isNoteOn', e])
+            #environLocal.printDebug(['_getTimedEventsAndNotes(): isNoteOn', e])
             for j in range(i+1, len(events)):
                 if j in memo: 
                     continue
                 tSub, eSub = events[j]
                 if e.matchedNoteOff(eSub):
-                    memo.append(j)
+                    memo[j] = True
                     match = i, j
                     break
             if match is not None:
@@ -1414,7 +1396,50 @@ def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
                 notes.append([events[i], events[j]])
             else:
                 pass
-                #environLocal.printDebug(['midiTrackToStream(): cannot find a note off for a note on', e])
+                #environLocal.printDebug(['_getTimedEventsAndNotes(): cannot find a note off for a note on', e])
+    return events, notes
+
+
+def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
+    inputM21=None):
+    '''
+    Note that quantization takes place in stream.py since it's useful not just for MIDI.
+
+    >>> from music21 import *
+    >>> import os
+    >>> fp = os.path.join(common.getSourceFilePath(), 'midi', 'testPrimitive',  'test05.mid')
+    >>> mf = midi.MidiFile()
+    >>> mf.open(fp)
+    >>> mf.read()
+    >>> mf.close()
+    >>> len(mf.tracks)
+    1
+    >>> mt = mf.tracks[0] 
+    >>> s = midi.translate.midiTrackToStream(mt)
+    >>> s
+    <music21.stream.Stream ...>
+    >>> len(s.notesAndRests)
+    11
+    '''
+    #environLocal.printDebug(['midiTrackToStream(): got midi track: events', len(mt.events), 'ticksPerQuarter', ticksPerQuarter])
+
+    if inputM21 == None:
+        from music21 import stream
+        s = stream.Stream()
+    else:
+        s = inputM21
+    if ticksPerQuarter == None:
+        ticksPerQuarter = defaults.ticksPerQuarter
+
+    # need to build chords and notes
+    from music21 import chord
+    from music21 import note
+
+    events, notes = _getTimedEventsAndNotes(mt)
+    metaEvents = [] # store pairs of abs time, m21 object
+    for t, e in events:
+        if e.isNoteOn():
+            continue
         else:
             if e.type == 'TIME_SIGNATURE':
                 # time signature should be 4 bytes
@@ -1537,6 +1562,47 @@ def midiTrackToStream(mt, ticksPerQuarter=None, quantizePost=True,
         s.makeRests(inPlace=True, fillGaps=True)
     return s
 
+
+def midiTrackToEvents(mt, ticksPerQuarter=None):
+    '''
+    Translate a :class:`~music21.midi.base.MidiTrack` into a list of 
+    (onset, MIDI pitch number, duration) tuples, one for each note, 
+    without creating Note, Chord, or Stream objects. Onsets and 
+    durations are in quarter lengths, and are not quantized; tuples 
+    are sorted by onset and then pitch. As when creating Notes, 
+    notes with a duration of zero are given a duration of 1.0.
+
+    This is useful for gathering statistics over many MIDI files.
+
+    >>> from music21 import *
+    >>> import os
+    >>> fp = os.path.join(common.getSourceFilePath(), 'midi', 'testPrimitive',  'test05.mid')
+    >>> mf = midi.MidiFile()
+    >>> mf.open(fp)
+    >>> mf.read()
+    >>> mf.close()
+    >>> events = midi.translate.midiTrackToEvents(mf.tracks[0], mf.ticksPerQuarterNote)
+    >>> len(events)
+    13
+    >>> events[:3]
+    [(0.0, 36, 1.0), (2.0, 53, 1.0), (2.0, 68, 1.0)]
+    '''
+    if ticksPerQuarter == None:
+        ticksPerQuarter = defaults.ticksPerQuarter
+    tpq = float(ticksPerQuarter)
+    post = []
+    unused, notes = _getTimedEventsAndNotes(mt)
+    for on, off in notes:
+        tOn, eOn = on
+        dur = off[0] - tOn
+        if dur != 0:
+            ql = dur / tpq
+        else: # as in midiEventsToNote
+            ql = 1.0
+        post.append((tOn / tpq, eOn.pitch, ql))
+    post.sort()
+    return post
+
     
 def _prepareStreamForMidi(s):
     '''
@@ -1738,22 +1804,57 @@ def midiTracksToStreams(midiTracks, ticksPerQuarter=None, quantizePost=True,
                               inputM21=conductorTrack)
     #environLocal.printDebug(['show() conductorTrack elements'])
     # if we have time sig/key sig elements, add to each part
-    for p in s.getElementsByClass('Stream'):
-        for e in conductorTrack.getElementsByClass(
-                            ('TimeSignature', 'KeySignature')):
-            # create a deepcopy of the element so a flat does not cause
-            # multiple references of the same
-            eventCopy = copy.deepcopy(e)
-            p.insert(e.getOffsetBySite(conductorTrack), eventCopy)
-
-    # if there is a conductor track, add tempo only to the top-most part
-    p = s.getElementsByClass('Stream')[0]
-    for e in conductorTrack.getElementsByClass('MetronomeMark'):
+    parts = s.getElementsByClass('Stream')
+    for i, p in enumerate(parts):
+        # if there is a conductor track, add tempo only to the top-most part
+        _insertConductorElements(p, conductorTrack, includeTempo=(i == 0))
+    return s
+
+
+def _insertConductorElements(p, conductorTrack, includeTempo=False):
+    '''
+    Insert copies of the TimeSignature and KeySignature objects of 
+    the Stream `conductorTrack` into the Stream `p`; if `includeTempo` 
+    is True, copies of MetronomeMark objects are inserted as well.
+    '''
+    classes = ['TimeSignature', 'KeySignature']
+    if includeTempo:
+        classes.append('MetronomeMark')
+    for e in conductorTrack.getElementsByClass(classes):
         # create a deepcopy of the element so a flat does not cause
         # multiple references of the same
         eventCopy = copy.deepcopy(e)
         p.insert(e.getOffsetBySite(conductorTrack), eventCopy)
-    return s
+
+
+def midiTracksToParts(midiTracks, ticksPerQuarter=None, quantizePost=True):
+    '''
+    A generator that translates a list of midiTracks one at a time, 
+    yielding a :class:`~music21.stream.Part` for each track that has 
+    notes as soon as it is translated. Unlike 
+    :func:`~music21.midi.translate.midiTracksToStreams`, no Score is 
+    built, so each Part can be processed and discarded before 
+    the next track is translated.
+
+    Time signatures, key signatures, and (for the first Part only) 
+    tempos found in tracks without notes are added to each following 
+    Part; in most MIDI files such a conductor track comes first. 
+    '''
+    from music21 import stream
+    conductorTrack = stream.Stream()
+    isFirst = True
+    for mt in midiTracks:
+        if mt.hasNotes(): 
+            streamPart = stream.Part() 
+            midiTrackToStream(mt, ticksPerQuarter, quantizePost, 
+                              inputM21=streamPart)
+            _insertConductorElements(streamPart, conductorTrack, 
+                                     includeTempo=isFirst)
+            isFirst = False
+            yield streamPart
+        else:
+            midiTrackToStream(mt, ticksPerQuarter, quantizePost, 
+                              inputM21=conductorTrack)
 
 
 def streamToMidiFile(inputM21):
@@ -1836,6 +1937,53 @@ def midiFileToStream(mf, inputM21=None):
     return s
 
 
+def midiFileToParts(mf, quantizePost=True):
+    '''
+    A generator that yields a :class:`~music21.stream.Part` for each 
+    track with notes in a :class:`~music21.midi.base.MidiFile` object, 
+    translating each track only when the next Part is requested. 
+    See :func:`~music21.midi.translate.midiTracksToParts`.
+
+    >>> from music21 import *
+    >>> import os
+    >>> fp = os.path.join(common.getSourceFilePath(), 'midi', 'testPrimitive',  'test05.mid')
+    >>> mf = midi.MidiFile()
+    >>> mf.open(fp)
+    >>> mf.read()
+    >>> mf.close()
+    >>> for p in midi.translate.midiFileToParts(mf):
+    ...     print p, len(p.flat.notesAndRests)
+    <music21.stream.Part ...> 11
+    '''
+    if len(mf.tracks) == 0:
+        raise TranslateException('no tracks are defined in this MIDI file.')
+    return midiTracksToParts(mf.tracks, 
+        ticksPerQuarter=mf.ticksPerQuarterNote, quantizePost=quantizePost)
+
+
+def midiFileToEvents(mf):
+    '''
+    A generator that yields, for each track with notes in a 
+    :class:`~music21.midi.base.MidiFile` object, a list of 
+    (onset, MIDI pitch number, duration) tuples, as returned by 
+    :func:`~music21.midi.translate.midiTrackToEvents`. No music21 
+    objects are created.
+
+    >>> from music21 import *
+    >>> import os
+    >>> fp = os.path.join(common.getSourceFilePath(), 'midi', 'testPrimitive',  'test05.mid')
+    >>> mf = midi.MidiFile()
+    >>> mf.open(fp)
+    >>> mf.read()
+    >>> mf.close()
+    >>> [len(events) for events in midi.translate.midiFileToEvents(mf)]
+    [13]
+    '''
+    for mt in mf.tracks:
+        if mt.hasNotes():
+            yield midiTrackToEvents(mt, mf.ticksPerQuarterNote)
+
+
 
 #-------------------------------------------------------------------------------
 class Test(unittest.TestCase):
@@ -2536,6 +2684,51 @@ class Test(unittest.TestCase):
         self.assertEqual(len(s.parts[0].voices), 2)
 
 
+    def testStreamingImportA(self):
+        import os
+        from music21 import midi
+
+        dir = common.getPackageDir(relative=False, remapSep=os.sep)
+        for fp in dir:
+            if fp.endswith('midi'):
+                break
+        dirLib = os.path.join(fp, 'testPrimitive')
+        # a file with a conductor track and four parts
+        fp = os.path.join(dirLib, 'test02.mid')
+        mf = midi.MidiFile()
+        mf.open(fp)
+        mf.read()
+        mf.close()
+
+        s = midiFileToStream(mf)
+        sParts = s.getElementsByClass('Stream')
+        parts = list(midiFileToParts(mf))
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(len(parts), len(sParts))
+        for i in range(len(parts)):
+            self.assertEqual(len(parts[i].flat.notesAndRests), 
+                             len(sParts[i].flat.notesAndRests))
+            self.assertEqual(
+                len(parts[i].flat.getElementsByClass('TimeSignature')), 2)
+        # tempo is only found in the first part
+        self.assertEqual(
+            len(parts[0].flat.getElementsByClass('MetronomeMark')), 1)
+        self.assertEqual(
+            len(parts[1].flat.getElementsByClass('MetronomeMark')), 0)
+
+        # events do not create notes, but match the pitches of the notes
+        eventLists = list(midiFileToEvents(mf))
+        self.assertEqual(len(eventLists), len(parts))
+        for i in range(len(parts)):
+            pitches = []
+            for n in sParts[i].flat.notes:
+                pitches += [p.midi for p in n.pitches]
+            self.assertEqual(sorted(pitches), 
+                             sorted([e[1] for e in eventLists[i]]))
+        for onset, pitch, dur in eventLists[0]:
+            self.assertEqual(isinstance(pitch, int), True)
+            self.assertEqual(dur > 0, True)
+
     def testImportChordsA(self):
         import os
         from music21 import converter, common
@@ -634,11 +634,19 @@ class MuseDataMeasure(object):
         return bl
 
 
-    def getMeasureObject(self):
-        '''Return a configured music21 :class:`~music21.stream.Measure`.
-        '''
-        from music21 import stream
+    def getMeasureNumber(self):
+        '''Return the number of this measure as an integer, as given to 
+        the Measure made by getMeasureObject(), or None if the 
+        definition has no numeric measure number.
 
+        >>> from music21 import *
+        >>> mdm = musedata.MuseDataMeasure(['measure 12       A'])
+        >>> mdm.getMeasureNumber()
+        12
+        >>> mdm = musedata.MuseDataMeasure(['C4     4        q     u'])
+        >>> mdm.getMeasureNumber()
+        1
+        '''
         data = self.src[0].strip() # get first line
         # not all measure first-lines begin w/ measures, such as pickups
         if data[0] != 'm': # a normal data record
@@ -648,15 +656,24 @@ class MuseDataMeasure(object):
         mNumber = '1'
         if len(data) >= 9 and data[8:].strip() != '':
             mNumber, junk = common.getNumFromStr(data)
+        if mNumber != '':
+            return int(mNumber)
+        return None
 
+    def getMeasureObject(self):
+        '''Return a configured music21 :class:`~music21.stream.Measure`.
+        '''
+        from music21 import stream
+
+        mNumber = self.getMeasureNumber()
         m = stream.Measure()
         # assume that this definition refers to this bar; this is not 
         # always the case
         m.leftBarline = self.getBarObject()
         #m.rightBarline = None
 
-        if mNumber != '':
-            m.number = int(mNumber)
+        if mNumber is not None:
+            m.number = mNumber
         return m
 
     def hasNotes(self):
@@ -21,6 +21,7 @@ import unittest
 
 from music21.musedata import base as museDataModule
 
+from music21 import common
 from music21 import environment
 from music21 import exceptions21
 _MOD = 'musedata.translate.py'
@@ -153,8 +154,13 @@ def _processPending(hasVoices, pendingRecords, eLast, m, vActive):
             m._insertCore(e.getOffsetBySite(m), d)
     return e
 
-def musedataPartToStreamPart(museDataPart, inputM21=None):
+def musedataPartToStreamPart(museDataPart, inputM21=None, measureRange=None):
     '''Translate a musedata part to a :class:`~music21.stream.Part`.
+
+    If `measureRange` is given as a pair of measure numbers (start, end), 
+    only measures numbered from start to end (inclusive) are translated; 
+    the first translated measure gets the clef, time signature, and key 
+    signature of the part.
     '''
     from music21 import stream
     from music21 import meter
@@ -183,6 +189,13 @@ def musedataPartToStreamPart(museDataPart, inputM21=None):
         #environLocal.printDebug(['processing:', mdm.src])
         if not mdm.hasNotes():
             continue
+        if measureRange is not None:
+            # a measure without a number is numbered 0, as by Measure
+            mNumber = mdm.getMeasureNumber()
+            if mNumber is None:
+                mNumber = 0
+            if mNumber < measureRange[0] or mNumber > measureRange[1]:
+                continue
 
         if mdm.hasVoices():
             hasVoices = True
@@ -319,13 +332,30 @@ def musedataPartToStreamPart(museDataPart, inputM21=None):
     return s
 
 
-def museDataWorkToStreamScore(museDataWork, inputM21=None):
+def museDataWorkToStreamScore(museDataWork, inputM21=None, parts=None, 
+    measureRange=None):
     '''Given an museDataWork object, build into a multi-part :class:`~music21.stream.Score` with metadata.
 
     This assumes that this MuseDataHandler defines a single work (with 1 or fewer reference numbers). 
     
     if the optional parameter inputM21 is given a music21 Stream subclass, it will use that object
     as the outermost object.  However, inner parts will always be made :class:`~music21.stream.Part` objects.
+
+    If `parts` is given, only the selected parts are translated; each 
+    selection is an index (counting from zero) or a part name. If 
+    `measureRange` is given as a pair of measure numbers (start, end), only 
+    those measures are translated.
+
+    >>> from music21 import *
+    >>> from music21.musedata import testFiles
+    >>> mdw = musedata.MuseDataWork()
+    >>> mdw.addString(testFiles.bach_cantata5_mvmt3)
+    >>> s = musedata.translate.museDataWorkToStreamScore(mdw, measureRange=(3, 4))
+    >>> [m.number for m in s.parts[0].getElementsByClass('Measure')]
+    [3, 4]
+    >>> s = musedata.translate.museDataWorkToStreamScore(mdw, parts=[6])
+    Traceback (most recent call last):
+    MuseDataTranslateException: cannot find a part for selection: 6
     '''
     from music21 import stream
     from music21 import metadata
@@ -350,8 +380,19 @@ def museDataWorkToStreamScore(museDataWork, inputM21=None):
     #md.localeOfComposition = mdpObjs[0].getWorkNumber()
     md.number = mdpObjs[0].getWorkNumber()
 
-    for mdPart in mdpObjs:
-        musedataPartToStreamPart(mdPart, s)
+    if parts is not None:
+        partNames = [mdPart.getPartName() for mdPart in mdpObjs]
+        for selection in parts:
+            if selection not in partNames and not (common.isNum(selection)
+                and 0 <= selection < len(mdpObjs)):
+                raise MuseDataTranslateException(
+                    'cannot find a part for selection: %s' % selection)
+
+    for i, mdPart in enumerate(mdpObjs):
+        if parts is not None and i not in parts and (
+            mdPart.getPartName() not in parts):
+            continue
+        musedataPartToStreamPart(mdPart, s, measureRange=measureRange)
     return s
 
 
@@ -3884,6 +3884,59 @@ class Handler(xml.sax.ContentHandler):
 
 
 
+class StreamingHandler(Handler):
+    '''A SAX handler that, rather than retaining all Part and Measure objects 
+    in the Score, passes each completed Measure to `measureCallback` and each
+    completed Part to `partCallback`, and then discards the Measures. The 
+    Score returned by getContent() thus only has header information (such 
+    as the part-list, identification, and credits) and Parts without 
+    Measures.
+
+    Both callbacks are called with the Score (with its partListObj already 
+    set) and the Part; the `measureCallback` also gets the Measure.
+
+    >>> from music21 import *
+    >>> from music21.musicxml import testPrimitive
+    >>> found = []
+    >>> def measureCallback(mxScore, mxPart, mxMeasure):
+    ...     found.append((mxPart.get('id'), mxMeasure.get('number')))
+    >>> d = musicxml.Document()
+    >>> d.readStreaming(testPrimitive.pitches01a, measureCallback)
+    >>> found[:3]
+    [(u'P1', u'1'), (u'P1', u'2'), (u'P1', u'3')]
+    >>> len(d.score)
+    1
+    >>> len(d.score.componentList[0])
+    0
+    >>> d.score.getPartIdsFromPartListObj()
+    [u'P1']
+    '''
+    def __init__(self, tagLib=None, measureCallback=None, partCallback=None):
+        Handler.__init__(self, tagLib)
+        self._measureCallback = measureCallback
+        self._partCallback = partCallback
+
+    def endElement(self, name):
+        if name == 'measure':
+            mxMeasure = self._mxObjs['measure']
+        elif name == 'part':
+            mxPart = self._mxObjs['part']
+        Handler.endElement(self, name)
+
+        if name == 'measure':
+            mxPart = self._mxObjs['part']
+            # the Measure has been appended to the Part; remove it
+            mxPart.componentList.pop()
+            if self._measureCallback is not None:
+                self._measureCallback(self._mxObjs['score'], mxPart, mxMeasure)
+        elif name == 'part':
+            if self._partCallback is not None:
+                self._partCallback(self._mxObjs['score'], mxPart)
+        elif name == 'part-list':
+            # make available to callbacks before parts are processed
+            self._mxObjs['score'].partListObj = self._mxObjs['part-list']
+
+
 #-------------------------------------------------------------------------------
 class Document(object):
     '''Represent a MusicXML document, 
@@ -3904,12 +3957,15 @@ class Document(object):
         saxparser.setFeature(xml.sax.handler.feature_namespaces, 0)   
         return saxparser
 
-    def _load(self, fileLike, file=True, audit=False):
+    def _load(self, fileLike, file=True, audit=False, handler=None):
         saxparser = self._getParser()
         #t = common.Timer()
         #t.start()
         # call the handler with tagLib
-        h = Handler(self.tagLib) 
+        if handler is None:
+            h = Handler(self.tagLib) 
+        else:
+            h = handler
         saxparser.setContentHandler(h)
 
         if not file:
@@ -3924,9 +3980,17 @@ class Document(object):
         # subsequent parsing operations produce an unclosed token error
         try:
             saxparser.parse(fileLikeOpen)
+        except xml.sax.SAXParseException, e:
+            # with a streaming handler, the parts completed so far 
+            # would otherwise be returned as a complete score
+            if handler is not None:
+                raise DocumentException('cannot parse MusicXML: %s' % e)
         except:
+            # errors raised by a provided handler's callbacks must propagate
+            if handler is not None:
+                raise
+        finally:
             fileLikeOpen.close()
-        fileLikeOpen.close()
 
         #t.stop()
         #environLocal.printDebug(['parsing time:', t])
@@ -3951,6 +4015,23 @@ class Document(object):
     def open(self, fp, audit=False):
         self._load(fp, True, audit)
 
+    def readStreaming(self, xmlString, measureCallback=None, 
+        partCallback=None):
+        '''Load MusicXML from a string with a 
+        :class:`~music21.musicxml.base.StreamingHandler`, passing each 
+        Measure and Part to the callbacks as they are completed. The 
+        resulting Score has Parts without Measures.
+        '''
+        h = StreamingHandler(self.tagLib, measureCallback, partCallback)
+        self._load(xmlString, False, handler=h)
+
+    def openStreaming(self, fp, measureCallback=None, partCallback=None):
+        '''Load MusicXML from a file path with a 
+        :class:`~music21.musicxml.base.StreamingHandler`.
+        '''
+        h = StreamingHandler(self.tagLib, measureCallback, partCallback)
+        self._load(fp, True, handler=h)
+
     #---------------------------------------------------------------------------        
     # convenience routines to get meta-data
     def getBestTitle(self):
@@ -15,6 +15,7 @@ Low-level conversion routines between MusicXML and music21.
 '''
 import unittest
 import copy
+import StringIO # this module is not supported in python3
 
 from music21.musicxml import base as musicxmlMod
 
@@ -88,18 +89,86 @@ def music21ObjectToMusicXML(m21Object):
     else:
         raise TranslateException("Cannot translate the object %s to a complete musicXML document; put it in a Stream first!" % m21Object)
 
+def music21ObjectToMusicXMLFile(m21Object, fileLike):
+    '''
+    Translate an arbitrary music21 object to a complete musicxml 
+    document written to the file-like object `fileLike`. Streams other 
+    than Measures are written measure by measure, with 
+    :func:`~music21.musicxml.translate.streamToMusicXMLFile`; other 
+    objects are translated as by 
+    :func:`~music21.musicxml.translate.music21ObjectToMusicXML`.
+
+    this is called by music21.base.write()
+
+    >>> from music21 import *
+    >>> import StringIO
+    >>> f = StringIO.StringIO()
+    >>> musicxml.translate.music21ObjectToMusicXMLFile(note.Note(), f)
+    >>> f.getvalue().count('<note')
+    1
+    '''
+    classes = m21Object.classes
+    if 'Stream' in classes and 'Measure' not in classes:
+        streamToMusicXMLFile(m21Object, fileLike)
+    else:
+        fileLike.write(music21ObjectToMusicXML(m21Object))
+
 def streamToMusicXML(streamObject):
     '''
     return a complete musicxml string
     from a music21 Stream object
     '''
+    # writing to a file-like object is faster than building a DOM
+    f = StringIO.StringIO()
+    streamToMusicXMLFile(streamObject, f)
+    return f.getvalue()
+
+def streamToMusicXMLFile(streamObject, fileLike):
+    '''
+    Write a complete musicxml document from a music21 Stream object to 
+    the file-like object `fileLike`. Measures are translated and written 
+    one at a time, and no DOM is built; the output is the same as the 
+    string returned by :func:`~music21.musicxml.translate.streamToMusicXML`.
+
+    >>> from music21 import *
+    >>> import StringIO
+    >>> s = stream.Stream()
+    >>> s.repeatAppend(note.Note('g3'), 4)
+    >>> f = StringIO.StringIO()
+    >>> musicxml.translate.streamToMusicXMLFile(s, f)
+    >>> f.getvalue().count('<measure')
+    1
+    >>> f.getvalue().count('<note')
+    4
+    '''
     # always make a deepcopy before processing musicxml
-    # this should only be done once
     post = copy.deepcopy(streamObject)
     post.makeImmutable()
-    mxScore = post._getMX()
-    del post
-    return mxScore.xmlStr()
+    mxScore, mxMeasureIters = _streamToMxDeferred(post)
+
+    indent = '  '
+    newl = '\n'
+    mxParts = mxScore.componentList
+    mxPartIds = set([id(mxPart) for mxPart in mxParts])
+    # all components but the Parts are written as usual
+    children = [(tag, data) for tag, data in mxScore._getChildren() 
+                if id(data) not in mxPartIds]
+
+    mxScore.writeXmlDeclaration(fileLike, newl)
+    mxScore.writeXmlStart(fileLike, '', newl)
+    mxScore._writeXmlChildren(fileLike, children, indent, indent, newl)
+    for mxPart, mxMeasureIter in zip(mxParts, mxMeasureIters):
+        started = False
+        for mxMeasure in mxMeasureIter:
+            if not started:
+                mxPart.writeXmlStart(fileLike, indent, newl)
+                started = True
+            mxMeasure.writeXml(fileLike, indent * 2, indent, newl)
+        if started:
+            mxPart.writeXmlEnd(fileLike, indent, newl)
+        else: # a part without measures
+            mxPart.writeXml(fileLike, indent, indent, newl)
+    mxScore.writeXmlEnd(fileLike, '', newl)
 
 def measureToMusicXML(m):
     '''Translate a music21 Measure into a 
@@ -4214,6 +4283,24 @@ def streamPartToMx(part, instStream=None, meterStream=None,
 
     The `meterStream`, if given, provides a template of meters.
     '''
+    mxScorePart, mxPart, mxMeasureIter = _streamPartToMxDeferred(part, 
+        instStream=instStream, meterStream=meterStream, 
+        refStreamOrTimeRange=refStreamOrTimeRange, 
+        spannerBundle=spannerBundle)
+    for mxMeasure in mxMeasureIter:
+        mxPart.append(mxMeasure)
+    # might to post processing after adding all measures to the Stream
+    # TODO: need to find all MetricModulations and updateByContext
+    # mxScorePart contains mxInstrument
+    return mxScorePart, mxPart
+
+def _streamPartToMxDeferred(part, instStream=None, meterStream=None,
+                   refStreamOrTimeRange=None, spannerBundle=None):
+    '''
+    Prepare the Measures of a part as :func:`~music21.musicxml.translate.streamPartToMx`
+    does, and return an MX ScorePart, an MX Part without measures, and
+    an iterator that translates and yields each MX Measure in turn.
+    '''
     from music21 import spanner
     from music21 import stream
 
@@ -4297,28 +4384,26 @@ def streamPartToMx(part, instStream=None, meterStream=None,
     # make sure that all instances of the same class have unique ids
     spannerBundle.setIdLocals()
 
-    # for each measure, call .mx to get the musicxml representation
-    for obj in measureStream:
-        # get instrument for every measure position
-        moStart = obj.getOffsetBySite(measureStream)
-        instSubStream = instStream.getElementsByOffset(moStart,
-                         moStart + obj.duration.quarterLength,
-                         includeEndBoundary=False)
-        mxTranspose = None
-        if len(instSubStream) > 0:
-            instSubObj = instSubStream[0]
-            if part.atSoundingPitch in [False]:
-                # if not at sounding pitch, encode transposition from instrument
-                if instSubObj.transposition is not None:
-                    mxTranspose = intervalToMXTranspose(
-                                    instSubObj.transposition)
-                    #raise TranslateException('cannot get transposition for a part that is not at sounding pitch.')
-        mxPart.append(measureToMx(obj, spannerBundle=spannerBundle,
-                 mxTranspose=mxTranspose))
-    # might to post processing after adding all measures to the Stream
-    # TODO: need to find all MetricModulations and updateByContext
-    # mxScorePart contains mxInstrument
-    return mxScorePart, mxPart
+    def mxMeasureIter():
+        # for each measure, call .mx to get the musicxml representation
+        for obj in measureStream:
+            # get instrument for every measure position
+            moStart = obj.getOffsetBySite(measureStream)
+            instSubStream = instStream.getElementsByOffset(moStart,
+                             moStart + obj.duration.quarterLength,
+                             includeEndBoundary=False)
+            mxTranspose = None
+            if len(instSubStream) > 0:
+                instSubObj = instSubStream[0]
+                if part.atSoundingPitch in [False]:
+                    # if not at sounding pitch, encode transposition from instrument
+                    if instSubObj.transposition is not None:
+                        mxTranspose = intervalToMXTranspose(
+                                        instSubObj.transposition)
+                        #raise TranslateException('cannot get transposition for a part that is not at sounding pitch.')
+            yield measureToMx(obj, spannerBundle=spannerBundle,
+                     mxTranspose=mxTranspose)
+    return mxScorePart, mxPart, mxMeasureIter()
 
 def emptyObjectToMx():
     '''
@@ -4359,15 +4444,31 @@ def streamToMx(s, spannerBundle=None):
     >>> mxScore = musicxml.translate.streamToMx(s1)
     >>> mxPartList = mxScore.get('partList')
     '''
+    mxScore, mxMeasureIters = _streamToMxDeferred(s, 
+        spannerBundle=spannerBundle)
+    for mxPart, mxMeasureIter in zip(mxScore.componentList, mxMeasureIters):
+        for mxMeasure in mxMeasureIter:
+            mxPart.append(mxMeasure)
+    return mxScore
+
+def _streamToMxDeferred(s, spannerBundle=None):
+    '''
+    Prepare a Stream or Score as :func:`~music21.musicxml.translate.streamToMx` 
+    does, and return a musicxml Score object, with MX Parts without measures, 
+    and a list of iterators, one for each MX Part, that translate and yield 
+    each MX Measure in turn.
+    '''
     #environLocal.printDebug(['streamToMx:'])
     from music21 import spanner
 
     if len(s) == 0:
-        return emptyObjectToMx()
+        mxScore = emptyObjectToMx()
+        return mxScore, [iter([]) for mxPart in mxScore.componentList]
     
     #environLocal.printDebug('calling Stream._getMX')
     # stores pairs of mxScorePart and mxScore
     mxComponents = []
+    mxMeasureIters = []
     instList = []
 
     # search context probably should always be True here
@@ -4440,11 +4541,13 @@ def streamToMx(s, spannerBundle=None):
             # force this instrument into this part
             # meterStream is only used here if there are no measures
             # defined in this part
-            mxScorePart, mxPart = streamPartToMx(obj, instStream=instStream,
+            mxScorePart, mxPart, mxMeasureIter = _streamPartToMxDeferred(obj, 
+                        instStream=instStream,
                         meterStream=meterStream,
                         refStreamOrTimeRange=refStreamOrTimeRange,
                         spannerBundle=spannerBundle)
             mxComponents.append([mxScorePart, mxPart, obj])
+            mxMeasureIters.append(mxMeasureIter)
             #mxComponents.append(obj._getMXPart(inst, meterStream, refStreamOrTimeRange))
 
     else: # assume this is the only part
@@ -4452,9 +4555,11 @@ def streamToMx(s, spannerBundle=None):
         # if no instrument is provided it will be obtained through s
         # when _getMxPart is called
         #mxComponents.append(s._getMXPart(None, meterStream))
-        mxScorePart, mxPart = streamPartToMx(s, meterStream=meterStream,
+        mxScorePart, mxPart, mxMeasureIter = _streamPartToMxDeferred(s, 
+                              meterStream=meterStream,
                               spannerBundle=spannerBundle)
         mxComponents.append([mxScorePart, mxPart, s])
+        mxMeasureIters.append(mxMeasureIter)
         #environLocal.printDebug(['mxComponents', mxComponents])
 
     # create score and part list
@@ -4518,7 +4623,7 @@ def streamToMx(s, spannerBundle=None):
 
     # set the mxPartList
     mxScore.set('partList', mxPartList)
-    return mxScore
+    return mxScore, mxMeasureIters
 
 def _getUniqueStaffKeys(staffReferenceList):
     '''Given a list of staffReference dictionaries, collect and return a list of all unique keys except None
@@ -4542,91 +4647,141 @@ def _getStaffExclude(staffReference, targetKey):
     return post
 
 
-def mxToStreamPart(mxScore, partId, spannerBundle=None, inputM21=None):
-    '''Load a part into a new Stream or one provided by `inputM21` given an mxScore and a part name.
+class _StreamPartBuilder(object):
+    '''Build a Part from mxMeasures given one at a time to addMeasure(), 
+    such that each mxMeasure can be discarded once it is translated. 
+    Used by :func:`~music21.musicxml.translate.mxToStreamPart` and 
+    :func:`~music21.musicxml.translate.musicXMLToScore`.
 
-    The `spannerBundle` reference, when passed in, is used to accumulate Spanners. These are not inserted here.
-
-    Though it is incorrect MusicXML, PDFtoMusic creates empty measures when it should create full
-    measures of rests (possibly hidden).  This routine fixes that bug.  See http://musescore.org/en/node/15129
+    The `spannerBundle` is used to accumulate Spanners; complete Spanners 
+    are moved into the Part by finish().
     '''
-    #environLocal.printDebug(['calling Stream._setMXPart'])
-    from music21 import layout
-    from music21 import bar
-    from music21 import clef
-    from music21 import stream
-    from music21 import spanner
-
-    if inputM21 == None:
-        # need a Score to load parts into
+    def __init__(self, mxScorePart, partId, spannerBundle):
         from music21 import stream
-        s = stream.Score()
-    else:
-        s = inputM21
 
-    if spannerBundle == None:
-        spannerBundle = spanner.SpannerBundle()
+        self.partId = partId
+        self.spannerBundle = spannerBundle
+
+        # create a new music21 instrument
+        self.instrumentObj = instrument.Instrument()
+        if mxScorePart is not None: # mxInstrument is a ScorePart
+            # need an mxScorePart here   
+            mxToInstrument(mxScorePart, self.instrumentObj)
+        # add part id as group
+        self.instrumentObj.groups.append(partId)
+
+        self.streamPart = stream.Part() # create a part instance for each part
+        # always assume at sounding, unless transposition is defined in attributes
+        self.streamPart.atSoundingPitch = True
+
+        # set part id to stream best name
+        if self.instrumentObj.bestName() is not None:
+            self.streamPart.id = self.instrumentObj.bestName()
+        self.streamPart._insertCore(0, self.instrumentObj) # add instrument at zero offset
+
+        self.staffReferenceList = []
+        # the highest number of staves used in this part
+        self.stavesCount = 1
+        self.measureCount = 0
+        # offset is in quarter note length
+        self.oMeasure = 0.0
+        self.lastTimeSignature = None
+        self.lastTransposition = None # may change at measure boundaries
+        self.lastMeasureWasShort = False  # keep track of whether the last measure was short...
+        # attributes of skipped measures, to be given to the next added one
+        self.skippedAttributes = {} # list name : {staff key : mxObject}
+        self.skippedTranspose = None
+
+    def skipMeasure(self, mxMeasure):
+        '''Pass over an mxMeasure without translating it. The last time 
+        signature, clef, key, and transposition of the skipped measures are 
+        given to the next measure added with addMeasure().
+        '''
+        mxAttributes = mxMeasure.attributesObj
+        if mxAttributes is None:
+            return
+        if mxAttributes.staves is not None:
+            self.stavesCount = max(self.stavesCount, int(mxAttributes.staves))
+        for listName in ['timeList', 'clefList', 'keyList']:
+            for mxSub in getattr(mxAttributes, listName):
+                if listName not in self.skippedAttributes:
+                    self.skippedAttributes[listName] = {}
+                self.skippedAttributes[listName][mxSub.get('number')] = mxSub
+        if mxAttributes.transposeObj is not None:
+            self.skippedTranspose = mxAttributes.transposeObj
+
+    def _addSkippedAttributes(self, mxMeasure, m, staffReference):
+        '''Insert into the Measure `m` the time signatures, clefs, and keys 
+        of skipped measures that the mxMeasure does not define itself.
+        '''
+        from music21 import clef
 
-    mxPart = mxScore.getPart(partId)
-    # in some cases there may be more than one instrument defined
-    # in each score part; this has not been tested
-    mxInstrument = mxScore.getScorePart(partId)
+        mxAttributes = mxMeasure.attributesObj
+        for listName in ['timeList', 'clefList', 'keyList']:
+            if listName not in self.skippedAttributes:
+                continue
+            if mxAttributes is not None and len(getattr(mxAttributes, listName)) > 0:
+                continue
+            for mxSub in self.skippedAttributes[listName].values():
+                if listName == 'timeList':
+                    obj = mxToTimeSignature(mxSub)
+                elif listName == 'clefList':
+                    obj = clef.Clef()
+                    obj.mx = mxSub
+                else:
+                    obj = mxKeyListToKeySignature(mxSub)
+                _addToStaffReference(mxSub, obj, staffReference)
+                m._insertCore(0, obj)
+        m._elementsChanged()
+        self.skippedAttributes = {}
+
+    def addMeasure(self, mxMeasure):
+        '''Translate an mxMeasure and add it to the Part.
+        '''
+        streamPart = self.streamPart
+        if (mxMeasure.attributesObj is not None and 
+            mxMeasure.attributesObj.staves is not None):
+            self.stavesCount = max(self.stavesCount, 
+                                   int(mxMeasure.attributesObj.staves))
 
-    # create a new music21 instrument
-    instrumentObj = instrument.Instrument()
-    if mxInstrument is not None: # mxInstrument is a ScorePart
-        # need an mxScorePart here   
-        mxToInstrument(mxInstrument, instrumentObj)
-    # add part id as group
-    instrumentObj.groups.append(partId)
-
-    streamPart = stream.Part() # create a part instance for each part
-    # always assume at sounding, unless transposition is defined in attributes
-    streamPart.atSoundingPitch = True
-
-    # set part id to stream best name
-    if instrumentObj.bestName() is not None:
-        streamPart.id = instrumentObj.bestName()
-    streamPart._insertCore(0, instrumentObj) # add instrument at zero offset
-
-    staffReferenceList = []
-    # offset is in quarter note length
-    oMeasure = 0.0
-    lastTimeSignature = None
-    lastTransposition = None # may change at measure boundaries
-    lastMeasureWasShort = False  # keep track of whether the last measure was short...
-
-    for i, mxMeasure in enumerate(mxPart):
         # t here is transposition, if defined; otherwise it is None
         m, staffReference, t = mxToMeasure(mxMeasure,
-                               spannerBundle=spannerBundle)
+                               spannerBundle=self.spannerBundle)
+        if len(self.skippedAttributes) > 0:
+            self._addSkippedAttributes(mxMeasure, m, staffReference)
+        if self.skippedTranspose is not None:
+            if t is None:
+                t = mxTransposeToInterval(self.skippedTranspose)
+            self.skippedTranspose = None
         if t is not None:
-            if lastTransposition is None and i == 0: # if this is the first
+            if self.lastTransposition is None and self.measureCount == 0: # if this is the first
                 #environLocal.printDebug(['transposition', t])
-                instrumentObj.transposition = t
+                self.instrumentObj.transposition = t
             else: # if not the first measure, need to copy as well
                 # for now, copy Instrument, change transposition, 
                 # could insert in part, or in measure
-                newInst = copy.deepcopy(instrumentObj)
+                newInst = copy.deepcopy(self.instrumentObj)
                 newInst.transposition = t
-                streamPart._insertCore(oMeasure, newInst)
+                streamPart._insertCore(self.oMeasure, newInst)
             # if a transposition is defined in musicxml, we assume it is
             # at written pitch
             streamPart.atSoundingPitch = False
             # store last for comparison
-            lastTransposition = t
+            self.lastTransposition = t
+        self.measureCount += 1
 
         # there will be one for each measure
-        staffReferenceList.append(staffReference)
+        self.staffReferenceList.append(staffReference)
 
         if m.timeSignature is not None:
-            lastTimeSignature = m.timeSignature
-        elif lastTimeSignature is None and m.timeSignature is None:
+            self.lastTimeSignature = m.timeSignature
+        elif self.lastTimeSignature is None and m.timeSignature is None:
             # if no time sigature is defined, need to get a default
             ts = meter.TimeSignature()
             ts.load('%s/%s' % (defaults.meterNumerator,
                                defaults.meterDenominatorBeatType))
-            lastTimeSignature = ts
+            self.lastTimeSignature = ts
+        lastTimeSignature = self.lastTimeSignature
         
         if m._fullMeasureRest is True:
             r1 = m.getElementsByClass('Rest')[0]
@@ -4637,7 +4792,7 @@ def mxToStreamPart(mxScore, partId, spannerBundle=None, inputM21=None):
         del(m._fullMeasureRest)
         
         # add measure to stream at current offset for this measure
-        streamPart._insertCore(oMeasure, m)
+        streamPart._insertCore(self.oMeasure, m)
 
         # note: we cannot assume that the time signature properly
         # describes the offsets w/n this bar. need to look at 
@@ -4663,7 +4818,7 @@ def mxToStreamPart(mxScore, partId, spannerBundle=None, inputM21=None):
             # for the first measure, this may be a pickup
             # must detect this when writing, as next measures offsets will be 
             # incorrect
-            if oMeasure == 0.0:
+            if self.oMeasure == 0.0:
                 # cannot get bar duration proportion if cannot get a ts
                 if m.barDurationProportion() < 1.0:
                     m.padAsAnacrusis()
@@ -4675,102 +4830,149 @@ def mxToStreamPart(mxScore, partId, spannerBundle=None, inputM21=None):
             ### no...let's not do this...
             else:
                 mOffsetShift = mHighestTime #lastTimeSignatureQuarterLength
-                if lastMeasureWasShort is True:
+                if self.lastMeasureWasShort is True:
                     if m.barDurationProportion() < 1.0:
                         m.padAsAnacrusis() # probably a pickup after a repeat or phrase boundary or something
-                        lastMeasureWasShort = False
+                        self.lastMeasureWasShort = False
                 else:
                     if mHighestTime < lastTimeSignatureQuarterLength:
-                        lastMeasureWasShort = True
+                        self.lastMeasureWasShort = True
                     else:
-                        lastMeasureWasShort = False
+                        self.lastMeasureWasShort = False
                         
-        oMeasure += mOffsetShift
-
-    # if we have multiple staves defined, add more parts, and transfer elements
-    # note: this presently has to look at _idLastDeepCopyOf to get matches
-    # to find removed elements after copying; this is probably not the
-    # best way to do this. 
-
-    # for this part, if any elements are components in the spannerBundle,
-    # then then we need to update the spannerBundle after the part is copied
-
-    streamPartStaff = None
-    if mxPart.getStavesCount() > 1:
-        # transfer all spanners to the streamPart such that they get
-        # updated in copying, then remove them
-        rm = []
-        for sp in spannerBundle.getByCompleteStatus(True):
-            streamPart._insertCore(0, sp)
-            rm.append(sp)
-        # remove from original spanner bundle
-        for sp in rm:
-            spannerBundle.remove(sp)
-
-        # get staves will return a number, between 1 and count
-        #for staffCount in range(mxPart.getStavesCount()):
-        for staffCount in _getUniqueStaffKeys(staffReferenceList):
-            partIdStaff = '%s-Staff%s' % (partId, staffCount)
-            #environLocal.printDebug(['partIdStaff', partIdStaff, 'copying streamPart'])
-            # this deepcopy is necessary, as we will remove components
-            # in each staff that do not belong
-            streamPartStaff = copy.deepcopy(streamPart)
-            # assign this as a PartStaff, a subclass of Part
-            streamPartStaff.__class__ = stream.PartStaff
-            # remove all elements that are not part of this staff
-            mStream = streamPartStaff.getElementsByClass('Measure')
-            for i, staffReference in enumerate(staffReferenceList):
-                staffExclude = _getStaffExclude(staffReference, staffCount)
-                m = mStream[i]
-                for eRemove in staffExclude:
-                    for eMeasure in m:
-                        if eMeasure._idLastDeepCopyOf == id(eRemove):
-                            m.remove(eMeasure)
-                    for v in m.voices:
-                        v.remove(eRemove)
-                        for eVoice in v.elements:
-                            if eVoice._idLastDeepCopyOf == id(eRemove):
-                                v.remove(eVoice)
-                # after adjusting voices see if voices can be reduced or
-                # removed
-                #environLocal.printDebug(['calling flattenUnnecessaryVoices: voices before:', len(m.voices)])
-                m.flattenUnnecessaryVoices(force=False, inPlace=True)
-                #environLocal.printDebug(['calling flattenUnnecessaryVoices: voices after:', len(m.voices)])
-            # TODO: copying spanners may have created orphaned
-            # spanners that no longer have valid connections
-            # in this part; should be deleted
-            streamPartStaff.addGroupForElements(partIdStaff)
-            streamPartStaff.groups.append(partIdStaff)
-            streamPartStaff._elementsChanged()
-            s._insertCore(0, streamPartStaff)
+        self.oMeasure += mOffsetShift
+
+    def finish(self):
+        '''Complete the Part after all measures have been added, and return
+        a list of the Parts to be inserted into the Score: either the Part, 
+        or one PartStaff for each staff.
+        '''
+        from music21 import stream
+
+        streamPart = self.streamPart
+        spannerBundle = self.spannerBundle
+        partId = self.partId
+        staffReferenceList = self.staffReferenceList
+
+        # if we have multiple staves defined, add more parts, and transfer elements
+        # note: this presently has to look at _idLastDeepCopyOf to get matches
+        # to find removed elements after copying; this is probably not the
+        # best way to do this. 
+
+        # for this part, if any elements are components in the spannerBundle,
+        # then then we need to update the spannerBundle after the part is copied
+
+        post = []
+        # a part without measures has no staff assignments
+        if self.stavesCount > 1 and len(
+            _getUniqueStaffKeys(staffReferenceList)) > 0:
+            # transfer all spanners to the streamPart such that they get
+            # updated in copying, then remove them
+            rm = []
+            for sp in spannerBundle.getByCompleteStatus(True):
+                streamPart._insertCore(0, sp)
+                rm.append(sp)
+            # remove from original spanner bundle
+            for sp in rm:
+                spannerBundle.remove(sp)
+
+            # get staves will return a number, between 1 and count
+            #for staffCount in range(mxPart.getStavesCount()):
+            for staffCount in _getUniqueStaffKeys(staffReferenceList):
+                partIdStaff = '%s-Staff%s' % (partId, staffCount)
+                #environLocal.printDebug(['partIdStaff', partIdStaff, 'copying streamPart'])
+                # this deepcopy is necessary, as we will remove components
+                # in each staff that do not belong
+                streamPartStaff = copy.deepcopy(streamPart)
+                # assign this as a PartStaff, a subclass of Part
+                streamPartStaff.__class__ = stream.PartStaff
+                # remove all elements that are not part of this staff
+                mStream = streamPartStaff.getElementsByClass('Measure')
+                for i, staffReference in enumerate(staffReferenceList):
+                    staffExclude = _getStaffExclude(staffReference, staffCount)
+                    m = mStream[i]
+                    for eRemove in staffExclude:
+                        for eMeasure in m:
+                            if eMeasure._idLastDeepCopyOf == id(eRemove):
+                                m.remove(eMeasure)
+                        for v in m.voices:
+                            v.remove(eRemove)
+                            for eVoice in v.elements:
+                                if eVoice._idLastDeepCopyOf == id(eRemove):
+                                    v.remove(eVoice)
+                    # after adjusting voices see if voices can be reduced or
+                    # removed
+                    #environLocal.printDebug(['calling flattenUnnecessaryVoices: voices before:', len(m.voices)])
+                    m.flattenUnnecessaryVoices(force=False, inPlace=True)
+                    #environLocal.printDebug(['calling flattenUnnecessaryVoices: voices after:', len(m.voices)])
+                # TODO: copying spanners may have created orphaned
+                # spanners that no longer have valid connections
+                # in this part; should be deleted
+                streamPartStaff.addGroupForElements(partIdStaff)
+                streamPartStaff.groups.append(partIdStaff)
+                streamPartStaff._elementsChanged()
+                post.append(streamPartStaff)
+        else:
+            streamPart.addGroupForElements(partId) # set group for components 
+            streamPart.groups.append(partId) # set group for stream itself
+
+            # TODO: this does not work with voices; there, Spanners 
+            # will be copied into the Score 
+
+            # copy spanners that are complete into the part, as this is the 
+            # highest level container that needs them
+            rm = []
+            for sp in spannerBundle.getByCompleteStatus(True):
+                streamPart._insertCore(0, sp)
+                rm.append(sp)
+            # remove from original spanner bundle
+            for sp in rm:
+                spannerBundle.remove(sp)
+            streamPart._elementsChanged()
+            post.append(streamPart)
+        return post
+
+
+def mxToStreamPart(mxScore, partId, spannerBundle=None, inputM21=None):
+    '''Load a part into a new Stream or one provided by `inputM21` given an mxScore and a part name.
+
+    The `spannerBundle` reference, when passed in, is used to accumulate Spanners. These are not inserted here.
+
+    Though it is incorrect MusicXML, PDFtoMusic creates empty measures when it should create full
+    measures of rests (possibly hidden).  This routine fixes that bug.  See http://musescore.org/en/node/15129
+    '''
+    #environLocal.printDebug(['calling Stream._setMXPart'])
+    from music21 import spanner
+
+    if inputM21 == None:
+        # need a Score to load parts into
+        from music21 import stream
+        s = stream.Score()
     else:
-        streamPart.addGroupForElements(partId) # set group for components 
-        streamPart.groups.append(partId) # set group for stream itself
-
-        # TODO: this does not work with voices; there, Spanners 
-        # will be copied into the Score 
-
-        # copy spanners that are complete into the part, as this is the 
-        # highest level container that needs them
-        rm = []
-        for sp in spannerBundle.getByCompleteStatus(True):
-            streamPart._insertCore(0, sp)
-            rm.append(sp)
-        # remove from original spanner bundle
-        for sp in rm:
-            spannerBundle.remove(sp)
-        # s is the score; adding the aprt to the score
-        streamPart._elementsChanged()
+        s = inputM21
+
+    if spannerBundle == None:
+        spannerBundle = spanner.SpannerBundle()
+
+    mxPart = mxScore.getPart(partId)
+    # in some cases there may be more than one instrument defined
+    # in each score part; this has not been tested
+    mxInstrument = mxScore.getScorePart(partId)
+
+    builder = _StreamPartBuilder(mxInstrument, partId, spannerBundle)
+    for mxMeasure in mxPart:
+        builder.addMeasure(mxMeasure)
+    post = builder.finish()
+    # s is the score; adding the part(s) to the score
+    for streamPart in post:
         s._insertCore(0, streamPart)
 
     s._elementsChanged()
     # when adding parts to this Score
     # this assumes all start at the same place
     # even if there is only one part, it will be placed in a Stream
-    if streamPartStaff is not None:
-        return streamPartStaff
-    else:
-        return streamPart
+    # if there are multiple staves, the last is returned
+    return post[-1]
 
 def mxToScore(mxScore, spannerBundle=None, inputM21=None):
     '''
@@ -4782,11 +4984,6 @@ def mxToScore(mxScore, spannerBundle=None, inputM21=None):
     '''
     # TODO: may not want to wait to this leve to insert spanners; may want to 
     # insert in lower positions if it makes sense
-
-    from music21 import metadata
-    from music21 import layout
-    from music21 import text
-
     if inputM21 == None:
         from music21 import stream
         s = stream.Score()
@@ -4816,13 +5013,34 @@ def mxToScore(mxScore, spannerBundle=None, inputM21=None):
         m21PartIdDictionary[partId] = part
         #print("%r %s %r" % (m21PartIdDictionary, partId, part))
 
+    _mxScoreFinish(mxScore, s, m21PartIdDictionary, spannerBundle)
+    return s
+
+
+def _mxScoreFinish(mxScore, s, m21PartIdDictionary, spannerBundle,
+    excludedPartIds=None):
+    '''Add staff groups, metadata, credits, and complete spanners to 
+    the Score `s` after all parts have been translated. 
+
+    Parts whose ids are in `excludedPartIds` were not translated, and are 
+    left out of staff groups.
+    '''
+    from music21 import metadata
+    from music21 import layout
+
+    if excludedPartIds is None:
+        excludedPartIds = []
     # get part/staff groups
     #environLocal.printDebug(['partgroups:', mxScore.getPartGroupData()])
     partGroupData = mxScore.getPartGroupData()
     for partGroup in partGroupData: # a list of dictionaries
+        scorePartIds = [partId for partId in partGroup['scorePartIds'] 
+                        if partId not in excludedPartIds]
+        if len(scorePartIds) == 0:
+            continue
         # create music21 spanner StaffGroup
         sg = layout.StaffGroup()
-        for partId in partGroup['scorePartIds']:
+        for partId in scorePartIds:
             # get music21 part from partIdDictionary
             try:
                 sg.addComponents(m21PartIdDictionary[partId])
@@ -4855,6 +5073,199 @@ def mxToScore(mxScore, spannerBundle=None, inputM21=None):
         spannerBundle.remove(sp)
 
     s._elementsChanged()
+
+
+#------------------------------------------------------------------------------
+# streaming import
+
+def _getSelectedPartIds(mxScore, parts):
+    '''Given an mxScore with a part-list and a list of part selections, 
+    return a list of the selected part ids, in part-list order. 
+    
+    A selection is either an integer index into the part-list (counting 
+    from zero) or a string that matches a part id or part name.
+
+    >>> from music21 import *
+    >>> mxScore = corpus.parse('bwv66.6', forceSource=True).mx
+    >>> musicxml.translate._getSelectedPartIds(mxScore, [3, 'P1'])
+    [u'P1', u'P4']
+    >>> musicxml.translate._getSelectedPartIds(mxScore, ['Alto'])
+    [u'P2']
+    >>> musicxml.translate._getSelectedPartIds(mxScore, [6])
+    Traceback (most recent call last):
+    TranslateException: cannot find a part for selection: 6
+    '''
+    mxPartIds = mxScore.getPartIdsFromPartListObj()
+    post = []
+    for selection in parts:
+        found = None
+        if common.isNum(selection):
+            if selection < len(mxPartIds):
+                found = mxPartIds[selection]
+        else:
+            for partId in mxPartIds:
+                if partId == selection:
+                    found = partId
+                    break
+                mxScorePart = mxScore.getScorePart(partId)
+                if (mxScorePart is not None and 
+                    mxScorePart.get('partName') == selection):
+                    found = partId
+                    break
+        if found is None:
+            raise TranslateException(
+                'cannot find a part for selection: %s' % selection)
+        post.append(found)
+    return [partId for partId in mxPartIds if partId in post]
+
+
+def _getMxMeasureNumber(mxMeasure, default=None):
+    '''Return the number of an mxMeasure as an integer, or `default` if the 
+    mxMeasure has no numeric number.
+
+    >>> from music21 import *
+    >>> mxMeasure = musicxml.Measure()
+    >>> mxMeasure.set('number', '12a')
+    >>> musicxml.translate._getMxMeasureNumber(mxMeasure)
+    12
+    >>> mxMeasure.set('number', 'X')
+    >>> musicxml.translate._getMxMeasureNumber(mxMeasure, 3)
+    3
+    '''
+    mNumRaw = mxMeasure.get('number')
+    if mNumRaw is None:
+        return default
+    mNum, junk = common.getNumFromStr(mNumRaw)
+    if mNum == '':
+        return default
+    return int(mNum)
+
+
+def musicXMLToScore(source, isFile=True, spannerBundle=None, inputM21=None,
+    defaultMovementTitle=None, mxDocument=None, parts=None, measureRange=None):
+    '''
+    Translate MusicXML, given as a file path or (if `isFile` is False) a 
+    string, into a music21 Score object or the given inputM21 object. 
+
+    Unlike :func:`~music21.musicxml.translate.mxToScore`, no complete 
+    mxScore is built: each mxMeasure is translated as soon as it has 
+    been parsed and then discarded. 
+
+    If the MusicXML defines neither a movement title nor a work title, the 
+    `defaultMovementTitle`, if given, is used as the movement title.
+
+    If `mxDocument` is given, it is used for parsing; afterwards its 
+    `score` holds an mxScore with the header information (part-list, 
+    identification, credits) and Parts without Measures.
+
+    If `parts` is given, only the selected parts are translated; each 
+    selection is an index into the part-list (counting from zero) or a part
+    id or part name. If `measureRange` is given as a pair of measure 
+    numbers (start, end), only measures numbered from start to end 
+    (inclusive) are translated; the time signature, clef, key, and 
+    transposition in effect are carried into the first translated measure.
+
+    >>> from music21 import *
+    >>> from music21.musicxml import testPrimitive
+    >>> s = musicxml.translate.musicXMLToScore(testPrimitive.chordsThreeNotesDuration21c, isFile=False)
+    >>> len(s.parts)
+    1
+    >>> len(s.parts[0].getElementsByClass('Measure'))
+    2
+    >>> s.flat.notes[0]
+    <music21.chord.Chord ...>
+
+    >>> s = musicxml.translate.musicXMLToScore(testPrimitive.mixedVoices1a, isFile=False, measureRange=(2, 2))
+    >>> [m.number for m in s.parts[0].getElementsByClass('Measure')]
+    [2]
+    >>> s.parts[1].getElementsByClass('Measure')[0].clef
+    <music21.clef.BassClef>
+    '''
+    from music21 import stream
+    from music21 import spanner
+
+    if inputM21 == None:
+        s = stream.Score()
+    else:
+        s = inputM21
+    if spannerBundle == None:
+        spannerBundle = spanner.SpannerBundle()
+
+    builders = {} # part id : _StreamPartBuilder
+    m21PartIdDictionary = {} # part id : list of completed parts
+    # the ids of selected parts, found once the part-list is available
+    selectedPartIds = []
+    lastMeasureNumber = {} # part id : number of the last mxMeasure
+
+    def isPartSelected(mxScore, partId):
+        if parts is None:
+            return True
+        if len(selectedPartIds) == 0:
+            selectedPartIds.extend(_getSelectedPartIds(mxScore, parts))
+        return partId in selectedPartIds
+
+    def measureCallback(mxScore, mxPart, mxMeasure):
+        partId = mxPart.get('id')
+        if not isPartSelected(mxScore, partId):
+            return
+        if partId not in builders:
+            builders[partId] = _StreamPartBuilder(
+                mxScore.getScorePart(partId), partId, spannerBundle)
+        if measureRange is not None:
+            # measures without a number continue the last number
+            mNum = _getMxMeasureNumber(mxMeasure, 
+                                       lastMeasureNumber.get(partId, 0))
+            lastMeasureNumber[partId] = mNum
+            if mNum < measureRange[0] or mNum > measureRange[1]:
+                builders[partId].skipMeasure(mxMeasure)
+                return
+        try:
+            builders[partId].addMeasure(mxMeasure)
+        except TranslateException as strerror:
+            raise TranslateException('cannot translate part %s: %s' % (partId, strerror))
+
+    def partCallback(mxScore, mxPart):
+        partId = mxPart.get('id')
+        if not isPartSelected(mxScore, partId):
+            return
+        if partId not in builders: # a part without measures
+            builders[partId] = _StreamPartBuilder(
+                mxScore.getScorePart(partId), partId, spannerBundle)
+        m21PartIdDictionary[partId] = builders[partId].finish()
+        # release the builder and the Part it holds
+        del builders[partId]
+
+    if mxDocument is None:
+        d = musicxmlMod.Document()
+    else:
+        d = mxDocument
+    if isFile:
+        d.openStreaming(source, measureCallback, partCallback)
+    else:
+        d.readStreaming(source, measureCallback, partCallback)
+    mxScore = d.score
+
+    if defaultMovementTitle is not None and mxScore.get('movementTitle') == None:
+        mxWork = mxScore.get('workObj')
+        if mxWork == None or mxWork.get('workTitle') == None: 
+            mxScore.set('movementTitle', defaultMovementTitle)
+
+    # insert parts in the order of the part-list, as does mxToScore
+    for partId in mxScore.getPartIdsFromPartListObj():
+        if partId not in m21PartIdDictionary:
+            continue
+        for streamPart in m21PartIdDictionary[partId]:
+            s._insertCore(0, streamPart)
+        # if there are multiple staves, the last is used in StaffGroups
+        m21PartIdDictionary[partId] = m21PartIdDictionary[partId][-1]
+    s._elementsChanged()
+
+    excludedPartIds = None
+    if parts is not None:
+        excludedPartIds = [partId for partId in 
+            mxScore.getPartIdsFromPartListObj() if partId not in selectedPartIds]
+    _mxScoreFinish(mxScore, s, m21PartIdDictionary, spannerBundle, 
+                   excludedPartIds=excludedPartIds)
     return s
 
 #------------------------------------------------------------------------------
@@ -6399,6 +6810,115 @@ spirit</words>
         self.assertRaises(bar.BarException, mxToRepeat, mxBarline)
 
 
+    def testStreamingImportA(self):
+        from music21 import musicxml
+        from music21 import stream
+        from music21.musicxml import testPrimitive
+        from music21.musicxml import testFiles
+
+        def getSignature(s):
+            post = []
+            for p in s.parts:
+                post.append((p.id, p.classes[0], 
+                    len(p.getElementsByClass('Measure'))))
+                for e in p.flat:
+                    post.append((e.offset, repr(e)))
+            for e in s.getElementsNotOfClass('Stream'):
+                post.append((e.offset, e.classes[0]))
+            post.append(s.metadata.title)
+            post.append(len(s.flat.getElementsByClass('Spanner')))
+            return post
+
+        for src in [testPrimitive.pitches01a, testPrimitive.spanners33a, 
+            testPrimitive.pianoStaff43a, testFiles.mozartTrioK581Excerpt, 
+            testFiles.binchoisMagnificat]:
+            d = musicxml.Document()
+            d.read(src)
+            sTree = stream.Score()
+            sTree.mx = d.score
+            sStream = musicXMLToScore(src, isFile=False)
+            self.assertEqual(getSignature(sTree), getSignature(sStream))
+
+        # a title is only set if there is none
+        s = musicXMLToScore(testPrimitive.beams01, isFile=False, 
+            defaultMovementTitle='test.xml')
+        self.assertEqual(s.metadata.movementName, 'test.xml')
+        s = musicXMLToScore(testFiles.mozartTrioK581Excerpt, isFile=False, 
+            defaultMovementTitle='test.xml')
+        self.assertNotEqual(s.metadata.movementName, 'test.xml')
+
+        # a truncated file raises, rather than returning the parts 
+        # completed so far
+        src = testPrimitive.pianoStaff43a
+        self.assertRaises(musicxml.DocumentException, musicXMLToScore, 
+            src[:len(src) * 2 / 3], isFile=False)
+
+    def testStreamingImportSelectionA(self):
+        from music21 import converter
+        from music21.musicxml import testPrimitive
+        from music21.musicxml import testFiles
+
+        def getNotes(s):
+            return [(n.offset, n.quarterLength, n.fullName) 
+                    for n in s.flat.notesAndRests]
+
+        src = testFiles.mozartTrioK581Excerpt
+        sFull = converter.parse(src)
+        s = musicXMLToScore(src, isFile=False, parts=[3, 'clarinet in A'],
+                            measureRange=(2, 3))
+        self.assertEqual([p.id for p in s.parts], 
+                         [sFull.parts[0].id, sFull.parts[3].id])
+        for p, pFull in zip(s.parts, [sFull.parts[0], sFull.parts[3]]):
+            measures = p.getElementsByClass('Measure')
+            self.assertEqual([m.number for m in measures], [2, 3])
+            self.assertEqual(measures[0].offset, 0)
+            # attributes of measure 1 are carried into measure 2
+            self.assertEqual(repr(measures[0].clef), 
+                             repr(pFull.getElementsByClass('Measure')[0].clef))
+            self.assertNotEqual(measures[0].keySignature, None)
+            self.assertNotEqual(measures[0].timeSignature, None)
+            self.assertEqual(getNotes(measures[1]), 
+                getNotes(pFull.getElementsByClass('Measure')[3]))
+        # staff groups only include the selected parts
+        sg = s.getElementsByClass('StaffGroup')[0]
+        self.assertEqual(len(sg.getComponents()), 2)
+        # transposition of the clarinet is carried over as well
+        self.assertEqual(s.parts[0].atSoundingPitch, False)
+        self.assertEqual(str(s.parts[0].flat.getElementsByClass(
+            'Instrument')[0].transposition), 
+            str(sFull.parts[0].flat.getElementsByClass(
+            'Instrument')[0].transposition))
+
+        # parts on two staves are split as when all measures are translated
+        s = musicXMLToScore(testPrimitive.mixedVoices1a, isFile=False, 
+                            parts=[0], measureRange=(2, 2))
+        self.assertEqual(len(s.parts), 2)
+        self.assertEqual([len(p.getElementsByClass('Measure')) 
+                          for p in s.parts], [1, 1])
+        self.assertRaises(TranslateException, musicXMLToScore, 
+            testPrimitive.pianoStaff43a, isFile=False, parts=['Viola'])
+
+    def testStreamToMusicXMLFileA(self):
+        import re
+        from music21 import converter, corpus
+        from music21.musicxml import testPrimitive
+
+        def normalize(msg):
+            # remove random ids and dates
+            msg = re.sub('"[IP][0-9a-f]{32}"', '"ID"', msg)
+            return re.sub('<encoding-date>.*</encoding-date>', '', msg)
+
+        for s in [corpus.parse('bwv66.6'), 
+            converter.parse(testPrimitive.pianoStaff43a),
+            converter.parse(testPrimitive.transposing01)]:
+            post = copy.deepcopy(s)
+            post.makeImmutable()
+            # the string as written from a DOM
+            msgDom = streamToMx(post).xmlStr()
+            f = StringIO.StringIO()
+            streamToMusicXMLFile(s, f)
+            self.assertEqual(normalize(msgDom), normalize(f.getvalue()))
+
 
 class TestExternal(unittest.TestCase):
     pass
@@ -6472,7 +6992,7 @@ class TestExternal(unittest.TestCase):
 
 #-------------------------------------------------------------------------------
 # define presented order in documentation
-_DOC_ORDER = [mxToScore, streamToMx]
+_DOC_ORDER = [mxToScore, musicXMLToScore, streamToMx]
 
 if __name__ == "__main__":
     # sys.arg test options will be used in mainTest()
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+#-------------------------------------------------------------------------------
+# Name:         noteArray.py
+# Purpose:      compact, array-based storage of notes and rests
+#
+# Authors:      The music21 Project
+#
+# Copyright:    (c) 2026 The music21 Project
+# License:      LGPL
+#-------------------------------------------------------------------------------
+'''
+The :class:`~music21.noteArray.NoteArray` stores the essential attributes of
+a large number of :class:`~music21.note.Note` and :class:`~music21.note.Rest`
+objects in parallel arrays of machine values. A Note carries a full
+:class:`~music21.base.Music21Object`, with its own DefinedContexts, Groups,
+Pitch, and Duration; a NoteArray stores about forty bytes per note.
+
+Pitch space, quarter length, offset, and tie queries run directly on the
+arrays; full Note and Rest objects are created only on demand.
+'''
+
+import array
+import bisect
+import unittest
+
+from music21 import common
+from music21 import exceptions21
+from music21 import duration
+from music21 import note
+from music21 import pitch
+from music21 import stream
+from music21 import tie
+
+from music21 import environment
+_MOD = "noteArray.py"
+environLocal = environment.Environment(_MOD)
+
+
+class NoteArrayException(exceptions21.Music21Exception):
+    pass
+
+
+# steps are stored as an index into this string; rests have no step
+_STEPS = 'CDEFGAB'
+_REST_STEP = -1
+# pitches without an explicit octave
+_NO_OCTAVE = -128
+# tie types are stored as an index into this list
+_TIE_TYPES = [None, 'start', 'continue', 'stop']
+
+
+#-------------------------------------------------------------------------------
+class NoteArray(object):
+    '''
+    A struct-of-arrays representation of a sequence of Notes and Rests.
+    Each note is represented by one entry in each of the arrays `offsets`,
+    `quarterLengths`, `pitchSpaces`, and `ties`, and by its spelling: step,
+    accidental alteration, octave, and microtone.
+
+    Only these attributes are retained: lyrics, articulations, beams,
+    expressions, and other attributes of a Note are not stored. Chords
+    and other elements are skipped.
+
+    >>> from music21 import *
+    >>> s = stream.Stream()
+    >>> s.append(note.Note('C#4', quarterLength=1.5))
+    >>> s.append(note.Rest(quarterLength=0.5))
+    >>> s.append(note.Note('B-3', quarterLength=2))
+    >>> na = noteArray.NoteArray.fromStream(s)
+    >>> len(na)
+    3
+    >>> list(na.offsets)
+    [0.0, 1.5, 2.0]
+    >>> list(na.pitchSpaces)
+    [61.0, 0.0, 58.0]
+    >>> na.highestTime
+    4.0
+    >>> na[2]
+    <music21.note.Note B->
+    >>> na[2].octave
+    3
+    >>> na[1].isRest
+    True
+    '''
+    __slots__ = ('offsets', 'quarterLengths', 'pitchSpaces', 'ties',
+                 '_steps', '_alters', '_octaves', '_microtones',
+                 '_lastOffset', '_highestTime', 'isSorted')
+
+    def __init__(self):
+        self.offsets = array.array('d')
+        self.quarterLengths = array.array('d')
+        # rests store a pitch space value of zero
+        self.pitchSpaces = array.array('d')
+        # an index into _TIE_TYPES
+        self.ties = array.array('b')
+
+        self._steps = array.array('b')
+        self._alters = array.array('d')
+        self._octaves = array.array('b')
+        self._microtones = array.array('d')
+
+        # track whether offsets are in order, so that offset queries
+        # can use a binary search
+        self._lastOffset = None
+        # the largest end time, kept as notes are added
+        self._highestTime = 0.0
+        self.isSorted = True
+
+    @classmethod
+    def fromStream(cls, streamObj):
+        '''
+        Create a NoteArray from all Notes and Rests found in the flat
+        representation of `streamObj`, with offsets relative to `streamObj`.
+
+        >>> from music21 import *
+        >>> s = corpus.parse('bach/bwv66.6')
+        >>> na = noteArray.NoteArray.fromStream(s.parts[0])
+        >>> len(na) == len(s.parts[0].flat.notesAndRests)
+        True
+        '''
+        post = cls()
+        for e, offset, unused in streamObj.recurseWithOffsets(
+                classFilter=['Note', 'Rest']):
+            post.append(e, offset)
+        return post
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __repr__(self):
+        return '<music21.noteArray.NoteArray %s notes>' % len(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            post = self.__class__()
+            for i in range(*index.indices(len(self))):
+                post._appendValues(self.offsets[i], self.quarterLengths[i],
+                    self.pitchSpaces[i], self.ties[i], self._steps[i],
+                    self._alters[i], self._octaves[i], self._microtones[i])
+            return post
+        return self.getNote(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.getNote(i)
+
+    def _appendValues(self, offset, quarterLength, ps, tieCode, step, alter,
+        octave, microtone):
+        if self._lastOffset is not None and offset < self._lastOffset:
+            self.isSorted = False
+        self._lastOffset = offset
+        if offset + quarterLength > self._highestTime:
+            self._highestTime = offset + quarterLength
+
+        self.offsets.append(offset)
+        self.quarterLengths.append(quarterLength)
+        self.pitchSpaces.append(ps)
+        self.ties.append(tieCode)
+        self._steps.append(step)
+        self._alters.append(alter)
+        self._octaves.append(octave)
+        self._microtones.append(microtone)
+
+    def append(self, n, offset=None):
+        '''
+        Add a Note or Rest. If `offset` is not given, the note is placed
+        at the current highest time.
+
+        >>> from music21 import *
+        >>> na = noteArray.NoteArray()
+        >>> n = note.Note('E~5', quarterLength=0.25)
+        >>> n.tie = tie.Tie('start')
+        >>> na.append(n)
+        >>> na.append(note.Note('E~5'), 0.25)
+        >>> list(na.pitchSpaces)
+        [76.5, 76.5]
+        >>> na.getTieType(0)
+        'start'
+        >>> na.getTieType(1) is None
+        True
+
+        >>> na.append(chord.Chord(['C4', 'E4']))
+        Traceback (most recent call last):
+        NoteArrayException: cannot store Chord objects in a NoteArray
+        '''
+        if offset is None:
+            offset = self.highestTime
+        if n.tie is None:
+            tieCode = 0
+        else:
+            tieCode = _TIE_TYPES.index(n.tie.type)
+
+        if 'Rest' in n.classes:
+            self._appendValues(offset, n.quarterLength, 0.0, tieCode,
+                _REST_STEP, 0.0, _NO_OCTAVE, 0.0)
+        elif 'Note' in n.classes:
+            p = n.pitch
+            if p.accidental is None:
+                alter = 0.0
+            else:
+                alter = p.accidental.alter
+            if p.octave is None:
+                octave = _NO_OCTAVE
+            else:
+                octave = p.octave
+            self._appendValues(offset, n.quarterLength, p.ps, tieCode,
+                _STEPS.index(p.step), alter, octave, p.microtone.cents)
+        else:
+            raise NoteArrayException('cannot store %s objects in a NoteArray'
+                % n.classes[0])
+
+    def _getHighestTime(self):
+        return self._highestTime
+
+    highestTime = property(_getHighestTime, doc='''
+        The largest offset plus quarter length of all stored notes.
+        ''')
+
+    def isRest(self, index):
+        '''
+        Return True if the entry at `index` is a Rest.
+        '''
+        return self._steps[index] == _REST_STEP
+
+    def getTieType(self, index):
+        '''
+        Return the type of the Tie on the entry at `index`, or None.
+        '''
+        return _TIE_TYPES[self.ties[index]]
+
+    def getIndicesByOffset(self, offsetStart, offsetEnd=None,
+        includeEndBoundary=True, mustFinishInSpan=False,
+        mustBeginInSpan=True):
+        '''
+        Return a list of the indices of entries that fall within the
+        offset span, matching
+        :meth:`~music21.stream.Stream.getElementsByOffset`. When entries
+        were added in offset order, the search starts with a binary search.
+
+        >>> from music21 import *
+        >>> na = noteArray.NoteArray()
+        >>> for p in ['C4', 'D4', 'E4', 'F4']:
+        ...     na.append(note.Note(p, quarterLength=2))
+        >>> na.getIndicesByOffset(2, 4)
+        [1, 2]
+        >>> na.getIndicesByOffset(3)
+        []
+        >>> na.getIndicesByOffset(3, mustBeginInSpan=False)
+        [1]
+        '''
+        if offsetEnd is None:
+            offsetEnd = offsetStart
+        if self.isSorted and mustBeginInSpan:
+            start = bisect.bisect_left(self.offsets,
+                offsetStart - common.OFFSET_SEARCH_MARGIN)
+        else:
+            start = 0
+        post = []
+        offsets = self.offsets
+        quarterLengths = self.quarterLengths
+        for i in range(start, len(offsets)):
+            if self.isSorted and offsets[i] > offsetEnd:
+                break
+            if common.offsetSpanMatches(offsets[i], quarterLengths[i],
+                offsetStart, offsetEnd,
+                includeEndBoundary=includeEndBoundary,
+                mustFinishInSpan=mustFinishInSpan,
+                mustBeginInSpan=mustBeginInSpan):
+                post.append(i)
+        return post
+
+    def getIndicesByPitchSpace(self, psLow, psHigh=None):
+        '''
+        Return a list of the indices of Notes whose pitch space value
+        is between `psLow` and `psHigh`, inclusive. Rests are never matched.
+
+        >>> from music21 import *
+        >>> na = noteArray.NoteArray()
+        >>> for p in ['C4', 'D4', 'E4', 'F4']:
+        ...     na.append(note.Note(p))
+        >>> na.append(note.Rest())
+        >>> na.getIndicesByPitchSpace(62, 64)
+        [1, 2]
+        >>> na.getIndicesByPitchSpace(65)
+        [3]
+        '''
+        if psHigh is None:
+            psHigh = psLow
+        steps = self._steps
+        return [i for i, ps in enumerate(self.pitchSpaces)
+            if psLow <= ps <= psHigh and steps[i] != _REST_STEP]
+
+    def getNote(self, index):
+        '''
+        Create a new Note or Rest from the entry at `index`.
+
+        >>> from music21 import *
+        >>> n = note.Note('G`3', quarterLength=1/3.)
+        >>> n.microtone = 20
+        >>> na = noteArray.NoteArray()
+        >>> na.append(n)
+        >>> post = na.getNote(0)
+        >>> post.pitch
+        <music21.pitch.Pitch G`3(+20c)>
+        >>> post.pitch.ps == n.pitch.ps
+        True
+        >>> post.duration.tuplets[0]
+        <music21.duration.Tuplet 3/2/eighth>
+        '''
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise NoteArrayException('index out of range: %s' % index)
+
+        d = duration.Duration(self.quarterLengths[index])
+        step = self._steps[index]
+        if step == _REST_STEP:
+            post = note.Rest(duration=d)
+        else:
+            p = pitch.Pitch(_STEPS[step])
+            alter = self._alters[index]
+            if alter != 0:
+                p.accidental = pitch.Accidental(alter)
+            if self._octaves[index] != _NO_OCTAVE:
+                p.octave = self._octaves[index]
+            if self._microtones[index] != 0:
+                p.microtone = self._microtones[index]
+            post = note.Note(p, duration=d)
+        tieType = _TIE_TYPES[self.ties[index]]
+        if tieType is not None:
+            post.tie = tie.Tie(tieType)
+        return post
+
+    def toStream(self, streamClass=None):
+        '''
+        Return a Stream containing new Notes and Rests for all entries,
+        at their stored offsets.
+
+        >>> from music21 import *
+        >>> s = converter.parse('c4 d8 r8 e2~ e4', '4/4')
+        >>> na = noteArray.NoteArray.fromStream(s)
+        >>> post = na.toStream()
+        >>> [e.offset for e in post]
+        [0.0, 1.0, 1.5, 2.0, 4.0]
+        >>> [str(e.tie) for e in post]
+        ['None', 'None', 'None', '<music21.tie.Tie start>', '<music21.tie.Tie stop>']
+        '''
+        if streamClass is None:
+            streamClass = stream.Stream
+        post = streamClass()
+        for i in range(len(self)):
+            post._insertCore(self.offsets[i], self.getNote(i))
+        post._elementsChanged()
+        return post
+
+
+
+#-------------------------------------------------------------------------------
+class Test(unittest.TestCase):
+
+    def runTest(self):
+        pass
+
+    def testRoundTripA(self):
+        from music21 import corpus
+
+        s = corpus.parse('bach/bwv66.6')
+        src = s.parts[1].flat.notesAndRests
+        na = NoteArray.fromStream(s.parts[1])
+        self.assertEqual(len(na), len(src))
+
+        post = na.toStream()
+        for a, b in zip(src, post):
+            self.assertEqual(a.offset, b.offset)
+            self.assertEqual(a.quarterLength, b.quarterLength)
+            self.assertEqual(a.isRest, b.isRest)
+            if not a.isRest:
+                self.assertEqual(a.pitch.nameWithOctave,
+                    b.pitch.nameWithOctave)
+                self.assertEqual(a.pitch.ps, b.pitch.ps)
+            self.assertEqual(str(a.tie), str(b.tie))
+
+        # slices retain values
+        sub = na[2:5]
+        self.assertEqual(len(sub), 3)
+        self.assertEqual(list(sub.offsets), list(na.offsets[2:5]))
+        self.assertEqual(sub[0].pitch.ps, na[2].pitch.ps)
+
+    def testOffsetQueryA(self):
+        from music21 import note
+
+        na = NoteArray()
+        # out of order entries disable the binary search
+        na.append(note.Note('C4'), 4)
+        na.append(note.Note('D4', quarterLength=3), 0)
+        self.assertEqual(na.isSorted, False)
+        self.assertEqual(na.getIndicesByOffset(0, 4), [0, 1])
+        self.assertEqual(na.getIndicesByOffset(2, 2,
+            mustBeginInSpan=False), [1])
+        self.assertEqual(na.highestTime, 5.0)
+
+        s = stream.Stream()
+        s.repeatAppend(note.Note('A4'), 20)
+        na = NoteArray.fromStream(s)
+        self.assertEqual(na.isSorted, True)
+        self.assertEqual(na.getIndicesByOffset(5, 7.5), [5, 6, 7])
+        self.assertEqual(len(s.getElementsByOffset(5, 7.5)), 3)
+
+        # offsets just below the start match after cleanup, as in Streams
+        s = stream.Stream()
+        for offset in [0, 0.99999, 2]:
+            s.insert(offset, note.Note('A4'))
+        na = NoteArray.fromStream(s)
+        self.assertEqual(na.isSorted, True)
+        self.assertEqual(na.getIndicesByOffset(1.0), [1])
+        self.assertEqual(len(s.getElementsByOffset(1.0)), 1)
+        self.assertEqual(na.highestTime, 3.0)
+
+
+#-------------------------------------------------------------------------------
+# define presented order in documentation
+_DOC_ORDER = [NoteArray]
+
+
+if __name__ == "__main__":
+    import music21
+    music21.mainTest(Test)
+
+
+#------------------------------------------------------------------------------
+# eof
+
@@ -332,6 +332,8 @@ class Spanner(base.Music21Object):
     def freezeIds(self):
         base.Music21Object.freezeIds(self)
         self._components.freezeIds()
+        # cached component ids are not valid once restored
+        self._cache = {}
 
     def unfreezeIds(self):
         base.Music21Object.unfreezeIds(self)
@@ -17,6 +17,7 @@
 import copy, types, random
 import doctest, unittest
 import sys
+import bisect
 from copy import deepcopy
 import itertools
 from collections import defaultdict
@@ -25,7 +26,7 @@ from operator import attrgetter
 from music21 import base
 from music21 import bar
 from music21 import common
-#from music21 import classCache
+from music21 import classCache
 from music21 import clef
 from music21 import chord
 from music21 import defaults
@@ -91,6 +92,350 @@ class StreamIterator(object):
         return post
 
 
+#-------------------------------------------------------------------------------
+class OffsetIndex(object):
+    '''
+    An index of the start and end offsets of all elements in a sorted 
+    Stream, used to answer offset range and overlap queries without 
+    scanning every element.
+
+    Offsets are stored in sorted order and searched with `bisect`; overlap 
+    queries use the sorted elements as an implicit balanced binary tree in 
+    which every node stores the maximum end offset of its subtree, so 
+    that queries run in O(log n + k) time.
+
+    An OffsetIndex is a snapshot: it is stored in the Stream's `_cache` and 
+    is discarded whenever :meth:`~music21.stream.Stream._elementsChanged` 
+    is called or the offset of an element is set. As with the cached 
+    `highestTime`, later changes to element durations are not seen.
+
+    >>> from music21 import *
+    >>> s = stream.Stream()
+    >>> s.repeatAppend(note.HalfNote(), 4)
+    >>> s.insert(1, clef.BassClef())
+    >>> oi = stream.OffsetIndex(s)
+    >>> oi.offsets
+    [0.0, 1.0, 2.0, 4.0, 6.0]
+    >>> oi.ends
+    [2.0, 1.0, 4.0, 6.0, 8.0]
+    >>> oi.getElementsStartingIn(1, 4)
+    [<music21.clef.BassClef>, <music21.note.Note C>, <music21.note.Note C>]
+    >>> [e.getOffsetBySite(s) for e in oi.getElementsOverlapping(3, 4.5)]
+    [2.0, 4.0]
+    '''
+    def __init__(self, srcStream):
+        self.srcStreamId = id(srcStream)
+        # the elements property will sort if necessary
+        self.elements = srcStream.elements
+        self.offsets = []
+        self.ends = []
+        # elements added with _insertCore may not be in order even if
+        # the Stream claims to be sorted; such an index cannot be used
+        self.isSorted = True
+        for e in self.elements:
+            offset = e.getOffsetBySite(srcStream)
+            if self.offsets and offset < self.offsets[-1]:
+                self.isSorted = False
+            self.offsets.append(offset)
+            self.ends.append(offset + e.duration.quarterLength)
+        self._maxEnds = self.ends[:]
+        self._setMaxEnds(0, len(self.ends) - 1)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def _setMaxEnds(self, lo, hi):
+        '''
+        Store, at the middle position of each span of positions, the 
+        maximum end offset found within that span. Returns that maximum.
+        '''
+        if lo > hi:
+            return None
+        mid = (lo + hi) // 2
+        maxEnd = self.ends[mid]
+        for subMax in (self._setMaxEnds(lo, mid - 1), 
+                       self._setMaxEnds(mid + 1, hi)):
+            if subMax is not None and subMax > maxEnd:
+                maxEnd = subMax
+        self._maxEnds[mid] = maxEnd
+        return maxEnd
+
+    def getElementsStartingIn(self, offsetStart, offsetEnd):
+        '''
+        Return a list of all elements with offsets greater than or equal to 
+        `offsetStart` and less than or equal to `offsetEnd`, in Stream order.
+        '''
+        i = bisect.bisect_left(self.offsets, offsetStart)
+        j = bisect.bisect_right(self.offsets, offsetEnd)
+        return self.elements[i:j]
+
+    def getElementsOverlapping(self, offsetStart, offsetEnd):
+        '''
+        Return a list of all elements that start at or before `offsetEnd` 
+        and end at or after `offsetStart`, in Stream order.
+        '''
+        post = []
+        # a stack of (lo, hi, visited) spans emulates in-order recursion
+        stack = [(0, len(self.elements) - 1, False)]
+        while stack:
+            lo, hi, visited = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            if visited:
+                # everything to the left has been collected
+                if self.offsets[mid] > offsetEnd:
+                    break # all remaining elements start later
+                if self.ends[mid] >= offsetStart:
+                    post.append(self.elements[mid])
+                stack.append((mid + 1, hi, False))
+                continue
+            if self._maxEnds[mid] < offsetStart:
+                continue # nothing in this span reaches offsetStart
+            stack.append((lo, hi, True))
+            stack.append((lo, mid - 1, False))
+        return post
+
+    def getIndexAtOrBefore(self, offset):
+        '''
+        Return the position after the last element with an offset less than 
+        or equal to `offset`.
+        '''
+        return bisect.bisect_right(self.offsets, offset)
+
+    def getIndexBefore(self, offset):
+        '''
+        Return the position after the last element with an offset less 
+        than `offset`.
+        '''
+        return bisect.bisect_left(self.offsets, offset)
+
+
+#-------------------------------------------------------------------------------
+class StreamView(object):
+    '''
+    A lightweight, read-only sequence of elements and their offsets, 
+    returned by some Stream methods in place of a new Stream. 
+
+    Creating a Stream from the elements of another Stream adds a location 
+    to every element; a StreamView only stores references, and adds no 
+    sites. The offset of each element is available from the `offsets` 
+    list or :meth:`~music21.stream.StreamView.getOffsetByElement`; as 
+    iterating does not set the `activeSite` of elements, the `offset` 
+    attribute of an element should not be relied upon.
+
+    >>> from music21 import *
+    >>> s = stream.Stream()
+    >>> s.repeatAppend(note.Note('E4'), 3)
+    >>> s.insert(1, clef.BassClef())
+    >>> sv = s.getElementsByClass('Note', returnView=True)
+    >>> len(sv)
+    3
+    >>> sv.offsets
+    [0.0, 1.0, 2.0]
+    >>> sv[1]
+    <music21.note.Note E>
+    >>> sv.getOffsetByElement(sv[2])
+    2.0
+    >>> len(sv[1:])
+    2
+    '''
+    def __init__(self, srcStream=None, elements=None, offsets=None, 
+        isSorted=False):
+        self.srcStream = srcStream
+        if elements is None:
+            elements = []
+        if offsets is None:
+            offsets = []
+        self._elements = elements
+        self._offsets = offsets
+        # if True, offsets are in ascending order
+        self.isSorted = isSorted
+
+    def __repr__(self):
+        return '<%s.%s of %s>' % (self.__module__, self.__class__.__name__, 
+                                  self.srcStream)
+
+    def _getElementsAndOffsets(self):
+        '''
+        Return the lists of elements and offsets. Subclasses may 
+        override this to gather elements when first needed.
+        '''
+        return self._elements, self._offsets
+
+    def __len__(self):
+        return len(self._getElementsAndOffsets()[0])
+
+    def __iter__(self):
+        return iter(self._getElementsAndOffsets()[0])
+
+    def __getitem__(self, key):
+        elements, offsets = self._getElementsAndOffsets()
+        if isinstance(key, slice):
+            return StreamView(self.srcStream, elements[key], offsets[key], 
+                              isSorted=self.isSorted)
+        return elements[key]
+
+    def _getElements(self):
+        return list(self._getElementsAndOffsets()[0])
+
+    elements = property(_getElements, doc='''
+        A new list of the elements in this view.
+        ''')
+
+    def _getOffsets(self):
+        return list(self._getElementsAndOffsets()[1])
+
+    offsets = property(_getOffsets, doc='''
+        A new list of the offsets of the elements in this view.
+        ''')
+
+    def getOffsetByElement(self, obj):
+        '''
+        Return the offset of the element `obj` in this view, or None if 
+        it is not found. Elements are matched by id().
+        '''
+        elements, offsets = self._getElementsAndOffsets()
+        objId = id(obj)
+        for i in range(len(elements)):
+            if id(elements[i]) == objId:
+                return offsets[i]
+        return None
+
+    def getElementsByClass(self, classFilterList):
+        '''
+        Return a new StreamView of the elements that match one or 
+        more classes in `classFilterList`.
+        '''
+        if not isinstance(classFilterList, (list, tuple)):
+            classFilterList = (classFilterList,)
+        elements, offsets = self._getElementsAndOffsets()
+        postElements = []
+        postOffsets = []
+        for i in range(len(elements)):
+            if elements[i].isClassOrSubclass(classFilterList):
+                postElements.append(elements[i])
+                postOffsets.append(offsets[i])
+        return StreamView(self.srcStream, postElements, postOffsets, 
+                          isSorted=self.isSorted)
+
+    def getElementsByOffset(self, offsetStart, offsetEnd=None,
+                    includeEndBoundary=True, mustFinishInSpan=False, 
+                    mustBeginInSpan=True, classList=None):
+        '''
+        Return a new StreamView of the elements found at an offset or 
+        within an offset range. The arguments are the same as those of 
+        :meth:`~music21.stream.Stream.getElementsByOffset`.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> s.repeatAppend(note.Note('G4', type='half'), 4)
+        >>> sv = s.getElementsByClass('Note', returnView=True)
+        >>> sv.getElementsByOffset(2, 4).offsets
+        [2.0, 4.0]
+        >>> sv.getElementsByOffset(3, mustBeginInSpan=False).offsets
+        [2.0]
+        '''
+        if offsetEnd is None:
+            offsetEnd = offsetStart
+        elements, offsets = self._getElementsAndOffsets()
+        start = 0
+        end = len(elements)
+        if self.isSorted:
+            end = bisect.bisect_right(offsets, offsetEnd)
+            if mustBeginInSpan:
+                start = bisect.bisect_left(offsets, 
+                        offsetStart - common.OFFSET_SEARCH_MARGIN)
+        postElements = []
+        postOffsets = []
+        for i in range(start, end):
+            e = elements[i]
+            if classList is not None:
+                if not e.isClassOrSubclass(classList):
+                    continue
+            if common.offsetSpanMatches(offsets[i], e.duration.quarterLength, 
+                offsetStart, offsetEnd, includeEndBoundary, mustFinishInSpan, 
+                mustBeginInSpan):
+                postElements.append(e)
+                postOffsets.append(offsets[i])
+        return StreamView(self.srcStream, postElements, postOffsets, 
+                          isSorted=self.isSorted)
+
+
+class FlatView(StreamView):
+    '''
+    A read-only, flattened view of a Stream and all Streams it contains, 
+    as returned by :attr:`~music21.stream.Stream.flatView`. 
+
+    Elements are gathered, and their offsets in the outermost Stream 
+    calculated, only when first needed. Unlike 
+    :attr:`~music21.stream.Stream.flat`, no new Stream is created and no 
+    locations are added to the elements. Elements are in the order in 
+    which the flat Stream would present them.
+
+    >>> from music21 import *
+    >>> p = stream.Part()
+    >>> for i in range(2):
+    ...     m = stream.Measure()
+    ...     m.repeatAppend(note.Note('D4'), 4)
+    ...     p.append(m)
+    >>> fv = p.flatView
+    >>> fv
+    <music21.stream.FlatView of <music21.stream.Part ...>>
+    >>> len(fv)
+    8
+    >>> fv.offsets
+    [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    >>> len(fv[5].getSites())
+    2
+    >>> fv.getElementsByOffset(3, 4).offsets
+    [3.0, 4.0]
+    '''
+    def __init__(self, srcStream):
+        StreamView.__init__(self, srcStream, isSorted=True)
+        self._gathered = False
+
+    def _getElementsAndOffsets(self):
+        if not self._gathered:
+            self._gather()
+        return self._elements, self._offsets
+
+    def _gather(self):
+        '''
+        Collect all non-Stream elements and their offsets in the source 
+        Stream, sorting them as a flat Stream would.
+        '''
+        src = self.srcStream
+        post = [] # pairs of sort key and element
+        self._gatherStream(src, 0.0, post)
+        if src.autoSort:
+            post.sort(key=lambda x: x[0])
+        else:
+            self.isSorted = False
+        self._elements = [x[1] for x in post]
+        self._offsets = [x[0][0] for x in post]
+        # end elements of the source Stream remain at its highest time
+        highestTime = src.highestTime
+        for e in src._endElements:
+            self._elements.append(e)
+            self._offsets.append(highestTime)
+        self._gathered = True
+
+    def _gatherStream(self, srcStream, offset, post):
+        for e in srcStream._elements:
+            eOffset = offset + e.getOffsetBySite(srcStream)
+            if e.isStream:
+                self._gatherStream(e, eOffset, post)
+                # end elements of contained Streams are placed at their end
+                highestTime = eOffset + e.highestTime
+                for eSub in e._endElements:
+                    post.append(((highestTime, eSub.priority, 
+                        eSub.classSortOrder, not eSub.isGrace), eSub))
+            else:
+                post.append(((eOffset, e.priority, e.classSortOrder, 
+                              not e.isGrace), e))
+
+
 #-------------------------------------------------------------------------------
 
 class Stream(base.Music21Object):
@@ -170,6 +515,8 @@ class Stream(base.Music21Object):
     'isSorted': 'Boolean describing whether the Stream is sorted or not.',
     'autoSort': 'Boolean describing whether the Stream is automatically sorted by offset whenever necessary.',
 
+    'keepSorted': 'Boolean describing whether elements inserted into a sorted Stream are placed directly at their sorted position (found by binary search), so that the Stream never needs to be fully re-sorted. Only used when autoSort is True.',
+
     'isFlat': 'Boolean describing whether this Stream contains embedded sub-Streams or Stream subclasses (not flat).',
 
     'flattenedRepresentationOf': 'When this flat Stream is derived from another non-flat stream, a reference to the source Stream is stored here.',
@@ -193,6 +540,10 @@ class Stream(base.Music21Object):
 
         self.isSorted = True
         self.autoSort = True
+        self.keepSorted = False
+        # incremented when the element lists change; caches kept across 
+        # changes, such as the ClassCache, compare it to find changes
+        self._mutations = 0
         self.isFlat = True  # does it have no embedded Streams
 
         # property for transposition status; 
@@ -369,6 +720,7 @@ class Stream(base.Music21Object):
         >>> a.isFlat
         False
         '''
+        self._mutations += 1
         # experimental
         if not self._mutable:
             return 
@@ -413,6 +765,19 @@ class Stream(base.Music21Object):
             if keepIndex:
                 self._cache['index'] = indexCache
 
+    def _elementsChangedByRemoval(self, element):
+        '''
+        Call :meth:`~music21.stream.Stream._elementsChanged` after `element` 
+        has been removed from `_elements` or `_endElements`. Removal does 
+        not change the sort status, and the class cache is updated rather 
+        than discarded.
+        '''
+        cc = self._getCurrentClassCache()
+        self._elementsChanged(clearIsSorted=False)
+        if cc is not None:
+            cc.removeElement(element)
+            self._cache['classCache'] = cc
+
     def _getElements(self):
         '''Combines the two storage lists, _elements and _endElements, such that they appear as a single list. 
         '''
@@ -723,6 +1088,9 @@ class Stream(base.Music21Object):
         False
         '''
         #environLocal.printDebug(['calling hasElementOfClass()', className])
+        cc = self._getCurrentClassCache()
+        if cc is not None and isinstance(className, basestring):
+            return cc.hasElementOfClass(className)
         for e in self._elements:
             if e.isClassOrSubclass([className]): 
                 return True
@@ -852,11 +1220,25 @@ class Stream(base.Music21Object):
         else:
             self._cache['index'] = {}     
 
-        # TODO: possibly replace by binary search
         if common.isNum(obj):
             objId = obj
         else:
             objId = id(obj)
+            # if sorted positions are maintained, a binary search finds
+            # the run of elements that share the sort key of obj
+            if self.keepSorted and self.isSorted:
+                try:
+                    key = self._elementSortKey(obj)
+                except exceptions21.DefinedContextsException:
+                    key = None # not in this Stream, or an end element
+                if key is not None:
+                    count = self._bisectElements(key, right=False)
+                    while (count < len(self._elements) and 
+                        self._elementSortKey(self._elements[count]) == key):
+                        if id(self._elements[count]) == objId:
+                            self._cache['index'][objId] = count
+                            return count
+                        count += 1
 
         count = 0
         for e in self._elements:
@@ -953,7 +1335,7 @@ class Stream(base.Music21Object):
                     if shiftOffsets is True:
                         matchOffset = match.getOffsetBySite(self)
                     
-                    self._elementsChanged(clearIsSorted=False)
+                    self._elementsChangedByRemoval(match)
                     match.removeLocationBySite(self)
                 
                 if shiftOffsets is True and matchedEndElement is False:
@@ -995,7 +1377,7 @@ class Stream(base.Music21Object):
                 if shiftOffsets is True: 
                     matchOffset = match.getOffsetBySite(self)
                 # removing an object will never change the sort status
-                self._elementsChanged(clearIsSorted=False)
+                self._elementsChangedByRemoval(match)
                 match.removeLocationBySite(self)
                 
                 if shiftOffsets is True and matchedEndElement is False: #shift all elements after the deletion point
@@ -1026,7 +1408,7 @@ class Stream(base.Music21Object):
         else: # its in the _endElements 
             post = self._endElements.pop(index - eLen)
 
-        self._elementsChanged(clearIsSorted=False)
+        self._elementsChangedByRemoval(post)
         # remove self from locations here only if
         # there are no further locations
         post.removeLocationBySite(self)
@@ -1285,15 +1667,25 @@ class Stream(base.Music21Object):
         # need to compare highest time before inserting the element in 
         # the elements list
         storeSorted = False 
+        insertSorted = False
         if not ignoreSort:
             # if sorted and our insertion is > the highest time, then
             # are still inserted
-            if self.isSorted is True and self.highestTime <= offset:
+            if self.isSorted is True and self.keepSorted and self.autoSort:
+                # binary search is cheaper than finding highestTime
+                insertSorted = True
+            elif self.isSorted is True and self.highestTime <= offset:
                 storeSorted = True
         element.addLocation(self, float(offset))
         # need to explicitly set the activeSite of the element
         if setActiveSite:
             element.activeSite = self
+        self._mutations += 1
+        if insertSorted:
+            # place at the sorted position; the Stream remains sorted
+            self._elements.insert(self._bisectElements(
+                self._elementSortKey(element)), element)
+            return True
         # will be sorted later if necessary
         self._elements.append(element)  
         return storeSorted
@@ -1399,6 +1791,7 @@ class Stream(base.Music21Object):
 
         # checks of element is self; possibly performs additional checks
         self._addElementPreProcess(element)
+        cc = self._getCurrentClassCache()
         # main insert procedure here
         storeSorted = self._insertCore(offset, element, 
                      ignoreSort=ignoreSort, setActiveSite=setActiveSite)
@@ -1408,6 +1801,10 @@ class Stream(base.Music21Object):
         self._elementsChanged(updateIsFlat=updateIsFlat) 
         if ignoreSort is False:
             self.isSorted = storeSorted
+        # the class cache can be kept if the element was stored last
+        if cc is not None and self._elements[-1] is element:
+            cc.addElement(element)
+            self._cache['classCache'] = cc
 
 
     def _appendCore(self, element):
@@ -1425,6 +1822,7 @@ class Stream(base.Music21Object):
         # need to explicitly set the activeSite of the element
         element.activeSite = self 
         self._elements.append(element)  
+        self._mutations += 1
         # does not change sorted state
         if element.duration is not None:
             self._setHighestTime(self.highestTime + 
@@ -1559,6 +1957,7 @@ class Stream(base.Music21Object):
         if not common.isListLike(others):
             # back into a list for list processing if single
             others = [others]
+        cc = self._getCurrentClassCache()
         updateIsFlat = False
         for e in others:
             try:
@@ -1585,6 +1984,10 @@ class Stream(base.Music21Object):
         self._elementsChanged(updateIsFlat=updateIsFlat)         
         self.isSorted = storeSorted
         self._setHighestTime(highestTime) # call after to store in cache
+        if cc is not None:
+            for e in others:
+                cc.addElement(e)
+            self._cache['classCache'] = cc
 
 
     def _storeAtEndCore(self, element):
@@ -1597,6 +2000,7 @@ class Stream(base.Music21Object):
         # could also do self.elements = self.elements + [element]
         #self._elements.append(element)  
         self._endElements.append(element)  
+        self._mutations += 1
 
 
     def storeAtEnd(self, itemOrList, ignoreSort=False):
@@ -1645,9 +2049,26 @@ class Stream(base.Music21Object):
 #         element.activeSite = self 
 #         self._endElements.append(element)  
 
+        storeSorted = (self.isSorted and self.keepSorted and self.autoSort 
+                       and not ignoreSort)
+        cc = self._getCurrentClassCache()
         self._storeAtEndCore(element)
+        if storeSorted:
+            # move the new end element to its sorted position
+            self._endElements.pop()
+            key = self._endElementSortKey(element)
+            i = len(self._endElements)
+            while i > 0 and self._endElementSortKey(
+                self._endElements[i-1]) > key:
+                i -= 1
+            self._endElements.insert(i, element)
         # Streams cannot reside in end elements, thus do not update is flat
         self._elementsChanged(updateIsFlat=False) 
+        if storeSorted:
+            self.isSorted = True
+        if cc is not None and self._endElements[-1] is element:
+            cc.addEndElement(element)
+            self._cache['classCache'] = cc
 
 
     #---------------------------------------------------------------------------
@@ -2053,6 +2474,11 @@ class Stream(base.Music21Object):
 
         # get all Stream that are in this hiearchy
         if topLevel:
+            # walking the hierarchy sets activeSites to the containing 
+            # Streams; store them, so that they are not changed
+            storedActiveSites = [(e, e.activeSite) for e in 
+                self._yieldElementsDownward(restoreActiveSites=False)]
+
             # get all Streams in this hierarchy
             streamsFound = self._yieldElementsDownward(streamsOnly=True, 
                        restoreActiveSites=True)
@@ -2062,6 +2488,26 @@ class Stream(base.Music21Object):
             spannerBundle = self.spannerBundle
             streamIdsFound += spannerBundle.getSpannerStorageIds()
 
+            # components of Spanners that are not in this hierarchy (such
+            # as notes dropped on import) are only found in SpannerStorage;
+            # as they may be shared with other Streams, they are replaced 
+            # with copies that can be changed
+            hierarchyIds = set([id(e) for e in self.recurse()])
+            spannerOrphans = []
+            for sp in spannerBundle:
+                for c in sp.getComponents():
+                    if id(c) not in hierarchyIds:
+                        cNew = copy.deepcopy(c)
+                        sp.replaceComponent(c, cNew)
+                        hierarchyIds.add(id(cNew))
+                        spannerOrphans.append(cNew)
+
+            # restore activeSites in this hierarchy; others are purged
+            for e, site in storedActiveSites:
+                if (site is not None and id(site) in streamIdsFound and 
+                    e.activeSite is not site):
+                    e.activeSite = site
+
             # TODO: a similar routine need to be done for Variants, getting
             # ids of contained Stream and passing them to purgeUndeclaredIds
 
@@ -2085,16 +2531,25 @@ class Stream(base.Music21Object):
                                     excludeStorageStreams=False)
                 e.unwrapWeakref()
                 e.freezeIds()
+
+        if topLevel:
+            for e in spannerOrphans:
+                e.purgeUndeclaredIds(streamIdsFound, 
+                                    excludeStorageStreams=False)
+                e.unwrapWeakref()
+                e.freezeIds()
                     
         # this must be done for all Streams
         # this calls overridden method
         self.unwrapWeakref()
         self.freezeIds()
 
-    def teardownSerializationScaffold(self):
+    def teardownSerializationScaffold(self, topLevel=True, spannersFound=None):
         '''
         After rebuilding this stream from pickled storage, prepare this as a normal Stream.
 
+        The `topLevel` and `spannersFound` arguments are used to keep track of recursive calls.
+
         >>> from music21 import *
 
         >>> a = stream.Stream()
@@ -2109,6 +2564,8 @@ class Stream(base.Music21Object):
         # turn off sorting before teardown
         storedAutoSort = self.autoSort
         self.autoSort = False
+        if topLevel:
+            spannersFound = []
 
         self._derivation.wrapWeakref()
 
@@ -2117,11 +2574,22 @@ class Stream(base.Music21Object):
 
         for e in self._elements + self._endElements:
             if e.isStream:
-                e.teardownSerializationScaffold()
+                e.teardownSerializationScaffold(topLevel=False, 
+                    spannersFound=spannersFound)
             else:
                 #environLocal.printDebug(['   processing music21 obj', e])
                 e.unfreezeIds()
                 e.wrapWeakref()
+                if 'Spanner' in e.classes:
+                    spannersFound.append(e)
+
+        if topLevel:
+            # restore Spanner components not found in this hierarchy; 
+            # this does not change components that are already restored
+            for sp in spannersFound:
+                for c in sp.getComponents():
+                    c.unfreezeIds()
+                    c.wrapWeakref()
 
         # restore to whatever it was
         self.autoSort = storedAutoSort
@@ -2334,7 +2802,45 @@ class Stream(base.Music21Object):
     #---------------------------------------------------------------------------
     # getElementsByX(self): anything that returns a collection of Elements should return a Stream
 
-    def getElementsByClass(self, classFilterList, returnStreamSubClass=True):
+    def _getClassCache(self):
+        '''
+        Return a :class:`~music21.classCache.ClassCache` of the elements 
+        of this Stream, in their present order. The ClassCache is stored in 
+        `_cache`; it is updated, rather than rebuilt, when elements are 
+        appended or removed.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> s.repeatAppend(note.Note(), 3)
+        >>> cc = s._getClassCache()
+        >>> len(cc.getElementListsByClass(['GeneralNote'])[0])
+        3
+        >>> s.append(note.Rest())
+        >>> s._getClassCache() is cc
+        True
+        >>> len(cc.repositories['GeneralNote'])
+        4
+        '''
+        cc = self._getCurrentClassCache()
+        if cc is None:
+            cc = classCache.ClassCache(self)
+            self._cache['classCache'] = cc
+        return cc
+
+    def _getCurrentClassCache(self):
+        '''
+        Return the stored ClassCache if it reflects the present elements of 
+        this Stream, otherwise None.
+        '''
+        if 'classCache' not in self._cache:
+            return None
+        cc = self._cache['classCache']
+        if cc is None or not cc.isCurrent(self):
+            return None
+        return cc
+
+    def getElementsByClass(self, classFilterList, returnStreamSubClass=True, 
+        returnView=False):
         '''Return a list of all Elements that match one or more classes in the `classFilterList`. A single class can be provided to the `classFilterList` parameter.
         
         >>> from music21 import *
@@ -2362,10 +2868,39 @@ class Stream(base.Music21Object):
         25
         >>> found.__class__.__name__
         'Score'
+
+
+        If `returnView` is True, a read-only 
+        :class:`~music21.stream.StreamView` is returned instead of a new 
+        Stream; no locations are added to the matched elements.
+
+        >>> found = a.getElementsByClass(['Note', 'Rest'], returnView=True)
+        >>> found
+        <music21.stream.StreamView of <music21.stream.Score ...>>
+        >>> len(found), found.offsets[-3:]
+        (14, [8.0, 9.0, 9.0])
         '''
         # TODO: could add `domain` parameter to allow searching only _elements, 
         # or _endElements, or both; possible performance hit
         # NOTE: this is a performance critical operation 
+
+        # much faster in the most common case than calling common.isListLike
+        if not isinstance(classFilterList, (list, tuple)):
+            classFilterList = tuple([classFilterList])
+
+        if not self.isSorted and self.autoSort:
+            self.sort() # will set isSorted to True
+
+        # matching elements are found from the class cache, in order 
+        elements, endElements = self._getClassCache().getElementListsByClass(
+            classFilterList)
+
+        if returnView:
+            offsets = [e.getOffsetBySite(self) for e in elements]
+            offsets += [e.getOffsetBySite(self) for e in endElements]
+            return StreamView(self, elements + endElements, offsets, 
+                              isSorted=self.isSorted)
+
         if returnStreamSubClass:
             try:
                 found = self.__class__()
@@ -2378,45 +2913,14 @@ class Stream(base.Music21Object):
         # passing on auto sort status may or may not be what is needed here
         found.autoSort = self.autoSort
 
-        # much faster in the most common case than calling common.isListLike
-        if not isinstance(classFilterList, (list, tuple)):
-            classFilterList = tuple([classFilterList])
-
-        # if we are sure that this Stream does not have a class
-        singleClassString = False
-        if (len(classFilterList) == 1 and 
-            isinstance(classFilterList[0], str)):
-            singleClassString = True
-        if singleClassString:
-            if not self.hasElementOfClass(classFilterList[0]):
-                found.isSorted = self.isSorted
-                return found
-
-        if not self.isSorted and self.autoSort:
-            self.sort() # will set isSorted to True
-        # if this stream was sorted, the resultant stream is sorted
-        found.isSorted = self.isSorted
-
-        # to use class cache, class must be provided as a string, 
-        # and there must be only one class
-#         if canUseClassCache:
-#             if self._cache['classCache'] is None:
-#                 self._cache['classCache'] = classCache.ClassCache()
-#                 self._cache['classCache'].load(self)
-#             found = self._cache['classCache'].getElementsByClass(found,
-#                                               classFilterList)
-#             return found
-
-        #found.show('t')
         # need both _elements and _endElements
-        for e in self._elements:
-            #eClasses = e.classes # store once, as this is property call
-            if e.isClassOrSubclass(classFilterList):
-                found._insertCore(e.getOffsetBySite(self), e, ignoreSort=True)                
-        for e in self._endElements:
-            if e.isClassOrSubclass(classFilterList):
-                found._storeAtEndCore(e)
+        for e in elements:
+            found._insertCore(e.getOffsetBySite(self), e, ignoreSort=True)                
+        for e in endElements:
+            found._storeAtEndCore(e)
         found._elementsChanged()
+        # if this stream was sorted, the resultant stream is sorted
+        found.isSorted = self.isSorted
         return found
 
 
@@ -2673,6 +3177,60 @@ class Stream(base.Music21Object):
         return None
 
 
+    def _getOffsetIndex(self):
+        '''
+        Return an :class:`~music21.stream.OffsetIndex` for this Stream, 
+        building it if necessary. The index is stored in `_cache`, and is 
+        thus rebuilt only after the elements of the Stream have changed. 
+
+        Returns None if this Stream is not sorted and cannot be sorted, 
+        or if its elements are not actually in order.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> s.repeatAppend(note.Note(), 3)
+        >>> oi = s._getOffsetIndex()
+        >>> oi.offsets
+        [0.0, 1.0, 2.0]
+        >>> s._getOffsetIndex() is oi
+        True
+        >>> s.append(note.Note())
+        >>> s._getOffsetIndex() is oi
+        False
+        '''
+        if not self.isSorted and self.autoSort:
+            self.sort() # will set isSorted to True
+        if not self.isSorted:
+            return None
+        if ('offsetIndex' not in self._cache or 
+            self._cache['offsetIndex'] is None or 
+            self._cache['offsetIndex'].srcStreamId != id(self)):
+            self._cache['offsetIndex'] = OffsetIndex(self)
+        if not self._cache['offsetIndex'].isSorted:
+            return None
+        return self._cache['offsetIndex']
+
+    def _clearOffsetIndex(self):
+        '''
+        Discard the stored :class:`~music21.stream.OffsetIndex`. This is 
+        called when the offset of an element in this Stream is set, 
+        as such a change does not call 
+        :meth:`~music21.stream.Stream._elementsChanged`.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> n = note.Note()
+        >>> s.insert(2, n)
+        >>> s.getElementAtOrBefore(1)
+        >>> n.setOffsetBySite(s, 0)
+        >>> s.getElementAtOrBefore(1) is n
+        True
+        >>> n.offset = 3
+        >>> s.getElementAtOrBefore(1)
+        '''
+        if 'offsetIndex' in self._cache:
+            del self._cache['offsetIndex']
+
     def _highestPriorityAtOffset(self, offset):
         '''Return the highes priority for all elements found at a specific offset.
         This may be a public method if useful.
@@ -2809,12 +3367,23 @@ class Stream(base.Music21Object):
         found.setDerivation(self)
         found.derivationMethod = 'getElementsByOffset'
 
-        # need both _elements and _endElements
-        for e in self.elements:
+        # if sorted, the offset index provides all candidates; these are
+        # then tested exactly as below
+        offsetIndex = self._getOffsetIndex()
+        if offsetIndex is None:
+            # need both _elements and _endElements
+            candidates = self.elements
+        elif mustBeginInSpan:
+            candidates = offsetIndex.getElementsStartingIn(
+                offsetStart - common.OFFSET_SEARCH_MARGIN, offsetEnd)
+        else:
+            candidates = offsetIndex.getElementsOverlapping(
+                offsetStart - common.OFFSET_SEARCH_MARGIN, offsetEnd)
+
+        for e in candidates:
             if classList is not None:
                 if not e.isClassOrSubclass(classList):
                     continue
-            match = False
             offset = e.getOffsetBySite(self)
             # if sorted, optimize by breaking after exceeding offsetEnd
             if self.isSorted:
@@ -2824,51 +3393,9 @@ class Stream(base.Music21Object):
                 # it is not  a match
                 if offset < (offsetStart - e.duration.quarterLength):
                     continue
-            dur = e.duration
-            if not mustFinishInSpan:
-                eEnd = offset
-            else:
-                eEnd = offset + dur.quarterLength
-            eEnd = common.cleanupFloat(eEnd)
-    
-            if not mustBeginInSpan:
-                eStart = offset + dur.quarterLength
-            else:
-                eStart = offset
-            eStart = common.cleanupFloat(eStart)
-
-            match = False
-
-            # alternate version that uses common based comparison
-            # not yet seen as necessary (but incurring a performance hit so
-            # not yet used
-
-#             if (includeEndBoundary is True and mustBeginInSpan is True and 
-#                 common.greaterThanOrEqual(eStart, offsetStart) and common.lessThanOrEqual(eEnd, offsetEnd)):
-#                     match = True
-#             elif (includeEndBoundary is True and mustBeginInSpan is False and
-#                 eStart > offsetStart and common.lessThanOrEqual(eEnd, offsetEnd)):
-#                     match = True
-#             elif (includeEndBoundary is False and mustBeginInSpan is True and 
-#                 common.greaterThanOrEqual(eStart, offsetStart) and eEnd < offsetEnd):
-#                     match = True
-#             elif (includeEndBoundary is False and mustBeginInSpan is False and
-#                 eStart > offsetStart and eEnd < offsetEnd):
-#                     match = True
-
-            if includeEndBoundary is True and mustBeginInSpan is True and \
-                eStart >= offsetStart and eEnd <= offsetEnd:
-                    match = True
-            elif includeEndBoundary is True and mustBeginInSpan is False and \
-                eStart > offsetStart and eEnd <= offsetEnd:
-                    match = True
-            elif includeEndBoundary is False and mustBeginInSpan is True and \
-                eStart >= offsetStart and eEnd < offsetEnd:
-                    match = True
-            elif includeEndBoundary is False and mustBeginInSpan is False and \
-                eStart > offsetStart and eEnd < offsetEnd:
-                    match = True
-
+            match = common.offsetSpanMatches(offset, e.duration.quarterLength, 
+                offsetStart, offsetEnd, includeEndBoundary, mustFinishInSpan, 
+                mustBeginInSpan)
             if match:
                 found._insertCore(offset, e)
 
@@ -2964,6 +3491,12 @@ class Stream(base.Music21Object):
         # NOTE: this is a performance critical method
         # TODO: need to deal with more than on object the same
         # offset and span from the source
+        offsetIndex = self._getOffsetIndex()
+        if offsetIndex is not None:
+            return self._getElementBeforeIndex(offsetIndex, 
+                offsetIndex.getIndexAtOrBefore(offset), min(offset, 0.0), 
+                classList)
+
         candidates = []
         nearestTrailSpan = offset # start with max time
 
@@ -2994,6 +3527,39 @@ class Stream(base.Music21Object):
             return None
 
 
+    def _getElementBeforeIndex(self, offsetIndex, index, minOffset, 
+        classList=None):
+        '''
+        Given an :class:`~music21.stream.OffsetIndex` and a position within 
+        it, return the last element before that position that matches 
+        `classList` and has an offset of at least `minOffset`. Of the 
+        matching elements that share that element's offset, the same 
+        element is returned as would be by sorting candidates in 
+        :meth:`~music21.stream.Stream.getElementAtOrBefore`.
+        '''
+        candidates = []
+        matchOffset = None
+        i = index - 1
+        while i >= 0:
+            if offsetIndex.offsets[i] < minOffset:
+                break
+            if matchOffset is not None and offsetIndex.offsets[i] != matchOffset:
+                break
+            e = offsetIndex.elements[i]
+            if classList is None or e.isClassOrSubclass(classList):
+                matchOffset = offsetIndex.offsets[i]
+                candidates.append((0, e))
+            i -= 1
+        if len(candidates) > 0:
+            # restore Stream order before sorting, as ties are resolved
+            # by comparing elements
+            candidates.reverse()
+            candidates.sort() 
+            candidates[0][1].activeSite = self
+            return candidates[0][1]
+        else:
+            return None
+
     def getElementAtOrAfter(self, offset, classList=None):
         '''Given an offset, find the element at this offset, or with the offset
         greater than and nearest to.
@@ -3039,6 +3605,11 @@ class Stream(base.Music21Object):
         (0.0, 'z')
         '''
         # NOTE: this is a performance critical method
+        offsetIndex = self._getOffsetIndex()
+        if offsetIndex is not None:
+            return self._getElementBeforeIndex(offsetIndex, 
+                offsetIndex.getIndexBefore(offset), 0.0, classList)
+
         candidates = []
         nearestTrailSpan = offset # start with max time
 
@@ -6622,23 +7193,64 @@ class Stream(base.Music21Object):
         # experimental
         if (not self.isSorted and self._mutable) or force:
             #environLocal.printDebug(['sorting _elements, _endElements'])
-            self._elements.sort(
-                cmp=lambda x, y: cmp(
-                    x.getOffsetBySite(self), y.getOffsetBySite(self)) 
-                    or cmp(x.priority, y.priority)  
-                    or cmp(x.classSortOrder, y.classSortOrder)
-                    or cmp(not x.isGrace, not y.isGrace) # sort graces first
-                )
-            self._endElements.sort(
-                cmp=lambda x, y: cmp(x.priority, y.priority) or 
-                    cmp(x.classSortOrder, y.classSortOrder)
-                )
+            self._elements.sort(key=self._elementSortKey)
+            self._endElements.sort(key=self._endElementSortKey)
             # as sorting changes order, elements have changed; 
             # need to clear cache, but flat status is the same
             self._elementsChanged(updateIsFlat=False, clearIsSorted=False)
             self.isSorted = True
             #environLocal.printDebug(['_elements', self._elements])
 
+    def _elementSortKey(self, e):
+        '''
+        Return the key by which an element of `_elements` is sorted: 
+        offset, then priority, then classSortOrder, with grace notes 
+        placed first.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> n = note.Note()
+        >>> s.insert(2, n)
+        >>> s._elementSortKey(n)
+        (2.0, 0, 20, True)
+        '''
+        return (e.getOffsetBySite(self), e.priority, e.classSortOrder, 
+                not e.isGrace)
+
+    def _endElementSortKey(self, e):
+        '''
+        Return the key by which an element of `_endElements` is sorted.
+        '''
+        return (e.priority, e.classSortOrder)
+
+    def _bisectElements(self, key, right=True):
+        '''
+        Given a sort key as returned by :meth:`_elementSortKey`, return the 
+        index in `_elements` at which an element with that key would be 
+        inserted to keep `_elements` sorted. As with the `bisect` module, 
+        `right` places the index after any elements with an equal key.
+
+        The Stream must be sorted.
+
+        >>> from music21 import *
+        >>> s = stream.Stream()
+        >>> s.repeatInsert(note.Note(), [0, 1, 1, 2])
+        >>> s._bisectElements((1.0, 0, 20, True))
+        3
+        >>> s._bisectElements((1.0, 0, 20, True), right=False)
+        1
+        '''
+        lo = 0
+        hi = len(self._elements)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            midKey = self._elementSortKey(self._elements[mid])
+            if midKey < key or (right and midKey == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
     def _getSorted(self):
         if 'sorted' not in self._cache or self._cache['sorted'] is None:
             shallowElements = copy.copy(self._elements) # already a copy
@@ -7064,7 +7676,33 @@ class Stream(base.Music21Object):
         <music21.note.Note C>
         >>> sf[0][0]
         <music21.note.Note C>
-        
+
+        ''')
+
+    def _getFlatView(self):
+        if 'flatView' not in self._cache or self._cache['flatView'] is None:
+            self._cache['flatView'] = FlatView(self)
+        return self._cache['flatView']
+
+    flatView = property(_getFlatView, doc='''
+        Returns a read-only :class:`~music21.stream.FlatView` of all
+        non-Stream elements in this Stream and in all Streams it contains,
+        with offsets relative to this Stream.
+
+        Unlike :attr:`~music21.stream.Stream.flat`, no new Stream is
+        created, and no locations are added to the elements. The view
+        supports `len()`, iteration, indexing, `getElementsByClass()` and
+        `getElementsByOffset()`, each of which returns a new view.
+
+        >>> from music21 import *
+        >>> s = corpus.parse('bach/bwv66.6')
+        >>> len(s.flatView.getElementsByClass('Note'))
+        165
+        >>> notes = s.flatView.getElementsByClass('Note')
+        >>> len(notes.getElementsByOffset(0, 0.5))
+        7
+        >>> notes.elements == s.flat.getElementsByClass('Note').elements
+        True
         ''')
 
 
@@ -7207,6 +7845,136 @@ class Stream(base.Music21Object):
         else:
             raise StreamException('no such direction: %s' % direction)
 
+    def recurseWithOffsets(self, classFilter=None, streamFilter=None,
+        streamsOnly=False, restoreActiveSites=False):
+        '''
+        Return a generator of (element, offset, containers) tuples for
+        all elements in this Stream and in all Streams it contains,
+        going downward. The offset is the offset of the element in this
+        Stream; containers is a tuple of the Streams from this Stream down
+        to the Stream that directly contains the element. As with
+        :attr:`~music21.stream.Stream.flat`, elements stored at the end of
+        a Stream are given the highest time of that Stream.
+
+        As elements are yielded as they are found, no list of all elements
+        is created, and no locations are added to elements. Streams must
+        not be changed while iterating.
+
+        >>> from music21 import *
+        >>> p = stream.Part()
+        >>> for i in range(2):
+        ...     m = stream.Measure()
+        ...     m.number = i + 1
+        ...     m.repeatAppend(note.Note('F4', type='half'), 2)
+        ...     p.append(m)
+        >>> for e, offset, containers in p.recurseWithOffsets():
+        ...     print e, offset, len(containers)
+        <music21.stream.Measure 1 offset=0.0> 0.0 1
+        <music21.note.Note F> 0.0 2
+        <music21.note.Note F> 2.0 2
+        <music21.stream.Measure 2 offset=4.0> 4.0 1
+        <music21.note.Note F> 4.0 2
+        <music21.note.Note F> 6.0 2
+
+        If `classFilter` is given, only elements (including Streams) that
+        match one or more of the classes are yielded. If all of the 
+        classes are Stream classes, the contents of Streams that contain 
+        no other Streams are not searched.
+
+        >>> [x[1] for x in p.recurseWithOffsets(classFilter='Note')]
+        [0.0, 2.0, 4.0, 6.0]
+        >>> x = list(p.recurseWithOffsets(classFilter=['Note']))[-1]
+        >>> x[2][-1].number
+        2
+
+        If `streamFilter` is given, only Streams that match one or more of
+        its classes are searched; the contents of all other Streams are
+        skipped.
+
+        >>> s = stream.Score()
+        >>> s.insert(0, p)
+        >>> s.insert(0, stream.Voice([note.Note('C5')]))
+        >>> len(list(s.recurseWithOffsets(classFilter='Note')))
+        5
+        >>> len(list(s.recurseWithOffsets(classFilter='Note',
+        ...     streamFilter=['Part', 'Measure'])))
+        4
+
+        If `streamsOnly` is True, only Streams are yielded.
+
+        If `restoreActiveSites` is True, the activeSite of each element 
+        found is set to the Stream that contains it, as done by 
+        :meth:`~music21.stream.Stream.recurse`; by default, activeSites 
+        are not changed.
+
+        >>> m = p.getElementsByClass('Measure')[1]
+        >>> m.activeSite = None
+        >>> [x[0] for x in s.recurseWithOffsets(classFilter='Measure', 
+        ...     restoreActiveSites=True)]
+        [<music21.stream.Measure 1 offset=0.0>, <music21.stream.Measure 2 offset=4.0>]
+        >>> m.activeSite is p
+        True
+        '''
+        if (classFilter is not None and
+            not isinstance(classFilter, (list, tuple))):
+            classFilter = (classFilter,)
+        if (streamFilter is not None and
+            not isinstance(streamFilter, (list, tuple))):
+            streamFilter = (streamFilter,)
+        # if only Streams can match, only Streams need to be searched
+        if classFilter is not None and not streamsOnly:
+            streamsOnly = True
+            for className in classFilter:
+                if common.isStr(className):
+                    className = globals().get(className)
+                if not (isinstance(className, type) and 
+                    issubclass(className, Stream)):
+                    streamsOnly = False
+                    break
+        return self._yieldElementsWithOffsets(0.0, (self,),
+            classFilter=classFilter, streamFilter=streamFilter,
+            streamsOnly=streamsOnly, restoreActiveSites=restoreActiveSites)
+
+    def _yieldElementsWithOffsets(self, offset, containers, classFilter=None,
+        streamFilter=None, streamsOnly=False, restoreActiveSites=False):
+        '''
+        Yield the (element, offset, containers) tuples of
+        :meth:`~music21.stream.Stream.recurseWithOffsets` for the elements
+        of this Stream, which is found at `offset` within `containers`.
+        '''
+        # there are no Streams here to search or yield
+        if streamsOnly and self.isFlat:
+            return
+        if not self.isSorted and self.autoSort:
+            self.sort() # will set isSorted to True
+
+        for e in self._elements:
+            if restoreActiveSites:
+                e.activeSite = self
+            eOffset = offset + e.getOffsetBySite(self)
+            if e.isStream:
+                if classFilter is None or e.isClassOrSubclass(classFilter):
+                    yield e, eOffset, containers
+                if streamFilter is None or e.isClassOrSubclass(streamFilter):
+                    for y in e._yieldElementsWithOffsets(eOffset,
+                        containers + (e,), classFilter=classFilter,
+                        streamFilter=streamFilter, streamsOnly=streamsOnly,
+                        restoreActiveSites=restoreActiveSites):
+                        yield y
+            elif not streamsOnly:
+                if classFilter is None or e.isClassOrSubclass(classFilter):
+                    yield e, eOffset, containers
+
+        if streamsOnly or len(self._endElements) == 0:
+            return
+        # end elements are never Streams
+        eOffset = offset + self.highestTime
+        for e in self._endElements:
+            if restoreActiveSites:
+                e.activeSite = self
+            if classFilter is None or e.isClassOrSubclass(classFilter):
+                yield e, eOffset, containers
+
 
     def restoreActiveSites(self):   
         '''Restore all active sites for all elements from this Stream downward.
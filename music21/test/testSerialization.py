@@ -227,11 +227,32 @@ class Test(unittest.TestCase):
 
 
 
-    def xtestBasicK(self):
-        # this fails due to finding a weakref
+    def testBasicK(self):
+        # spanners in this work have components not found in the Score
         from music21 import corpus, converter
-        s = corpus.parse('beethoven/opus133')
+        s = corpus.parse('beethoven/opus18no1', 1)
         data = converter.freezeStr(s, fmt='pickle')
+        sPost = converter.unfreezeStr(data)
+        self.assertEqual(len(sPost.flat.notes), len(s.flat.notes))
+
+
+    def testBasicL(self):
+        # volumes store their parent as a weakref
+        from music21 import stream, note, converter
+
+        s = stream.Stream()
+        for v in [20, 60, 100]:
+            n = note.Note('E4')
+            n.volume.velocity = v
+            s.append(n)
+
+        for fmt in ['pickle', 'jsonpickle']:
+            temp = converter.freezeStr(s, fmt=fmt)
+            sPost = converter.unfreezeStr(temp)
+            self.assertEqual([n.volume.velocity for n in sPost.notes], 
+                [20, 60, 100])
+            n = sPost.notes[0]
+            self.assertEqual(n.volume.parent is n, True)
 
 
 
@@ -7375,6 +7375,219 @@ class Test(unittest.TestCase):
         self.assertEqual(s1 in n1.getSites(), False)
         self.assertEqual(s2 in n1.getSites(), True)
 
+    def testKeepSortedA(self):
+        from music21 import note, stream, clef
+
+        s1 = stream.Stream()
+        s1.keepSorted = True
+        s2 = stream.Stream()
+        offsets = [8, 3, 3, 0, 12, 5.5, 1, 3, 0]
+        for o in offsets:
+            n = note.Note()
+            s1.insert(o, n)
+            s2.insert(o, copy.deepcopy(n))
+            # out of order inserts do not clear the sort status
+            self.assertEqual(s1.isSorted, True)
+        self.assertEqual(s2.isSorted, False)
+        c = clef.BassClef()
+        s1.insert(3, c)
+        s2.insert(3, copy.deepcopy(c))
+        self.assertEqual(s1.isSorted, True)
+        self.assertEqual([e.offset for e in s1], [e.offset for e in s2])
+        self.assertEqual([e.classes[0] for e in s1], 
+                         [e.classes[0] for e in s2])
+        # clef sorts before notes at the same offset
+        self.assertEqual(s1.index(c), 3)
+        self.assertEqual(s1[3], c)
+
+        # removal retains sorting and index lookups
+        n = s1.getElementsByOffset(3)[1]
+        s1.remove(n)
+        self.assertEqual(s1.isSorted, True)
+        self.assertEqual(s1.hasElement(n), False)
+        self.assertEqual([e.offset for e in s1], 
+                         [0.0, 0.0, 1.0, 3.0, 3.0, 3.0, 5.5, 8.0, 12.0])
+        for i, e in enumerate(s1):
+            self.assertEqual(s1.index(e), i)
+
+        # end elements are placed by priority
+        from music21 import bar
+        b1 = bar.Barline()
+        b1.priority = 2
+        b2 = bar.Barline()
+        s1.storeAtEnd(b1)
+        s1.storeAtEnd(b2)
+        self.assertEqual(s1.isSorted, True)
+        self.assertEqual(s1.elements[-2:], [b2, b1])
+
+
+    def testOffsetIndexA(self):
+        import random
+        from music21 import note, stream, clef
+
+        s = stream.Stream()
+        random.seed(5)
+        for i in range(200):
+            n = note.Note()
+            n.quarterLength = random.choice([0, .25, .5, 1, 2, 6])
+            s.insert(random.randint(0, 80) * .5, n)
+        s.insert(3, clef.BassClef())
+        # a copy that does not use the index, as it is not sorted
+        sUnsorted = copy.deepcopy(s)
+        sUnsorted.autoSort = False
+        sUnsorted.isSorted = False
+
+        for offsetStart, offsetEnd in [(0, 0), (3, 3), (2.5, 7), (10.25, 11),
+            (39, 45), (-2, 1), (40, 40)]:
+            for mustBeginInSpan in [True, False]:
+                for includeEndBoundary in [True, False]:
+                    for mustFinishInSpan in [True, False]:
+                        kw = dict(mustBeginInSpan=mustBeginInSpan, 
+                            includeEndBoundary=includeEndBoundary, 
+                            mustFinishInSpan=mustFinishInSpan)
+                        post = s.getElementsByOffset(offsetStart, offsetEnd, 
+                               **kw)
+                        match = sUnsorted.getElementsByOffset(offsetStart, 
+                               offsetEnd, **kw)
+                        self.assertEqual(
+                            sorted([(e.offset, e.duration.quarterLength) for e in post]),
+                            sorted([(e.offset, e.duration.quarterLength) for e in match]))
+        self.assertEqual(len(s.getElementsByOffset(3, classList=['Clef'])), 1)
+
+        for o in [-1, 0, 0.1, 3, 3.2, 17.5, 100]:
+            for classList in [None, ['Clef'], ['Rest']]:
+                post = s.getElementAtOrBefore(o, classList)
+                match = sUnsorted.getElementAtOrBefore(o, classList)
+                if match is None:
+                    self.assertEqual(post, None)
+                else:
+                    self.assertEqual(post.getOffsetBySite(s), 
+                                     match.getOffsetBySite(sUnsorted))
+                    self.assertEqual(post.classes, match.classes)
+                post = s.getElementBeforeOffset(o, classList)
+                match = sUnsorted.getElementBeforeOffset(o, classList)
+                if match is None:
+                    self.assertEqual(post, None)
+                else:
+                    self.assertEqual(post.getOffsetBySite(s), 
+                                     match.getOffsetBySite(sUnsorted))
+
+        # the index is rebuilt after changes
+        n = note.Note()
+        s.insert(100, n)
+        self.assertEqual(s.getElementAtOrBefore(200) is n, True)
+        self.assertEqual(len(s.getElementsByOffset(99, 101)), 1)
+
+    def testClassCacheA(self):
+        from music21 import note, stream, clef, chord, bar
+
+        s = stream.Stream()
+        s.repeatAppend(note.Note(), 4)
+        self.assertEqual(len(s.getElementsByClass('Note')), 4)
+        cc = s._getClassCache()
+        # appending, inserting at the end, and removing update the cache
+        s.append(note.Rest())
+        s.insert(20, chord.Chord(['c', 'e']))
+        s.storeAtEnd(bar.Barline())
+        self.assertEqual(s._getClassCache() is cc, True)
+        self.assertEqual(len(s.getElementsByClass('GeneralNote')), 6)
+        self.assertEqual(len(s.getElementsByClass(['Rest', 'Chord'])), 2)
+        self.assertEqual(len(s.getElementsByClass(bar.Barline)), 1)
+        # storing at the end requires sorting, which rebuilds the cache
+        cc = s._getClassCache()
+        s.remove(s.getElementsByClass('Rest')[0])
+        s.pop(0)
+        self.assertEqual(s._getClassCache() is cc, True)
+        self.assertEqual(len(s.getElementsByClass('GeneralNote')), 4)
+        self.assertEqual(s.hasElementOfClass('Rest'), False)
+
+        # out of order inserts require sorting; results remain sorted
+        c = clef.AltoClef()
+        s.insert(1, c)
+        self.assertEqual(s.isSorted, False)
+        match = [e.offset for e in s if e.isClassOrSubclass(['Clef', 'Note'])]
+        self.assertEqual([e.offset for e in 
+                          s.getElementsByClass(['Clef', note.Note])], match)
+        self.assertEqual(s.getElementsByClass('Clef')[0] is c, True)
+
+        # elements added with _insertCore are found
+        s._insertCore(30, note.Rest())
+        self.assertEqual(len(s.getElementsByClass('Rest')), 1)
+
+        view = s.getElementsByClass('NotRest', returnView=True)
+        self.assertEqual(view.offsets, [1.0, 2.0, 3.0, 20.0])
+        self.assertEqual(len(view.getElementsByClass('Chord')), 1)
+
+    def testFlatViewA(self):
+        from music21 import corpus, note, stream
+
+        s = corpus.parse('bach/bwv66.6')
+        fv = s.flatView
+        self.assertEqual(len(fv), len(s.flat))
+        # elements, order, and offsets match those of the flat Stream 
+        sFlat = s.flat
+        self.assertEqual(fv.elements, sFlat.elements)
+        self.assertEqual(fv.offsets, 
+                         [e.getOffsetBySite(sFlat) for e in sFlat])
+        match = sFlat.getElementsByOffset(4, 6, classList=['Note'])
+        self.assertEqual(fv.getElementsByOffset(4, 6, 
+            classList=['Note']).elements, match.elements)
+        match = sFlat.getElementsByOffset(4.5, mustBeginInSpan=False)
+        self.assertEqual(fv.getElementsByOffset(4.5, 
+            mustBeginInSpan=False).elements, match.elements)
+
+        # a new Stream, with no flat representation, gains no sites
+        s = corpus.parse('bach/bwv66.6', forceSource=True)
+        notes = s.flatView.getElementsByClass('Note')
+        self.assertEqual(len(notes), 165)
+        self.assertEqual([len(n.getSites()) for n in notes], 
+                         [len(n.getSites()) for n in s.recurse() 
+                          if isinstance(n, note.Note)])
+
+        # the view is rebuilt after the Stream changes
+        s = stream.Stream()
+        s.repeatAppend(note.Note(), 2)
+        self.assertEqual(len(s.flatView), 2)
+        s.append(note.Note())
+        self.assertEqual(len(s.flatView), 3)
+
+    def testRecurseWithOffsetsA(self):
+        from music21 import corpus, note, bar
+
+        s = corpus.parse('bach/bwv66.6')
+        sFlat = s.flat
+        # all non-Stream elements, and their offsets, match those of flat
+        post = [(id(e), o) for e, o, c in s.recurseWithOffsets() 
+                if not e.isStream]
+        match = [(id(e), e.getOffsetBySite(sFlat)) for e in sFlat]
+        self.assertEqual(sorted(post), sorted(match))
+
+        post = list(s.recurseWithOffsets(classFilter=[note.Note, bar.Barline]))
+        match = sFlat.getElementsByClass([note.Note, bar.Barline])
+        self.assertEqual(len(post), len(match))
+        self.assertEqual(sorted([o for e, o, c in post]), 
+            sorted([e.getOffsetBySite(match) for e in match]))
+        for e, o, c in post:
+            self.assertEqual(c[0] is s, True)
+            self.assertEqual(e.getOffsetBySite(c[-1]) is not None, True)
+            self.assertEqual([x.classes[0] for x in c], 
+                             ['Score', 'Part', 'Measure'])
+
+        # filtering does not create class caches in the Streams searched
+        for m in s.recurse(streamsOnly=True):
+            self.assertEqual('classCache' in m._cache, False)
+
+        post = list(s.recurseWithOffsets(streamsOnly=True))
+        self.assertEqual(len(post), len(s.recurse(streamsOnly=True)) - 1)
+        # only Streams can match, so the same Streams are found
+        post = list(s.recurseWithOffsets(classFilter=['Measure', 'Part']))
+        match = [x for x in s.recurse(streamsOnly=True) 
+                 if 'Measure' in x.classes or 'Part' in x.classes]
+        self.assertEqual([id(e) for e, o, c in post], [id(x) for x in match])
+        # Parts do not match the stream filter, so are not searched
+        post = list(s.recurseWithOffsets(classFilter='Note', 
+                                         streamFilter='Score'))
+        self.assertEqual(post, [])
 
 #------------------------------------------------------------------------------
 
@@ -62,6 +62,16 @@ class Volume(object):
         new._parent = self._parent
         return new
 
+    def __getstate__(self):
+        # weak references cannot be pickled; store the parent itself
+        state = self.__dict__.copy()
+        state['_parent'] = self.parent
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._parent = common.wrapWeakref(self._parent)
+
 
     def __repr__(self):
         return "<music21.volume.Volume realized=%s>" % round(self.realized, 2)
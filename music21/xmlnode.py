@@ -70,6 +70,24 @@ def fixed_writexml(self, writer, indent="", addindent="", newl=""):
 
 
 
+def _escapeXml(data):
+    '''Escape character data as xml.dom.minidom does.
+
+    >>> from music21 import *
+    >>> xmlnode._escapeXml('"a" < b & c')
+    '&quot;a&quot; &lt; b &amp; c'
+    '''
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace(
+        "\"", "&quot;").replace(">", "&gt;")
+
+def _encodeXml(data):
+    '''Encode unicode character data as utf-8.
+    '''
+    if isinstance(data, unicode):
+        return data.encode('utf-8')
+    return data
+
+
 #-------------------------------------------------------------------------------
 class XMLNodeException(exceptions21.Music21Exception):
     pass
@@ -540,6 +558,141 @@ class XMLNode(object):
         '''Shortcut method to provide quick xml out.'''
         return self.toxml(None, None, 1)
 
+    #---------------------------------------------------------------------------
+    # writing without a DOM
+
+    def _getChildren(self):
+        '''Return a list of the children that toxml() would create for this
+        node, as (tag, data) pairs. For text, tag is None; for simple
+        elements, data is a string or, if the element is empty, None;
+        XMLNode components are given as (None, component).
+
+        >>> from music21 import *
+        >>> a = musicxml.Pitch()
+        >>> a.set('step', 'C')
+        >>> a.set('octave', 4)
+        >>> a._getChildren()
+        [('step', u'C'), ('octave', u'4')]
+        '''
+        post = []
+        if self.charData != None:
+            try:
+                post.append((None, str(self.charData)))
+            except UnicodeEncodeError:
+                post.append((None, self.charData))
+        for component in self._getComponents():
+            if component == None: continue
+            # its a simple element
+            elif isinstance(component, tuple):
+                tag, content = component
+                if content == None: continue
+                if type(content) == bool and content == False:
+                    continue
+                if type(content) == bool and content == True:
+                    post.append((tag, None))
+                else:
+                    try:
+                        entry = unicode(content, errors='replace')
+                    except TypeError:
+                        entry = u"%s" % content
+                    post.append((tag, entry))
+            elif isinstance(component, XMLNode):
+                post.append((None, component))
+            else:
+                raise XMLNodeException(
+                    'cannot process component object: %s' % component)
+        return post
+
+    def _getXmlStartTag(self):
+        '''Return the opening tag, without the closing bracket, with
+        attributes sorted as by xml.dom.minidom.
+        '''
+        attrs = {}
+        for name, value in self._getAttributes():
+            if value in [None, '']: continue
+            attrs[name] = str(value)
+        msg = ['<', self._tag]
+        for name in sorted(attrs.keys()):
+            msg.append(' %s="%s"' % (name, _escapeXml(attrs[name])))
+        return ''.join(msg)
+
+    def writeXmlDeclaration(self, writer, newl='\n'):
+        '''Write the XML declaration, and the doctype if defined, to
+        the file-like `writer`, as toxml() does for a new document.
+        '''
+        writer.write('<?xml version="1.0" encoding="utf-8"?>' + newl)
+        if self._doctypeName != None:
+            writer.write('<!DOCTYPE ' + self._doctypeName)
+            if self._doctypePublic:
+                writer.write("%s  PUBLIC '%s'%s  '%s'" % (newl,
+                    self._doctypePublic, newl, self._doctypeSystem))
+            elif self._doctypeSystem:
+                writer.write("%s  SYSTEM '%s'" % (newl, self._doctypeSystem))
+            writer.write('>' + newl)
+
+    def writeXmlStart(self, writer, indent='', newl='\n'):
+        '''Write the opening tag of this node to the file-like `writer`.
+        Together with writeXmlEnd(), this permits writing components
+        one at a time with writeXml().
+        '''
+        writer.write(indent + self._getXmlStartTag() + '>' + newl)
+
+    def writeXmlEnd(self, writer, indent='', newl='\n'):
+        '''Write the closing tag of this node to the file-like `writer`.
+        '''
+        writer.write('%s</%s>%s' % (indent, self._tag, newl))
+
+    def writeXml(self, writer, indent='', addindent='  ', newl='\n'):
+        '''Write this node and all sub nodes to the file-like `writer`,
+        without building a DOM. The output is the same as the
+        pretty-printed output of toxml() for this node, encoded as utf-8.
+
+        >>> from music21 import *
+        >>> import StringIO
+        >>> a = musicxml.Pitch()
+        >>> a.set('step', 'C')
+        >>> a.set('octave', 4)
+        >>> f = StringIO.StringIO()
+        >>> a.writeXml(f)
+        >>> print(f.getvalue())
+        <pitch>
+          <step>C</step>
+          <octave>4</octave>
+        </pitch>
+        <BLANKLINE>
+        >>> a.xmlStr().endswith(f.getvalue())
+        True
+        '''
+        children = self._getChildren()
+        start = indent + self._getXmlStartTag()
+        if len(children) == 0:
+            writer.write(start + '/>' + newl)
+        elif len(children) == 1 and children[0][0] is None and not isinstance(
+            children[0][1], XMLNode):
+            writer.write('%s>%s</%s>%s' % (start,
+                _encodeXml(_escapeXml(children[0][1])), self._tag, newl))
+        else:
+            writer.write(start + '>' + newl)
+            self._writeXmlChildren(writer, children, indent + addindent, 
+                addindent, newl)
+            self.writeXmlEnd(writer, indent, newl)
+
+    def _writeXmlChildren(self, writer, children, indent, addindent, newl):
+        '''Write children, as returned by _getChildren(), at the given indent.
+        '''
+        for tag, data in children:
+            if tag is None:
+                if isinstance(data, XMLNode):
+                    data.writeXml(writer, indent, addindent, newl)
+                elif data: # empty text is not written
+                    writer.write(_encodeXml(_escapeXml(
+                        indent + data + newl)))
+            elif data is None:
+                writer.write('%s<%s/>%s' % (indent, tag, newl))
+            else:
+                writer.write('%s<%s>%s</%s>%s' % (indent, tag,
+                    _encodeXml(_escapeXml(data)), tag, newl))
+
 
 
 class XMLNodeList(XMLNode):